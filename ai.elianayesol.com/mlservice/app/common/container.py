@@ -0,0 +1,104 @@
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServiceSpec:
+    """
+    컨테이너에 등록하는 서비스 선언
+
+    - factory: 인스턴스 생성 함수 (기본: 서비스 클래스 자체)
+    - warm: 서버 시작 시 미리 생성하고 인스턴스의 warm() 을 호출할지 여부
+      (외부 네트워크가 필요한 서비스는 False 로 두고 첫 요청에서 생성)
+    """
+    factory: Callable
+    warm: bool = True
+
+
+class ServiceContainer:
+    """
+    프로세스 전체에서 서비스 인스턴스를 하나씩만 만들어 공유하는 컨테이너
+
+    - get(cls): 처음 요청할 때 한 번만 생성 (동시에 요청해도 서비스별 잠금으로 한 번만 생성)
+    - startup(): lifespan 시작 시 warm 대상 서비스를 만들고 warm() 호출 (데이터 로드, 캐시 채우기)
+    - shutdown(): lifespan 종료 시 만들어진 서비스의 close() 호출 (풀, 세션 정리)
+    - lock(cls): 서비스 상태를 바꾸는 작업을 직렬화할 때 쓰는 서비스별 재진입 잠금
+
+    등록하지 않은 클래스도 get(cls) 로 요청하면 기본 생성자로 등록된다.
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._instances = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def register(self, cls: type, factory: Callable = None, warm: bool = True):
+        with self._guard:
+            self._specs[cls] = ServiceSpec(factory=factory or cls, warm=warm)
+            self._locks.setdefault(cls, threading.RLock())
+
+    def lock(self, cls: type) -> threading.RLock:
+        with self._guard:
+            return self._locks.setdefault(cls, threading.RLock())
+
+    def get(self, cls: type):
+        instance = self._instances.get(cls)
+        if instance is not None:
+            return instance
+        with self.lock(cls):
+            # 잠금을 기다리는 동안 다른 요청이 만들었을 수 있음
+            if cls not in self._instances:
+                with self._guard:
+                    spec = self._specs.setdefault(cls, ServiceSpec(factory=cls))
+                started = time.perf_counter()
+                self._instances[cls] = spec.factory()
+                logger.info(f"🧩 {cls.__name__} 생성 ({time.perf_counter() - started:.3f}s)")
+            return self._instances[cls]
+
+    def startup(self) -> dict:
+        """warm 대상 서비스 생성 + warm() 호출, 서비스별 소요 시간 (실패해도 서버는 뜨고 첫 요청에서 다시 시도)"""
+        report = {}
+        for cls, spec in list(self._specs.items()):
+            if not spec.warm:
+                continue
+            started = time.perf_counter()
+            try:
+                service = self.get(cls)
+                warm = getattr(service, "warm", None)
+                if callable(warm):
+                    with self.lock(cls):
+                        warm()
+                report[cls.__name__] = round(time.perf_counter() - started, 3)
+            except Exception as e:
+                logger.warning(f"⚠️ {cls.__name__} 준비 실패 (첫 요청에서 다시 시도): {e}")
+                report[cls.__name__] = f"error: {e}"
+        logger.info(f"🚀 서비스 준비 완료: {report}")
+        return report
+
+    def shutdown(self):
+        with self._guard:
+            instances = list(self._instances.items())
+            self._instances.clear()
+        for cls, service in instances:
+            close = getattr(service, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"⚠️ {cls.__name__} 종료 중 오류: {e}")
+
+    def status(self) -> dict:
+        """등록된 서비스별 생성 여부"""
+        with self._guard:
+            return {cls.__name__: cls in self._instances for cls in self._specs}
+
+
+# 앱 전체에서 쓰는 컨테이너 (main.py 의 lifespan 에서 startup / shutdown)
+services = ServiceContainer()
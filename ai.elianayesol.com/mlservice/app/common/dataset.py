@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+import pandas as pd
+
+
+@dataclass  # 데이터웨어하우스에서 일부분 발췌하는 데코레이터
+class DataSet(object):
+    """
+    train/test 데이터셋 공통 구조 (타이타닉/ESG 등급 서비스가 함께 사용)
+    """
+    _fname: str = ''  # file name
+    _dname: str = ''  # data path
+    _sname: str = ''  # save path
+    _train: pd.DataFrame = None
+    _test: pd.DataFrame = None
+    _id: str = ''
+    _label: object = ''  # 라벨 컬럼 이름 또는 라벨 데이터
+    _state: dict = None  # 학습 데이터에서 계산한 전처리 통계 (새 데이터 변환에 재사용)
+    _report: list = None  # 이 데이터셋을 만든 전처리 파이프라인 단계별 실행 기록 (캐시 적중 여부 포함)
+
+    @property  # 필요한 부분만 읽게 하는 것
+    def fname(self) -> str:
+        return self._fname
+
+    @fname.setter
+    def fname(self, fname):
+        self._fname = fname
+
+    @property
+    def dname(self) -> str:
+        return self._dname
+
+    @dname.setter
+    def dname(self, dname):
+        self._dname = dname
+
+    @property
+    def sname(self) -> str:
+        return self._sname
+
+    @sname.setter
+    def sname(self, sname):
+        self._sname = sname
+
+    @property
+    def train(self) -> object:
+        return self._train
+
+    @train.setter
+    def train(self, train):
+        self._train = train
+
+    @property
+    def test(self) -> object:
+        return self._test
+
+    @test.setter
+    def test(self, test):
+        self._test = test
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @id.setter
+    def id(self, id):
+        self._id = id
+
+    @property
+    def label(self) -> object:
+        return self._label
+
+    @label.setter
+    def label(self, label):
+        self._label = label
+
+    @property
+    def state(self) -> dict:
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = state
+
+    @property
+    def report(self) -> list:
+        return self._report
+
+    @report.setter
+    def report(self, report):
+        self._report = report
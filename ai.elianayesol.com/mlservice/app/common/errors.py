@@ -0,0 +1,15 @@
+class InvalidRequestError(ValueError):
+    """
+    요청 값(쿼리 파라미터, 업로드 파일 형식 등)이 잘못됐을 때 서비스가 직접 던지는 예외
+
+    라우터는 이 예외만 400 으로 돌려주고, 다른 ValueError 는 서버 오류(500)로 기록한다.
+    ValueError 를 상속하므로 기존처럼 ValueError 로 잡는 코드도 그대로 동작한다.
+    """
+
+
+class NotFoundError(LookupError):
+    """
+    요청한 대상(회사 코드 등)이 데이터에 없을 때 서비스가 직접 던지는 예외
+
+    라우터는 이 예외만 404 로 돌려준다. 내부 코드의 KeyError 는 서버 오류(500)로 기록한다.
+    """
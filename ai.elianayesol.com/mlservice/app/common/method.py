@@ -0,0 +1,37 @@
+import pandas as pd
+from pandas import DataFrame
+
+
+class TabularMethod(object):
+    """
+    표 형식 데이터 전처리 공통 단계
+
+    모든 메소드는 프레임 하나를 받아 프레임 하나를 반환한다.
+    train/test 에 나눠 적용하는 것은 Pipeline 의 단계 선언이 맡는다.
+    """
+
+    def read_csv(self, path: str, dtype: dict = None) -> DataFrame:
+        return pd.read_csv(path, dtype=dtype)
+
+    def create_df(self, df: DataFrame, label: str) -> DataFrame:
+        # 라벨 컬럼을 제거한 데이터프레임 (라벨이 없으면 그대로)
+        return df.drop(columns=[label]) if label in df.columns else df
+
+    def create_label(self, df: DataFrame, label: str) -> pd.Series:
+        # 라벨 값만 가지는 답안지 (라벨이 없으면 빈 Series)
+        return df[label] if label in df.columns else pd.Series(dtype=object)
+
+    def drop_features(self, df: DataFrame, *features: str) -> DataFrame:
+        return self.drop_columns(df, features)
+
+    def drop_columns(self, df: DataFrame, features: list) -> DataFrame:
+        # 존재하는 컬럼만 삭제 (열 제거만 하므로 다른 컬럼 데이터는 복사하지 않음)
+        # Step(params={"features": [...]}) 로 선언할 수 있도록 목록을 받는 형태
+        df = df.copy(deep=False)
+        for feature in features:
+            if feature in df.columns:
+                del df[feature]
+        return df
+
+    def check_null(self, df: DataFrame) -> int:
+        return int(df.isnull().sum().sum())
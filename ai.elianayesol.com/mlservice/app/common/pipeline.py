@@ -0,0 +1,272 @@
+import os
+import copy
+import time
+import uuid
+import inspect
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable
+import joblib
+import pandas as pd
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+# 단계 결과 메모리 캐시 (단계 해시 -> (출력 튜플, 단계 state)), 프로세스 전체에서 공유
+_MEMORY_CACHE = OrderedDict()
+_MEMORY_LIMIT = 256
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class Step:
+    """
+    파이프라인 단계 선언
+
+    - fn(*inputs, **params) 를 호출해 outputs 이름으로 결과를 등록한다
+      (출력이 여러 개면 fn 은 같은 순서의 튜플을 반환)
+    - stateful 단계는 fn(..., state=dict) 로 자기 이름의 state 를 받는다.
+      비어 있으면 학습(fit) 통계를 채우고, 채워져 있으면 그대로 사용(transform)한다.
+    - fingerprint 는 외부 데이터를 읽는 단계의 데이터 버전 (예: 파일 mtime) 을 반환한다.
+    - 단계 함수는 입력 프레임의 값을 직접 수정하지 않고 컬럼을 통째로 교체해야 한다
+      (엔진이 입력을 얕은 복사로 넘기므로 캐시된 결과가 보존됨).
+    """
+    name: str
+    fn: Callable
+    inputs: tuple = ()
+    outputs: tuple = ()
+    params: dict = field(default_factory=dict)
+    stateful: bool = False
+    fingerprint: Callable = None
+    cache: bool = True
+
+
+@dataclass
+class PipelineResult:
+    outputs: dict
+    state: dict
+    report: list
+
+    @property
+    def hits(self) -> int:
+        return sum(1 for record in self.report if record["cache"].startswith("hit"))
+
+    def __getitem__(self, name: str):
+        return self.outputs[name]
+
+
+def _source_hash(fn: Callable) -> str:
+    """단계 함수 소스 코드 해시 (코드가 바뀌면 캐시 무효화)"""
+    target = getattr(fn, "__func__", fn)
+    try:
+        source = inspect.getsource(target)
+    except (OSError, TypeError):
+        source = getattr(target, "__qualname__", repr(target))
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+def _shallow(value):
+    """프레임은 얕은 복사 (컬럼 교체/삭제가 원본에 영향을 주지 않음)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+class Pipeline:
+    """
+    선언형 표 데이터 파이프라인
+
+    단계 선언 순서로 의존 관계를 정하고(입력 이름 = 앞 단계 중 마지막으로 그 이름을 출력한 단계),
+    입력이 준비된 단계들은 스레드 풀에서 동시에 실행한다.
+
+    단계 결과는 단계 해시(단계 이름 + 함수 소스 + params + 입력 해시 + 데이터 버전 + state)로
+    메모리와 cache_dir 디스크에 캐시되어, 같은 입력으로 다시 실행하면 바뀐 단계부터만 계산한다.
+    단계 함수가 부르는 헬퍼 코드가 바뀌면 version 을 올려서 캐시를 무효화한다.
+    """
+
+    def __init__(self, name: str, steps: list, cache_dir: str = None, max_workers: int = 4, version=0):
+        self.name = name
+        self.version = version
+        self.steps = list(steps)
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self._deps = self._resolve()
+
+    def _resolve(self) -> list:
+        """단계별 입력 -> (이름, 생산 단계 번호), 외부 입력이면 -1"""
+        latest, deps = {}, []
+        for step in self.steps:
+            deps.append([(name, latest.get(name, -1)) for name in step.inputs])
+            for name in step.outputs:
+                latest[name] = len(deps) - 1
+        return deps
+
+    # -----------------------------
+    # 캐시
+    # -----------------------------
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, self.name, f"{key}.joblib")
+
+    def _cache_get(self, key: str):
+        with _CACHE_LOCK:
+            if key in _MEMORY_CACHE:
+                _MEMORY_CACHE.move_to_end(key)
+                return _MEMORY_CACHE[key], "hit-memory"
+        if self.cache_dir and os.path.exists(self._cache_path(key)):
+            try:
+                value = joblib.load(self._cache_path(key))
+            except Exception as e:  # 깨진 캐시 파일은 무시하고 다시 계산
+                logger.warning(f"파이프라인 캐시 읽기 실패 ({key}): {e}")
+                return None, "miss"
+            self._memory_put(key, value)
+            return value, "hit-disk"
+        return None, "miss"
+
+    def _memory_put(self, key: str, value):
+        with _CACHE_LOCK:
+            _MEMORY_CACHE[key] = value
+            _MEMORY_CACHE.move_to_end(key)
+            while len(_MEMORY_CACHE) > _MEMORY_LIMIT:
+                _MEMORY_CACHE.popitem(last=False)
+
+    def _cache_put(self, key: str, value):
+        self._memory_put(key, value)
+        if self.cache_dir:
+            path = self._cache_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, path)
+
+    def _step_key(self, step: Step, input_hashes: list, step_state: dict) -> str:
+        digest = hashlib.sha1()
+        digest.update(f"{self.name}|{self.version}|{step.name}|{_source_hash(step.fn)}".encode())
+        digest.update(joblib.hash(step.params).encode())
+        for input_hash in input_hashes:
+            digest.update(input_hash.encode())
+        if step.fingerprint is not None:
+            digest.update(str(step.fingerprint()).encode())
+        if step.stateful:
+            digest.update(joblib.hash(step_state).encode())
+        return digest.hexdigest()
+
+    # -----------------------------
+    # 실행
+    # -----------------------------
+    def _needed(self, provided: set, targets: list) -> list:
+        """targets 를 만드는 데 필요한 단계 번호 (출력이 모두 입력으로 주어진 소스 단계는 제외)"""
+        latest = {}
+        for index, step in enumerate(self.steps):
+            for name in step.outputs:
+                latest[name] = index
+        wanted = [latest[name] for name in targets if name in latest]
+        needed = set()
+        while wanted:
+            index = wanted.pop()
+            if index in needed:
+                continue
+            step = self.steps[index]
+            if not step.inputs and all(name in provided for name in step.outputs):
+                continue
+            needed.add(index)
+            wanted.extend(dep for _, dep in self._deps[index] if dep >= 0)
+        return sorted(needed)
+
+    def run(self, inputs: dict = None, state: dict = None, cache: bool = True,
+            targets: list = None, runner=None) -> PipelineResult:
+        """
+        파이프라인 실행
+
+        Args:
+            inputs: 외부에서 넣는 데이터 (이름 -> 값), 같은 이름을 출력하는 소스 단계(입력 없는 단계)는 건너뜀
+            state: 단계 이름 -> 학습 통계 (비어 있으면 학습, 있으면 재사용)
+            cache: 단계 결과 캐시 사용 여부 (청크 채점처럼 매번 다른 데이터면 False)
+            targets: 필요한 출력 이름 (기본값: 모든 단계의 출력)
+            runner: run(name, fn, *args, **kwargs) 를 제공하는 계측기 (예: PipelineProfiler)
+        """
+        inputs = dict(inputs or {})
+        state = state if state is not None else {}
+        targets = targets or [name for step in self.steps for name in step.outputs]
+        needed = self._needed(set(inputs), targets)
+
+        values = {(name, -1): value for name, value in inputs.items()}
+        hashes = {(name, -1): joblib.hash(value) if cache else "" for name, value in inputs.items()}
+        report = [None] * len(self.steps)
+
+        def resolve(index: int, name: str, dep: int):
+            # 생산 단계를 건너뛰었으면 외부 입력 사용
+            key = (name, dep) if dep >= 0 and dep in needed else (name, -1)
+            if key not in values:
+                raise ValueError(f"{self.name}.{self.steps[index].name}: 입력 '{name}' 이 없습니다.")
+            return key
+
+        def execute(index: int):
+            step = self.steps[index]
+            keys = [resolve(index, name, dep) for name, dep in self._deps[index]]
+            args = [_shallow(values[key]) for key in keys]
+            step_state = state.setdefault(step.name, {}) if step.stateful else None
+            use_cache = cache and step.cache
+            started = time.perf_counter()
+
+            cache_key, status = None, "off"
+            if use_cache:
+                cache_key = self._step_key(step, [hashes[key] for key in keys], step_state)
+                cached, status = self._cache_get(cache_key)
+                if cached is not None:
+                    outputs, cached_state = cached
+                    if step.stateful:
+                        step_state.clear()
+                        step_state.update(copy.deepcopy(cached_state))
+                    return index, outputs, cache_key, status, time.perf_counter() - started
+
+            kwargs = dict(step.params)
+            if step.stateful:
+                kwargs["state"] = step_state
+            result = runner.run(step.name, step.fn, *args, **kwargs) if runner is not None else step.fn(*args, **kwargs)
+            outputs = tuple(result) if len(step.outputs) > 1 else (result,)
+            if len(outputs) != len(step.outputs):
+                raise ValueError(f"{self.name}.{step.name}: 출력 {len(step.outputs)}개가 필요하지만 {len(outputs)}개를 반환했습니다.")
+            if use_cache:
+                self._cache_put(cache_key, (outputs, copy.deepcopy(step_state) if step.stateful else None))
+            return index, outputs, cache_key, status, time.perf_counter() - started
+
+        def finish(index: int, outputs: tuple, cache_key: str, status: str, elapsed: float):
+            step = self.steps[index]
+            for position, name in enumerate(step.outputs):
+                values[(name, index)] = outputs[position]
+                if cache_key:
+                    hashes[(name, index)] = f"{cache_key}:{position}"
+                else:
+                    # 캐시하지 않는 단계(매번 실행)는 출력 내용으로 해시해서 뒤 단계 캐시 키에 반영
+                    hashes[(name, index)] = joblib.hash(outputs[position]) if cache else ""
+            report[index] = {"step": step.name, "cache": status, "seconds": round(elapsed, 6)}
+
+        pending = list(needed)
+        done = set()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            running = {}
+            while pending or running:
+                ready = [i for i in pending
+                         if all(dep < 0 or dep in done or dep not in needed for _, dep in self._deps[i])]
+                for index in ready:
+                    pending.remove(index)
+                    running[pool.submit(execute, index)] = index
+                if not running:
+                    raise ValueError(f"{self.name}: 실행할 수 없는 단계가 있습니다: {[self.steps[i].name for i in pending]}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    finish(*future.result())
+                    done.add(index)
+
+        # 각 이름의 마지막 값을 결과로 (호출자가 속성을 바꿔도 캐시에 영향이 없도록 얕은 복사)
+        outputs = {name: _shallow(value) for (name, _), value in sorted(
+            values.items(), key=lambda item: item[0][1])}
+        records = [record for record in report if record is not None]
+        hits = sum(1 for record in records if record["cache"].startswith("hit"))
+        logger.info(f"🔧 {self.name} 파이프라인: {len(records)}단계 실행, 캐시 적중 {hits}단계")
+        return PipelineResult(outputs=outputs, state=state, report=records)
@@ -0,0 +1,104 @@
+"""
+ESG 등급 전처리 메모리/시간 프로파일
+
+기존 방식(인코딩 단계마다 train/test 전체 복사 + dict map)과
+현재 방식(COLUMN_ENCODINGS 선언을 한 번에 적용, category/int8 dtype)의
+최대 메모리와 소요 시간을 비교한다.
+
+실행 (mlservice 디렉토리에서):
+    python -m app.grade.grade_benchmark --scale 1 100 1000
+"""
+import os
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from app.grade.grade_method import GradeMethod, RAW_DTYPES
+
+LEGACY_RATING_MAPPING = {'S': 0, 'A+': 1, 'A': 2, 'B+': 3, 'B': 4, 'C': 5, 'D': 6, '등급없음': 7}
+
+
+def _scaled_frames(scale: int):
+    """train/test 원본을 scale 배로 복제 (NO 는 겹치지 않게 재부여)"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    train = pd.read_csv(os.path.join(current_dir, 'train.csv'))
+    test = pd.read_csv(os.path.join(current_dir, 'test.csv'))
+    train = pd.concat([train] * scale, ignore_index=True)
+    test = pd.concat([test] * scale, ignore_index=True)
+    train["NO"] = np.arange(1, len(train) + 1)
+    test["NO"] = np.arange(len(train) + 1, len(train) + len(test) + 1)
+    return train, test
+
+
+def legacy_preprocess(df_train: pd.DataFrame, df_test: pd.DataFrame):
+    """이전 버전 GradeService.preprocess 의 인코딩 흐름 (비교용으로만 보관)"""
+    train = df_train.drop(columns=['esg_rating', 'company_name'])
+    test = df_test.drop(columns=['esg_rating', 'company_name'])
+
+    train, test = train.copy(), test.copy()
+    code_mapping = {code: idx for idx, code in enumerate(train["company_code"].unique())}
+    train["company_code"] = train["company_code"].map(code_mapping)
+    test["company_code"] = test["company_code"].map(lambda x: code_mapping.get(x, -1))
+
+    for column in ("env_rating", "soc_rating", "gov_rating"):
+        train, test = train.copy(), test.copy()
+        train[column] = train[column].map(LEGACY_RATING_MAPPING)
+        test[column] = test[column].map(LEGACY_RATING_MAPPING)
+
+    train, test = train.copy(), test.copy()
+    train["year"] = pd.to_numeric(train["year"], errors='coerce').astype(int)
+    test["year"] = pd.to_numeric(test["year"], errors='coerce').astype(int)
+    return train, test
+
+
+def current_preprocess(df_train: pd.DataFrame, df_test: pd.DataFrame):
+    """현재 GradeMethod 흐름"""
+    the_method = GradeMethod()
+    train = the_method.drop_features(the_method.create_df(df_train, 'esg_rating'), 'company_name')
+    test = the_method.drop_features(the_method.create_df(df_test, 'esg_rating'), 'company_name')
+    return the_method.encode_columns(train, test)
+
+
+def profile(fn, df_train: pd.DataFrame, df_test: pd.DataFrame) -> dict:
+    """입력 프레임 이후에 새로 할당된 메모리의 최대값과 소요 시간 측정"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    train, test = fn(df_train, df_test)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_mb": peak / 1024 ** 2,
+        "seconds": elapsed,
+        "result_mb": (train.memory_usage(deep=True).sum() + test.memory_usage(deep=True).sum()) / 1024 ** 2,
+        "result": (train, test),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ESG 등급 전처리 메모리 프로파일")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100, 1000],
+                        help="원본 데이터 복제 배수 목록")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'rows':>9} | {'방식':<8} {'peak MB':>9} {'result MB':>10} {'seconds':>8} {'same':>5}")
+    print("-" * 68)
+    for scale in args.scale:
+        train, test = _scaled_frames(scale)
+        rows = len(train) + len(test)
+        legacy = profile(legacy_preprocess, train.copy(), test.copy())
+        # 현재 방식은 category dtype 으로 읽는 것까지 흐름에 포함
+        current = profile(current_preprocess, train.astype(RAW_DTYPES), test.astype(RAW_DTYPES))
+        # 인코딩 결과 값이 기존 방식과 같은지 확인 (dtype 은 다름)
+        same = all(
+            np.array_equal(old.to_numpy(dtype=np.int64), new[old.columns].to_numpy(dtype=np.int64))
+            for old, new in zip(legacy["result"], current["result"])
+        )
+        for name, result in (("legacy", legacy), ("current", current)):
+            print(f"{scale:>6} {rows:>9} | {name:<8} {result['peak_mb']:>9.2f} {result['result_mb']:>10.2f} "
+                  f"{result['seconds']:>8.3f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,26 @@
 from dataclasses import dataclass
 import pandas as pd
+from app.common.dataset import DataSet
 
 
 @dataclass  # 데이터웨어하우스에서 일부분 발췌하는 데코레이터
-class GradeDataSet(object):
-    _fname: str = ''  # file name
-    _dname: str = ''  # data path
-    _sname: str = ''  # save path
-    _train: pd.DataFrame = None
-    _test: pd.DataFrame = None
-    _id: str = ''
-    _label: str = ''
-
-    @property  # 필요한 부분만 읽게 하는 것
-    def fname(self) -> str:
-        return self._fname
-
-    @fname.setter
-    def fname(self, fname):
-        self._fname = fname
-
-    @property
-    def dname(self) -> str:
-        return self._dname
-
-    @dname.setter
-    def dname(self, dname):
-        self._dname = dname
-
-    @property
-    def sname(self) -> str:
-        return self._sname
-
-    @sname.setter
-    def sname(self, sname):
-        self._sname = sname
-
-    @property
-    def train(self) -> object:
-        return self._train
-
-    @train.setter
-    def train(self, train):
-        self._train = train
-
-    @property
-    def test(self) -> object:
-        return self._test
-
-    @test.setter
-    def test(self, test):
-        self._test = test
+class GradeDataSet(DataSet):
+    """ESG 등급 데이터셋 (label 은 라벨 컬럼 이름, 인코딩된 라벨은 train_label / test_label)"""
+    _train_label: pd.Series = None
+    _test_label: pd.Series = None
 
     @property
-    def id(self) -> str:
-        return self._id
+    def train_label(self) -> pd.Series:
+        return self._train_label
 
-    @id.setter
-    def id(self, id):
-        self._id = id
+    @train_label.setter
+    def train_label(self, train_label):
+        self._train_label = train_label
 
     @property
-    def label(self) -> str:
-        return self._label
+    def test_label(self) -> pd.Series:
+        return self._test_label
 
-    @label.setter
-    def label(self, label):
-        self._label = label
+    @test_label.setter
+    def test_label(self, test_label):
+        self._test_label = test_label
@@ -1,46 +1,120 @@
+import inspect
+import hashlib
+import numpy as np
 import pandas as pd
+from functools import partial
 from pandas import DataFrame
+from app.common.method import TabularMethod
+from app.common.pipeline import Pipeline, Step
 from app.grade.grade_dataset import GradeDataSet
-from typing import Tuple
 
-class GradeMethod(object):
+# 전처리 로직/피처 구성이 바뀌면 올려서 저장된 모델 아티팩트와 단계 캐시를 무효화
+FEATURE_VERSION = 1
+
+# 등급 순서 = 코드 (S=0, A+=1, A=2, B+=3, B=4, C=5, D=6, 등급없음=7)
+RATING_CATEGORIES = ['S', 'A+', 'A', 'B+', 'B', 'C', 'D', '등급없음']
+
+# 원본 CSV 읽기 dtype (등급 문자열은 category 로 읽어 인코딩 시 범주 코드만 재배열)
+RAW_DTYPES = {
+    "env_rating": "category",
+    "soc_rating": "category",
+    "gov_rating": "category",
+}
+
+# 컬럼 인코딩 선언 (컬럼 -> (척도, 범주 목록 또는 dtype))
+#   nominal: 범주 목록이 None 이면 train 에 등장한 순서로 범주를 만들고, test 의 처음 보는 값은 -1
+#   ordinal: 범주 목록 순서가 곧 코드, 목록에 없는 값은 -1
+#   numeric: 숫자로 변환해 지정한 정수 dtype 으로 저장
+COLUMN_ENCODINGS = {
+    "company_code": ("nominal", None),
+    "esg_rating": ("ordinal", RATING_CATEGORIES),
+    "env_rating": ("ordinal", RATING_CATEGORIES),
+    "soc_rating": ("ordinal", RATING_CATEGORIES),
+    "gov_rating": ("ordinal", RATING_CATEGORIES),
+    "year": ("numeric", "int16"),
+}
+
+# 회사별 이력(lag) 피처를 만들 등급 컬럼과 '등급없음' 코드
+LAG_COLUMNS = ["esg_rating", "env_rating", "soc_rating", "gov_rating"]
+UNRATED_CODE = RATING_CATEGORIES.index('등급없음')
+
+# ESG 라벨 코드 (등급없음 제외 7개 등급, S=0 ... D=6)
+LABEL_MAPPING = {rating: code for code, rating in enumerate(RATING_CATEGORIES[:UNRATED_CODE])}
+
+class GradeMethod(TabularMethod):
+    # create_df / create_label / drop_features / check_null 은 프레임 하나 단위 (TabularMethod)
+    # train/test 각각에 적용하는 것은 pipeline() 의 Step 선언이 맡는다
 
     def __init__(self):
         self.dataset = GradeDataSet()
 
-    def read_csv(self, train_fname: str, test_fname: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-        # train.csv와 test.csv 파일을 읽어와서 반환
-        return (pd.read_csv(train_fname), pd.read_csv(test_fname))
-
-    def create_df(self, train_df: DataFrame, test_df: DataFrame, label: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-        # esg_rating 값을 제거한 데이터프레임 작성
-        # test_df에는 label 컬럼이 없을 수 있으므로 존재할 때만 제거
-        train_result = train_df.drop(columns=[label]) if label in train_df.columns else train_df
-        test_result = test_df.drop(columns=[label]) if label in test_df.columns else test_df
-        return (train_result, test_result)
-
-    def create_label(self, train_df: DataFrame, test_df: DataFrame, label: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-        # esg_rating 값만 가지는 답안지 데이터프레임 작성
-        train_label = train_df[label] if label in train_df.columns else pd.Series()
-        test_label = test_df[label] if label in test_df.columns else pd.Series()
-        return (train_label, test_label)
-
-    def drop_features(self, train_df: DataFrame, test_df: DataFrame, *features: str)-> tuple[pd.DataFrame, pd.DataFrame]:
-        # 피쳐를 삭제하는 메소드
-        # 존재하는 컬럼만 삭제
-        features_list = list(features)
-        train_cols_to_drop = [col for col in features_list if col in train_df.columns]
-        test_cols_to_drop = [col for col in features_list if col in test_df.columns]
-        train_result = train_df.drop(columns=train_cols_to_drop) if train_cols_to_drop else train_df
-        test_result = test_df.drop(columns=test_cols_to_drop) if test_cols_to_drop else test_df
-        return (train_result, test_result)
-
-    def check_null(self, train_df, test_df) -> Tuple[int, int]:
-        # 널을 체크하는 메소드
-        return (int(train_df.isnull().sum().sum()), int(test_df.isnull().sum().sum()))
+    def read_csv(self, path: str, dtype: dict = None) -> DataFrame:
+        return pd.read_csv(path, dtype=RAW_DTYPES if dtype is None else dtype)
 
     # 척도: nominal , ordinal , interval , ratio
 
+    @staticmethod
+    def _codes(values: pd.Series, categories: list) -> np.ndarray:
+        """고정된 범주 순서로 정수 코드 생성 (범주에 없는 값/결측은 -1)"""
+        codes = pd.Categorical(values, categories=categories).codes
+        return codes.astype(np.int8 if len(categories) < 128 else np.int32)
+
+    def encode_columns(self, train_df: DataFrame, test_df: DataFrame,
+                       encodings: dict = None, state: dict = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        선언된 nominal/ordinal/numeric 인코딩을 한 번에 적용
+
+        - 중간 복사 없이 각 컬럼을 정수 코드 배열로 통째로 교체한다 (전달한 프레임이 바뀜)
+        - nominal 범주는 train 기준으로 만들고 test 에도 같은 코드를 사용한다
+        - train_df 가 None 이면 test_df 만 변환한다 (예측 입력 변환용)
+
+        Args:
+            encodings: 컬럼 -> (척도, 범주 목록 또는 dtype), 기본값은 COLUMN_ENCODINGS
+            state: 주어지면 train 에서 만든 nominal 범주를 저장하고, 이미 있으면 재사용
+        """
+        frames = [df for df in (train_df, test_df) if df is not None]
+        for column, (scale, option) in (encodings or COLUMN_ENCODINGS).items():
+            if not any(column in df.columns for df in frames):
+                continue
+            if scale == "nominal":
+                categories = option
+                if categories is None and state is not None and column in state:
+                    categories = state[column]
+                elif categories is None:
+                    fitted = train_df is not None and column in train_df.columns
+                    categories = pd.unique(train_df[column].dropna()) if fitted else []
+                    if state is not None and fitted:
+                        state[column] = categories.tolist()
+                for df in frames:
+                    if column in df.columns:
+                        df[column] = self._codes(df[column], categories)
+            elif scale == "ordinal":
+                for df in frames:
+                    if column in df.columns:
+                        df[column] = self._codes(df[column], option)
+            elif scale == "numeric":
+                for df in frames:
+                    if column in df.columns:
+                        df[column] = pd.to_numeric(df[column], errors='coerce').astype(option)
+            else:
+                raise ValueError(f"알 수 없는 척도입니다: {scale} (컬럼: {column})")
+        return train_df, test_df
+
+    def _encode_copy(self, train_df: DataFrame, test_df: DataFrame, column: str,
+                     unknown_nan: bool = False) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        컬럼별 래퍼 공통: 입력 프레임은 그대로 두고 얕은 복사본에 한 컬럼만 인코딩
+
+        unknown_nan 이면 범주에 없는 값 / 결측을 -1 대신 NaN 으로 둔다 (기존 .map() 결과와 같음).
+        """
+        train_df, test_df = train_df.copy(deep=False), test_df.copy(deep=False)
+        self.encode_columns(train_df, test_df, {column: COLUMN_ENCODINGS[column]})
+        if unknown_nan:
+            for df in (train_df, test_df):
+                if column in df.columns and (df[column] < 0).any():
+                    df[column] = df[column].where(df[column] >= 0)
+        return train_df, test_df
+
     def company_name_Nominal(self, train_df: DataFrame, test_df: DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         # company_name은 이미 삭제되었으므로 그대로 반환
         return train_df, test_df
@@ -48,106 +122,133 @@ class GradeMethod(object):
     def company_code_Nominal(self, train_df: DataFrame, test_df: DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         company_code: 회사 코드 (nominal 척도)
-        - 문자열을 라벨 인코딩으로 변환합니다.
-        - train 기준으로 매핑을 생성하고 test에도 동일하게 적용합니다.
-        """
-        train_df = train_df.copy()
-        test_df = test_df.copy()
-        
-        # train 기준으로 company_code 라벨 인코딩(고유값에 숫자 매핑)
-        unique_codes = train_df["company_code"].unique()
-        code_mapping = {code: idx for idx, code in enumerate(unique_codes)}
-        
-        # train에 매핑 적용
-        train_df["company_code"] = train_df["company_code"].map(code_mapping)
-        
-        # test에 매핑 적용 (train에 없는 코드는 -1로 처리)
-        test_df["company_code"] = test_df["company_code"].map(lambda x: code_mapping.get(x, -1))
-        
-        return train_df, test_df
+        - train 에 등장한 순서로 라벨 인코딩하고 test 에도 동일하게 적용합니다.
+        - train 에 없는 코드는 -1 로 처리합니다.
+        """
+        return self._encode_copy(train_df, test_df, "company_code")
 
     def env_rating_Ordinal(self, train_df: DataFrame, test_df: DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         env_rating: 환경 등급 (ordinal 척도)
         - 등급을 숫자로 변환합니다 (S=0, A+=1, A=2, B+=3, B=4, C=5, D=6, 등급없음=7)
+        - 목록에 없는 값은 NaN 으로 둡니다.
         """
-        train_df = train_df.copy()
-        test_df = test_df.copy()
-        
-        # 등급 매핑
-        rating_mapping = {
-            'S': 0,
-            'A+': 1,
-            'A': 2,
-            'B+': 3,
-            'B': 4,
-            'C': 5,
-            'D': 6,
-            '등급없음': 7
-        }
-        train_df["env_rating"] = train_df["env_rating"].map(rating_mapping)
-        test_df["env_rating"] = test_df["env_rating"].map(rating_mapping)
-        
-        return train_df, test_df
+        return self._encode_copy(train_df, test_df, "env_rating", unknown_nan=True)
 
     def soc_rating_Ordinal(self, train_df: DataFrame, test_df: DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         soc_rating: 사회 등급 (ordinal 척도)
         - 등급을 숫자로 변환합니다 (S=0, A+=1, A=2, B+=3, B=4, C=5, D=6, 등급없음=7)
+        - 목록에 없는 값은 NaN 으로 둡니다.
         """
-        train_df = train_df.copy()
-        test_df = test_df.copy()
-        
-        # 등급 매핑
-        rating_mapping = {
-            'S': 0,
-            'A+': 1,
-            'A': 2,
-            'B+': 3,
-            'B': 4,
-            'C': 5,
-            'D': 6,
-            '등급없음': 7
-        }
-        train_df["soc_rating"] = train_df["soc_rating"].map(rating_mapping)
-        test_df["soc_rating"] = test_df["soc_rating"].map(rating_mapping)
-        
-        return train_df, test_df
+        return self._encode_copy(train_df, test_df, "soc_rating", unknown_nan=True)
 
     def gov_rating_Ordinal(self, train_df: DataFrame, test_df: DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         gov_rating: 지배구조 등급 (ordinal 척도)
         - 등급을 숫자로 변환합니다 (S=0, A+=1, A=2, B+=3, B=4, C=5, D=6, 등급없음=7)
+        - 목록에 없는 값은 NaN 으로 둡니다.
         """
-        train_df = train_df.copy()
-        test_df = test_df.copy()
-        
-        # 등급 매핑
-        rating_mapping = {
-            'S': 0,
-            'A+': 1,
-            'A': 2,
-            'B+': 3,
-            'B': 4,
-            'C': 5,
-            'D': 6,
-            '등급없음': 7
-        }
-        train_df["gov_rating"] = train_df["gov_rating"].map(rating_mapping)
-        test_df["gov_rating"] = test_df["gov_rating"].map(rating_mapping)
-        
-        return train_df, test_df
+        return self._encode_copy(train_df, test_df, "gov_rating", unknown_nan=True)
 
     def year_Ordinal(self, train_df: DataFrame, test_df: DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         year: 연도 (ordinal 척도)
         - 문자열을 숫자로 변환합니다.
         """
-        train_df = train_df.copy()
-        test_df = test_df.copy()
-        
-        # year를 숫자로 변환(pd.to_numeric 사용하여 안전하게 변환)
-        train_df["year"] = pd.to_numeric(train_df["year"], errors='coerce').astype(int)
-        test_df["year"] = pd.to_numeric(test_df["year"], errors='coerce').astype(int)
-        
-        return train_df, test_df
+        return self._encode_copy(train_df, test_df, "year")
+
+    def encode_label(self, label: pd.Series) -> pd.Series:
+        """esg_rating 문자열 -> 0~6 (매핑에 없는 '등급없음' 등은 NaN)"""
+        return label.astype(str).map(LABEL_MAPPING)
+
+    def drop_unrated(self, train_df: DataFrame, train_label: pd.Series):
+        """7개 등급에 속하지 않는 라벨('등급없음') 행을 학습 데이터에서 제외"""
+        keep = train_label.notna().to_numpy()
+        return (train_df[keep].reset_index(drop=True),
+                train_label[keep].astype(int).reset_index(drop=True))
+
+    # -----------------------------
+    # 파이프라인 선언
+    # -----------------------------
+    def pipeline(self, store, years: list = None, cache_dir: str = None, max_workers: int = 4) -> Pipeline:
+        """
+        ESG 등급 전처리 파이프라인
+
+        train/test 쪽 단계는 서로 독립이라 동시에 실행되고, encode_columns 에서 합류한다
+        (nominal 범주를 train 에서 학습하는 stateful 단계). 읽기 단계 캐시는
+        선택한 연도 파티션의 내용 해시로 무효화된다.
+        """
+        label = 'esg_rating'
+        # 불필요한 컬럼 (company_name은 company_code와 중복)
+        drop = ['company_name']
+        fingerprint = partial(store.fingerprint, years)
+        return Pipeline("grade", [
+            Step("read_train", store.read, outputs=("train_raw",),
+                 params={"split": "train", "years": years}, fingerprint=fingerprint),
+            # test 는 없는 연도가 있을 수 있음 (train 에만 적재한 연도) -> 빈 프레임으로 진행
+            Step("read_test", store.read, outputs=("test_raw",),
+                 params={"split": "test", "years": years, "missing_ok": True}, fingerprint=fingerprint),
+            Step("create_train_label", self.create_label, ("train_raw",), ("train_label",), params={"label": label}),
+            Step("create_test_label", self.create_label, ("test_raw",), ("test_label",), params={"label": label}),
+            # Train/Test 데이터는 esg_rating 컬럼 제거
+            Step("create_train_df", self.create_df, ("train_raw",), ("train",), params={"label": label}),
+            Step("create_test_df", self.create_df, ("test_raw",), ("test",), params={"label": label}),
+            Step("drop_train_features", self.drop_columns, ("train",), ("train",), params={"features": drop}),
+            Step("drop_test_features", self.drop_columns, ("test",), ("test",), params={"features": drop}),
+            Step("encode_columns", self.encode_columns, ("train", "test"), ("train", "test"), stateful=True),
+            Step("encode_train_label", self.encode_label, ("train_label",), ("train_label",)),
+            Step("encode_test_label", self.encode_label, ("test_label",), ("test_label",)),
+            # 라벨 인코딩: 7개 등급에 속하지 않는 행('등급없음')은 학습/평가에서 제외
+            Step("drop_unrated", self.drop_unrated, ("train", "train_label"), ("train", "train_label")),
+        ], cache_dir=cache_dir, max_workers=max_workers, version=PIPELINE_VERSION)
+
+    # -----------------------------
+    # 회사별 이력 피처 (lag / transition)
+    # -----------------------------
+    def lag_features(self, df: DataFrame, group: str = "company_code", order: str = "year",
+                     columns: list = None) -> DataFrame:
+        """
+        회사별 직전 기록의 등급과 변화량 피처 추가
+
+        전체 데이터를 (회사, 연도) 로 한 번 정렬한 뒤 groupby-shift 로 계산한다 (회사별 반복문 없음).
+        등급 컬럼은 encode_columns 로 인코딩된 코드여야 한다.
+
+        - prev_{컬럼}: 직전 기록의 등급 코드 (없으면 -1)
+        - {컬럼}_delta: 직전 대비 개선 폭 (이전 코드 - 현재 코드, 양수 = 상승, 비교 불가면 0)
+        - years_since_prev: 직전 기록과의 연도 차이 (없으면 0)
+        - has_prev: 직전 기록 존재 여부
+
+        Returns:
+            (회사, 연도) 순으로 정렬된 새 프레임
+        """
+        columns = [c for c in (columns or LAG_COLUMNS) if c in df.columns]
+        df = df.sort_values([group, order], kind="stable", ignore_index=True)
+        prev = df.groupby(group, sort=False)[columns + [order]].shift(1)
+
+        has_prev = prev[order].notna().to_numpy()
+        df["has_prev"] = has_prev.astype(np.int8)
+        df["years_since_prev"] = (df[order] - prev[order]).fillna(0).astype(np.int16)
+        for column in columns:
+            current = df[column].to_numpy()
+            previous = prev[column].fillna(-1).to_numpy(dtype=np.int8)
+            rated = (previous >= 0) & (previous != UNRATED_CODE) & (current >= 0) & (current != UNRATED_CODE)
+            df[f"prev_{column}"] = previous
+            df[f"{column}_delta"] = np.where(rated, previous - current, 0).astype(np.int8)
+        return df
+
+
+def _pipeline_version() -> str:
+    """
+    전처리 단계 캐시 버전
+
+    Pipeline 은 단계 함수 자신의 소스만 해시하므로, 단계 함수가 참조하는 인코딩 선언과
+    헬퍼(_codes) 소스, FEATURE_VERSION 을 합쳐 버전을 만든다. 인코딩 표나 헬퍼가 바뀌면
+    save/pipeline_cache 의 이전 결과를 쓰지 않는다.
+    """
+    digest = hashlib.sha1(f"{FEATURE_VERSION}|{COLUMN_ENCODINGS!r}|{LABEL_MAPPING!r}".encode())
+    digest.update(inspect.getsource(GradeMethod._codes).encode())
+    return digest.hexdigest()[:16]
+
+
+PIPELINE_VERSION = _pipeline_version()
@@ -1,17 +1,107 @@
+import os
+import uuid
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from lightgbm import LGBMClassifier
+from sklearn.metrics import accuracy_score, f1_score
+
+
+# -----------------------------
+# 모델 저장소 (이름 -> (클래스, 기본 하이퍼파라미터))
+# ESG 등급은 7개 클래스 다중 분류
+# -----------------------------
+MODEL_ZOO = {
+    "logistic_regression": (LogisticRegression, {"max_iter": 1000, "random_state": 42}),
+    "naive_bayes": (GaussianNB, {}),
+    "random_forest": (RandomForestClassifier, {
+        "n_estimators": 200,
+        "random_state": 42
+    }),
+    "decision_tree": (DecisionTreeClassifier, {"random_state": 42}),
+    "lightgbm": (LGBMClassifier, {
+        "n_estimators": 100,
+        "learning_rate": 0.1,
+        "num_leaves": 15,
+        "min_child_samples": 5,
+        "random_state": 42,
+        "verbose": -1
+    }),
+    "knn": (KNeighborsClassifier, {"n_neighbors": 7}),
+}
+
+
+def create_model(name: str, params: dict = None):
+    """MODEL_ZOO 의 기본값에 params 를 덮어써서 새 모델 객체 생성"""
+    if name not in MODEL_ZOO:
+        raise ValueError(f"지원하지 않는 모델입니다: {name} (가능: {list(MODEL_ZOO)})")
+    model_cls, defaults = MODEL_ZOO[name]
+    return model_cls(**{**defaults, **(params or {})})
+
+
+def fit_fold(name: str, X, y, train_idx: np.ndarray, val_idx: np.ndarray) -> dict:
+    """
+    한 개 모델의 한 개 fold 학습/검증 (joblib 병렬 작업 단위)
+
+    모듈 수준 함수여야 프로세스 풀로 전달할 수 있다.
+    """
+    model = create_model(name)
+    model.fit(X.iloc[train_idx], y[train_idx])
+    pred = model.predict(X.iloc[val_idx])
+    return {
+        "model": name,
+        "accuracy": accuracy_score(y[val_idx], pred),
+        "f1_macro": f1_score(y[val_idx], pred, average="macro"),
+    }
+
+
 class GradeModel(object):
-    """ESG 등급 데이터 모델"""
-    
-    def __init__(self):
-        # 데이터셋 객체 생성
-        pass
-
-    def new_model(self):
-        # grade.csv 파일을 읽어와서 데이터셋 객체에 저장
-        pass
-
-    def create_grade(self):
-        
-        pass
-
-    def create_label(self):
-        pass
\ No newline at end of file
+    """
+    ESG 등급 분류 모델 아티팩트
+
+    추정기와 함께 학습 피처 컬럼 순서와 데이터 버전을 보관해서
+    디스크에서 다시 읽은 뒤에도 같은 방식으로 예측할 수 있다.
+    """
+
+    def __init__(self, name: str = "random_forest", params: dict = None):
+        self.name = name
+        self.params = params or {}
+        self.model = create_model(name, self.params)
+        self.feature_columns = None
+        self.version = None
+
+    def fit(self, X, y):
+        self.feature_columns = list(X.columns)
+        self.model.fit(X, y)
+
+    def predict(self, X):
+        return self.model.predict(X[self.feature_columns])
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X[self.feature_columns])
+
+    @property
+    def classes(self) -> list:
+        return [int(c) for c in self.model.classes_]
+
+    def evaluate(self, X, y) -> dict:
+        pred = self.predict(X)
+        return {
+            "accuracy": accuracy_score(y, pred),
+            "f1_macro": f1_score(y, pred, average="macro"),
+        }
+
+    def save(self, path: str):
+        """임시 파일에 쓴 뒤 교체 (동시에 읽는 요청이 깨진 파일을 보지 않도록)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> "GradeModel":
+        return joblib.load(path)
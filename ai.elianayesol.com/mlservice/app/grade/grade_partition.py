@@ -0,0 +1,223 @@
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import datetime
+import pandas as pd
+from app.grade.grade_method import RATING_CATEGORIES
+from app.common.errors import InvalidRequestError
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+SPLITS = ("train", "test")
+RATING_COLUMNS = ["esg_rating", "env_rating", "soc_rating", "gov_rating"]
+REQUIRED_COLUMNS = ["NO", "company_name", "company_code", "env_rating", "soc_rating", "gov_rating", "year"]
+
+# 파티션 파일 dtype (등급은 고정 범주 category -> parquet dictionary 인코딩)
+PARTITION_DTYPES = {
+    "NO": "int32",
+    "company_code": "int32",
+    "year": "int16",
+    **{column: pd.CategoricalDtype(RATING_CATEGORIES) for column in RATING_COLUMNS},
+}
+
+
+class GradePartitionStore:
+    """
+    ESG 등급 데이터를 연도별 parquet 파티션으로 보관하는 저장소
+
+    partitions/{split}/year={연도}.parquet 에 연도 하나씩 저장하고,
+    manifest.json 에 파티션별 행 수와 내용 해시를 기록한다.
+
+    - ingest: 새로 들어온 연도의 데이터만 검증/인코딩해서 파티션으로 추가
+      (이미 있는 연도는 replace=True 일 때만 교체, 다른 연도는 건드리지 않음)
+    - read: 필요한 연도 파티션 파일만 읽음
+    - bootstrap: 파티션이 없으면 train.csv / test.csv 를 한 번 적재
+    """
+    # bootstrap 이 잠금 안에서 ingest 를 부르므로 재진입 가능한 잠금
+    _lock = threading.RLock()
+
+    def __init__(self, root: str = None):
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.current_dir = current_dir
+        self.root = root or os.path.join(current_dir, 'partitions')
+        self.manifest_path = os.path.join(self.root, 'manifest.json')
+
+    # -----------------------------
+    # manifest
+    # -----------------------------
+    def manifest(self) -> dict:
+        """{split: {연도(str): {rows, sha1, path, ingested_at}}}"""
+        if not os.path.exists(self.manifest_path):
+            return {split: {} for split in SPLITS}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_json(self, path: str, data: dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def years(self, split: str = "train") -> list:
+        return sorted(int(year) for year in self.manifest().get(split, {}))
+
+    def fingerprint(self, years: list = None) -> str:
+        """선택한 연도 파티션들의 내용 해시 (모델 아티팩트 버전에 사용)"""
+        manifest = self.manifest()
+        digest = hashlib.sha1()
+        for split in SPLITS:
+            for year, entry in sorted(manifest.get(split, {}).items()):
+                if years is None or int(year) in years:
+                    digest.update(f"{split}|{year}|{entry['sha1']}".encode())
+        return digest.hexdigest()
+
+    # -----------------------------
+    # 검증 / 인코딩
+    # -----------------------------
+    def validate(self, df: pd.DataFrame, split: str) -> pd.DataFrame:
+        """
+        새 데이터 검증 후 파티션 dtype 으로 변환
+
+        Raises:
+            InvalidRequestError: 잘못된 split, 필수 컬럼 누락, 결측, 알 수 없는 등급, 연도 내 회사 코드 중복
+        """
+        if split not in SPLITS:
+            raise InvalidRequestError(f"split은 {list(SPLITS)} 중 하나여야 합니다. 현재 값: {split}")
+        required = REQUIRED_COLUMNS + (["esg_rating"] if split == "train" else [])
+        missing = [column for column in required if column not in df.columns]
+        if missing:
+            raise InvalidRequestError(f"필수 컬럼이 없습니다: {missing}")
+
+        nulls = df[required].isnull().sum()
+        if nulls.any():
+            raise InvalidRequestError(f"결측값이 있습니다: {nulls[nulls > 0].to_dict()}")
+
+        for column in RATING_COLUMNS:
+            if column not in df.columns:
+                continue
+            unknown = set(df[column].astype(str).unique()) - set(RATING_CATEGORIES)
+            if unknown:
+                raise InvalidRequestError(f"{column}에 알 수 없는 등급이 있습니다: {sorted(unknown)}")
+
+        year = pd.to_numeric(df["year"], errors='coerce')
+        if year.isnull().any():
+            raise InvalidRequestError("year는 정수여야 합니다.")
+        duplicated = df.assign(year=year).duplicated(subset=["company_code", "year"])
+        if duplicated.any():
+            raise InvalidRequestError(f"같은 연도에 중복된 회사 코드가 있습니다: {df.loc[duplicated, 'company_code'].tolist()[:10]}")
+
+        columns = [column for column in REQUIRED_COLUMNS + ["esg_rating"] if column in df.columns]
+        try:
+            return df[columns].assign(year=year).astype(
+                {column: dtype for column, dtype in PARTITION_DTYPES.items() if column in columns}
+            )
+        except (ValueError, TypeError) as e:
+            raise InvalidRequestError(f"컬럼 값 형식이 잘못되었습니다: {e}") from e
+
+    # -----------------------------
+    # 적재 / 읽기
+    # -----------------------------
+    def _partition_path(self, split: str, year: int) -> str:
+        return os.path.join(self.root, split, f"year={int(year)}.parquet")
+
+    def ingest(self, df: pd.DataFrame, split: str = "train", replace: bool = False) -> list:
+        """
+        새 데이터를 연도별 파티션으로 추가 (들어온 연도만 처리)
+
+        Returns:
+            추가/교체된 파티션 정보 리스트
+
+        Raises:
+            InvalidRequestError: 검증 실패, 또는 이미 적재된 연도를 replace 없이 다시 적재할 때
+        """
+        encoded = self.validate(df, split)
+        with self._lock:
+            manifest = self.manifest()
+            entries = manifest.setdefault(split, {})
+            incoming = sorted(int(year) for year in encoded["year"].unique())
+            existing = [year for year in incoming if str(year) in entries]
+            if existing and not replace:
+                raise InvalidRequestError(f"이미 적재된 연도입니다: {existing} (교체하려면 replace=True)")
+
+            written = []
+            for year, part in encoded.groupby("year", observed=True, sort=True):
+                part = part.reset_index(drop=True)
+                path = self._partition_path(split, year)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                part.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+                os.replace(tmp_path, path)
+
+                sha1 = hashlib.sha1(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes()).hexdigest()
+                entries[str(int(year))] = {
+                    "rows": int(len(part)),
+                    "sha1": sha1,
+                    "path": os.path.relpath(path, self.root),
+                    "ingested_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                written.append({"split": split, "year": int(year), **entries[str(int(year))]})
+                logger.info(f"📦 {split} {int(year)}년 파티션 저장: {len(part)}행")
+
+            self._write_json(self.manifest_path, manifest)
+        return written
+
+    def bootstrap(self) -> list:
+        """
+        파티션이 없는 split 은 원본 CSV 를 한 번 적재
+
+        확인과 적재를 같은 잠금 안에서 해서, 첫 요청 여러 개가 동시에 들어와도 한 번만 적재한다
+        (이미 적재된 뒤에는 잠금 없이 manifest 만 보고 돌아감).
+        """
+        if all(self.manifest().get(split) for split in SPLITS):
+            return []
+        written = []
+        with self._lock:
+            manifest = self.manifest()
+            for split in SPLITS:
+                if manifest.get(split):
+                    continue
+                csv_path = os.path.join(self.current_dir, f'{split}.csv')
+                if os.path.exists(csv_path):
+                    written += self.ingest(pd.read_csv(csv_path), split=split)
+        return written
+
+    def empty(self, columns: list = None) -> pd.DataFrame:
+        """파티션과 같은 컬럼 / dtype 의 빈 프레임"""
+        columns = columns or REQUIRED_COLUMNS + ["esg_rating"]
+        return pd.DataFrame({
+            column: pd.Series([], dtype=PARTITION_DTYPES.get(column, "object")) for column in columns
+        })
+
+    def read(self, split: str = "train", years: list = None, columns: list = None,
+             missing_ok: bool = False) -> pd.DataFrame:
+        """
+        연도 파티션 읽기 (years 가 None 이면 전체)
+
+        필요한 연도의 파일만 열고, columns 를 지정하면 그 컬럼만 읽는다.
+        요청한 연도 중 이 split 에 없는 연도는 건너뛰고, 하나도 없으면 missing_ok 일 때 빈 프레임을 반환한다
+        (예: train 에만 적재한 연도의 test).
+
+        Raises:
+            InvalidRequestError: 요청 연도 중 읽을 파티션이 하나도 없고 missing_ok 가 아닐 때
+        """
+        entries = self.manifest().get(split, {})
+        selected = sorted(int(year) for year in entries if years is None or int(year) in years)
+        if not selected:
+            if missing_ok:
+                logger.info(f"📦 {split} 파티션 없음, 빈 프레임 사용 (요청 연도: {years})")
+                return self.empty(columns)
+            raise InvalidRequestError(f"{split} 파티션이 없습니다 (요청 연도: {years}, 적재된 연도: {self.years(split)})")
+        frames = [
+            pd.read_parquet(os.path.join(self.root, entries[str(year)]["path"]), engine="pyarrow", columns=columns)
+            for year in selected
+        ]
+        if len(frames) == 1:
+            return frames[0]
+        df = pd.concat(frames, ignore_index=True)
+        # 파티션마다 범주가 같아서 concat 후에도 category dtype 유지
+        return df.astype({c: t for c, t in PARTITION_DTYPES.items() if c in df.columns and isinstance(t, pd.CategoricalDtype)})
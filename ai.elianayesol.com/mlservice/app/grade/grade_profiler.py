@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import logging
+import threading
+import tracemalloc
+import pandas as pd
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+# tracemalloc 은 프로세스 전역이므로 계측 중인 단계는 프로세스 전체에서 하나씩만 실행
+# (동시 /grade/profile 요청이나 GRADE_PROFILE=1 전처리가 서로의 추적을 멈추거나 peak 를 초기화하지 않도록)
+_TRACEMALLOC_LOCK = threading.RLock()
+
+
+def _frames(value) -> list:
+    """인자/반환값에서 DataFrame/Series 만 골라냄 (튜플/리스트는 한 단계 펼침)"""
+    items = value if isinstance(value, (tuple, list)) else (value,)
+    return [item for item in items if isinstance(item, (pd.DataFrame, pd.Series))]
+
+
+def _memory_mb(frames: list) -> float:
+    return sum(float(frame.memory_usage(deep=True).sum() if isinstance(frame, pd.DataFrame)
+                     else frame.memory_usage(deep=True)) for frame in frames) / 1024 ** 2
+
+
+class PipelineProfiler:
+    """
+    전처리 단계 계측기
+
+    활성화되면 단계마다 소요 시간, 입출력 행 수, 메모리 변화, 출력 결측 수를 기록하고
+    한 줄 JSON 으로 로그에 남긴다. 비활성화 상태에서는 단계 함수를 그대로 호출만 한다
+    (프레임 포맷팅/메모리 계산 없음).
+
+    기본값은 환경변수 GRADE_PROFILE=1 일 때 활성화.
+    """
+
+    def __init__(self, enabled: bool = None):
+        if enabled is None:
+            enabled = os.getenv("GRADE_PROFILE", "").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+        self.records = []
+
+    def run(self, step: str, fn, *args, **kwargs):
+        """fn(*args, **kwargs) 를 실행하고 활성화 상태면 계측 기록 추가"""
+        if not self.enabled:
+            return fn(*args, **kwargs)
+
+        frames_in = _frames(args)
+        memory_in = _memory_mb(frames_in)
+        with _TRACEMALLOC_LOCK:
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            try:
+                tracemalloc.reset_peak()
+                started = time.perf_counter()
+                result = fn(*args, **kwargs)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                if tracing:
+                    tracemalloc.stop()
+
+        frames_out = _frames(result)
+        memory_out = _memory_mb(frames_out)
+        record = {
+            "step": step,
+            "seconds": round(elapsed, 6),
+            "rows_in": [len(frame) for frame in frames_in],
+            "rows_out": [len(frame) for frame in frames_out],
+            "memory_in_mb": round(memory_in, 4),
+            "memory_out_mb": round(memory_out, 4),
+            "memory_delta_mb": round(memory_out - memory_in, 4),
+            "peak_alloc_mb": round(peak / 1024 ** 2, 4),
+            "nulls_out": [int(frame.isnull().sum().sum()) if isinstance(frame, pd.DataFrame)
+                          else int(frame.isnull().sum()) for frame in frames_out],
+        }
+        self.records.append(record)
+        logger.info(json.dumps({"profile": record}, ensure_ascii=False))
+        return result
+
+    def report(self) -> dict:
+        return {
+            "steps": self.records,
+            "total_seconds": round(sum(record["seconds"] for record in self.records), 6),
+        }
@@ -1,9 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, UploadFile, File
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-import csv
-import os
+import math
+import pandas as pd
+import logging
 from .grade_service import GradeService
+from .grade_store import CompanyStore
+from .grade_partition import GradePartitionStore
+from app.common.container import services
+from app.common.errors import InvalidRequestError, NotFoundError
 
 # 라우터 생성
 router = APIRouter(
@@ -34,45 +41,84 @@ class Top10Response(BaseModel):
     total: int
     message: str
 
+class CompanyPageResponse(BaseModel):
+    """회사 페이지 조회 응답 모델"""
+    success: bool
+    data: List[CompanyResponse]
+    total: int
+    page: int
+    size: int
+    pages: int
+    message: str
+
+class CompanyHistoryResponse(BaseModel):
+    """회사 단건(연도별 등급) 조회 응답 모델"""
+    success: bool
+    data: List[CompanyResponse]
+    message: str
+
+class RatingInput(BaseModel):
+    """예측 입력 (회사 한 곳의 세부 등급)"""
+    envRating: str
+    socRating: str
+    govRating: str
+    year: int = 2025
+
+class PredictRequest(BaseModel):
+    """ESG 종합 등급 예측 요청 모델"""
+    companies: List[RatingInput]
+
 class ServiceStatusResponse(BaseModel):
     """서비스 상태 응답 모델"""
     message: str
     status: str
 
+# Logger 설정
+logger = logging.getLogger(__name__)
+
 # 서비스 인스턴스 생성
 def get_service() -> GradeService:
-    """GradeService 인스턴스 반환"""
-    return GradeService()
+    """프로세스에서 공유하는 GradeService 인스턴스 반환 (서비스 컨테이너)"""
+    return services.get(GradeService)
+
+def _error_response(e: Exception, message: str) -> JSONResponse:
+    """
+    엔드포인트 예외 -> 오류 응답
+
+    - NotFoundError: 404 (요청한 회사가 없음)
+    - InvalidRequestError: 400 (서비스가 직접 검사한 잘못된 요청 값)
+    - 그 밖의 예외: 서버 오류로 보고 traceback 을 로그에 남긴 뒤 500
+    """
+    if isinstance(e, NotFoundError):
+        return JSONResponse(status_code=404, content={"success": False, "message": str(e)})
+    if isinstance(e, InvalidRequestError):
+        return JSONResponse(status_code=400, content={"success": False, "message": str(e)})
+    import traceback
+    error_detail = traceback.format_exc()
+    logger.error(f"{message} 중 오류 발생: {str(e)}")
+    logger.error(error_detail)
+    return JSONResponse(
+        status_code=500,
+        content={
+            "success": False,
+            "message": f"{message} 중 오류가 발생했습니다.",
+            "error": str(e),
+            "detail": error_detail
+        }
+    )
+
+def _parse_years(years: Optional[str]) -> Optional[List[int]]:
+    """쉼표로 구분한 연도 쿼리 -> 정수 리스트 (없으면 None = 적재된 전체 연도)"""
+    if not years:
+        return None
+    try:
+        return [int(y) for y in years.split(",") if y.strip()]
+    except ValueError:
+        raise InvalidRequestError(f"years는 쉼표로 구분한 정수여야 합니다. 현재 값: {years}")
 
 def get_top_10_companies() -> List[Dict]:
-    """grade.csv에서 리스트 순서대로 상위 10개를 반환"""
-    # 현재 파일의 디렉토리 경로
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(current_dir, 'grade.csv')
-    
-    # CSV 파일 읽기
-    companies = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            companies.append({
-                'no': row['NO'],
-                'companyName': row['company_name'],
-                'companyCode': row['company_code'],
-                'esgRating': row['esg_rating'],
-                'envRating': row['env_rating'],
-                'socRating': row['soc_rating'],
-                'govRating': row['gov_rating'],
-                'year': row['year']
-            })
-    
-    # 정렬 없이 리스트에서 순서대로 처음 10개만 반환
-    top_10 = companies[:10]
-    
-    # 순위 추가
-    for rank, company in enumerate(top_10, 1):
-        company['rank'] = rank
-    
+    """grade.csv에서 리스트 순서대로 상위 10개를 반환 (메모리 저장소 사용)"""
+    top_10, _ = CompanyStore().query(page=1, size=10)
     return top_10
 
 @router.get(
@@ -102,11 +148,47 @@ async def preprocess_data():
     ESG 등급 데이터 전처리를 수행합니다.
     
     - Grade 데이터를 로드하고 전처리합니다.
-    - 각 데이터의 타입, 컬럼, 상위 행, null 개수 등을 확인합니다.
+    - 단계별 계측 결과는 /grade/profile 에서 확인합니다.
+    - **pipeline**: 단계별 실행 기록 (cache: hit-memory / hit-disk / miss, seconds)
     """
     service = get_service()
-    service.preprocess()
-    return {"message": "데이터 전처리가 완료되었습니다."}
+    dataset = service.preprocess()
+    return {"message": "데이터 전처리가 완료되었습니다.", "pipeline": dataset.report}
+
+@router.get(
+    "/profile",
+    summary="전처리 단계 계측",
+    description="전처리 단계별 소요 시간, 입출력 행 수, 메모리 변화, 결측 수를 반환합니다.",
+    response_description="단계별 계측 결과"
+)
+async def profile_preprocess(years: Optional[str] = None):
+    """
+    전처리를 계측 모드로 한 번 실행하고 단계별 결과를 반환합니다.
+    
+    Parameters:
+    - years: 사용할 연도 (쉼표 구분, 기본값: 적재된 전체 연도)
+    
+    ### 단계별 정보
+    - **step**: 단계 이름
+    - **seconds**: 소요 시간
+    - **rows_in / rows_out**: 입력/출력 프레임별 행 수
+    - **memory_in_mb / memory_out_mb / memory_delta_mb**: 입력/출력 프레임 메모리와 변화량
+    - **peak_alloc_mb**: 단계 실행 중 최대 추가 할당량
+    - **nulls_out**: 출력 프레임별 결측 수
+    
+    평소에는 계측이 꺼져 있어 비용이 없고, 환경변수 GRADE_PROFILE=1 이면
+    모든 전처리에서 단계별 결과를 JSON 로그로 남깁니다.
+    """
+    try:
+        service = get_service()
+        report = await run_in_threadpool(service.profile, years=_parse_years(years))
+    except Exception as e:
+        return _error_response(e, "전처리 계측")
+    return {
+        "success": True,
+        "results": report,
+        "message": f"{len(report['steps'])}개 전처리 단계를 계측했습니다."
+    }
 
 @router.get(
     "/top-10",
@@ -162,7 +244,7 @@ async def get_top_10():
     ```
     """
     top_10 = get_top_10_companies()
-    total_count = 1091  # grade.csv의 총 데이터 수
+    total_count = CompanyStore().total  # 실제 회사 데이터 수
     return {
         "success": True,
         "data": top_10,
@@ -170,3 +252,282 @@ async def get_top_10():
         "message": f"총 {total_count}개 중 상위 10개를 반환했습니다."
     }
 
+@router.get(
+    "/companies",
+    response_model=CompanyPageResponse,
+    summary="회사 목록 조회 (검색/필터/정렬/페이지)",
+    description="메모리에 적재된 ESG 등급 데이터에서 조건에 맞는 회사를 페이지 단위로 반환합니다.",
+    response_description="조건에 맞는 회사 목록과 페이지 정보"
+)
+async def get_companies(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    q: Optional[str] = None,
+    year: Optional[int] = None,
+    esg_rating: Optional[str] = None,
+    env_rating: Optional[str] = None,
+    soc_rating: Optional[str] = None,
+    gov_rating: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    order: str = "asc"
+):
+    """
+    회사 목록을 검색/필터/정렬/페이지 조건으로 조회합니다.
+    
+    Parameters:
+    - page: 페이지 번호 (1부터 시작)
+    - size: 페이지 크기 (최대 100)
+    - q: 회사명 또는 회사 코드 검색어 (부분 일치)
+    - year: 연도
+    - esg_rating, env_rating, soc_rating, gov_rating: 등급 (S, A+, A, B+, B, C, D, 등급없음)
+    - sort_by: 정렬 기준 (no, companyName, companyCode, esgRating, year / 생략 시 원본 순서)
+    - order: 정렬 방향 (asc, desc)
+    
+    원본 CSV 가 수정되면 다음 요청에서 자동으로 다시 적재됩니다.
+    """
+    try:
+        data, total = CompanyStore().query(
+            q=q, year=year,
+            esg_rating=esg_rating, env_rating=env_rating,
+            soc_rating=soc_rating, gov_rating=gov_rating,
+            sort_by=sort_by, order=order, page=page, size=size
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": str(e)}
+        )
+    return {
+        "success": True,
+        "data": data,
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": math.ceil(total / size) if total else 0,
+        "message": f"총 {total}개 중 {len(data)}개를 반환했습니다."
+    }
+
+@router.get(
+    "/companies/{company_code}",
+    response_model=CompanyHistoryResponse,
+    summary="회사 단건 조회",
+    description="회사 코드로 해당 회사의 연도별 ESG 등급을 조회합니다.",
+    response_description="회사의 연도별 등급 정보 (최근 연도부터)"
+)
+async def get_company(company_code: str):
+    """company_code 인덱스로 회사 정보를 조회합니다."""
+    history = CompanyStore().get(company_code)
+    if not history:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "message": f"회사를 찾을 수 없습니다: {company_code}"}
+        )
+    return {
+        "success": True,
+        "data": history,
+        "message": f"{len(history)}개 연도의 등급 정보를 반환했습니다."
+    }
+
+
+@router.get(
+    "/evaluate",
+    summary="모델 평가",
+    description="ESG 등급 7개 클래스 분류 모델들을 Stratified K-Fold 교차검증과 test.csv 홀드아웃으로 평가합니다.",
+    response_description="각 모델의 평가 결과"
+)
+async def evaluate_model(models: Optional[str] = None, n_splits: int = 5, n_jobs: int = -1,
+                         years: Optional[str] = None):
+    """
+    모델 평가를 수행합니다.
+    
+    Parameters:
+    - models: 평가할 모델 이름 (쉼표 구분, 기본값: 전체)
+      logistic_regression, naive_bayes, random_forest, decision_tree, lightgbm, knn
+    - n_splits: 교차검증 fold 수 (기본값: 5)
+    - n_jobs: 병렬 작업 수 (기본값: -1, 전체 CPU)
+    - years: 사용할 연도 (쉼표 구분, 기본값: 적재된 전체 연도)
+    
+    ### 처리 순서
+    1. 데이터 전처리 (preprocess) - 요청한 연도 파티션만 읽고, '등급없음' 라벨 행은 학습에서 제외
+    2. (모델, fold) 조합 전체를 병렬로 교차검증
+    3. 전체 train 으로 학습한 모델을 저장하고 test.csv 로 홀드아웃 평가
+       (같은 데이터/모델 버전은 저장된 아티팩트를 재사용)
+    
+    ### 반환 정보
+    - **results.models**: 모델별 cv_accuracy, cv_accuracy_std, cv_f1_macro,
+      holdout_accuracy, holdout_f1_macro (%), version
+    - **results.best_model**: 교차검증 정확도가 가장 높은 모델
+    """
+    try:
+        service = get_service()
+        model_list = [m.strip() for m in models.split(",") if m.strip()] if models else None
+        results = await run_in_threadpool(
+            service.evaluate, models=model_list, n_splits=n_splits, n_jobs=n_jobs, years=_parse_years(years)
+        )
+        return {
+            "success": True,
+            "results": results,
+            "message": "모델 평가가 완료되었습니다."
+        }
+        
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        logger.error(f"모델 평가 중 오류 발생: {str(e)}")
+        return {
+            "success": False,
+            "message": "모델 평가 중 오류가 발생했습니다.",
+            "error": str(e),
+            "detail": error_detail
+        }
+
+@router.post(
+    "/predict",
+    summary="ESG 종합 등급 예측",
+    description="환경/사회/지배구조 등급으로 ESG 종합 등급을 예측합니다. 학습된 모델은 캐시되어 재사용됩니다.",
+    response_description="회사별 예측 등급과 등급별 확률"
+)
+async def predict_grade(request: PredictRequest, model: str = "random_forest"):
+    """
+    ESG 종합 등급을 예측합니다.
+    
+    Parameters:
+    - model: 사용할 모델 이름 (기본값: random_forest)
+    
+    ### 요청 예시
+    ```json
+    {
+        "companies": [
+            {"envRating": "C", "socRating": "A", "govRating": "A", "year": 2025}
+        ]
+    }
+    ```
+    
+    - 등급 값: S, A+, A, B+, B, C, D, 등급없음
+    
+    ### 응답 예시
+    ```json
+    {
+        "success": true,
+        "data": [
+            {"esgRating": "B+", "probabilities": {"A+": 0.0, "A": 0.12, "B+": 0.81, ...}}
+        ],
+        "message": "1개 회사의 ESG 등급을 예측했습니다."
+    }
+    ```
+    """
+    companies = [
+        {
+            'env_rating': company.envRating,
+            'soc_rating': company.socRating,
+            'gov_rating': company.govRating,
+            'year': company.year,
+        }
+        for company in request.companies
+    ]
+    try:
+        service = get_service()
+        predictions = await run_in_threadpool(service.predict, companies, name=model)
+    except Exception as e:
+        return _error_response(e, "ESG 등급 예측")
+    return {
+        "success": True,
+        "data": predictions,
+        "message": f"{len(predictions)}개 회사의 ESG 등급을 예측했습니다."
+    }
+
+@router.get(
+    "/partitions",
+    summary="연도 파티션 목록",
+    description="연도별로 저장된 ESG 등급 데이터 파티션 정보를 반환합니다.",
+    response_description="split/연도별 행 수와 내용 해시"
+)
+async def get_partitions():
+    """적재된 연도 파티션 manifest 를 반환합니다 (없으면 원본 CSV 를 먼저 적재)."""
+    store = GradePartitionStore()
+    store.bootstrap()
+    return {
+        "success": True,
+        "data": store.manifest(),
+        "message": "파티션 정보를 반환했습니다."
+    }
+
+def _ingest(service: GradeService, file: UploadFile, split: str, replace: bool) -> list:
+    """업로드 CSV 를 읽어 연도 파티션으로 적재 (파일 읽기와 parquet 쓰기 모두 스레드풀에서)"""
+    df = pd.read_csv(file.file)
+    return service.ingest(df, split=split, replace=replace)
+
+@router.post(
+    "/ingest",
+    summary="새 연도 데이터 적재",
+    description="새로 들어온 연도의 ESG 등급 CSV 를 검증/인코딩해서 연도 파티션으로 추가합니다.",
+    response_description="추가된 파티션 정보"
+)
+async def ingest_data(file: UploadFile = File(...), split: str = "train", replace: bool = False):
+    """
+    새 연도 ESG 등급 데이터를 적재합니다.
+    
+    Parameters:
+    - file: train.csv 와 같은 컬럼의 CSV (NO, company_name, company_code, esg_rating,
+      env_rating, soc_rating, gov_rating, year)
+    - split: train 또는 test (기본값: train)
+    - replace: 이미 적재된 연도를 교체할지 여부 (기본값: False)
+    
+    들어온 연도의 파티션만 새로 쓰고, 기존 연도 파티션은 다시 처리하지 않습니다.
+    """
+    try:
+        written = await run_in_threadpool(_ingest, get_service(), file, split, replace)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return JSONResponse(status_code=400, content={"success": False, "message": str(e)})
+    except Exception as e:
+        return _error_response(e, "데이터 적재")
+    finally:
+        file.file.close()
+    return {
+        "success": True,
+        "data": written,
+        "message": f"{len(written)}개 연도 파티션을 적재했습니다."
+    }
+
+@router.get(
+    "/transition/evaluate",
+    summary="등급 전이 예측 평가",
+    description="회사별 직전 연도 등급/변화량(lag) 피처로 다음 연도 ESG 등급 변화 방향(상승/유지/하락)을 예측하는 모델을 평가합니다.",
+    response_description="교차검증 결과와 피처 중요도"
+)
+async def evaluate_transition(n_splits: int = 5, n_jobs: int = -1):
+    """
+    등급 전이 예측 모델을 Stratified K-Fold 로 평가합니다.
+    
+    - 적재된 모든 연도 파티션을 합쳐 회사별 lag 피처를 계산합니다 (groupby-shift, 회사별 반복문 없음).
+    - 2개 연도 이상의 이력이 있어야 합니다 (/grade/ingest 로 새 연도 적재).
+    """
+    try:
+        service = get_service()
+        results = await run_in_threadpool(service.transition_evaluate, n_splits=n_splits, n_jobs=n_jobs)
+    except Exception as e:
+        return _error_response(e, "등급 전이 평가")
+    return {
+        "success": True,
+        "results": results,
+        "message": "등급 전이 평가가 완료되었습니다."
+    }
+
+@router.get(
+    "/companies/{company_code}/transition",
+    summary="회사 등급 전이 예측",
+    description="회사의 가장 최근 등급 기록으로 다음 연도 ESG 등급 변화 방향을 예측합니다.",
+    response_description="예측 방향과 방향별 확률"
+)
+async def predict_transition(company_code: int):
+    """가장 최근 연도 기록과 직전 기록 대비 변화량으로 다음 연도 변화 방향(상승/유지/하락)을 예측합니다."""
+    try:
+        service = get_service()
+        prediction = await run_in_threadpool(service.transition_predict, company_code)
+    except Exception as e:
+        return _error_response(e, "등급 전이 예측")
+    return {
+        "success": True,
+        "data": prediction,
+        "message": "등급 전이 예측을 반환했습니다."
+    }
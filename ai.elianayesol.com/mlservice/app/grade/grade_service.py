@@ -2,9 +2,34 @@ import pandas as pd
 import numpy as np
 from sklearn import datasets
 from sklearn.datasets import load_iris, load_wine, load_breast_cancer
-from icecream import ic
+import logging
 import os
-from app.grade.grade_method import GradeMethod
+import json
+import time
+import hashlib
+import threading
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold
+from app.grade.grade_method import (
+    GradeMethod, COLUMN_ENCODINGS, PIPELINE_VERSION, LAG_COLUMNS, RATING_CATEGORIES, UNRATED_CODE
+)
+from app.grade.grade_dataset import GradeDataSet
+from app.grade.grade_model import MODEL_ZOO, GradeModel, fit_fold
+from app.grade.grade_partition import GradePartitionStore, SPLITS
+from app.grade.grade_profiler import PipelineProfiler
+from app.grade.grade_store import CompanyStore
+from app.common.errors import InvalidRequestError, NotFoundError
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+# 학습된 모델 캐시 (버전 -> GradeModel), 프로세스 전체에서 공유
+_MODEL_CACHE = {}
+_MODEL_LOCK = threading.Lock()
+
+# 회사별 등급 이력 프레임 캐시 ((파티션 경로, 파티션 내용 해시, 전처리 버전) -> 프레임), 마지막 버전 하나만 보관
+_HISTORY_CACHE = {}
+_HISTORY_LOCK = threading.Lock()
 
 class GradeService(object):
     """
@@ -27,68 +52,374 @@ class GradeService(object):
         'C': 5,
         'D': 6
     }
-    
+    RATING_LABELS = {v: k for k, v in ESG_RATING_MAPPING.items()}
 
-    def preprocess(self):
-        ic("❤️❤️ 데이터 읽기 시작")
-        the_method = GradeMethod()
-        
-        # 컨테이너 내부 경로 사용
+    # 학습 피처 (NO 는 식별자, company_code 는 회사마다 달라 test 에서 모두 -1 이 되므로 제외)
+    FEATURE_COLUMNS = ['env_rating', 'soc_rating', 'gov_rating', 'year']
+    RAW_COLUMNS = ['company_code', 'env_rating', 'soc_rating', 'gov_rating', 'year']
+
+    # 등급 전이 예측: t 년도 등급 + 직전 기록 대비 변화 -> t+1 년도 ESG 등급 변화 방향
+    TRANSITION_LABELS = {0: '하락', 1: '유지', 2: '상승'}
+    TRANSITION_FEATURES = (
+        LAG_COLUMNS
+        + [f'prev_{c}' for c in LAG_COLUMNS]
+        + [f'{c}_delta' for c in LAG_COLUMNS]
+        + ['years_since_prev', 'has_prev']
+    )
+
+    def _encode(self, the_method: GradeMethod, this_train: pd.DataFrame, this_test: pd.DataFrame):
+        """컬럼 인코딩 단계 (preprocess 와 예측 입력 변환이 같은 단계를 사용)"""
+        # nominal/ordinal/numeric 인코딩을 한 번에 적용 (COLUMN_ENCODINGS)
+        return the_method.encode_columns(this_train, this_test)
+
+    def warm(self):
+        """서버 시작 시 회사 조회 저장소와 전처리 데이터를 미리 준비 (서비스 컨테이너가 호출)"""
+        CompanyStore()
+        self.preprocess()
+
+    def preprocess(self, years: list = None, cache: bool = True, profiler: PipelineProfiler = None) -> GradeDataSet:
+        """
+        연도 파티션에서 필요한 연도만 읽어 전처리한 데이터셋 반환
+
+        서비스 인스턴스는 프로세스에서 공유되므로 결과를 인스턴스에 저장하지 않고
+        호출한 쪽이 받은 데이터셋을 evaluate / get_fitted_model 에 넘긴다.
+
+        Args:
+            years: 사용할 연도 목록 (None 이면 적재된 전체 연도)
+            cache: 단계 결과 캐시 사용 여부 (파티션 내용이 같으면 save/pipeline_cache 에서 재사용)
+            profiler: 이번 실행에만 쓸 계측기 (None 이면 GRADE_PROFILE=1 일 때만 켜지는 새 계측기)
+        """
+        profiler = profiler or PipelineProfiler()
+        logger.info("❤️❤️ 데이터 전처리 시작")
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        train_path = os.path.join(current_dir, 'train.csv')
-        test_path = os.path.join(current_dir, 'test.csv')
-        
-        df_train, df_test = the_method.read_csv(train_path, test_path)
-        
-        ic("❤️❤️ 트레인 전처리 시작")
-        # Train 데이터는 esg_rating 컬럼 제거
-        this_train, this_test = the_method.create_df(df_train, df_test, 'esg_rating')
-        train_null, test_null = the_method.check_null(this_train, this_test)
-        ic(f'1. Train 의 type \n {type(this_train)} ')
-        ic(f'2. Train 의 column \n {this_train.columns} ')
-        ic(f'3. Train 의 상위 5개 행\n {this_train.head(5)} ')
-        ic(f'4. Train 의 null 의 갯수\n {train_null}개')
-        
-        ic("🧡🧡 테스트 전처리 시작")
-        ic(f'1. test 의 type \n {type(this_test)} ')
-        ic(f'2. test 의 column \n {this_test.columns} ')
-        ic(f'3. test 의 상위 5개 행\n {this_test.head(5)} ')
-        ic(f'4. test 의 null 의 갯수\n {test_null}개')
-        
-        # 불필요한 컬럼 삭제 (company_name은 company_code와 중복)
-        drop_features = ['company_name']
-        this_train, this_test = the_method.drop_features(this_train, this_test, *drop_features)
-        this_train, this_test = the_method.company_code_Nominal(this_train, this_test)
-        this_train, this_test = the_method.env_rating_Ordinal(this_train, this_test)
-        this_train, this_test = the_method.soc_rating_Ordinal(this_train, this_test)
-        this_train, this_test = the_method.gov_rating_Ordinal(this_train, this_test)
-        this_train, this_test = the_method.year_Ordinal(this_train, this_test)
-        
-        ic("❤️❤️ 트레인 전처리 완료")
-        train_null_final, test_null_final = the_method.check_null(this_train, this_test)
-        ic(f'1. Train 의 type \n {type(this_train)} ')
-        ic(f'2. Train 의 column \n {this_train.columns} ')
-        ic(f'3. Train 의 상위 5개 행\n {this_train.head(5)} ')
-        ic(f'4. Train 의 null 의 갯수\n {train_null_final}개')
-
-        ic("🧡🧡 테스트 전처리 완료")
-        ic(f'1. test 의 type \n {type(this_test)} ')
-        ic(f'2. test 의 column \n {this_test.columns} ')
-        ic(f'3. test 의 상위 5개 행\n {this_test.head(5)} ')
-        ic(f'4. test 의 null 의 갯수\n {test_null_final}개')
-
-    def modeling(self):
-        ic("❤️❤️ 모델링 시작")
-        ic("❤️❤️ 모델링 완료")
-
-    def learning(self):
-        ic("❤️❤️ 학습 시작")
-        ic("❤️❤️ 학습 완료")
-
-    def evaluate(self):
-        ic("❤️❤️ 평가 시작")
-        ic("❤️❤️ 평가 완료")
-
-    def submit(self):
-        ic("❤️❤️ 제출 시작")
-        ic("❤️❤️ 제출 완료")
+
+        # 파티션이 없으면 원본 CSV(train.csv / test.csv)를 한 번 적재
+        store = GradePartitionStore()
+        store.bootstrap()
+
+        # 계측 중에는 단계별 메모리 측정이 섞이지 않도록 한 번에 한 단계씩 실행
+        pipeline = GradeMethod().pipeline(
+            store, years,
+            cache_dir=os.path.join(current_dir, 'save', 'pipeline_cache'),
+            max_workers=1 if profiler.enabled else 4,
+        )
+        result = pipeline.run(cache=cache, targets=["train", "train_label", "test", "test_label"],
+                              runner=profiler)
+
+        dataset = GradeDataSet()
+        dataset.id = 'NO'
+        dataset.label = 'esg_rating'
+        dataset.train = result["train"]
+        dataset.train_label = result["train_label"]
+        dataset.test = result["test"]
+        dataset.test_label = result["test_label"]
+        dataset.state = result.state
+        dataset.report = result.report
+        logger.info(f"❤️❤️ 데이터 전처리 완료 (train {dataset.train.shape}, test {dataset.test.shape})")
+        return dataset
+
+    def profile(self, years: list = None) -> dict:
+        """전처리 단계별 계측 결과 (소요 시간, 행 수, 메모리 변화, 결측 수)"""
+        # 이번 요청에만 계측기를 켠다 (이후 전처리는 다시 GRADE_PROFILE 설정을 따름)
+        profiler = PipelineProfiler(enabled=True)
+        # 캐시에서 꺼낸 단계는 계측되지 않으므로 모든 단계를 실제로 실행
+        self.preprocess(years, cache=False, profiler=profiler)
+        return profiler.report()
+
+    def ingest(self, df: pd.DataFrame, split: str = "train", replace: bool = False) -> list:
+        """
+        새 연도 ESG 등급 데이터를 파티션으로 추가
+
+        들어온 연도만 검증/인코딩해서 저장하고 기존 연도 파티션은 다시 처리하지 않는다.
+        파티션 내용 해시가 모델 버전에 들어가므로 이후 학습은 새 데이터로 다시 이루어진다.
+        """
+        logger.info(f"❤️❤️ {split} 데이터 적재 시작 ({len(df)}행)")
+        store = GradePartitionStore()
+        store.bootstrap()
+        written = store.ingest(df, split=split, replace=replace)
+        logger.info("❤️❤️ 데이터 적재 완료")
+        return written
+
+    # -----------------------------
+    # 모델링, 학습, 평가
+    # -----------------------------
+    def modeling(self, models: list = None) -> list:
+        """평가/학습할 모델 이름 목록 확정 (지정하지 않으면 전체 MODEL_ZOO)"""
+        logger.info("❤️❤️ 모델링 시작")
+        models = list(models or MODEL_ZOO)
+        unknown = [name for name in models if name not in MODEL_ZOO]
+        if unknown:
+            raise InvalidRequestError(f"지원하지 않는 모델입니다: {unknown} (가능: {list(MODEL_ZOO)})")
+        logger.info("❤️❤️ 모델링 완료")
+        return models
+
+    def learning(self, models: list = None, years: list = None, dataset: GradeDataSet = None) -> dict:
+        """전체 train 데이터로 모델 학습 (저장된 아티팩트가 있으면 재사용)"""
+        logger.info("❤️❤️ 학습 시작")
+        fitted = {name: self.get_fitted_model(name, years, dataset) for name in self.modeling(models)}
+        logger.info("❤️❤️ 학습 완료")
+        return fitted
+
+    def evaluate(self, models: list = None, n_splits: int = 5, n_jobs: int = -1, years: list = None) -> dict:
+        """
+        Stratified K-Fold 교차검증 + test.csv 홀드아웃 평가
+
+        (모델, fold) 조합 전체를 joblib 으로 한 번에 병렬 실행한다.
+        """
+        logger.info("❤️❤️ 평가 시작")
+        started = time.perf_counter()
+        dataset = self.preprocess(years)
+        models = self.modeling(models)
+
+        X = dataset.train[self.FEATURE_COLUMNS]
+        y = dataset.train_label.to_numpy()
+        k_fold = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        folds = list(k_fold.split(X, y))
+
+        scores = Parallel(n_jobs=n_jobs)(
+            delayed(fit_fold)(name, X, y, train_idx, val_idx)
+            for name in models
+            for train_idx, val_idx in folds
+        )
+
+        # 홀드아웃: test.csv 중 7개 등급 라벨이 있는 행
+        rated = dataset.test_label.notna().to_numpy()
+        X_holdout = dataset.test.loc[rated, self.FEATURE_COLUMNS]
+        y_holdout = dataset.test_label[rated].astype(int).to_numpy()
+
+        results = {}
+        for name, model in self.learning(models, years, dataset).items():
+            accuracy = np.array([s["accuracy"] for s in scores if s["model"] == name])
+            f1_macro = np.array([s["f1_macro"] for s in scores if s["model"] == name])
+            # 선택한 연도에 test 파티션이 없으면 홀드아웃 지표는 None
+            holdout = model.evaluate(X_holdout, y_holdout) if len(y_holdout) else None
+            results[name] = {
+                "cv_accuracy": round(float(accuracy.mean()) * 100, 2),
+                "cv_accuracy_std": round(float(accuracy.std()) * 100, 2),
+                "cv_f1_macro": round(float(f1_macro.mean()) * 100, 2),
+                "holdout_accuracy": round(float(holdout["accuracy"]) * 100, 2) if holdout else None,
+                "holdout_f1_macro": round(float(holdout["f1_macro"]) * 100, 2) if holdout else None,
+                "version": model.version,
+            }
+            logger.info(f'{name} {n_splits}-Fold CV 평균 정확도: {results[name]["cv_accuracy"]}%')
+
+        best_model = max(results, key=lambda name: results[name]["cv_accuracy"])
+        evaluation_results = {
+            "years": years or GradePartitionStore().years('train'),
+            "n_splits": n_splits,
+            "n_train": int(len(X)),
+            "n_holdout": int(len(y_holdout)),
+            "best_model": best_model,
+            "models": results,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("❤️❤️ 평가 완료")
+        return evaluation_results
+
+    # -----------------------------
+    # 학습된 모델 캐시 및 예측
+    # -----------------------------
+    def model_version(self, name: str = "random_forest", years: list = None) -> str:
+        """사용 연도 파티션 내용 + 모델 이름 + 전처리 버전(인코딩 선언/헬퍼 포함)으로 만든 아티팩트 버전 (years 가 None 이면 전체 연도)"""
+        store = GradePartitionStore()
+        store.bootstrap()
+        digest = hashlib.sha1(store.fingerprint(years).encode())
+        digest.update(f"{name}|{json.dumps(self.FEATURE_COLUMNS)}|{PIPELINE_VERSION}".encode())
+        return digest.hexdigest()[:16]
+
+    def get_fitted_model(self, name: str = "random_forest", years: list = None,
+                         dataset: GradeDataSet = None) -> GradeModel:
+        """
+        years 연도 train 데이터로 학습된 모델 반환 (years 가 None 이면 전체 연도)
+
+        프로세스 메모리 → save/ 디스크 아티팩트 → 새로 학습 순서로 찾으며,
+        새로 학습한 경우 아티팩트를 저장한다. dataset 은 같은 years 로 이미 전처리한
+        데이터셋이 있을 때 넘기면 다시 전처리하지 않는다.
+        """
+        def fit() -> GradeModel:
+            data = dataset if dataset is not None else self.preprocess(years)
+            model = GradeModel(name)
+            model.fit(data.train[self.FEATURE_COLUMNS], data.train_label.to_numpy())
+            return model
+
+        return self._load_or_fit(f'model_{name}', self.model_version(name, years), fit)
+
+    def _load_or_fit(self, prefix: str, version: str, fit) -> GradeModel:
+        """프로세스 메모리 → save/{prefix}_{version}.joblib → fit() 으로 새로 학습 후 저장"""
+        with _MODEL_LOCK:
+            cached = _MODEL_CACHE.get(f'{prefix}_{version}')
+            if cached is not None:
+                return cached
+
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            model_path = os.path.join(current_dir, 'save', f'{prefix}_{version}.joblib')
+            if os.path.exists(model_path):
+                logger.info(f"저장된 모델 로드: {model_path}")
+                model = GradeModel.load(model_path)
+            else:
+                logger.info(f"{prefix} 모델 학습 중 (버전 {version})...")
+                model = fit()
+                model.version = version
+                model.save(model_path)
+                logger.info(f"모델 저장 완료: {model_path}")
+
+            _MODEL_CACHE[f'{prefix}_{version}'] = model
+            return model
+
+    def predict(self, companies: list, name: str = "random_forest") -> list:
+        """
+        env/soc/gov 등급과 연도로 ESG 종합 등급 예측
+
+        Args:
+            companies: {'env_rating', 'soc_rating', 'gov_rating', 'year'} 딕셔너리 리스트
+            name: 사용할 모델 이름
+
+        Returns:
+            예측 등급과 등급별 확률 딕셔너리 리스트
+        """
+        if name not in MODEL_ZOO:
+            raise InvalidRequestError(f"지원하지 않는 모델입니다: {name} (가능: {list(MODEL_ZOO)})")
+        df = pd.DataFrame(companies).reindex(columns=self.RAW_COLUMNS)
+        the_method = GradeMethod()
+        _, features = self._encode(the_method, None, df)
+        invalid = (features[['env_rating', 'soc_rating', 'gov_rating']] < 0).any(axis=1).to_numpy()
+        if invalid.any():
+            raise InvalidRequestError(f"알 수 없는 등급 값이 있습니다 (행 번호: {np.flatnonzero(invalid).tolist()})")
+
+        model = self.get_fitted_model(name)
+        probabilities = model.predict_proba(features)
+        labels = [self.RATING_LABELS[c] for c in model.classes]
+        results = []
+        for proba in probabilities:
+            best = int(np.argmax(proba))
+            results.append({
+                "esgRating": labels[best],
+                "probabilities": {label: round(float(p), 4) for label, p in zip(labels, proba)},
+            })
+        return results
+
+    # -----------------------------
+    # 회사별 등급 이력 / 전이 예측
+    # -----------------------------
+    def history_frame(self) -> pd.DataFrame:
+        """
+        적재된 모든 연도/split 을 합친 회사별 이력 프레임 (lag 피처 포함)
+
+        같은 회사가 연도마다 train/test 에 나뉘어 있을 수 있어 둘 다 합쳐서 계산한다.
+        적재된 파티션 내용이 같으면 프로세스 메모리에 캐시한 프레임을 쓴다 (ingest 하면 다시 계산).
+        """
+        store = GradePartitionStore()
+        store.bootstrap()
+        key = (store.root, store.fingerprint(), PIPELINE_VERSION)
+        with _HISTORY_LOCK:
+            cached = _HISTORY_CACHE.get(key)
+            if cached is None:
+                cached = self._build_history(store)
+                _HISTORY_CACHE.clear()
+                _HISTORY_CACHE[key] = cached
+        # 호출한 쪽이 컬럼을 추가/삭제해도 캐시가 바뀌지 않도록 얕은 복사
+        return cached.copy(deep=False)
+
+    def _build_history(self, store: GradePartitionStore) -> pd.DataFrame:
+        """파티션 전체를 읽어 이력 프레임 계산 (history_frame 의 캐시 미스 경로)"""
+        frames = [store.read(split) for split in SPLITS if store.years(split)]
+        history = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        del history['company_name']
+
+        # 등급만 코드로 변환 (company_code 는 회사 구분에 그대로 사용)
+        the_method = GradeMethod()
+        ordinal = {c: e for c, e in COLUMN_ENCODINGS.items() if e[0] != 'nominal'}
+        _, history = the_method.encode_columns(None, history, ordinal)
+        history = the_method.lag_features(history)
+
+        # 다음 기록의 ESG 등급 (전이 예측 타깃)
+        history['next_esg_rating'] = (
+            history.groupby('company_code', sort=False)['esg_rating'].shift(-1).fillna(-1).astype(np.int8)
+        )
+        return history
+
+    def _transition_target(self, history: pd.DataFrame):
+        """다음 기록이 있는 행과 변화 방향 (0=하락, 1=유지, 2=상승, 코드가 작을수록 좋은 등급)"""
+        current = history['esg_rating'].to_numpy()
+        nxt = history['next_esg_rating'].to_numpy()
+        rated = (current >= 0) & (current != UNRATED_CODE) & (nxt >= 0) & (nxt != UNRATED_CODE)
+        target = (np.sign(current[rated].astype(np.int16) - nxt[rated]) + 1).astype(np.int8)
+        return rated, target
+
+    def get_transition_model(self, history: pd.DataFrame = None) -> GradeModel:
+        """등급 전이 예측 모델 (적재된 전체 파티션 기준, 버전별 캐시)"""
+        store = GradePartitionStore()
+        store.bootstrap()
+        digest = hashlib.sha1(store.fingerprint().encode())
+        digest.update(f"transition|{json.dumps(self.TRANSITION_FEATURES)}|{PIPELINE_VERSION}".encode())
+
+        def fit() -> GradeModel:
+            frame = self.history_frame() if history is None else history
+            rated, target = self._transition_target(frame)
+            if len(np.unique(target)) < 2:
+                raise InvalidRequestError("등급 전이를 학습하려면 2개 연도 이상의 이력과 2가지 이상의 변화 방향이 필요합니다.")
+            model = GradeModel("random_forest")
+            model.fit(frame.loc[rated, self.TRANSITION_FEATURES], target)
+            return model
+
+        return self._load_or_fit('transition', digest.hexdigest()[:16], fit)
+
+    def transition_evaluate(self, n_splits: int = 5, n_jobs: int = -1) -> dict:
+        """등급 전이 예측 Stratified K-Fold 평가"""
+        logger.info("❤️❤️ 등급 전이 평가 시작")
+        if n_splits < 2:
+            raise InvalidRequestError(f"n_splits는 2 이상이어야 합니다. 현재 값: {n_splits}")
+        started = time.perf_counter()
+        history = self.history_frame()
+        rated, target = self._transition_target(history)
+        classes, counts = np.unique(target, return_counts=True)
+        if len(classes) < 2 or counts.min() < n_splits:
+            raise InvalidRequestError(
+                f"등급 전이 평가에 필요한 이력이 부족합니다 "
+                f"(전이 {int(rated.sum())}건, 방향별 {dict(zip(classes.tolist(), counts.tolist()))}, n_splits={n_splits})"
+            )
+
+        X = history.loc[rated, self.TRANSITION_FEATURES].reset_index(drop=True)
+        k_fold = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        scores = Parallel(n_jobs=n_jobs)(
+            delayed(fit_fold)("random_forest", X, target, train_idx, val_idx)
+            for train_idx, val_idx in k_fold.split(X, target)
+        )
+        model = self.get_transition_model(history)
+        accuracy = np.array([score["accuracy"] for score in scores])
+        f1_macro = np.array([score["f1_macro"] for score in scores])
+        importances = sorted(
+            zip(self.TRANSITION_FEATURES, model.model.feature_importances_),
+            key=lambda item: item[1], reverse=True
+        )
+        logger.info("❤️❤️ 등급 전이 평가 완료")
+        return {
+            "n_transitions": int(rated.sum()),
+            "n_companies": int(history['company_code'].nunique()),
+            "years": sorted(history['year'].unique().tolist()),
+            "distribution": {self.TRANSITION_LABELS[int(c)]: int(n) for c, n in zip(classes, counts)},
+            "cv_accuracy": round(float(accuracy.mean()) * 100, 2),
+            "cv_f1_macro": round(float(f1_macro.mean()) * 100, 2),
+            "feature_importances": {name: round(float(v), 4) for name, v in importances},
+            "version": model.version,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def transition_predict(self, company_code: int) -> dict:
+        """회사의 가장 최근 기록으로 다음 연도 ESG 등급 변화 방향 예측"""
+        history = self.history_frame()
+        rows = history[history['company_code'] == int(company_code)]
+        if rows.empty:
+            raise NotFoundError(f"회사를 찾을 수 없습니다: {company_code}")
+        latest = rows.iloc[[-1]]
+        model = self.get_transition_model(history)
+        proba = model.predict_proba(latest[self.TRANSITION_FEATURES])[0]
+        labels = [self.TRANSITION_LABELS[c] for c in model.classes]
+        esg_code = int(latest['esg_rating'].iloc[0])
+        return {
+            "companyCode": str(int(company_code)),
+            "year": int(latest['year'].iloc[0]),
+            "esgRating": RATING_CATEGORIES[esg_code] if esg_code >= 0 else "",
+            "transition": labels[int(np.argmax(proba))],
+            "probabilities": {label: round(float(p), 4) for label, p in zip(labels, proba)},
+        }
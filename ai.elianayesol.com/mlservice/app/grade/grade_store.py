@@ -0,0 +1,221 @@
+import os
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from app.grade.grade_method import RATING_CATEGORIES
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+
+class CompanyStore:
+    """
+    ESG 등급 회사 데이터를 메모리에 보관하는 컬럼 기반 저장소 (싱글턴)
+
+    - grade.csv 가 있으면 그 파일을, 없으면 train.csv + test.csv 를 NO 내림차순으로 합쳐 사용
+      (grade.csv 와 같은 순서)
+    - 컬럼별 numpy 배열 (등급은 RATING_CATEGORIES 코드 int8) 로 보관
+    - 인덱스: company_code / year / 등급별 -> 행 번호 배열
+      (company_code 는 응답에 원본 CSV 값 그대로 쓰고, 인덱스/정렬/검색에는 6자리로 맞춘 code_key 사용)
+    - 조회할 때마다 원본 파일의 mtime 을 확인해서 바뀌었으면 다시 적재
+    """
+    _instance = None  # 싱글턴 인스턴스를 저장할 클래스 변수
+    _lock = threading.Lock()
+
+    RATING_COLUMNS = {
+        "esg_rating": "esgRating",
+        "env_rating": "envRating",
+        "soc_rating": "socRating",
+        "gov_rating": "govRating",
+    }
+    SORTABLE = {
+        "no": "no",
+        "companyName": "company_name",
+        "companyCode": "code_key",
+        "esgRating": "esg_rating",
+        "year": "year",
+    }
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:  # 인스턴스가 없으면 생성 후 데이터 로드
+                instance = super(CompanyStore, cls).__new__(cls)
+                instance._signature = None
+                cls._instance = instance
+            instance = cls._instance
+            if instance._signature != instance._source_signature():  # 원본 파일이 바뀌었으면 다시 로드
+                instance._load()
+        return instance  # 기존 인스턴스 반환
+
+    # -----------------------------
+    # 로드 및 인덱스 생성
+    # -----------------------------
+    @staticmethod
+    def _sources() -> list:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        grade_path = os.path.join(current_dir, 'grade.csv')
+        if os.path.exists(grade_path):
+            return [grade_path]
+        return [os.path.join(current_dir, 'train.csv'), os.path.join(current_dir, 'test.csv')]
+
+    def _source_signature(self) -> tuple:
+        return tuple((path, os.stat(path).st_mtime_ns) for path in self._sources())
+
+    def _load(self):
+        signature = self._source_signature()
+        frames = [
+            pd.read_csv(path, dtype={'company_code': str, 'year': 'int16', 'NO': 'int32'})
+            for path, _ in signature
+        ]
+        df = frames[0] if len(frames) == 1 else (
+            pd.concat(frames, ignore_index=True).sort_values('NO', ascending=False, kind='stable')
+        )
+
+        table = {
+            "no": df['NO'].to_numpy(),
+            "company_name": df['company_name'].to_numpy(dtype=object),
+            "company_code": df['company_code'].to_numpy(dtype=object),
+            "code_key": df['company_code'].str.zfill(6).to_numpy(dtype=object),
+            "year": df['year'].to_numpy(),
+        }
+        for column in self.RATING_COLUMNS:
+            table[column] = pd.Categorical(df[column], categories=RATING_CATEGORIES).codes.astype(np.int8)
+        table["search_name"] = np.array([name.lower() for name in table["company_name"]], dtype=object)
+        total = len(df)
+
+        # 해시 인덱스
+        indexes = {
+            "company_code": self._group_index(table["code_key"]),
+            "year": self._group_index(table["year"]),
+        }
+        for column in self.RATING_COLUMNS:
+            indexes[column] = self._group_index(table[column])
+
+        # 정렬 순서
+        sort_orders = {}
+        for key, column in self.SORTABLE.items():
+            asc = np.argsort(table[column], kind="stable")
+            sort_orders[key] = (asc, asc[::-1])
+
+        # 조회 중인 요청이 섞인 상태를 보지 않도록 한 번에 교체
+        self.__dict__.update(
+            table=table, indexes=indexes, sort_orders=sort_orders,
+            total=total, _signature=signature
+        )
+        logger.info(f"🏢 회사 저장소 로드 완료: {total}개 ({', '.join(os.path.basename(p) for p, _ in signature)})")
+
+    @staticmethod
+    def _group_index(values: np.ndarray) -> dict:
+        """값 -> 해당 값을 가진 행 번호 배열 (오름차순)"""
+        order = np.argsort(values, kind="stable")
+        keys, starts = np.unique(values[order], return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+        return {
+            (k.item() if hasattr(k, "item") else k): np.sort(order[s:e])
+            for k, s, e in zip(keys, starts, bounds)
+        }
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def _row(self, row: int, rank: int) -> dict:
+        table = self.table
+        result = {
+            'no': str(int(table["no"][row])),
+            'companyName': table["company_name"][row],
+            'companyCode': table["company_code"][row],
+            'year': str(int(table["year"][row])),
+            'rank': rank,
+        }
+        for column, key in self.RATING_COLUMNS.items():
+            code = table[column][row]
+            result[key] = RATING_CATEGORIES[code] if code >= 0 else ''
+        return result
+
+    def get(self, company_code: str) -> list:
+        """회사 코드로 해당 회사의 모든 연도 등급 조회 (최근 연도부터, 없으면 빈 리스트)"""
+        rows = self.indexes["company_code"].get(str(company_code).zfill(6))
+        if rows is None:
+            return []
+        rows = rows[np.argsort(-self.table["year"][rows], kind="stable")]
+        return [self._row(int(row), rank) for rank, row in enumerate(rows, 1)]
+
+    def query(self, q: str = None, year: int = None,
+              esg_rating: str = None, env_rating: str = None,
+              soc_rating: str = None, gov_rating: str = None,
+              sort_by: str = None, order: str = "asc",
+              page: int = 1, size: int = 10) -> tuple:
+        """
+        검색/필터/정렬/페이지 조회
+
+        Args:
+            q: 회사명 또는 회사 코드 검색어 (부분 일치, 대소문자 무시)
+            year: 연도
+            esg_rating, env_rating, soc_rating, gov_rating: 등급 (S, A+, A, B+, B, C, D, 등급없음)
+            sort_by: 정렬 기준 (no, companyName, companyCode, esgRating, year / 없으면 원본 순서)
+            order: 'asc' 또는 'desc'
+            page: 1부터 시작하는 페이지 번호
+            size: 페이지 크기
+
+        Returns:
+            (회사 딕셔너리 리스트, 조건에 맞는 전체 회사 수)
+        """
+        if sort_by is not None and sort_by not in self.SORTABLE:
+            raise ValueError(f"정렬할 수 없는 컬럼입니다: {sort_by} (가능: {list(self.SORTABLE)})")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"order는 'asc' 또는 'desc'여야 합니다. 현재 값: {order}")
+
+        # 인덱스로 후보 행 집합 계산 (작은 집합부터 교집합)
+        empty = np.empty(0, dtype=np.int64)
+        candidates = []
+        if year is not None:
+            candidates.append(self.indexes["year"].get(int(year), empty))
+        ratings = {"esg_rating": esg_rating, "env_rating": env_rating,
+                   "soc_rating": soc_rating, "gov_rating": gov_rating}
+        for column, rating in ratings.items():
+            if rating is None:
+                continue
+            if rating not in RATING_CATEGORIES:
+                raise ValueError(f"{column}은 {RATING_CATEGORIES} 중 하나여야 합니다. 현재 값: {rating}")
+            candidates.append(self.indexes[column].get(RATING_CATEGORIES.index(rating), empty))
+
+        if candidates:
+            candidates.sort(key=len)
+            rows = candidates[0]
+            for other in candidates[1:]:
+                rows = np.intersect1d(rows, other, assume_unique=True)
+        else:
+            rows = None
+
+        # 검색어: 코드 인덱스로 정확히 일치하면 바로 사용, 아니면 회사명/코드 부분 일치
+        if q:
+            keyword = q.strip().lower()
+            exact = self.indexes["company_code"].get(keyword.zfill(6)) if keyword.isdigit() else None
+            if exact is not None:
+                matched = exact
+            else:
+                scan = np.arange(self.total) if rows is None else rows
+                names = self.table["search_name"][scan]
+                codes = self.table["code_key"][scan]
+                hit = [keyword in name or keyword in code for name, code in zip(names, codes)]
+                matched = scan[np.array(hit, dtype=bool)] if len(scan) else empty
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        total = self.total if rows is None else len(rows)
+
+        # 정렬: 미리 계산한 전체 정렬 순서에서 후보 행만 남김
+        if sort_by is not None:
+            asc, desc = self.sort_orders[sort_by]
+            ordered = asc if order == "asc" else desc
+            if rows is not None:
+                member = np.zeros(self.total, dtype=bool)
+                member[rows] = True
+                ordered = ordered[member[ordered]]
+        else:
+            ordered = np.arange(self.total) if rows is None else rows
+            if order == "desc":
+                ordered = ordered[::-1]
+
+        offset = (max(page, 1) - 1) * size
+        page_rows = ordered[offset:offset + size]
+        return [self._row(int(row), offset + idx + 1) for idx, row in enumerate(page_rows)], total
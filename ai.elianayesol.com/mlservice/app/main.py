@@ -1,12 +1,48 @@
 from fastapi import FastAPI  # pyright: ignore[reportMissingImports]
 from fastapi.openapi.utils import get_openapi  # pyright: ignore[reportMissingImports]
+from starlette.concurrency import run_in_threadpool  # pyright: ignore[reportMissingImports]
+from contextlib import asynccontextmanager
 import uvicorn  # pyright: ignore[reportMissingImports]
+import logging
+import os
+from app.common.container import services
+from app.titanic.titanic_service import TitanicService
+from app.grade.grade_service import GradeService
+from app.seoul_crime.seoul_service import SeoulService
+from app.us_unemployment.service import USUnemploymentService
+from app.nlp.emma.emma_wordcloud import EmmaWordCloud
 from app.titanic.titanic_router import router as titanic_router
 from app.grade.grade_router import router as grade_router
 from app.seoul_crime.seoul_router import router as seoul_router
 from app.us_unemployment.router import router as usa_router
 from app.nlp.nlp_router import router as nlp_router
 
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# 서비스 컨테이너 (요청마다 만들지 않고 프로세스에서 하나씩 공유)
+# -----------------------------
+# warm=True: 서버 시작 시 생성 + warm() (로컬 데이터 로드, 캐시 채우기)
+# warm=False: 외부 네트워크/다운로드가 필요해서 첫 요청에서 생성
+services.register(TitanicService)
+services.register(GradeService)
+services.register(SeoulService)
+services.register(USUnemploymentService, warm=False)
+services.register(EmmaWordCloud, warm=False)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작 시 서비스 준비, 종료 시 정리 (ML_WARM_SERVICES=0 이면 준비 생략)"""
+    app.state.services = services
+    if os.getenv("ML_WARM_SERVICES", "1") != "0":
+        # 데이터 로드는 동기 코드라 스레드에서 실행
+        app.state.warmup = await run_in_threadpool(services.startup)
+    yield
+    services.shutdown()
+    logger.info("🛑 서비스 정리 완료")
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="ML Service API",
@@ -29,7 +65,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS는 Gateway에서 처리하므로 여기서는 제거
@@ -41,7 +78,8 @@ async def root():
     return {
         "message": "ML Service",
         "status": "running",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "services": services.status()
     }
 
 # 타이타닉 라우터 연결
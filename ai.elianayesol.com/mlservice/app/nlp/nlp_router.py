@@ -1,6 +1,8 @@
 from fastapi import APIRouter
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import Response, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from app.nlp.emma.emma_wordcloud import EmmaWordCloud
+from app.common.container import services
 import logging
 import os
 
@@ -16,8 +18,8 @@ router = APIRouter(
 )
 
 def get_emma_service() -> EmmaWordCloud:
-    """EmmaWordCloud 인스턴스 반환"""
-    return EmmaWordCloud()
+    """프로세스에서 공유하는 EmmaWordCloud 인스턴스 반환 (서비스 컨테이너, NLTK 데이터는 처음 한 번만 준비)"""
+    return services.get(EmmaWordCloud)
 
 @router.get(
     "/",
@@ -31,6 +33,34 @@ async def nlp_root():
         "status": "running"
     }
 
+def _render_wordcloud(width: int, height: int, background_color: str, random_state: int):
+    """
+    워드클라우드를 생성하고 저장된 PNG 바이트 반환 (파일이 없으면 None)
+
+    같은 파일에 저장하므로 생성과 읽기를 서비스 잠금 안에서 끝냄
+    (다른 요청이 응답 도중 다른 크기로 덮어쓰지 않도록 바이트를 읽어서 반환)
+    """
+    # EmmaWordCloud 인스턴스 (프로세스에서 공유, 처음 만들 때 NLTK 데이터 준비)
+    emma = get_emma_service()
+    save_file_path = os.path.join(emma.save_dir, "emma_wordcloud.png")
+    with services.lock(EmmaWordCloud):
+        # 워드클라우드 생성 (자동으로 save 폴더에 저장됨)
+        emma.generate_wordcloud(
+            width=width,
+            height=height,
+            background_color=background_color,
+            random_state=random_state,
+            show=False,
+            auto_save=True,
+            filename="emma_wordcloud.png"
+        )
+        
+        # 파일이 존재하는지 확인
+        if os.path.exists(save_file_path):
+            with open(save_file_path, 'rb') as f:
+                return f.read()
+    return None
+
 @router.get(
     "/emma",
     summary="엠마 소설 워드클라우드 생성",
@@ -56,29 +86,16 @@ async def generate_emma_wordcloud(
     - random_state: 랜덤 시드 (기본값: 0)
     """
     try:
-        # EmmaWordCloud 인스턴스 생성
-        emma = get_emma_service()
-        
-        # 워드클라우드 생성 (자동으로 save 폴더에 저장됨)
-        wc = emma.generate_wordcloud(
-            width=width,
-            height=height,
-            background_color=background_color,
-            random_state=random_state,
-            show=False,
-            auto_save=True,
-            filename="emma_wordcloud.png"
+        # 서비스 준비, 렌더링, 파일 읽기는 스레드풀에서 (서비스 잠금을 이벤트 루프에서 잡지 않도록)
+        content = await run_in_threadpool(
+            _render_wordcloud, width, height, background_color, random_state
         )
         
-        # save 폴더에서 파일 경로 가져오기
-        save_file_path = os.path.join(emma.save_dir, "emma_wordcloud.png")
-        
-        # 파일이 존재하는지 확인
-        if os.path.exists(save_file_path):
-            return FileResponse(
-                save_file_path,
+        if content is not None:
+            return Response(
+                content=content,
                 media_type="image/png",
-                filename="emma_wordcloud.png"
+                headers={"Content-Disposition": 'attachment; filename="emma_wordcloud.png"'}
             )
         else:
             return JSONResponse(
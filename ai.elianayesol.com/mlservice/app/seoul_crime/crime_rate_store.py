@@ -0,0 +1,74 @@
+# 자치구별 범죄율 표 메모 (히트맵 / 지도 / 범죄율 API 공용)
+
+import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def file_version(path: str) -> tuple:
+    """원본 파일 버전 (수정 시각, 크기) - 파일이 바뀌면 캐시 무효화"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CrimeRateStore:
+    """
+    (crime_type, 데이터 버전) -> {"counts", "rate", "norm"} 표 메모
+
+    - 데이터 버전은 crime_with_gu.csv 와 pop.xls 의 (수정 시각, 크기)
+    - 버전이 바뀌면 메모 전체를 버리고 다시 계산 (전처리로 CSV 를 다시 쓰면 자동 무효화)
+    - CSV 와 인구 데이터는 버전당 한 번만 읽어서 발생/검거 표가 같이 씀 (인구는 변환된 parquet)
+    - 반환한 표는 여러 요청이 공유하므로 호출자는 값을 수정하지 않는다
+    """
+
+    def __init__(self, method, crime_csv_path: str, pop_path: str):
+        self.method = method
+        self.crime_csv_path = crime_csv_path
+        self.pop_path = pop_path
+        self._version = None
+        self._inputs = None  # (df_crime, df_pop)
+        self._tables = {}
+        self._lock = threading.Lock()
+        self.computed = 0  # 표 계산 횟수
+        self.hits = 0  # 메모 적중 횟수
+
+    def version(self) -> tuple:
+        if not os.path.exists(self.crime_csv_path):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {self.crime_csv_path} (/seoul/preprocess 를 먼저 실행하세요)")
+        return file_version(self.crime_csv_path), file_version(self.pop_path)
+
+    def tables(self, crime_type: str = '발생') -> dict:
+        """crime_type 의 범죄율 표 (현재 데이터 버전 기준)"""
+        self.method._heatmap_spec(crime_type)  # 잘못된 crime_type 은 ValueError
+        version = self.version()
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    logger.info("♻️ 범죄 / 인구 데이터가 바뀌어 범죄율 표를 다시 계산합니다.")
+                self._version, self._inputs, self._tables = version, None, {}
+            if crime_type in self._tables:
+                self.hits += 1
+                return self._tables[crime_type]
+            if self._inputs is None:
+                self._inputs = (
+                    self.method.read_crime_counts(self.crime_csv_path),
+                    self.method.load_population(self.pop_path),
+                )
+            self._tables[crime_type] = self.method.compute_crime_rates(*self._inputs, crime_type)
+            self.computed += 1
+            return self._tables[crime_type]
+
+    def invalidate(self):
+        with self._lock:
+            self._version, self._inputs, self._tables = None, None, {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "crime_types": list(self._tables),
+                "computed": self.computed,
+                "hits": self.hits,
+            }
@@ -0,0 +1,179 @@
+# 자치구 경계 공간 인덱스 (위경도 점 -> 자치구)
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class DistrictIndex:
+    """
+    자치구 폴리곤 STR 트리 + 벡터화한 점-폴리곤 판정
+
+    - 폴리곤 경계 상자(bbox)를 STR(Sort-Tile-Recursive) 방식으로 묶어 트리를 한 번만 만든다
+    - assign / locate 는 점 배열 전체를 한 번에 받아 트리 노드마다 bbox 안에 드는 점만 골라 내려가고,
+      잎(자치구 폴리곤)에서 ray casting 으로 안/밖을 판정한다 (파이썬 반복은 노드·변 단위, 점 단위가 아님)
+    - 경계 위의 점처럼 두 구에 동시에 드는 점은 먼저 판정된 구 하나에만 배정
+    - Polygon / MultiPolygon, 구멍(hole) 지원. GeoJSON 좌표 순서는 [경도, 위도]
+
+    경계 데이터(kr-state.json)가 바뀌지 않는 한 프로세스에서 하나를 만들어 공유한다.
+    """
+
+    def __init__(self, names: list, polygons: list, node_capacity: int = 4, max_cells: int = 2_000_000):
+        """
+        Args:
+            names: 자치구 이름 (polygons 와 같은 순서)
+            polygons: 자치구별 [(외곽 링, [구멍 링, ...]), ...] (링은 (n, 2) [경도, 위도] 배열)
+            node_capacity: STR 트리 노드당 자식 수
+            max_cells: ray casting 한 번에 만드는 (점 x 변) 행렬 크기 상한 (메모리 제한)
+        """
+        if len(names) != len(polygons):
+            raise ValueError(f"자치구 이름({len(names)})과 폴리곤({len(polygons)}) 개수가 다릅니다.")
+        self.names = np.asarray(names, dtype=object)
+        self.polygons = [[(np.asarray(shell, dtype=float), [np.asarray(h, dtype=float) for h in holes])
+                          for shell, holes in parts] for parts in polygons]
+        self.node_capacity = max(2, node_capacity)
+        self.max_cells = max_cells
+        self.bounds = np.array([self._bounds(parts) for parts in self.polygons])
+        self.root = self._build_str(np.arange(len(self.polygons)), self.bounds)
+
+    @classmethod
+    def from_geojson(cls, geo: dict, name_key: str = 'name', **kwargs) -> "DistrictIndex":
+        """GeoJSON FeatureCollection (Polygon / MultiPolygon) 에서 인덱스 생성"""
+        names, polygons = [], []
+        for feature in geo.get('features', []):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                rings_list = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                rings_list = geometry['coordinates']
+            else:
+                logger.warning(f"⚠️ 지원하지 않는 geometry 를 건너뜁니다: {geometry.get('type')}")
+                continue
+            names.append(feature['properties'][name_key])
+            polygons.append([(rings[0], rings[1:]) for rings in rings_list if rings])
+        return cls(names, polygons, **kwargs)
+
+    # -----------------------------
+    # STR 트리
+    # -----------------------------
+    @staticmethod
+    def _bounds(parts: list) -> tuple:
+        coords = np.vstack([shell for shell, _ in parts])
+        return coords[:, 0].min(), coords[:, 1].min(), coords[:, 0].max(), coords[:, 1].max()
+
+    def _build_str(self, ids: np.ndarray, bounds: np.ndarray) -> dict:
+        """
+        STR 패킹: bbox 중심을 x 로 정렬해 세로 조각으로 나누고, 조각 안에서 y 로 정렬해 node_capacity 개씩 묶기를
+        노드가 하나 남을 때까지 반복. 노드 = {"bounds", "children"} (잎은 "ids")
+        """
+        nodes = [{"bounds": tuple(bounds[i]), "ids": np.array([i])} for i in ids]
+        while len(nodes) > 1:
+            capacity = self.node_capacity
+            boxes = np.array([node["bounds"] for node in nodes])
+            centers = np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2])
+            n_groups = int(np.ceil(len(nodes) / capacity))
+            n_slices = int(np.ceil(np.sqrt(n_groups)))
+            per_slice = n_slices * capacity
+            by_x = np.argsort(centers[:, 0], kind="stable")
+            parents = []
+            for start in range(0, len(nodes), per_slice):
+                chunk = by_x[start:start + per_slice]
+                chunk = chunk[np.argsort(centers[chunk, 1], kind="stable")]
+                for group_start in range(0, len(chunk), capacity):
+                    group = chunk[group_start:group_start + capacity]
+                    group_boxes = boxes[group]
+                    parents.append({
+                        "bounds": (group_boxes[:, 0].min(), group_boxes[:, 1].min(),
+                                   group_boxes[:, 2].max(), group_boxes[:, 3].max()),
+                        "children": [nodes[i] for i in group],
+                    })
+            nodes = parents
+        return nodes[0] if nodes else {"bounds": (np.inf, np.inf, -np.inf, -np.inf), "children": []}
+
+    # -----------------------------
+    # 점 배정
+    # -----------------------------
+    def _ring_contains(self, ring: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """ray casting: 점에서 +x 방향 반직선이 링의 변과 홀수 번 만나면 안쪽"""
+        xi, yi = ring[:, 0], ring[:, 1]
+        xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+        inside = np.zeros(len(x), dtype=bool)
+        step = max(1, self.max_cells // max(1, len(ring)))
+        for start in range(0, len(x), step):
+            px, py = x[start:start + step, None], y[start:start + step, None]
+            straddles = (yi > py) != (yj > py)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = (xj - xi) * (py - yi) / (yj - yi) + xi
+            crossings = np.count_nonzero(straddles & (px < x_cross), axis=1)
+            inside[start:start + step] = crossings % 2 == 1
+        return inside
+
+    def _polygon_contains(self, parts: list, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        inside = np.zeros(len(x), dtype=bool)
+        for shell, holes in parts:
+            hit = self._ring_contains(shell, x, y)
+            for hole in holes:
+                if hit.any():
+                    hit[hit] &= ~self._ring_contains(hole, x[hit], y[hit])
+            inside |= hit
+        return inside
+
+    def locate(self, lat, lng) -> np.ndarray:
+        """
+        위도 / 경도 배열 -> 자치구 번호 배열 (어느 구에도 들지 않거나 좌표가 없으면 -1)
+        """
+        y = np.asarray(lat, dtype=float).ravel()
+        x = np.asarray(lng, dtype=float).ravel()
+        if x.shape != y.shape:
+            raise ValueError(f"위도({y.shape})와 경도({x.shape}) 배열 길이가 다릅니다.")
+        result = np.full(len(x), -1, dtype=np.int64)
+        valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+
+        stack = [(self.root, valid)]
+        while stack:
+            node, idx = stack.pop()
+            # 앞에서 다른 구에 배정된 점은 제외
+            idx = idx[result[idx] < 0]
+            if len(idx) == 0:
+                continue
+            min_x, min_y, max_x, max_y = node["bounds"]
+            px, py = x[idx], y[idx]
+            idx = idx[(px >= min_x) & (px <= max_x) & (py >= min_y) & (py <= max_y)]
+            if len(idx) == 0:
+                continue
+            if "ids" in node:
+                district = int(node["ids"][0])
+                result[idx[self._polygon_contains(self.polygons[district], x[idx], y[idx])]] = district
+            else:
+                stack.extend((child, idx) for child in reversed(node["children"]))
+        return result
+
+    def assign(self, lat, lng, missing: str = "") -> np.ndarray:
+        """위도 / 경도 배열 -> 자치구 이름 배열 (어느 구에도 들지 않으면 missing)"""
+        located = self.locate(lat, lng)
+        names = np.full(len(located), missing, dtype=object)
+        found = located >= 0
+        names[found] = self.names[located[found]]
+        return names
+
+    def areas_m2(self) -> np.ndarray:
+        """자치구별 면적 (제곱미터, 구 중심 위도 기준 등장방형 근사 + 신발끈 공식, 구멍 제외)"""
+        def ring_area(ring: np.ndarray, m_per_deg_lng: float) -> float:
+            x, y = ring[:, 0] * m_per_deg_lng, ring[:, 1] * 110_574.0
+            return abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+        areas = np.zeros(len(self.polygons))
+        for i, parts in enumerate(self.polygons):
+            m_per_deg_lng = 111_320.0 * np.cos(np.radians((self.bounds[i, 1] + self.bounds[i, 3]) / 2))
+            areas[i] = sum(ring_area(shell, m_per_deg_lng) - sum(ring_area(h, m_per_deg_lng) for h in holes)
+                           for shell, holes in parts)
+        return areas
+
+    @property
+    def extent(self) -> tuple:
+        """전체 자치구 경계 상자 (최소 경도, 최소 위도, 최대 경도, 최대 위도)"""
+        return tuple(self.root["bounds"])
+
+    def __len__(self) -> int:
+        return len(self.names)
@@ -0,0 +1,112 @@
+"""
+로컬 가짜 카카오 키워드 검색 서버 (테스트/개발용)
+
+실제 API 키와 네트워크 없이 지오코딩 흐름을 확인할 때 사용한다.
+서울 경찰서 31곳은 고정된 자치구 주소와 좌표를 돌려주고, 나머지 검색어는 빈 결과를 돌려준다.
+fail_rate / rate_limit_every 로 5xx·429 응답을 섞어 재시도 동작을 확인할 수 있다.
+
+실행 (mlservice 디렉토리에서):
+    python -m app.seoul_crime.fake_kakao_server --port 9999 --fail-rate 0.2
+    KAKAO_BASE_URL=http://127.0.0.1:9999/v2/local KAKAO_REST_API_KEY=test uvicorn app.main:app
+
+프로세스 안에서 바로 연결할 때:
+    app = create_app()
+    AsyncKakaoGeocoder(api_key="test", base_url="http://fake/v2/local",
+                       transport=httpx.ASGITransport(app=app))
+"""
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+from fastapi import FastAPI, Header, Query
+from fastapi.responses import JSONResponse
+
+# 관서명 -> 자치구
+STATION_GU = {
+    "서울중부경찰서": "중구", "서울종로경찰서": "종로구", "서울남대문경찰서": "중구",
+    "서울서대문경찰서": "서대문구", "서울혜화경찰서": "종로구", "서울용산경찰서": "용산구",
+    "서울성북경찰서": "성북구", "서울동대문경찰서": "동대문구", "서울마포경찰서": "마포구",
+    "서울영등포경찰서": "영등포구", "서울성동경찰서": "성동구", "서울동작경찰서": "동작구",
+    "서울광진경찰서": "광진구", "서울서부경찰서": "은평구", "서울강북경찰서": "강북구",
+    "서울금천경찰서": "금천구", "서울중랑경찰서": "중랑구", "서울강남경찰서": "강남구",
+    "서울관악경찰서": "관악구", "서울강서경찰서": "강서구", "서울강동경찰서": "강동구",
+    "서울종암경찰서": "성북구", "서울구로경찰서": "구로구", "서울서초경찰서": "서초구",
+    "서울양천경찰서": "양천구", "서울송파경찰서": "송파구", "서울노원경찰서": "노원구",
+    "서울방배경찰서": "서초구", "서울은평경찰서": "은평구", "서울도봉경찰서": "도봉구",
+    "서울수서경찰서": "강남구",
+}
+
+
+def _document(query: str, gu: str) -> dict:
+    """검색어로 정해지는 서울 범위 안의 고정 좌표 문서"""
+    digest = hashlib.sha1(query.encode()).digest()
+    lat = 37.45 + digest[0] / 255 * 0.2
+    lng = 126.85 + digest[1] / 255 * 0.3
+    return {
+        "place_name": query,
+        "address_name": f"서울 {gu} 가짜동 {digest[2]}",
+        "road_address_name": f"서울 {gu} 가짜로 {digest[3]}",
+        "x": f"{lng:.6f}",
+        "y": f"{lat:.6f}",
+    }
+
+
+def create_app(fail_rate: float = 0.0, rate_limit_every: int = 0, latency: float = 0.0,
+               api_key: str = None, seed: int = 0) -> FastAPI:
+    """
+    가짜 서버 앱 생성
+
+    Args:
+        fail_rate: 503 으로 응답할 확률
+        rate_limit_every: N 번째 요청마다 429 (Retry-After: 0) 응답, 0 이면 사용 안 함
+        latency: 응답 전 대기 시간(초)
+        api_key: 지정하면 Authorization 헤더의 키가 같아야 함 (기본: 아무 키나 허용)
+    """
+    app = FastAPI(title="Fake Kakao Local API")
+    app.state.calls = 0  # 받은 요청 수 (캐시 적중 확인용)
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    @app.get("/v2/local/search/keyword.json")
+    async def search_keyword(query: str = Query(...), authorization: str = Header(default="")):
+        with lock:
+            app.state.calls += 1
+            calls = app.state.calls
+            failed = rng.random() < fail_rate
+        if latency:
+            await asyncio.sleep(latency)
+
+        key = authorization.removeprefix("KakaoAK ").strip()
+        if not key or (api_key is not None and key != api_key):
+            return JSONResponse(status_code=401, content={"errorType": "AccessDeniedError", "message": "wrong appKey"})
+        if rate_limit_every and calls % rate_limit_every == 0:
+            return JSONResponse(status_code=429, headers={"Retry-After": "0"},
+                                content={"errorType": "RequestThrottled", "message": "too many requests"})
+        if failed:
+            return JSONResponse(status_code=503, content={"errorType": "ServiceUnavailable", "message": "injected failure"})
+
+        gu = STATION_GU.get(query)
+        documents = [_document(query, gu)] if gu else []
+        return {"meta": {"total_count": len(documents), "is_end": True}, "documents": documents}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="가짜 카카오 키워드 검색 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--api-key", default=None)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.fail_rate, args.rate_limit_every, args.latency, args.api_key),
+                host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
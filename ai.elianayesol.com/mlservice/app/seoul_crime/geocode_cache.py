@@ -0,0 +1,91 @@
+# 지오코딩 결과 영구 캐시 (SQLite)
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = str(Path(__file__).parent / 'save' / 'geocode_cache.sqlite')
+
+
+class GeocodeCache:
+    """
+    검색어 -> 지오코딩 결과 캐시
+
+    경찰서 위치처럼 바뀌지 않는 결과를 save/geocode_cache.sqlite 에 보관해서
+    /seoul/preprocess 를 다시 실행해도 외부 API 를 호출하지 않게 한다.
+    결과는 KakaoMapSingleton.geocode 와 같은 Google Maps 호환 리스트를 JSON 으로 저장한다.
+    검색 결과가 없거나 호출이 실패한 검색어는 저장하지 않는다 (다음 실행에서 다시 시도).
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, path: str = None, provider: str = "kakao"):
+        self.path = path or os.getenv('GEOCODE_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.provider = provider
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " provider TEXT NOT NULL,"
+                " query TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (provider, query))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # 호출마다 짧게 열고 닫음 (sqlite 연결은 스레드 간 공유 불가)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:  # 성공하면 commit, 예외면 rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, queries: list) -> dict:
+        """캐시에 있는 검색어만 {검색어: 결과} 로 반환"""
+        queries = list(dict.fromkeys(queries))
+        found = {}
+        with self._connect() as conn:
+            # sqlite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(queries), 500):
+                chunk = queries[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT query, result FROM geocode WHERE provider = ? AND query IN ({','.join('?' * len(chunk))})",
+                    [self.provider, *chunk],
+                ).fetchall()
+                found.update((query, json.loads(result)) for query, result in rows)
+        return found
+
+    def get(self, query: str):
+        return self.get_many([query]).get(query)
+
+    def put_many(self, results: dict) -> int:
+        """비어 있지 않은 결과만 저장하고 저장한 개수 반환"""
+        rows = [
+            (self.provider, query, json.dumps(result, ensure_ascii=False), time.time())
+            for query, result in results.items() if result
+        ]
+        if not rows:
+            return 0
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO geocode (provider, query, result, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        logger.info(f"💾 지오코딩 캐시 저장: {len(rows)}건")
+        return len(rows)
+
+    def put(self, query: str, result: list) -> int:
+        return self.put_many({query: result})
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM geocode WHERE provider = ?", [self.provider])
@@ -0,0 +1,152 @@
+# 렌더링된 히트맵 이미지 캐시 (내용 주소 기반)
+
+import os
+import uuid
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+import joblib
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = str(Path(__file__).parent / 'save' / 'heatmap_cache')
+
+# 렌더링 코드(제목, 폰트, 레이아웃 등)가 바뀌면 올려서 기존 이미지를 무효화
+RENDER_VERSION = 1
+
+
+def render_key(df_norm, **spec) -> str:
+    """
+    정규화 행렬 내용 + 렌더링 옵션(crime_type, cmap, dpi, figsize, format 등)으로 만든 캐시 키
+
+    같은 데이터와 옵션이면 항상 같은 키가 나오므로 그대로 ETag 로 쓴다.
+    """
+    digest = hashlib.sha1()
+    digest.update(f"v{RENDER_VERSION}".encode())
+    digest.update(joblib.hash(df_norm).encode())
+    digest.update(joblib.hash(sorted(spec.items())).encode())
+    return digest.hexdigest()
+
+
+class HeatmapCache:
+    """
+    키 -> 이미지 바이트 캐시
+
+    - 메모리 LRU (최근 max_items 개) + save/heatmap_cache/{key}.{ext} 디스크 파일
+    - 디스크는 전체 max_disk_bytes 이하로 유지 (저장할 때 가장 오래 안 쓴 파일부터 삭제,
+      디스크에서 읽을 때마다 파일 mtime 을 갱신해서 최근 사용 순서로 씀)
+    - 같은 키를 동시에 요청하면 한 번만 렌더링하고 나머지는 그 결과를 기다림
+
+    환경변수: HEATMAP_CACHE_DIR, HEATMAP_CACHE_MAX_MB
+    """
+    _render_locks = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, cache_dir: str = None, max_items: int = 16, max_disk_bytes: int = None):
+        self.cache_dir = cache_dir or os.getenv('HEATMAP_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_items = max_items
+        if max_disk_bytes is None:
+            max_disk_bytes = int(float(os.getenv('HEATMAP_CACHE_MAX_MB', '256')) * 1024 * 1024)
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, key: str, ext: str = 'png') -> str:
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    def get(self, key: str, ext: str = 'png'):
+        """(이미지 바이트, 'hit-memory' | 'hit-disk') 또는 (None, 'miss')"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key], "hit-memory"
+        path = self.path(key, ext)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)  # 최근 사용 표시 (디스크 정리 순서)
+        except FileNotFoundError:
+            # 없거나 읽는 사이 정리된 파일
+            return None, "miss"
+        self._remember(key, content)
+        return content, "hit-disk"
+
+    def put(self, key: str, content: bytes, ext: str = 'png') -> str:
+        """메모리와 디스크에 저장하고 파일 경로 반환 (임시 파일 후 교체라 읽는 쪽은 항상 완전한 파일을 봄)"""
+        self._remember(key, content)
+        path = self.path(key, ext)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str = None) -> int:
+        """디스크 캐시가 max_disk_bytes 를 넘으면 mtime 이 오래된 파일부터 삭제하고 삭제한 개수 반환"""
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                # 다른 요청이 쓰는 중인 임시 파일은 건드리지 않음
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # 다른 요청이 먼저 지움
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"🧹 히트맵 디스크 캐시 정리: {removed}개 삭제 (현재 {total:,} bytes)")
+        return removed
+
+    def get_or_render(self, key: str, render, ext: str = 'png'):
+        """
+        캐시에 있으면 그대로, 없으면 render() 로 만든 바이트를 저장해서 반환
+
+        Returns:
+            (이미지 바이트, 캐시 상태)
+        """
+        content, status = self.get(key, ext)
+        if content is not None:
+            return content, status
+        with self._locks_guard:
+            lock = self._render_locks.setdefault(key, threading.Lock())
+        with lock:
+            # 기다리는 동안 다른 요청이 렌더링을 끝냈을 수 있음
+            content, status = self.get(key, ext)
+            if content is None:
+                content = render()
+                self.put(key, content, ext)
+                logger.info(f"🎨 히트맵 렌더링 캐시 저장: {key[:12]}.{ext} ({len(content):,} bytes)")
+        with self._locks_guard:
+            self._render_locks.pop(key, None)
+        return content, status
+
+    def _remember(self, key: str, content: bytes):
+        with self._lock:
+            self._memory[key] = content
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,224 @@
+# 사건 단위 좌표 데이터 청크 집계 (자치구 / 육각형 격자 / 사각형 격자)
+
+import os
+import math
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from app.common.errors import InvalidRequestError
+
+logger = logging.getLogger(__name__)
+
+# 위도 / 경도 컬럼 후보 (대소문자 무시, 앞에서부터 처음 찾은 컬럼을 씀)
+LAT_COLUMNS = ('lat', 'latitude', '위도', '위도(lat)', 'y')
+LNG_COLUMNS = ('lng', 'lon', 'long', 'longitude', '경도', '경도(lng)', 'x')
+
+GRID_KINDS = ('hex', 'square')
+MIN_CELL_M = 50
+MAX_CELLS = 4_000_000
+
+# 위도 1도 / 경도 1도(적도) 거리 (미터) - 서울 범위에서는 등장방형 근사로 충분
+_M_PER_DEG_LAT = 110_574.0
+_M_PER_DEG_LNG = 111_320.0
+_SQRT3 = math.sqrt(3)
+
+
+def incident_columns(path: str) -> tuple:
+    """파일 헤더에서 (위도 컬럼, 경도 컬럼) 찾기 (CSV / Parquet)"""
+    if path.endswith('.parquet'):
+        names = pq.ParquetFile(path).schema_arrow.names
+    else:
+        names = pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns.tolist()
+    lowered = {str(name).strip().lower(): name for name in names}
+    lat_col = next((lowered[c] for c in LAT_COLUMNS if c in lowered), None)
+    lng_col = next((lowered[c] for c in LNG_COLUMNS if c in lowered), None)
+    if lat_col is None or lng_col is None:
+        raise InvalidRequestError(f"위도/경도 컬럼을 찾을 수 없습니다 (후보: {LAT_COLUMNS} / {LNG_COLUMNS}). 현재 컬럼: {names}")
+    return lat_col, lng_col
+
+
+def iter_incident_chunks(path: str, chunksize: int = 500_000):
+    """
+    사건 파일을 chunksize 행씩 읽어 (위도 배열, 경도 배열) 을 차례로 반환
+
+    위도 / 경도 두 컬럼만 읽고, 숫자가 아닌 값은 NaN 으로 바꾼다 (집계에서 invalid 로 셈).
+    파일 크기와 무관하게 한 번에 chunksize 행만 메모리에 올린다.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"사건 파일을 찾을 수 없습니다: {path}")
+    lat_col, lng_col = incident_columns(path)
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=[lat_col, lng_col]):
+            chunk = batch.to_pandas()
+            yield (pd.to_numeric(chunk[lat_col], errors='coerce').to_numpy(dtype=float),
+                   pd.to_numeric(chunk[lng_col], errors='coerce').to_numpy(dtype=float))
+    else:
+        for chunk in pd.read_csv(path, usecols=[lat_col, lng_col], chunksize=chunksize,
+                                 encoding='utf-8-sig', low_memory=True):
+            yield (pd.to_numeric(chunk[lat_col], errors='coerce').to_numpy(dtype=float),
+                   pd.to_numeric(chunk[lng_col], errors='coerce').to_numpy(dtype=float))
+
+
+class IncidentGrid:
+    """
+    서울 범위를 덮는 고정 크기 격자 (H3 와 비슷한 pointy-top 육각형 또는 정사각형)
+
+    - 위경도를 범위 남서쪽 모서리 기준 미터 좌표로 근사 투영한 뒤 NumPy 로 칸 번호를 계산
+    - 칸 수가 범위와 cell_m 으로 정해지므로 집계 배열 크기가 데이터 양과 무관하다
+    - cell_m: 육각형은 한 변 길이(= 중심에서 꼭짓점까지), 사각형은 한 변 길이 (미터)
+    """
+
+    def __init__(self, bounds: tuple, kind: str = 'hex', cell_m: float = 500):
+        """
+        Args:
+            bounds: (최소 경도, 최소 위도, 최대 경도, 최대 위도)
+        """
+        if kind not in GRID_KINDS:
+            raise InvalidRequestError(f"grid 는 {GRID_KINDS} 중 하나여야 합니다. 현재 값: {kind}")
+        if not cell_m or cell_m < MIN_CELL_M:
+            raise InvalidRequestError(f"cell_m 은 {MIN_CELL_M}m 이상이어야 합니다. 현재 값: {cell_m}")
+        self.kind = kind
+        self.cell_m = float(cell_m)
+        self.min_lng, self.min_lat, self.max_lng, self.max_lat = bounds
+        self._m_per_deg_lng = _M_PER_DEG_LNG * math.cos(math.radians((self.min_lat + self.max_lat) / 2))
+        width, height = self.project(self.max_lat, self.max_lng)
+        size = self.cell_m
+        if kind == 'square':
+            self.q_min, self.r_min = 0, 0
+            self.n_q, self.n_r = int(math.ceil(width / size)) or 1, int(math.ceil(height / size)) or 1
+        else:
+            r_max = int(math.ceil(height / (1.5 * size))) + 1
+            self.r_min = -1
+            self.q_min = int(math.floor(-r_max / 2)) - 1
+            q_max = int(math.ceil(width / (_SQRT3 * size) - self.r_min / 2)) + 1
+            self.n_q, self.n_r = q_max - self.q_min + 1, r_max - self.r_min + 1
+        if self.n_cells > MAX_CELLS:
+            raise InvalidRequestError(f"격자 칸이 너무 많습니다 ({self.n_cells:,}개 > {MAX_CELLS:,}). cell_m 을 키우세요.")
+
+    @property
+    def n_cells(self) -> int:
+        return self.n_q * self.n_r
+
+    def project(self, lat, lng) -> tuple:
+        """위도 / 경도 -> 범위 남서쪽 모서리 기준 (x, y) 미터"""
+        x = (np.asarray(lng, dtype=float) - self.min_lng) * self._m_per_deg_lng
+        y = (np.asarray(lat, dtype=float) - self.min_lat) * _M_PER_DEG_LAT
+        return x, y
+
+    def unproject(self, x, y) -> tuple:
+        """(x, y) 미터 -> (위도, 경도)"""
+        return self.min_lat + np.asarray(y) / _M_PER_DEG_LAT, self.min_lng + np.asarray(x) / self._m_per_deg_lng
+
+    def cell_index(self, lat, lng) -> np.ndarray:
+        """위도 / 경도 배열 -> 칸 번호 배열 (범위 밖이거나 좌표가 없으면 -1)"""
+        x, y = self.project(lat, lng)
+        size = self.cell_m
+        with np.errstate(invalid='ignore'):
+            if self.kind == 'square':
+                q, r = np.floor(x / size), np.floor(y / size)
+            else:
+                # 축 좌표(axial)로 바꾼 뒤 cube 좌표 반올림
+                qf = (_SQRT3 / 3 * x - y / 3) / size
+                rf = (2 / 3 * y) / size
+                sf = -qf - rf
+                q, r, s = np.round(qf), np.round(rf), np.round(sf)
+                dq, dr, ds = np.abs(q - qf), np.abs(r - rf), np.abs(s - sf)
+                fix_q = (dq > dr) & (dq > ds)
+                fix_r = ~fix_q & (dr > ds)
+                q = np.where(fix_q, -r - s, q)
+                r = np.where(fix_r, -q - s, r)
+            q, r = q - self.q_min, r - self.r_min
+            inside = (q >= 0) & (q < self.n_q) & (r >= 0) & (r < self.n_r)
+        index = np.full(len(x), -1, dtype=np.int64)
+        index[inside] = r[inside].astype(np.int64) * self.n_q + q[inside].astype(np.int64)
+        return index
+
+    def cell_polygon(self, index: int) -> list:
+        """칸 번호 -> GeoJSON 외곽 링 [[경도, 위도], ...]"""
+        r, q = divmod(int(index), self.n_q)
+        q, r = q + self.q_min, r + self.r_min
+        size = self.cell_m
+        if self.kind == 'square':
+            xs = np.array([q, q + 1, q + 1, q, q]) * size
+            ys = np.array([r, r, r + 1, r + 1, r]) * size
+        else:
+            cx, cy = size * _SQRT3 * (q + r / 2), size * 1.5 * r
+            angles = np.radians(np.arange(7) * 60 - 30)
+            xs, ys = cx + size * np.cos(angles), cy + size * np.sin(angles)
+        lats, lngs = self.unproject(xs, ys)
+        return [[round(float(lng), 6), round(float(lat), 6)] for lat, lng in zip(lats, lngs)]
+
+
+class IncidentAggregator:
+    """
+    청크마다 add(위도, 경도) 로 자치구별 / 격자 칸별 사건 수를 누적
+
+    누적 배열 크기는 자치구 수 + 격자 칸 수로 고정이라 입력 행 수와 무관하다.
+    """
+
+    def __init__(self, districts, grid: IncidentGrid):
+        self.districts = districts
+        self.grid = grid
+        self.district_counts = np.zeros(len(districts), dtype=np.int64)
+        self.cell_counts = np.zeros(grid.n_cells, dtype=np.int64)
+        self.rows = 0
+        self.invalid = 0  # 좌표가 비었거나 숫자가 아닌 행
+        self.outside_districts = 0  # 어느 자치구에도 들지 않는 행
+        self.outside_grid = 0  # 격자 범위 밖 행
+
+    def add(self, lat: np.ndarray, lng: np.ndarray):
+        self.rows += len(lat)
+        valid = np.isfinite(lat) & np.isfinite(lng)
+        self.invalid += int(len(lat) - np.count_nonzero(valid))
+        lat, lng = lat[valid], lng[valid]
+
+        located = self.districts.locate(lat, lng)
+        found = located >= 0
+        self.outside_districts += int(len(located) - np.count_nonzero(found))
+        self.district_counts += np.bincount(located[found], minlength=len(self.district_counts))
+
+        cells = self.grid.cell_index(lat, lng)
+        in_grid = cells >= 0
+        self.outside_grid += int(len(cells) - np.count_nonzero(in_grid))
+        self.cell_counts += np.bincount(cells[in_grid], minlength=len(self.cell_counts))
+
+    def district_table(self) -> pd.DataFrame:
+        """자치구별 사건 수 (많은 순)"""
+        return (pd.DataFrame({'자치구': self.districts.names, '사건수': self.district_counts})
+                .sort_values('사건수', ascending=False, kind='stable').reset_index(drop=True))
+
+    def cells_geojson(self, min_count: int = 1) -> dict:
+        """사건 수가 min_count 이상인 칸만 담은 GeoJSON FeatureCollection (properties.count)"""
+        occupied = np.flatnonzero(self.cell_counts >= max(1, min_count))
+        return {
+            "type": "FeatureCollection",
+            "features": [{
+                "type": "Feature",
+                "id": int(index),
+                "properties": {"count": int(self.cell_counts[index])},
+                "geometry": {"type": "Polygon", "coordinates": [self.grid.cell_polygon(index)]},
+            } for index in occupied],
+        }
+
+    def summary(self) -> dict:
+        return {
+            "rows": self.rows,
+            "invalid": self.invalid,
+            "outside_districts": self.outside_districts,
+            "outside_grid": self.outside_grid,
+            "grid": self.grid.kind,
+            "cell_m": self.grid.cell_m,
+            "grid_cells": self.grid.n_cells,
+            "occupied_cells": int(np.count_nonzero(self.cell_counts)),
+            "max_cell_count": int(self.cell_counts.max()) if len(self.cell_counts) else 0,
+        }
+
+
+def aggregate_incidents(path: str, districts, grid: IncidentGrid, chunksize: int = 500_000) -> IncidentAggregator:
+    """사건 파일 전체를 청크 단위로 읽으며 자치구 / 격자 집계"""
+    aggregator = IncidentAggregator(districts, grid)
+    for lat, lng in iter_incident_chunks(path, chunksize):
+        aggregator.add(lat, lng)
+    logger.info(f"🧮 사건 집계 완료: {aggregator.summary()}")
+    return aggregator
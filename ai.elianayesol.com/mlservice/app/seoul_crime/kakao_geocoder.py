@@ -0,0 +1,298 @@
+# 카카오맵 비동기 일괄 지오코딩
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from app.seoul_crime.kakao_map_singletone import KakaoMapSingleton, format_document, RETRY_STATUS
+from app.seoul_crime.geocode_cache import GeocodeCache
+
+logger = logging.getLogger(__name__)
+
+
+class _RateLimiter:
+    """초당 rate 회를 넘지 않도록 요청 시작 시각을 일정 간격으로 배정"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    연속 실패 차단기
+
+    - closed: 정상 호출
+    - open: 연속 failure_threshold 번 실패하면 reset_timeout 초 동안 호출하지 않고 바로 실패 처리
+    - half_open: 대기 시간이 지나면 한 번만 시험 호출, 성공하면 closed, 실패하면 다시 open
+      (4xx 처럼 성공도 장애도 아닌 결과면 half_open 그대로 두고 다음 호출이 다시 시험)
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """지금 호출해도 되는지 (half_open 에서는 시험 호출 하나만 허용)"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(f"🚫 카카오맵 API 연속 {self.failures}회 실패, {self.reset_timeout}초 동안 호출 차단")
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """시험 호출 표시 해제 (호출이 어떻게 끝나든 마지막에 호출)"""
+        with self._lock:
+            self._probing = False
+
+
+class LatencyMetrics:
+    """호출별 소요 시간/결과 기록 (최근 maxlen 건)"""
+
+    def __init__(self, maxlen: int = 1000):
+        self.calls = deque(maxlen=maxlen)
+        self.totals = {"calls": 0, "success": 0, "not_found": 0, "error": 0, "rejected": 0, "retries": 0}
+        self._lock = threading.Lock()
+
+    def record(self, query: str, outcome: str, seconds: float, attempts: int = 1, status: int = None):
+        with self._lock:
+            self.calls.append({
+                "query": query, "outcome": outcome, "seconds": round(seconds, 6),
+                "attempts": attempts, "status": status,
+            })
+            self.totals["calls"] += 1
+            self.totals[outcome] += 1
+            self.totals["retries"] += max(0, attempts - 1)
+
+    def summary(self, recent: int = 10) -> dict:
+        with self._lock:
+            calls = list(self.calls)
+            totals = dict(self.totals)
+        # 차단(rejected)된 호출은 네트워크를 타지 않으므로 지연 통계에서 제외
+        latencies = sorted(call["seconds"] for call in calls if call["outcome"] != "rejected")
+
+        def percentile(q: float):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            **totals,
+            "latency_seconds": {
+                "p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99),
+                "max": latencies[-1] if latencies else None,
+                "mean": round(sum(latencies) / len(latencies), 6) if latencies else None,
+            },
+            "recent": calls[-recent:],
+        }
+
+
+# 프로세스 전체에서 공유하는 차단기 / 호출 지표 (요청마다 만드는 클라이언트가 함께 씀)
+_BREAKER = CircuitBreaker()
+_METRICS = LatencyMetrics()
+
+
+def geocode_metrics(recent: int = 10) -> dict:
+    """호출 지연 통계와 차단기 상태"""
+    return {
+        **_METRICS.summary(recent),
+        "circuit": {"state": _BREAKER.state, "consecutive_failures": _BREAKER.failures},
+    }
+
+
+class AsyncKakaoGeocoder:
+    """
+    카카오 키워드 검색 API 비동기 클라이언트
+
+    - httpx.AsyncClient 하나로 연결을 재사용 (최대 concurrency 개 연결 풀)
+    - 동시 요청 수(concurrency)와 초당 요청 수(rate_per_sec)를 제한
+    - 429/5xx/네트워크 오류는 지수 백오프(+지터)로 max_retries 번까지 재시도,
+      429 의 Retry-After 헤더가 있으면 그 시간만큼 대기
+    - 401/403 등 나머지 오류는 재시도하지 않음
+    - 연속 실패가 쌓이면 차단기(breaker)가 잠시 호출을 막고, 호출별 소요 시간은 metrics 에 기록
+      (기본값은 프로세스 공유 차단기 / 지표라 /seoul/geocode/metrics 에서 조회됨)
+
+    검색 결과 없음: [], 실패(차단 포함): None.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = None, concurrency: int = 8,
+                 rate_per_sec: float = 10.0, max_retries: int = None, backoff: float = 0.5,
+                 timeout: float = None, transport: httpx.AsyncBaseTransport = None,
+                 breaker: CircuitBreaker = None, metrics: LatencyMetrics = None):
+        if api_key is None or base_url is None or max_retries is None or timeout is None:
+            kakao_map = KakaoMapSingleton()
+            api_key = api_key or kakao_map._api_key
+            base_url = base_url or kakao_map._base_url
+            max_retries = kakao_map._max_retries if max_retries is None else max_retries
+            timeout = kakao_map._read_timeout if timeout is None else timeout
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = max(1, concurrency)
+        self.rate_per_sec = rate_per_sec
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.transport = transport  # 테스트에서 가짜 서버 앱을 직접 연결할 때 사용
+        self.breaker = breaker or _BREAKER
+        self.metrics = metrics or _METRICS
+
+    def _retry_delay(self, attempt: int, response: httpx.Response = None) -> float:
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return float(response.headers['Retry-After'])
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    async def _geocode_one(self, client: httpx.AsyncClient, limiter: _RateLimiter,
+                           semaphore: asyncio.Semaphore, query: str):
+        async with semaphore:
+            if not self.breaker.allow():
+                logger.warning(f"카카오맵 API 호출 차단 중 (circuit {self.breaker.state}): {query}")
+                self.metrics.record(query, "rejected", 0.0, attempts=0)
+                return None
+
+            # 소요 시간은 첫 요청을 보낸 시점부터 (초당 요청 수 제한으로 기다린 시간 제외)
+            started, outcome, attempts, status = None, "error", 0, None
+            try:
+                for attempt in range(self.max_retries + 1):
+                    await limiter.wait()
+                    started = started or time.perf_counter()
+                    attempts += 1
+                    response = None
+                    try:
+                        response = await client.get("/search/keyword.json", params={'query': query})
+                        status = response.status_code
+                        if status == 200:
+                            documents = response.json().get('documents') or []
+                            self.breaker.record_success()
+                            outcome = "success" if documents else "not_found"
+                            return [format_document(documents[0])] if documents else []
+                        if status not in RETRY_STATUS:
+                            # 4xx 는 요청/키 문제라 서버 장애로 보지 않음 (차단기 실패 횟수에 넣지 않음)
+                            if status >= 500:
+                                self.breaker.record_failure()
+                            logger.error(f"카카오맵 API HTTP 오류 ({status}): {query} - {response.text[:200]}")
+                            return None
+                        reason = f"HTTP {status}"
+                    except httpx.TransportError as e:
+                        reason = f"{type(e).__name__}: {e}"
+
+                    if attempt == self.max_retries:
+                        self.breaker.record_failure()
+                        logger.error(f"카카오맵 API 호출 실패 ({reason}), 재시도 {self.max_retries}회 초과: {query}")
+                        return None
+                    delay = self._retry_delay(attempt, response)
+                    logger.warning(f"카카오맵 API 재시도 {attempt + 1}/{self.max_retries} ({reason}), {delay:.2f}초 후: {query}")
+                    await asyncio.sleep(delay)
+            finally:
+                # half_open 시험 호출이 어떤 결과로 끝나도 (4xx, 예외 포함) 다음 시험 호출을 막지 않도록 해제
+                self.breaker.release()
+                self.metrics.record(query, outcome, time.perf_counter() - (started or time.perf_counter()),
+                                    attempts, status)
+
+    async def geocode_many(self, queries: list) -> dict:
+        """검색어 목록을 동시에 조회해서 {검색어: 결과} 반환 (중복 검색어는 한 번만 호출)"""
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return {}
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        limiter = _RateLimiter(self.rate_per_sec)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={'Authorization': f'KakaoAK {self.api_key}'},
+            timeout=self.timeout,
+            limits=limits,
+            transport=self.transport,
+        ) as client:
+            results = await asyncio.gather(
+                *(self._geocode_one(client, limiter, semaphore, query) for query in queries)
+            )
+        return dict(zip(queries, results))
+
+
+def run_sync(coro):
+    """이벤트 루프 안(FastAPI async 엔드포인트)에서도 동기 코드처럼 코루틴 실행"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def geocode_all(queries: list, cache: GeocodeCache = None, geocoder: AsyncKakaoGeocoder = None):
+    """
+    캐시를 먼저 보고, 없는 검색어만 비동기로 일괄 조회한 뒤 캐시에 저장
+
+    캐시로 모두 해결되면 API 키 없이도 동작한다.
+
+    Returns:
+        ({검색어: 결과 리스트 (없거나 실패하면 [])}, 통계 dict)
+    """
+    cache = cache or GeocodeCache()
+    unique = list(dict.fromkeys(queries))
+    started = time.perf_counter()
+
+    results = cache.get_many(unique)
+    misses = [query for query in unique if query not in results]
+    fetched = {}
+    if misses:
+        logger.info(f"🌐 지오코딩 캐시 미스 {len(misses)}건 비동기 조회 시작")
+        fetched = run_sync((geocoder or AsyncKakaoGeocoder()).geocode_many(misses))
+        cache.put_many(fetched)
+        results.update({query: result or [] for query, result in fetched.items()})
+
+    stats = {
+        "requested": len(unique),
+        "cache_hits": len(unique) - len(misses),
+        "fetched": sum(1 for result in fetched.values() if result),
+        "not_found": sum(1 for result in fetched.values() if result == []),
+        "failed": sum(1 for result in fetched.values() if result is None),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    logger.info(f"📍 지오코딩 완료: {stats}")
+    return results, stats
@@ -1,21 +1,81 @@
 # 카카오 맵 호출하는 메소드
 
-import requests
 import os
 import logging
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# 카카오맵 API 기본 URL (로컬 가짜 서버로 테스트할 때는 KAKAO_BASE_URL 로 변경)
+DEFAULT_BASE_URL = "https://dapi.kakao.com/v2/local"
+
+# 재시도할 응답 코드 (요청 한도 초과, 일시적인 서버 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def format_document(doc: dict) -> dict:
+    """카카오 키워드 검색 결과 문서 하나를 Google Maps API 와 호환되는 형식으로 변환"""
+    # 키워드 검색은 address_name 또는 road_address_name을 직접 제공
+    formatted_address = doc.get('address_name', '') or doc.get('road_address_name', '')
+
+    # address 객체에서 지역 정보 추출
+    address_info = doc.get('address', {})
+    if not address_info:
+        # road_address에서 시도
+        address_info = doc.get('road_address', {})
+
+    return {
+        'formatted_address': formatted_address,
+        'geometry': {
+            'location': {
+                'lat': float(doc.get('y', 0)),
+                'lng': float(doc.get('x', 0))
+            }
+        },
+        'address_components': [
+            {
+                'long_name': address_info.get('region_1depth_name', ''),
+                'short_name': address_info.get('region_1depth_name', ''),
+                'types': ['administrative_area_level_1']
+            },
+            {
+                'long_name': address_info.get('region_2depth_name', ''),
+                'short_name': address_info.get('region_2depth_name', ''),
+                'types': ['administrative_area_level_2']
+            },
+            {
+                'long_name': address_info.get('region_3depth_name', ''),
+                'short_name': address_info.get('region_3depth_name', ''),
+                'types': ['locality']
+            }
+        ]
+    }
+
+
 class KakaoMapSingleton:
+    """
+    카카오맵 API 설정 싱글턴 (API 키, 기본 URL, 타임아웃, 재시도 횟수)
+
+    실제 호출은 kakao_geocoder.AsyncKakaoGeocoder 한 곳에서 처리한다
+    (연결 재사용, 재시도, 차단기, 호출 지표). geocode 는 그 클라이언트로 한 건을 조회한다.
+
+    환경변수: KAKAO_BASE_URL, KAKAO_TIMEOUT(읽기 초), KAKAO_MAX_RETRIES
+    """
     _instance = None  # 싱글턴 인스턴스를 저장할 클래스 변수
+    _lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:  # 인스턴스가 없으면 생성
-            cls._instance = super(KakaoMapSingleton, cls).__new__(cls)
-            cls._instance._api_key = cls._instance._retrieve_api_key()  # API 키 가져오기
-            cls._instance._base_url = "https://dapi.kakao.com/v2/local"  # 카카오맵 API 기본 URL
+        if cls._instance is None:  # 인스턴스가 없으면 생성 (동시 요청에서도 한 번만)
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(KakaoMapSingleton, cls).__new__(cls)
+                    instance._api_key = instance._retrieve_api_key()  # API 키 가져오기
+                    instance._base_url = os.getenv('KAKAO_BASE_URL', DEFAULT_BASE_URL).rstrip('/')  # 카카오맵 API 기본 URL
+                    instance._read_timeout = float(os.getenv('KAKAO_TIMEOUT', '5'))
+                    instance._max_retries = int(os.getenv('KAKAO_MAX_RETRIES', '3'))
+                    cls._instance = instance
         return cls._instance  # 기존 인스턴스 반환
 
     def _retrieve_api_key(self):
@@ -72,77 +132,8 @@ class KakaoMapSingleton:
             language: 언어 설정 (기본값: 'ko')
         
         Returns:
-            Google Maps API와 호환되는 형식의 결과 리스트
+            Google Maps API와 호환되는 형식의 결과 리스트 (없거나 실패하면 [])
         """
-        # 키워드 검색 API 사용 (장소명 검색에 더 적합)
-        url = f"{self._base_url}/search/keyword.json"
-        headers = {'Authorization': f'KakaoAK {self._api_key}'}
-        params = {'query': address}
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            
-            # 403 오류인 경우 상세 정보 로깅
-            if response.status_code == 403:
-                logger.error(f"카카오맵 API 403 오류 - 응답: {response.text}")
-                logger.error(f"사용된 API 키 (처음 10자): {self._api_key[:10]}...")
-            
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            if result.get('documents') and len(result['documents']) > 0:
-                doc = result['documents'][0]
-                
-                # 키워드 검색 API 응답 형식에 맞게 파싱
-                # 키워드 검색은 address_name 또는 road_address_name을 직접 제공
-                formatted_address = doc.get('address_name', '') or doc.get('road_address_name', '')
-                
-                # address 객체에서 지역 정보 추출
-                address_info = doc.get('address', {})
-                if not address_info:
-                    # road_address에서 시도
-                    address_info = doc.get('road_address', {})
-                
-                # Google Maps API와 호환되는 형식으로 변환
-                formatted_result = [{
-                    'formatted_address': formatted_address,
-                    'geometry': {
-                        'location': {
-                            'lat': float(doc.get('y', 0)),
-                            'lng': float(doc.get('x', 0))
-                        }
-                    },
-                    'address_components': [
-                        {
-                            'long_name': address_info.get('region_1depth_name', ''),
-                            'short_name': address_info.get('region_1depth_name', ''),
-                            'types': ['administrative_area_level_1']
-                        },
-                        {
-                            'long_name': address_info.get('region_2depth_name', ''),
-                            'short_name': address_info.get('region_2depth_name', ''),
-                            'types': ['administrative_area_level_2']
-                        },
-                        {
-                            'long_name': address_info.get('region_3depth_name', ''),
-                            'short_name': address_info.get('region_3depth_name', ''),
-                            'types': ['locality']
-                        }
-                    ]
-                }]
-                
-                return formatted_result
-            else:
-                return []
-                
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                logger.error(f"카카오맵 API 인증 오류 (403 Forbidden): API 키를 확인해주세요. URL: {url}")
-            else:
-                logger.error(f"카카오맵 API HTTP 오류 ({e.response.status_code}): {str(e)}")
-            return []
-        except requests.exceptions.RequestException as e:
-            logger.error(f"카카오맵 API 호출 오류: {str(e)}")
-            return []
-
+        # kakao_geocoder 가 이 모듈을 import 하므로 호출할 때 로드
+        from app.seoul_crime.kakao_geocoder import AsyncKakaoGeocoder, run_sync
+        return run_sync(AsyncKakaoGeocoder(concurrency=1).geocode_many([address])).get(address) or []
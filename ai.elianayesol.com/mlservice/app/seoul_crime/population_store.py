@@ -0,0 +1,133 @@
+# 자치구 인구 데이터 변환 저장소 (pop.xls -> parquet)
+
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+import pandas as pd
+from app.seoul_crime.crime_rate_store import file_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAVE_DIR = str(Path(__file__).parent / 'save')
+
+# 정리된 인구 데이터 스키마 (컬럼 -> dtype)
+POPULATION_SCHEMA = {"자치구": "object", "인구": "float64"}
+
+
+class PopulationStore:
+    """
+    pop.xls 를 한 번만 파싱해서 정리된 parquet 으로 보관하는 저장소
+
+    - ingest: xlrd 로 원본 Excel 을 읽고 clean_population 으로 정리 → 스키마 검증 → save/{이름}.parquet
+      (manifest {이름}.parquet.json 에 원본 파일 버전, 행 수, 내용 해시 기록)
+    - load: 원본 버전이 manifest 와 같으면 parquet 만 읽고, 프로세스 안에서는 메모리에 보관한 프레임을 그대로 씀
+      (원본이 바뀌었거나 parquet 이 없거나 스키마가 다르면 다시 변환)
+    - 반환한 프레임은 여러 요청이 공유하므로 호출자는 값을 수정하지 않는다
+
+    method 는 xlsx_to_df / clean_population 을 제공하는 SeoulMethod.
+    """
+    _lock = threading.Lock()
+    _cache = {}  # parquet 경로 -> (원본 버전, 프레임)
+
+    def __init__(self, source: str, method, save_dir: str = None):
+        self.source = source
+        self.method = method
+        name = Path(source).stem
+        self.path = os.path.join(save_dir or DEFAULT_SAVE_DIR, f"{name}.parquet")
+        self.manifest_path = f"{self.path}.json"
+
+    def version(self) -> tuple:
+        """원본 Excel 파일 버전 (수정 시각, 크기)"""
+        return file_version(self.source)
+
+    def manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # -----------------------------
+    # 검증 / 변환
+    # -----------------------------
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        정리된 인구 데이터 검증 후 스키마 dtype 으로 변환
+
+        Raises:
+            ValueError: 컬럼 불일치, 결측, 인구가 0 이하, 자치구 중복
+        """
+        if list(df.columns) != list(POPULATION_SCHEMA):
+            raise ValueError(f"인구 데이터 컬럼이 {list(POPULATION_SCHEMA)} 이어야 합니다. 현재 컬럼: {df.columns.tolist()}")
+        if df.empty:
+            raise ValueError("인구 데이터가 비어 있습니다.")
+        nulls = df.isnull().sum()
+        if nulls.any():
+            raise ValueError(f"결측값이 있습니다: {nulls[nulls > 0].to_dict()}")
+        df = df.astype(POPULATION_SCHEMA).reset_index(drop=True)
+        if (df["인구"] <= 0).any():
+            raise ValueError(f"인구가 0 이하인 자치구가 있습니다: {df.loc[df['인구'] <= 0, '자치구'].tolist()}")
+        duplicated = df["자치구"].duplicated()
+        if duplicated.any():
+            raise ValueError(f"중복된 자치구가 있습니다: {df.loc[duplicated, '자치구'].tolist()}")
+        return df
+
+    def ingest(self) -> dict:
+        """원본 Excel 을 정리/검증해서 parquet 으로 저장하고 manifest 반환"""
+        version = self.version()
+        df = self.validate(self.method.clean_population(self.method.xlsx_to_df(self.source)))
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, self.path)
+
+        manifest = {
+            "source": os.path.basename(self.source),
+            "source_version": list(version),
+            "rows": int(len(df)),
+            "sha1": hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest(),
+            "converted_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_path = f"{self.manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        logger.info(f"📦 인구 데이터 변환: {self.source} → {self.path} ({len(df)}행)")
+        return manifest
+
+    # -----------------------------
+    # 읽기
+    # -----------------------------
+    def _read_converted(self, version: tuple):
+        """manifest 의 원본 버전이 같고 스키마가 맞으면 parquet 프레임, 아니면 None"""
+        if tuple(self.manifest().get("source_version", ())) != version or not os.path.exists(self.path):
+            return None
+        try:
+            return self.validate(pd.read_parquet(self.path, engine="pyarrow"))
+        except Exception as e:  # 깨진 파일이나 스키마가 다른 파일은 다시 변환
+            logger.warning(f"⚠️ 변환된 인구 데이터를 쓸 수 없어 다시 변환합니다 ({self.path}): {e}")
+            return None
+
+    def load(self) -> pd.DataFrame:
+        """정리된 인구 데이터 (자치구, 인구)"""
+        version = self.version()
+        with self._lock:
+            cached = self._cache.get(self.path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            df = self._read_converted(version)
+            if df is None:
+                self.ingest()
+                df = self._read_converted(version)
+            self._cache[self.path] = (version, df)
+            return df
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._cache.clear()
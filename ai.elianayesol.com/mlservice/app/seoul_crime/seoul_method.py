@@ -1,21 +1,61 @@
 import pandas as pd
 from pandas import DataFrame
 from app.seoul_crime.seoul_data import SeoulData   
+from app.seoul_crime.population_store import PopulationStore
 import logging
+import io
 import os
 import json
 import folium
 import matplotlib
 matplotlib.use('Agg')  # GUI 백엔드 없이 사용
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
 from sklearn.preprocessing import MinMaxScaler
+from app.common.errors import InvalidRequestError
 
 # Logger 설정
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _douglas_peucker(points: list, tolerance: float) -> list:
+    """Douglas-Peucker 선 단순화 (양 끝점은 항상 유지)"""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        (x1, y1), (x2, y2) = points[start][:2], points[end][:2]
+        dx, dy = x2 - x1, y2 - y1
+        norm = (dx * dx + dy * dy) ** 0.5
+        farthest, max_dist = None, tolerance
+        for i in range(start + 1, end):
+            px, py = points[i][:2]
+            if norm:
+                dist = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / norm
+            else:
+                dist = ((px - x1) ** 2 + (py - y1) ** 2) ** 0.5
+            if dist > max_dist:
+                farthest, max_dist = i, dist
+        if farthest is not None:
+            keep[farthest] = True
+            stack.extend([(start, farthest), (farthest, end)])
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _simplify_ring(ring: list, tolerance: float, precision: int) -> list:
+    """폴리곤 링 단순화 (닫힌 링 유지, 점이 너무 적어지면 원본 유지)"""
+    simplified = _douglas_peucker(ring, tolerance)
+    if len(simplified) < 4:
+        simplified = ring
+    return [[round(x, precision), round(y, precision)] for x, y, *_ in simplified]
+
+
 class SeoulMethod(object):
 
     def __init__(self):
@@ -183,11 +223,321 @@ class SeoulMethod(object):
         
         return df_pop
 
+    # -----------------------------
+    # 전처리 단계 (SeoulService.preprocess 파이프라인)
+    # -----------------------------
+    def load_cctv(self, path: str) -> pd.DataFrame:
+        """CCTV 데이터 로드 후 좌로부터 1, 2번째 컬럼만 유지"""
+        df_cctv = self.csv_to_df(path)
+        logger.info("\n🧹 CCTV 데이터 컬럼 정리")
+        logger.info(f"  원본 컬럼: {df_cctv.columns.tolist()}")
+        if len(df_cctv.columns) >= 2:
+            cols_to_keep = [df_cctv.columns[0], df_cctv.columns[1]]
+            df_cctv = df_cctv[cols_to_keep]
+            logger.info(f"  유지된 컬럼: {cols_to_keep}")
+        else:
+            logger.warning("  컬럼이 2개 미만입니다.")
+        return df_cctv
+
+    def clean_population(self, df_pop: pd.DataFrame) -> pd.DataFrame:
+        """'자치구' 컬럼을 찾아 이름을 맞춘 뒤 인구 데이터 정리"""
+        logger.info(f"\n📋 인구 데이터 컬럼: {', '.join(df_pop.columns.tolist())}")
+        if '자치구' not in df_pop.columns:
+            # '자치구_자치구' 컬럼이 있으면 '자치구'로 rename
+            if '자치구_자치구' in df_pop.columns:
+                df_pop = df_pop.rename(columns={'자치구_자치구': '자치구'})
+                logger.info(f"  '자치구_자치구' → '자치구'로 변경")
+            elif len(df_pop.columns) > 0:
+                # 첫 번째 컬럼을 '자치구'로 rename
+                first_col = df_pop.columns[0]
+                if '기간' not in str(first_col) and '합계' not in str(first_col):
+                    df_pop = df_pop.rename(columns={first_col: '자치구'})
+                    logger.info(f"  '{first_col}' → '자치구'로 변경")
+
+        if '자치구' not in df_pop.columns:
+            raise ValueError(f"'자치구' 컬럼을 찾을 수 없습니다. 사용 가능한 컬럼: {df_pop.columns.tolist()}")
+        return self._clean_population_data(df_pop)
+
+    def load_population(self, pop_path: str) -> pd.DataFrame:
+        """
+        정리된 인구 데이터 (자치구, 인구)
+
+        pop.xls 는 처음 한 번만 파싱해서 save/pop.parquet 으로 변환해 두고,
+        이후에는 parquet (프로세스 안에서는 메모리) 에서 읽는다.
+        """
+        return PopulationStore(pop_path, self).load()
+
+    def merge_cctv_pop(self, df_cctv: pd.DataFrame, df_pop: pd.DataFrame) -> pd.DataFrame:
+        """CCTV 기관명 ↔ 인구 자치구 머지"""
+        return self.df_merge(df_cctv, df_pop, left_on='기관명', right_on='자치구', how='inner')
+
+    def station_names(self, df_crime: pd.DataFrame) -> list:
+        """관서명('중부서') -> 카카오맵 검색어('서울중부경찰서')"""
+        return ['서울' + str(name[:-1]) + '경찰서' for name in df_crime['관서명']]
+
+    def enrich_crime(self, df_crime: pd.DataFrame, station_names: list, geocoded: dict,
+                     districts=None) -> pd.DataFrame:
+        """
+        경찰서 자치구를 crime 데이터 맨 앞에 추가하고 관서명을 검색어 형식으로 변경
+
+        districts(DistrictIndex) 가 있으면 지오코딩 좌표를 자치구 경계에 공간 배정하고,
+        경계 밖이거나 좌표가 없는 관서만 주소 문자열의 'ㅇㅇ구' 로 채운다.
+        """
+        station_addrs, station_lats, station_lngs = [], [], []
+        for name in station_names:
+            tmp = geocoded.get(name)
+            if tmp:
+                location = tmp[0].get("geometry")['location']
+                station_addrs.append(tmp[0].get("formatted_address"))
+                station_lats.append(location['lat'])
+                station_lngs.append(location['lng'])
+            else:
+                logger.warning(f"⚠️ {name}의 주소를 찾을 수 없습니다.")
+                station_addrs.append("")
+                station_lats.append(0.0)
+                station_lngs.append(0.0)
+
+        # 경찰서별 상세 정보 테이블 형태로 출력
+        location_df = pd.DataFrame({
+            '경찰서명': station_names,
+            '주소': station_addrs,
+            '위도(Lat)': station_lats,
+            '경도(Lng)': station_lngs
+        })
+        logger.info("\n📍 경찰서 위치 정보 상세")
+        logger.info(f"\n{location_df.to_string(index=False)}")
+
+        addr_gu_names = []
+        for addr in station_addrs:
+            tmp_gu = [gu for gu in addr.split() if gu[-1] == '구'] if addr else []
+            if addr and not tmp_gu and districts is None:
+                logger.warning(f"⚠️ 주소에서 자치구를 찾을 수 없습니다: {addr}")
+            addr_gu_names.append(tmp_gu[0] if tmp_gu else "")
+
+        if districts is None:
+            gu_names = addr_gu_names
+        else:
+            # 좌표가 없는 관서(0, 0)는 경계 밖이 되어 주소로 채워짐
+            spatial = districts.assign(station_lats, station_lngs)
+            gu_names = []
+            for name, spatial_gu, addr_gu in zip(station_names, spatial, addr_gu_names):
+                if not spatial_gu:
+                    if not addr_gu:
+                        logger.warning(f"⚠️ {name}의 자치구를 좌표와 주소 모두에서 찾을 수 없습니다.")
+                    gu_names.append(addr_gu)
+                    continue
+                if addr_gu and addr_gu != spatial_gu:
+                    logger.info(f"  {name}: 주소는 {addr_gu}, 좌표는 {spatial_gu} → 좌표 기준으로 배정")
+                gu_names.append(spatial_gu)
+            logger.info(f"📍 자치구 공간 배정: {sum(1 for gu in spatial if gu)}/{len(station_names)}개 관서")
+
+        df_crime = df_crime.copy()
+        # crime 데이터프레임에 '자치구' 컬럼을 제일 앞에 추가
+        df_crime.insert(0, '자치구', gu_names)
+        # 관서명을 '서울ㅇㅇ경찰서' 형식으로 변경
+        df_crime['관서명'] = station_names
+        return df_crime
+
+    # -----------------------------
+    # CCTV 배치
+    # -----------------------------
+    # 가중치 종류 -> 설명
+    CCTV_WEIGHTS = {
+        'count': '범죄 발생 건수 (많이 일어나는 곳 우선)',
+        'rate': '인구 10만명당 범죄 발생률 (주민 1인당 위험이 큰 곳 우선)',
+    }
+
+    def cctv_allocation_inputs(self, df_cctv_pop: pd.DataFrame, crime_tables: dict, areas: dict,
+                               weight: str = 'count') -> pd.DataFrame:
+        """
+        CCTV 배치 최적화 입력 (자치구, 기존CCTV, 가중치, 면적_m2, 인구)
+
+        Args:
+            df_cctv_pop: merge_cctv_pop 결과 (자치구, 소계, 인구)
+            crime_tables: 발생 범죄율 표 {"counts", "rate", "norm"}
+            areas: 자치구 -> 면적 (제곱미터)
+            weight: CCTV_WEIGHTS 중 하나
+        """
+        if weight not in self.CCTV_WEIGHTS:
+            raise InvalidRequestError(f"weight 는 {list(self.CCTV_WEIGHTS)} 중 하나여야 합니다. 현재 값: {weight}")
+        if weight == 'count':
+            weights = crime_tables["counts"].sum(axis=1)
+        else:
+            weights = crime_tables["rate"]['범죄']
+        df = df_cctv_pop[['자치구', '소계', '인구']].rename(columns={'소계': '기존CCTV'})
+        df = df.merge(weights.rename('가중치').reset_index(), on='자치구', how='inner')
+        df['면적_m2'] = df['자치구'].map(areas)
+        missing_area = df.loc[df['면적_m2'].isnull(), '자치구'].tolist()
+        if missing_area:
+            logger.warning(f"  ⚠️ 경계 데이터에 없는 자치구는 CCTV 배치에서 제외: {missing_area}")
+            df = df.dropna(subset=['면적_m2'])
+        return df.reset_index(drop=True)
+
+    # -----------------------------
+    # 히트맵
+    # -----------------------------
+    # crime_type -> (범죄 컬럼, 제목 앞부분, 컬러바 레이블, 기본 컬러맵, 기존 저장 파일명)
+    HEATMAP_SPECS = {
+        '발생': (['살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생'],
+               "서울시 범죄 발생률 정규화 히트맵 (인구수 대비", '정규화된 범죄 발생률 (인구수 대비)',
+               "Reds", 'heatmap.png'),
+        '검거': (['살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거'],
+               "서울시 범죄 검거률 정규화 히트맵 (인구수 대비", '정규화된 범죄 검거률 (인구수 대비)',
+               "Blues", 'heatmap_arrest.png'),
+    }
+
+    # 크기 프리셋 -> (figsize, dpi, 이미지 형식)
+    HEATMAP_SIZES = {
+        'thumbnail': ((7, 5), 72, 'png'),
+        'web': ((14, 10), 100, 'png'),
+        'print': ((14, 10), 300, 'png'),
+        'svg': ((14, 10), 100, 'svg'),
+    }
+
+    def _heatmap_spec(self, crime_type: str) -> tuple:
+        if crime_type not in self.HEATMAP_SPECS:
+            raise InvalidRequestError(f"crime_type은 '발생' 또는 '검거'여야 합니다. 현재 값: {crime_type}")
+        return self.HEATMAP_SPECS[crime_type]
+
+    def heatmap_variant(self, crime_type: str = '발생', style: str = None, size: str = 'print') -> dict:
+        """
+        스타일(컬러맵)과 크기 프리셋을 렌더링 옵션으로 변환
+
+        Returns:
+            render_heatmap 에 넘길 {"crime_type", "cmap", "dpi", "figsize", "fmt"}
+        """
+        default_cmap = self._heatmap_spec(crime_type)[3]
+        if size not in self.HEATMAP_SIZES:
+            raise InvalidRequestError(f"size는 {list(self.HEATMAP_SIZES)} 중 하나여야 합니다. 현재 값: {size}")
+        cmap = style or default_cmap
+        if cmap not in matplotlib.colormaps:
+            raise InvalidRequestError(f"알 수 없는 컬러맵입니다: {cmap}")
+        figsize, dpi, fmt = self.HEATMAP_SIZES[size]
+        return {"crime_type": crime_type, "cmap": cmap, "dpi": dpi, "figsize": figsize, "fmt": fmt}
+
+    def read_crime_counts(self, crime_csv_path: str) -> pd.DataFrame:
+        """자치구가 추가된 범죄 CSV 읽기 (발생/검거 건수 컬럼의 쉼표 제거 후 숫자 변환)"""
+        logger.info(f"\n📂 CSV 파일 읽기: {crime_csv_path}")
+        if not os.path.exists(crime_csv_path):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {crime_csv_path}")
+        df = pd.read_csv(crime_csv_path, encoding='utf-8-sig')
+        for crime_cols, *_ in self.HEATMAP_SPECS.values():
+            for col in crime_cols:
+                if col in df.columns:
+                    df[col] = df[col].astype(str).str.replace(',', '').astype(float)
+        return df
+
+    def compute_crime_rates(self, df_crime: pd.DataFrame, df_pop: pd.DataFrame,
+                            crime_type: str = '발생') -> dict:
+        """
+        자치구별 범죄 건수 / 인구 10만명당 비율 / 정규화 비율 표 계산 (렌더링 없음)
+
+        자치구별 합산 → 인구 10만명당 비율 → '범죄' 합계 컬럼 → MinMax 정규화 → 범죄 기준 내림차순 정렬
+
+        Args:
+            df_crime: read_crime_counts 결과
+            df_pop: clean_population 결과 (자치구, 인구)
+
+        Returns:
+            {"counts": 자치구별 합산 건수, "rate": 10만명당 비율, "norm": 정규화 비율}
+            (rate / norm 은 인덱스: 자치구, 컬럼: 범죄 유형 + '범죄', 정규화된 범죄 기준 내림차순)
+        """
+        crime_cols = self._heatmap_spec(crime_type)[0]
+        required_cols = ['자치구'] + crime_cols
+
+        # 필수 컬럼이 모두 있는지 확인
+        missing_cols = [col for col in required_cols if col not in df_crime.columns]
+        if missing_cols:
+            raise ValueError(f"필수 컬럼이 없습니다: {missing_cols}")
+
+        # 동일 자치구에 여러 관서가 있는 경우 건수 합산
+        df_grouped = df_crime[required_cols].groupby('자치구')[crime_cols].sum()
+
+        # 범죄 데이터와 인구 데이터 머지
+        df_merged = df_grouped.reset_index().merge(df_pop, on='자치구', how='inner').set_index('자치구')
+
+        # 인구수 대비 비율 계산 (인구 10만명당) + 총 범죄 비율 컬럼 (폭력 다음)
+        df_rate = df_merged[crime_cols].div(df_merged['인구'], axis=0) * 100000
+        df_rate['범죄'] = df_rate.sum(axis=1)
+        df_rate = df_rate[crime_cols + ['범죄']]
+
+        # MinMax 정규화 (0~1) 후 정규화된 총 범죄 비율 기준 내림차순 정렬
+        scaler = MinMaxScaler()
+        df_norm = pd.DataFrame(
+            scaler.fit_transform(df_rate),
+            columns=df_rate.columns,
+            index=df_rate.index
+        ).sort_values(by='범죄', ascending=False)
+
+        logger.info(f"  ✅ {crime_type} 범죄율 표 계산 완료: {df_norm.shape}")
+        return {"counts": df_grouped, "rate": df_rate.loc[df_norm.index], "norm": df_norm}
+
+    def crime_rate_tables(self, crime_csv_path: str, pop_path: str,
+                          df_pop_cleaned: pd.DataFrame = None,
+                          crime_type: str = '발생') -> dict:
+        """파일 경로로 범죄율 표 계산 (인구 데이터는 있으면 재사용, 없으면 pop_path 에서 로드)"""
+        self._heatmap_spec(crime_type)
+        df_crime = self.read_crime_counts(crime_csv_path)
+        if df_pop_cleaned is None:
+            df_pop_cleaned = self.load_population(pop_path)
+        return self.compute_crime_rates(df_crime, df_pop_cleaned, crime_type)
+
+    def heatmap_matrix(self, crime_csv_path: str, pop_path: str,
+                       df_pop_cleaned: pd.DataFrame = None,
+                       crime_type: str = '발생') -> tuple:
+        """히트맵에 그릴 (정규화 행렬, 자치구별 합산 건수)"""
+        tables = self.crime_rate_tables(crime_csv_path, pop_path, df_pop_cleaned, crime_type)
+        return tables["norm"], tables["counts"]
+
+    def heatmap_summary(self, df_norm: pd.DataFrame, df_grouped: pd.DataFrame) -> dict:
+        """히트맵 데이터 요약 (응답용)"""
+        return {
+            "total_districts": len(df_grouped),
+            "crime_types": df_grouped.columns.tolist(),
+            "normalized_data_preview": df_norm.head(5).to_dict(orient='index')
+        }
+
+    def render_heatmap(self, df_norm: pd.DataFrame, crime_type: str = '발생', cmap: str = None,
+                       dpi: int = 300, figsize: tuple = (14, 10), fmt: str = 'png') -> bytes:
+        """
+        정규화 행렬을 히트맵 이미지 바이트로 렌더링
+
+        pyplot 전역 상태를 쓰지 않고 Figure 를 직접 만들어서 여러 스레드에서 동시에 호출해도 안전하다.
+        한글 폰트는 호출 전에 setup_korean_font() 로 설정되어 있어야 한다.
+
+        Args:
+            cmap: 컬러맵 (기본값: 발생은 Reds, 검거는 Blues)
+        """
+        _, title_prefix, cbar_label, default_cmap, _ = self._heatmap_spec(crime_type)
+
+        # X축 레이블 (범죄 유형만 표시, '살인 발생' -> '살인', '살인 검거' -> '살인')
+        x_labels = [col.replace(' 발생', '').replace(' 검거', '') for col in df_norm.columns]
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        sns.heatmap(df_norm, annot=True, fmt=".6f", cmap=cmap or default_cmap,
+                    xticklabels=x_labels, yticklabels=True,
+                    cbar_kws={'label': cbar_label}, ax=ax)
+        ax.set_title(f"{title_prefix})", fontsize=18, pad=20, fontweight='bold')
+        ax.set_xlabel('범죄 유형', fontsize=14, fontweight='bold')
+        ax.set_ylabel('자치구', fontsize=14, fontweight='bold')
+        ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right', fontsize=11)
+        ax.set_yticklabels(ax.get_yticklabels(), rotation=0, fontsize=11)
+        fig.tight_layout()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight', facecolor='white')
+        return buffer.getvalue()
+
     def generate_heatmap(self, crime_csv_path: str, pop_path: str, save_dir: str, 
                          df_pop_cleaned: pd.DataFrame = None,
                          crime_type: str = '발생') -> dict:
         """
         서울 범죄 데이터 히트맵 생성 (전체 프로세스 포함)
+
+        heatmap_matrix 로 행렬을 계산하고 render_heatmap 으로 그려서 save_dir 에 저장한다.
+        API 는 렌더링 결과를 캐시하는 SeoulService.heatmap 을 사용한다.
         
         Args:
             crime_csv_path: 범죄 데이터 CSV 파일 경로
@@ -200,208 +550,21 @@ class SeoulMethod(object):
             생성된 히트맵 파일 경로와 데이터 요약 정보를 포함한 딕셔너리
         """
         try:
-            # crime_type 검증
-            if crime_type not in ['발생', '검거']:
-                raise ValueError(f"crime_type은 '발생' 또는 '검거'여야 합니다. 현재 값: {crime_type}")
-            
-            # crime_type에 따른 컬럼명 설정
-            if crime_type == '검거':
-                numeric_cols = ['살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거']
-                required_cols = ['자치구', '살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거']
-                crime_cols = ['살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거']
-                title_prefix = "서울시 범죄 검거률 정규화 히트맵 (인구수 대비"
-                cbar_label = '정규화된 범죄 검거률 (인구수 대비)'
-                heatmap_filename = 'heatmap_arrest.png'
-                log_prefix = "검거"
-            else:  # crime_type == '발생'
-                numeric_cols = ['살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생']
-                required_cols = ['자치구', '살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생']
-                crime_cols = ['살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생']
-                title_prefix = "서울시 범죄 발생률 정규화 히트맵 (인구수 대비"
-                cbar_label = '정규화된 범죄 발생률 (인구수 대비)'
-                heatmap_filename = 'heatmap.png'
-                log_prefix = "발생"
-            
-            # 1. CSV 파일 읽기
-            logger.info(f"\n📂 CSV 파일 읽기: {crime_csv_path}")
-            
-            if not os.path.exists(crime_csv_path):
-                raise FileNotFoundError(f"파일을 찾을 수 없습니다: {crime_csv_path}")
-            
-            # CSV 파일 읽기 (쉼표로 구분)
-            df = pd.read_csv(crime_csv_path, encoding='utf-8-sig')
-            logger.info(f"  원본 데이터 shape: {df.shape}")
-            logger.info(f"  원본 컬럼: {df.columns.tolist()}")
-            
-            # 숫자 컬럼에서 쉼표 제거 및 숫자 변환
-            for col in numeric_cols:
-                if col in df.columns:
-                    # 문자열인 경우 쉼표 제거 후 숫자 변환
-                    df[col] = df[col].astype(str).str.replace(',', '').astype(float)
-            
-            logger.info(f"\n✅ CSV 파일 읽기 완료")
-            logger.info(f"  데이터 shape: {df.shape}")
-            logger.info(f"  상위 3개:\n{df.head(3).to_string()}")
-            
-            # 2. 히트맵 생성에 필요한 컬럼만 남기기
-            logger.info(f"\n🧹 히트맵 생성에 필요한 컬럼만 선택 ({log_prefix} 데이터)")
-            
-            # 필수 컬럼이 모두 있는지 확인
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                raise ValueError(f"필수 컬럼이 없습니다: {missing_cols}")
-            
-            df_selected = df[required_cols].copy()
-            logger.info(f"  선택된 컬럼: {df_selected.columns.tolist()}")
-            logger.info(f"  데이터 shape: {df_selected.shape}")
-            
-            # 3. 동일 자치구에 여러 관서가 있는 경우 건수 합산
-            logger.info(f"\n📊 자치구별 {log_prefix} 건수 합산")
-            logger.info(f"  합산 전 행 수: {len(df_selected)}")
-            logger.info(f"  자치구별 관서 수:\n{df_selected.groupby('자치구').size()}")
-            
-            df_grouped = df_selected.groupby('자치구')[crime_cols].sum()
-            
-            logger.info(f"  합산 후 행 수: {len(df_grouped)}")
-            logger.info(f"  합산 결과 (상위 5개):\n{df_grouped.head(5).to_string()}")
-            
-            # 4. 인구 데이터 로드 및 머지
-            logger.info("\n📊 인구 데이터 로드 및 머지")
-            
-            # 이미 정리된 인구 데이터가 있으면 사용, 없으면 로드 및 정리
-            if df_pop_cleaned is not None:
-                logger.info("  ✅ 정리된 인구 데이터 재사용")
-                df_pop = df_pop_cleaned.copy()
-            else:
-                logger.info("  📂 인구 데이터 로드 및 정리")
-                df_pop = self.xlsx_to_df(pop_path)
-                
-                # 자치구 컬럼 확인 및 매핑
-                if '자치구' not in df_pop.columns:
-                    if '자치구_자치구' in df_pop.columns:
-                        df_pop = df_pop.rename(columns={'자치구_자치구': '자치구'})
-                    else:
-                        if len(df_pop.columns) > 0:
-                            first_col = df_pop.columns[0]
-                            if '기간' not in str(first_col) and '합계' not in str(first_col):
-                                df_pop = df_pop.rename(columns={first_col: '자치구'})
-                
-                # 인구 데이터 정리
-                df_pop = self._clean_population_data(df_pop)
-            
-            logger.info(f"  인구 데이터 shape: {df_pop.shape}")
-            logger.info(f"  인구 데이터 (상위 5개):\n{df_pop.head(5).to_string()}")
-            
-            # 범죄 데이터와 인구 데이터 머지
-            df_merged = df_grouped.reset_index().merge(df_pop, on='자치구', how='inner')
-            df_merged = df_merged.set_index('자치구')
-            logger.info(f"  머지 후 shape: {df_merged.shape}")
-            logger.info(f"  머지 결과 (상위 3개):\n{df_merged.head(3).to_string()}")
-            
-            # 5. 인구수 대비 비율 계산 (인구 10만명당)
-            logger.info(f"\n📊 인구수 대비 {log_prefix}률 계산 (인구 10만명당)")
-            df_rate = df_merged[crime_cols].div(df_merged['인구'], axis=0) * 100000
-            logger.info(f"  {log_prefix}률 계산 완료")
-            logger.info(f"  {log_prefix}률 결과 (상위 3개):\n{df_rate.head(3).to_string()}")
-            
-            # 6. 총 범죄 비율 컬럼 추가 (폭력 다음에 추가)
-            logger.info(f"\n➕ 총 범죄 {log_prefix}률 컬럼 추가")
-            df_rate['범죄'] = df_rate.sum(axis=1)
-            
-            # 컬럼 순서 재정렬: 살인, 강도, 강간, 절도, 폭력, 범죄 순서
-            if crime_type == '검거':
-                column_order = ['살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거', '범죄']
-            else:
-                column_order = ['살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생', '범죄']
-            
-            # 존재하는 컬럼만 재정렬
-            existing_columns = [col for col in column_order if col in df_rate.columns]
-            if len(existing_columns) != len(column_order):
-                missing = set(column_order) - set(existing_columns)
-                logger.warning(f"⚠️ 일부 컬럼이 없습니다: {missing}")
-            
-            df_rate = df_rate[existing_columns]
-            logger.info(f"  추가된 컬럼: {df_rate.columns.tolist()}")
-            logger.info(f"  총 범죄 {log_prefix}률 (상위 5개):\n{df_rate[['범죄']].head(5).to_string()}")
-            
-            # 7. 정규화(Normalization) 수행
-            logger.info(f"\n📐 MinMax 정규화 수행 ({log_prefix}률 기준, 0~1 사이로 스케일링)")
-            # 컬럼 순서 저장
-            column_order_before_norm = df_rate.columns.tolist()
-            
-            scaler = MinMaxScaler()
-            df_norm = pd.DataFrame(
-                scaler.fit_transform(df_rate),
-                columns=df_rate.columns,
-                index=df_rate.index
-            )
-            
-            # 컬럼 순서가 유지되었는지 확인
-            if df_norm.columns.tolist() != column_order_before_norm:
-                logger.warning(f"⚠️ 정규화 후 컬럼 순서가 변경되었습니다. 재정렬합니다.")
-                df_norm = df_norm[column_order_before_norm]
-            
-            logger.info(f"  정규화 완료")
-            logger.info(f"  정규화 결과 (상위 3개):\n{df_norm.head(3).to_string()}")
-            
-            # 8. 정규화된 범죄 비율(총 범죄) 기준으로 내림차순 정렬
-            logger.info(f"\n📊 정규화된 범죄 {log_prefix}률(총 범죄) 기준으로 내림차순 정렬")
-            # 검거일 때는 정규화된 검거율 기준으로 정렬
-            df_norm = df_norm.sort_values(by='범죄', ascending=False)
-            logger.info(f"  정렬 완료")
-            logger.info(f"  정렬 결과 (상위 5개):\n{df_norm[['범죄']].head(5).to_string()}")
-            
-            # 9. 히트맵 생성 (빨간색 계열-하얀색)
+            heatmap_filename = self._heatmap_spec(crime_type)[4]
+            df_norm, df_grouped = self.heatmap_matrix(crime_csv_path, pop_path, df_pop_cleaned, crime_type)
+
             logger.info("\n🎨 히트맵 생성 중...")
-            
-            # 저장 경로 설정
             os.makedirs(save_dir, exist_ok=True)
-            
-            heatmap_files = []
-            
-            # X축 레이블 생성 (범죄 유형만 표시, '발생' 또는 '검거' 제거)
-            x_labels = []
-            for col in df_norm.columns:
-                if col == '범죄':
-                    x_labels.append('범죄')
-                else:
-                    # '살인 발생' -> '살인', '살인 검거' -> '살인'
-                    label = col.replace(' 발생', '').replace(' 검거', '')
-                    x_labels.append(label)
-            
-            # 히트맵 색상 설정: 검거는 파란색, 발생은 빨간색
-            cmap_color = "Blues" if crime_type == '검거' else "Reds"
-            
-            # 히트맵 생성
-            plt.figure(figsize=(14, 10))
-            sns.heatmap(df_norm, annot=True, fmt=".6f", cmap=cmap_color, 
-                       xticklabels=x_labels, yticklabels=True,
-                       cbar_kws={'label': cbar_label})
-            plt.title(f"{title_prefix})", fontsize=18, pad=20, fontweight='bold')
-            plt.xlabel('범죄 유형', fontsize=14, fontweight='bold')
-            plt.ylabel('자치구', fontsize=14, fontweight='bold')
-            plt.xticks(rotation=45, ha='right', fontsize=11)
-            plt.yticks(rotation=0, fontsize=11)
-            plt.tight_layout()
-            
             heatmap_path = os.path.join(save_dir, heatmap_filename)
-            plt.savefig(heatmap_path, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close()
-            heatmap_files.append(heatmap_path)
+            with open(heatmap_path, 'wb') as f:
+                f.write(self.render_heatmap(df_norm, crime_type))
             logger.info(f"  ✅ 히트맵 저장: {heatmap_path}")
-            
-            logger.info("\n✅ 히트맵 생성 완료!")
-            
-            # 반환 데이터 구성
+
             return {
                 "status": "success",
                 "message": "히트맵 생성이 완료되었습니다",
-                "heatmap_files": heatmap_files,
-                "data_summary": {
-                    "total_districts": len(df_grouped),
-                    "crime_types": df_grouped.columns.tolist(),
-                    "normalized_data_preview": df_norm.head(5).to_dict(orient='index')
-                }
+                "heatmap_files": [heatmap_path],
+                "data_summary": self.heatmap_summary(df_norm, df_grouped)
             }
             
         except Exception as e:
@@ -414,80 +577,139 @@ class SeoulMethod(object):
                               df_pop_cleaned: pd.DataFrame = None,
                               crime_type: str = '발생') -> pd.DataFrame:
         """
-        범죄율 데이터 계산 (히트맵 생성 로직 재사용)
-        
-        Args:
-            crime_csv_path: 범죄 데이터 CSV 파일 경로
-            pop_path: 인구 데이터 Excel 파일 경로
-            df_pop_cleaned: 정리된 인구 데이터 (선택사항)
-            crime_type: 범죄 유형 ('발생' 또는 '검거')
+        범죄율 데이터 계산 (crime_rate_tables 의 정규화 표)
         
         Returns:
             자치구별 정규화된 범죄율 데이터프레임 (인덱스: 자치구, 컬럼: 범죄 유형)
         """
-        # crime_type에 따른 컬럼명 설정
-        if crime_type == '검거':
-            numeric_cols = ['살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거']
-            required_cols = ['자치구', '살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거']
-            crime_cols = ['살인 검거', '강도 검거', '강간 검거', '절도 검거', '폭력 검거']
-        else:  # crime_type == '발생'
-            numeric_cols = ['살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생']
-            required_cols = ['자치구', '살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생']
-            crime_cols = ['살인 발생', '강도 발생', '강간 발생', '절도 발생', '폭력 발생']
-        
-        # CSV 파일 읽기
-        df = pd.read_csv(crime_csv_path, encoding='utf-8-sig')
-        
-        # 숫자 컬럼에서 쉼표 제거 및 숫자 변환
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace(',', '').astype(float)
-        
-        # 필수 컬럼 확인
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            raise ValueError(f"필수 컬럼이 없습니다: {missing_cols}")
-        
-        df_selected = df[required_cols].copy()
-        
-        # 자치구별 합산
-        df_grouped = df_selected.groupby('자치구')[crime_cols].sum()
-        
-        # 인구 데이터 로드
-        if df_pop_cleaned is not None:
-            df_pop = df_pop_cleaned.copy()
-        else:
-            df_pop = self.xlsx_to_df(pop_path)
-            if '자치구' not in df_pop.columns:
-                if '자치구_자치구' in df_pop.columns:
-                    df_pop = df_pop.rename(columns={'자치구_자치구': '자치구'})
-                else:
-                    if len(df_pop.columns) > 0:
-                        first_col = df_pop.columns[0]
-                        if '기간' not in str(first_col) and '합계' not in str(first_col):
-                            df_pop = df_pop.rename(columns={first_col: '자치구'})
-            df_pop = self._clean_population_data(df_pop)
-        
-        # 머지
-        df_merged = df_grouped.reset_index().merge(df_pop, on='자치구', how='inner')
-        df_merged = df_merged.set_index('자치구')
-        
-        # 인구수 대비 비율 계산 (인구 10만명당)
-        df_rate = df_merged[crime_cols].div(df_merged['인구'], axis=0) * 100000
-        
-        # 총 범죄 비율 컬럼 추가
-        df_rate['범죄'] = df_rate.sum(axis=1)
-        
-        # 정규화
-        scaler = MinMaxScaler()
-        df_norm = pd.DataFrame(
-            scaler.fit_transform(df_rate),
-            columns=df_rate.columns,
-            index=df_rate.index
-        )
-        
-        return df_norm
+        return self.crime_rate_tables(crime_csv_path, pop_path, df_pop_cleaned, crime_type)["norm"]
     
+    # -----------------------------
+    # 지도
+    # -----------------------------
+    def simplify_geojson(self, geo: dict, tolerance: float = 0.0005, precision: int = 5) -> dict:
+        """
+        GeoJSON 폴리곤 경계 단순화 (folium 지도 HTML 에 그대로 들어가므로 크기를 줄임)
+
+        Args:
+            tolerance: Douglas-Peucker 허용 오차 (도 단위, 0.0005 ≈ 50m)
+            precision: 좌표 소수점 자릿수 (5자리 ≈ 1m)
+        """
+        features = []
+        for feature in geo.get('features', []):
+            geometry = feature.get('geometry') or {}
+            coordinates = geometry.get('coordinates')
+            if geometry.get('type') == 'Polygon':
+                coordinates = [_simplify_ring(ring, tolerance, precision) for ring in coordinates]
+            elif geometry.get('type') == 'MultiPolygon':
+                coordinates = [[_simplify_ring(ring, tolerance, precision) for ring in polygon]
+                               for polygon in coordinates]
+            features.append({**feature, 'geometry': {**geometry, 'coordinates': coordinates}})
+        return {**geo, 'features': features}
+
+    def build_folium_map(self, df_norm: pd.DataFrame, seoul_geo: dict, crime_type: str = '발생') -> tuple:
+        """
+        정규화 범죄율 표와 GeoJSON 으로 자치구 단계구분도(Choropleth) 생성
+
+        Returns:
+            (folium.Map, 자치구별 범죄율 데이터프레임)
+        """
+        # '범죄' 컬럼을 사용하여 지도 색상 결정
+        crime_rate_data = df_norm[['범죄']].reset_index()
+        crime_rate_data.columns = ['자치구', '범죄율']
+
+        # GeoJSON 에만 있는 자치구는 최소값으로 채워서 회색 구멍이 생기지 않게 함
+        geo_districts = [feature.get('id') for feature in seoul_geo.get('features', [])]
+        data_districts = set(crime_rate_data['자치구'])
+        missing_in_data = sorted(set(geo_districts) - data_districts)
+        missing_in_geo = sorted(data_districts - set(geo_districts))
+        if missing_in_data:
+            logger.warning(f"  ⚠️ GeoJSON에는 있지만 데이터에 없는 자치구: {missing_in_data}")
+            min_value = crime_rate_data['범죄율'].min() if len(crime_rate_data) > 0 else 0.0
+            crime_rate_data = pd.concat([
+                crime_rate_data,
+                pd.DataFrame({'자치구': missing_in_data, '범죄율': min_value})
+            ], ignore_index=True)
+        if missing_in_geo:
+            logger.warning(f"  ⚠️ 데이터에는 있지만 GeoJSON에 없는 자치구: {missing_in_geo}")
+
+        # Folium 지도 생성 (서울시청 중심 좌표)
+        m = folium.Map(location=[37.5665, 126.9780], zoom_start=11, tiles='OpenStreetMap')
+
+        # 색상 설정: 발생은 빨간색, 검거는 파란색
+        fill_color = self._heatmap_spec(crime_type)[3]
+        legend_name = "범죄 발생률 (정규화)" if crime_type == '발생' else "범죄 검거률 (정규화)"
+
+        folium.Choropleth(
+            geo_data=seoul_geo,
+            name="choropleth",
+            data=crime_rate_data,
+            columns=["자치구", "범죄율"],
+            key_on="feature.id",  # GeoJSON의 id 필드와 매칭
+            fill_color=fill_color,
+            fill_opacity=0.7,
+            line_opacity=0.2,
+            line_color='black',
+            line_weight=1,
+            legend_name=legend_name,
+            highlight=True,
+            smooth_factor=0
+        ).add_to(m)
+        folium.LayerControl().add_to(m)
+        return m, crime_rate_data
+
+    def build_incident_map(self, cells_geo: dict, district_counts: pd.DataFrame, seoul_geo: dict,
+                           grid_label: str = '격자') -> folium.Map:
+        """
+        사건 집계 지도: 자치구별 사건 수 단계구분도 + 격자 칸 레이어 (LayerControl 로 켜고 끔)
+
+        격자 칸 색은 만들 때 properties.fill 에 미리 계산해 두어 style_function 이 값만 읽게 한다.
+
+        Args:
+            cells_geo: IncidentAggregator.cells_geojson() 결과 (properties.count)
+            district_counts: 자치구, 사건수 컬럼 데이터프레임
+            grid_label: 레이어 이름 (예: 'hex 500m')
+        """
+        from branca.colormap import linear
+
+        m = folium.Map(location=[37.5665, 126.9780], zoom_start=11, tiles='OpenStreetMap')
+        folium.Choropleth(
+            geo_data=seoul_geo,
+            name="자치구 사건 수",
+            data=district_counts,
+            columns=["자치구", "사건수"],
+            key_on="feature.id",
+            fill_color="YlOrRd",
+            fill_opacity=0.5,
+            line_opacity=0.3,
+            legend_name="자치구별 사건 수",
+            highlight=True,
+            smooth_factor=0,
+            show=False
+        ).add_to(m)
+
+        counts = [feature['properties']['count'] for feature in cells_geo['features']]
+        if counts:
+            colormap = linear.YlOrRd_09.scale(min(counts), max(counts) if max(counts) > min(counts) else min(counts) + 1)
+            colormap.caption = f"{grid_label} 칸별 사건 수"
+            for feature in cells_geo['features']:
+                feature['properties']['fill'] = colormap(feature['properties']['count'])
+            folium.GeoJson(
+                cells_geo,
+                name=grid_label,
+                style_function=lambda feature: {
+                    "fillColor": feature['properties']['fill'],
+                    "color": feature['properties']['fill'],
+                    "weight": 0.5,
+                    "fillOpacity": 0.6,
+                },
+                tooltip=folium.GeoJsonTooltip(fields=["count"], aliases=["사건 수"]),
+                smooth_factor=0
+            ).add_to(m)
+            colormap.add_to(m)
+        folium.LayerControl().add_to(m)
+        return m
+
     def generate_folium_map(self, crime_csv_path: str, pop_path: str, 
                            geo_json_path: str, save_dir: str,
                            df_pop_cleaned: pd.DataFrame = None,
@@ -518,83 +740,17 @@ class SeoulMethod(object):
                 crime_type=crime_type
             )
             
-            # '범죄' 컬럼을 사용하여 지도 색상 결정
-            crime_rate_data = df_norm[['범죄']].reset_index()
-            crime_rate_data.columns = ['자치구', '범죄율']
-            logger.info(f"  범죄율 데이터 shape: {crime_rate_data.shape}")
-            logger.info(f"  범죄율 데이터 (상위 5개):\n{crime_rate_data.head(5).to_string()}")
-            
             # 2. GeoJSON 파일 로드
             logger.info(f"\n📂 GeoJSON 파일 로드: {geo_json_path}")
             with open(geo_json_path, 'r', encoding='utf-8') as f:
                 seoul_geo = json.load(f)
             logger.info(f"  ✅ GeoJSON 로드 완료: {len(seoul_geo.get('features', []))}개 구")
-            
-            # GeoJSON의 모든 자치구 id 추출
-            geo_districts = [feature.get('id') for feature in seoul_geo.get('features', [])]
-            data_districts = crime_rate_data['자치구'].tolist()
-            
-            logger.info(f"  GeoJSON 자치구 수: {len(geo_districts)}")
-            logger.info(f"  GeoJSON 자치구 목록: {sorted(geo_districts)}")
-            logger.info(f"  데이터 자치구 수: {len(data_districts)}")
-            logger.info(f"  데이터 자치구 목록: {sorted(data_districts)}")
-            
-            # 매칭되지 않는 자치구 확인
-            missing_in_data = set(geo_districts) - set(data_districts)
-            missing_in_geo = set(data_districts) - set(geo_districts)
-            
-            if missing_in_data:
-                logger.warning(f"  ⚠️ GeoJSON에는 있지만 데이터에 없는 자치구: {sorted(missing_in_data)}")
-                # 매칭되지 않는 자치구에 대해 최소값(0) 추가
-                min_value = crime_rate_data['범죄율'].min() if len(crime_rate_data) > 0 else 0.0
-                for district in missing_in_data:
-                    crime_rate_data = pd.concat([
-                        crime_rate_data,
-                        pd.DataFrame([{'자치구': district, '범죄율': min_value}])
-                    ], ignore_index=True)
-                logger.info(f"  ✅ 매칭되지 않는 자치구에 최소값({min_value}) 추가 완료")
-            
-            if missing_in_geo:
-                logger.warning(f"  ⚠️ 데이터에는 있지만 GeoJSON에 없는 자치구: {sorted(missing_in_geo)}")
-            
-            # 최종 매칭 확인
-            final_geo_districts = set(geo_districts)
-            final_data_districts = set(crime_rate_data['자치구'].tolist())
-            matched = final_geo_districts & final_data_districts
-            logger.info(f"  ✅ 최종 매칭된 자치구 수: {len(matched)}/{len(geo_districts)}")
-            
-            # 3. Folium 지도 생성 (서울 중심 좌표)
+
+            # 3. Folium 지도 + Choropleth 레이어 생성
             logger.info("\n🗺️ Folium 지도 생성 중...")
-            seoul_center = [37.5665, 126.9780]  # 서울시청 좌표
-            m = folium.Map(location=seoul_center, zoom_start=11, tiles='OpenStreetMap')
-            
-            # 4. Choropleth 레이어 추가
-            logger.info("  Choropleth 레이어 추가 중...")
-            
-            # 색상 설정: 발생은 빨간색, 검거는 파란색
-            fill_color = "Reds" if crime_type == '발생' else "Blues"
-            legend_name = "범죄 발생률 (정규화)" if crime_type == '발생' else "범죄 검거률 (정규화)"
-            
-            folium.Choropleth(
-                geo_data=seoul_geo,
-                name="choropleth",
-                data=crime_rate_data,
-                columns=["자치구", "범죄율"],
-                key_on="feature.id",  # GeoJSON의 id 필드와 매칭
-                fill_color=fill_color,
-                fill_opacity=0.7,
-                line_opacity=0.2,
-                line_color='black',
-                line_weight=1,
-                legend_name=legend_name,
-                highlight=True,
-                smooth_factor=0
-            ).add_to(m)
-            
-            # 5. 레이어 컨트롤 추가
-            folium.LayerControl().add_to(m)
+            m, crime_rate_data = self.build_folium_map(df_norm, seoul_geo, crime_type)
             
-            # 6. 저장
+            # 4. 저장
             os.makedirs(save_dir, exist_ok=True)
             filename = f"seoul_crime_map_{crime_type}.html"
             filepath = os.path.join(save_dir, filename)
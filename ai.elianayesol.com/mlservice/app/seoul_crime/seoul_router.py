@@ -1,8 +1,14 @@
-from fastapi import APIRouter
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, Request, UploadFile, File
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from app.seoul_crime.seoul_service import SeoulService
+from app.seoul_crime.kakao_geocoder import geocode_metrics
+from app.common.container import services
+from app.common.errors import InvalidRequestError
 import logging
 import os
+import shutil
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +22,8 @@ router = APIRouter(
 )
 
 def get_service() -> SeoulService:
-    """SeoulService 인스턴스 반환"""
-    return SeoulService()
+    """프로세스에서 공유하는 SeoulService 인스턴스 반환 (서비스 컨테이너)"""
+    return services.get(SeoulService)
 
 @router.get(
     "/",
@@ -46,7 +52,7 @@ async def preprocess_data():
     """
     try:
         service = get_service()
-        result = service.preprocess()
+        result = await run_in_threadpool(service.preprocess)
         
         # 서비스에서 반환된 딕셔너리를 그대로 반환
         return result
@@ -62,69 +68,91 @@ async def preprocess_data():
             "detail": error_detail
         }
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더에 현재 ETag 가 있는지 (여러 값, W/ 약한 비교, * 허용)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/").strip('"') for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+# 히트맵 이미지 형식 -> 응답 media type
+HEATMAP_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+def _heatmap_response(request: Request, result: dict) -> Response:
+    """캐시된 히트맵 이미지 응답 (ETag 가 같으면 본문 없이 304)"""
+    headers = {
+        "ETag": f'"{result["etag"]}"',
+        "Cache-Control": "public, max-age=0, must-revalidate",
+        "X-Heatmap-Cache": result["cache"],
+    }
+    if _etag_matches(request, result["etag"]):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f'inline; filename="{os.path.basename(result["path"])}"'
+    return Response(content=result["content"], media_type=HEATMAP_MEDIA_TYPES[result["format"]], headers=headers)
+
+def _csv_list(value: str) -> list:
+    """쉼표 구분 쿼리 값 -> 목록 (비어 있으면 None)"""
+    items = [item.strip() for item in (value or "").split(",") if item.strip()]
+    return items or None
+
+def _error_response(e: Exception, message: str) -> JSONResponse:
+    """
+    엔드포인트 예외 -> 오류 응답
+
+    - FileNotFoundError: 404 (전처리 / 업로드 전)
+    - InvalidRequestError: 400 (서비스가 직접 검사한 잘못된 요청 값)
+    - 그 밖의 예외: 서버 오류로 보고 traceback 을 로그에 남긴 뒤 500
+    """
+    if isinstance(e, FileNotFoundError):
+        return JSONResponse(status_code=404, content={"status": "error", "message": str(e)})
+    if isinstance(e, InvalidRequestError):
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    import traceback
+    error_detail = traceback.format_exc()
+    logger.error(f"❌ {message}: {str(e)}")
+    logger.error(error_detail)
+    return JSONResponse(
+        status_code=500,
+        content={
+            "status": "error",
+            "message": f"{message} 중 오류가 발생했습니다.",
+            "error": str(e),
+            "detail": error_detail
+        }
+    )
+
 @router.get(
     "/heatmap",
     summary="서울 범죄 데이터 히트맵 생성",
-    description="서울시 범죄 데이터를 기반으로 정규화된 히트맵을 생성합니다."
+    description="서울시 범죄 데이터를 기반으로 정규화된 히트맵을 생성합니다. 렌더링 결과는 캐시되고 ETag 로 재검증합니다."
 )
-async def generate_heatmap(style: str = "coolwarm"):
+async def generate_heatmap(request: Request, style: str = None, size: str = "print"):
     """
     서울 범죄 데이터 히트맵 생성
     
     - CSV 파일에서 범죄 데이터를 읽어옵니다.
     - 자치구별로 발생 건수를 합산합니다.
     - MinMax 정규화를 수행합니다.
-    - coolwarm 또는 viridis 컬러맵으로 히트맵을 생성합니다.
+    - 같은 데이터/옵션의 히트맵은 다시 그리지 않고 캐시에서 바로 돌려줍니다.
+    - If-None-Match 가 ETag 와 같으면 304 Not Modified 를 돌려줍니다.
     
     Parameters:
-    - style: 히트맵 스타일 ("coolwarm" 또는 "viridis", 기본값: "coolwarm")
+    - style: 컬러맵 이름 (예: "Reds", "coolwarm", "viridis", 기본값: "Reds")
+    - size: 크기 프리셋 ("thumbnail", "web", "print", "svg", 기본값: "print" 300dpi PNG)
     """
     try:
         service = get_service()
-        result = service.generate_heatmap()
-        
-        # style 파라미터에 따라 해당 히트맵 파일 경로 선택
-        if style == "viridis":
-            heatmap_path = result["heatmap_files"][1]  # viridis
-        else:
-            heatmap_path = result["heatmap_files"][0]  # coolwarm (기본값)
-        
-        if os.path.exists(heatmap_path):
-            return FileResponse(
-                heatmap_path,
-                media_type="image/png",
-                filename=os.path.basename(heatmap_path)
-            )
-        else:
-            return JSONResponse(
-                status_code=404,
-                content={
-                    "status": "error",
-                    "message": f"히트맵 파일을 찾을 수 없습니다: {heatmap_path}"
-                }
-            )
-            
+        return _heatmap_response(request, await run_in_threadpool(service.heatmap, '발생', style, size))
     except Exception as e:
-        import traceback
-        error_detail = traceback.format_exc()
-        logger.error(f"❌ 히트맵 생성 오류: {str(e)}")
-        logger.error(error_detail)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "status": "error",
-                "message": "히트맵 생성 중 오류가 발생했습니다.",
-                "error": str(e),
-                "detail": error_detail
-            }
-        )
+        return _error_response(e, "히트맵 생성")
 
 @router.get(
     "/heatmap/arrest",
     summary="서울 범죄 검거 데이터 히트맵 생성",
-    description="서울시 범죄 검거 데이터를 기반으로 정규화된 히트맵을 생성합니다."
+    description="서울시 범죄 검거 데이터를 기반으로 정규화된 히트맵을 생성합니다. 렌더링 결과는 캐시되고 ETag 로 재검증합니다."
 )
-async def generate_heatmap_arrest():
+async def generate_heatmap_arrest(request: Request, style: str = None, size: str = "print"):
     """
     서울 범죄 검거 데이터 히트맵 생성
     
@@ -132,63 +160,61 @@ async def generate_heatmap_arrest():
     - 자치구별로 검거 건수를 합산합니다.
     - 인구수 대비 검거률을 계산합니다.
     - MinMax 정규화를 수행합니다.
-    - 빨간색 계열 히트맵을 생성합니다.
+    - 파란색 계열 히트맵을 생성합니다 (style / size / 캐시 / ETag 는 /heatmap 과 동일).
     """
     try:
         service = get_service()
-        result = service.generate_heatmap_arrest()
-        
-        # 검거 히트맵 파일 경로
-        heatmap_path = result["heatmap_files"][0]
-        
-        if os.path.exists(heatmap_path):
-            return FileResponse(
-                heatmap_path,
-                media_type="image/png",
-                filename=os.path.basename(heatmap_path)
-            )
-        else:
-            return JSONResponse(
-                status_code=404,
-                content={
-                    "status": "error",
-                    "message": f"히트맵 파일을 찾을 수 없습니다: {heatmap_path}"
-                }
-            )
-            
+        return _heatmap_response(request, await run_in_threadpool(service.heatmap, '검거', style, size))
     except Exception as e:
-        import traceback
-        error_detail = traceback.format_exc()
-        logger.error(f"❌ 검거 히트맵 생성 오류: {str(e)}")
-        logger.error(error_detail)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "status": "error",
-                "message": "검거 히트맵 생성 중 오류가 발생했습니다.",
-                "error": str(e),
-                "detail": error_detail
-            }
-        )
+        return _error_response(e, "검거 히트맵 생성")
+
+@router.get(
+    "/heatmap/variants",
+    summary="히트맵 여러 스타일/크기 미리 렌더링",
+    description="정규화 행렬을 한 번 계산하고 요청한 컬러맵 × 크기 조합을 프로세스 풀에서 동시에 렌더링해 캐시합니다."
+)
+async def render_heatmap_variants(crime_type: str = '발생', styles: str = None,
+                                  sizes: str = "thumbnail,web,print,svg"):
+    """
+    히트맵 변형 미리 렌더링
+    
+    - styles: 쉼표로 구분한 컬러맵 이름 (기본값: crime_type 기본 컬러맵)
+    - sizes: 쉼표로 구분한 크기 프리셋 (thumbnail, web, print, svg)
+    - 이미 캐시된 변형은 다시 그리지 않습니다.
+    - 각 변형의 etag 로 /heatmap?style=&size= 를 조건부 요청할 수 있습니다.
+    """
+    try:
+        service = get_service()
+        variants = await run_in_threadpool(service.heatmap_variants, crime_type, _csv_list(styles), _csv_list(sizes))
+        return {
+            "status": "success",
+            "crime_type": crime_type,
+            "rendered": sum(1 for variant in variants if variant["cache"] == "miss"),
+            "variants": variants
+        }
+    except Exception as e:
+        return _error_response(e, "히트맵 변형 렌더링")
 
 @router.get(
     "/heatmap/info",
     summary="히트맵 생성 정보 조회",
-    description="생성된 히트맵의 데이터 요약 정보를 조회합니다."
+    description="히트맵 데이터 요약 정보를 조회합니다. 이미지는 렌더링하지 않습니다."
 )
-async def get_heatmap_info():
+async def get_heatmap_info(crime_type: str = '발생'):
     """
     히트맵 생성 정보 조회
     
-    - 생성된 히트맵 파일 경로
+    - etag: 기본 히트맵의 ETag (이미지를 받지 않고 변경 여부 확인용)
+    - heatmap_files: 캐시에 렌더링된 히트맵 파일 경로 (아직 없으면 빈 목록)
     - 데이터 요약 정보 (자치구 수, 범죄 종류 등)
     """
     try:
         service = get_service()
-        result = service.generate_heatmap()
+        result = await run_in_threadpool(service.heatmap_info, crime_type)
         
         return {
             "status": "success",
+            "etag": result["etag"],
             "heatmap_files": result["heatmap_files"],
             "data_summary": result["data_summary"]
         }
@@ -204,3 +230,256 @@ async def get_heatmap_info():
             "detail": error_detail
         }
 
+@router.get(
+    "/crime-rates",
+    summary="자치구별 범죄율 데이터 (JSON / Arrow)",
+    description="히트맵과 같은 자치구별 범죄율 표를 클라이언트에서 차트를 그릴 수 있도록 JSON 또는 Arrow 로 돌려줍니다."
+)
+async def get_crime_rates(request: Request, crime_type: str = '발생', kind: str = 'norm', format: str = 'json'):
+    """
+    자치구별 범죄율 데이터
+    
+    - crime_type: '발생' 또는 '검거'
+    - kind: 'norm' (MinMax 정규화, 히트맵 값), 'rate' (인구 10만명당), 'counts' (자치구별 합산 건수)
+    - format: 'json' ({index, columns, data} 분리형) 또는 'arrow' (Arrow IPC 스트림)
+    - 표와 직렬화 결과는 원본 파일이 바뀔 때까지 캐시되고, If-None-Match 가 ETag 와 같으면 304 를 돌려줍니다.
+    """
+    try:
+        service = get_service()
+        result = await run_in_threadpool(service.crime_rates, crime_type, kind, format)
+        headers = {"ETag": f'"{result["etag"]}"', "Cache-Control": "public, max-age=0, must-revalidate"}
+        if _etag_matches(request, result["etag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=result["content"], media_type=result["media_type"], headers=headers)
+    except Exception as e:
+        return _error_response(e, "범죄율 데이터 조회")
+
+def _accepted_encoding(request: Request, available: dict) -> str:
+    """Accept-Encoding 에서 미리 압축해 둔 인코딩 선택 (br > gzip > identity, q=0 은 제외)"""
+    accepted = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=") if params.strip().startswith("q=") else "1"
+        try:
+            accepted[name.strip().lower()] = float(quality)
+        except ValueError:
+            continue
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+def _encoded_response(request: Request, result: dict, media_type: str) -> Response:
+    """미리 압축해 둔 본문 중 Accept-Encoding 에 맞는 것을 ETag 와 함께 반환 (같으면 304)"""
+    encoding = _accepted_encoding(request, result["bodies"])
+    headers = {
+        "ETag": f'"{result["etag"]}"',
+        "Cache-Control": "public, max-age=0, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request, result["etag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=result["bodies"][encoding], media_type=media_type, headers=headers)
+
+@router.get(
+    "/map",
+    summary="서울 범죄율 지도",
+    description="자치구별 정규화 범죄율 Folium 단계구분도(Choropleth)를 HTML 로 반환합니다. 범죄 데이터가 바뀔 때만 다시 만듭니다.",
+    response_class=HTMLResponse
+)
+async def get_seoul_map(request: Request, crime_type: str = '발생'):
+    """
+    서울 범죄율 지도
+    
+    - crime_type: '발생' (빨간색) 또는 '검거' (파란색)
+    - 지도는 crime_type 별로 미리 만들어 두고, 범죄율 표가 바뀔 때만 다시 생성합니다.
+    - 자치구 경계 GeoJSON 은 한 번만 읽고 단순화해서 HTML 크기를 줄입니다.
+    - Accept-Encoding 에 따라 미리 압축해 둔 br / gzip 본문을 돌려줍니다.
+    - If-None-Match 가 ETag 와 같으면 304 를 돌려줍니다.
+    """
+    try:
+        service = get_service()
+        result = await run_in_threadpool(service.seoul_map, crime_type)
+        return _encoded_response(request, result, "text/html; charset=utf-8")
+    except Exception as e:
+        return _error_response(e, "지도 생성")
+
+@router.get(
+    "/map/info",
+    summary="서울 범죄율 지도 정보 조회",
+    description="지도 데이터 요약과 ETag, 인코딩별 HTML 크기를 조회합니다."
+)
+async def get_seoul_map_info(crime_type: str = '발생'):
+    """
+    서울 범죄율 지도 정보
+    
+    - etag: 현재 지도 ETag
+    - data_summary: 자치구 수, 인코딩별 HTML 크기, 범죄율 미리보기
+    """
+    try:
+        service = get_service()
+        result = await run_in_threadpool(service.seoul_map, crime_type)
+        return {
+            "status": "success",
+            "etag": result["etag"],
+            "data_summary": result["data_summary"]
+        }
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        logger.error(f"❌ 지도 정보 조회 오류: {str(e)}")
+        logger.error(error_detail)
+        return {
+            "status": "error",
+            "message": "지도 정보 조회 중 오류가 발생했습니다.",
+            "error": str(e),
+            "detail": error_detail
+        }
+
+def _save_incidents(service: SeoulService, file: UploadFile) -> dict:
+    """업로드 파일을 save 폴더의 임시 파일로 받은 뒤 집계 (실패하면 임시 파일 삭제)"""
+    tmp_path = None
+    try:
+        suffix = os.path.splitext(file.filename or '')[1].lower()
+        # 저장 위치와 같은 폴더에 받아야 os.replace 로 바로 옮길 수 있음
+        os.makedirs(service.dataset.sname, exist_ok=True)
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False, dir=service.dataset.sname) as tmp:
+            tmp_path = tmp.name
+            shutil.copyfileobj(file.file, tmp, length=1024 * 1024)
+        return service.save_incidents(tmp_path, suffix)
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+@router.post(
+    "/incidents",
+    summary="사건 좌표 파일 업로드 및 집계",
+    description="사건 단위 위도/경도 CSV 또는 Parquet 파일을 업로드하면 청크 단위로 읽어 자치구 / 육각형 격자별로 집계합니다."
+)
+async def upload_incidents(file: UploadFile = File(...)):
+    """
+    사건 좌표 파일 업로드
+    
+    - 위도/경도 컬럼(lat/lng, latitude/longitude, 위도/경도 등)이 있는 .csv 또는 .parquet
+    - 업로드 파일은 1MB 단위로 디스크에 옮기고, 집계도 청크 단위라 파일 크기와 무관하게 메모리 사용량이 일정합니다.
+    - 저장 후 기본 격자(hex 500m)로 집계한 결과를 돌려줍니다.
+    """
+    try:
+        # 파일 복사와 집계는 블로킹 작업이라 스레드 풀에서 실행
+        return await run_in_threadpool(_save_incidents, get_service(), file)
+    except Exception as e:
+        return _error_response(e, "사건 파일 집계")
+
+@router.get(
+    "/incidents",
+    summary="사건 집계 조회",
+    description="저장된 사건 파일의 자치구별 사건 수와 격자 집계 요약을 조회합니다. 파일이 바뀔 때만 다시 집계합니다."
+)
+async def get_incidents(grid: str = 'hex', cell_m: float = 500):
+    """
+    사건 집계 조회
+    
+    - grid: 'hex' (H3 와 비슷한 육각형) 또는 'square'
+    - cell_m: 칸 한 변 길이 (미터, 50 이상)
+    """
+    try:
+        return await run_in_threadpool(get_service().incident_aggregate, grid, cell_m)
+    except Exception as e:
+        return _error_response(e, "사건 집계")
+
+@router.get(
+    "/incidents/grid",
+    summary="사건 격자 GeoJSON",
+    description="사건이 있는 격자 칸을 GeoJSON FeatureCollection(properties.count)으로 반환합니다. 지도 레이어에 바로 올릴 수 있습니다."
+)
+async def get_incident_grid(request: Request, grid: str = 'hex', cell_m: float = 500):
+    """
+    사건 격자 GeoJSON
+    
+    - 집계 결과가 같으면 ETag 로 304 를 돌려주고, gzip(/br) 으로 미리 압축한 본문을 씁니다.
+    """
+    try:
+        result = await run_in_threadpool(get_service().incident_cells, grid, cell_m)
+        return _encoded_response(request, result, "application/geo+json")
+    except Exception as e:
+        return _error_response(e, "사건 격자 생성")
+
+@router.get(
+    "/incidents/map",
+    summary="사건 집계 지도",
+    description="자치구별 사건 수 단계구분도와 격자 칸 레이어를 담은 Folium 지도 HTML 을 반환합니다.",
+    response_class=HTMLResponse
+)
+async def get_incident_map(request: Request, grid: str = 'hex', cell_m: float = 500):
+    """
+    사건 집계 지도
+    
+    - grid / cell_m 조합별로 한 번만 만들고, 사건 파일이 바뀌면 다시 만듭니다.
+    """
+    try:
+        result = await run_in_threadpool(get_service().incident_map, grid, cell_m)
+        return _encoded_response(request, result, "text/html; charset=utf-8")
+    except Exception as e:
+        return _error_response(e, "사건 지도 생성")
+
+@router.get(
+    "/cctv/allocation",
+    summary="구별 CCTV 추가 배치 최적화",
+    description="CCTV 추가 예산을 범죄 가중 커버리지가 최대가 되도록 자치구에 나눕니다. 입력은 캐시되어 밀리초 안에 답합니다."
+)
+async def get_cctv_allocation(budget: int = 500, weight: str = 'count', coverage_m2: float = 20000,
+                              max_per_district: int = None):
+    """
+    구별 CCTV 추가 배치
+    
+    - budget: 추가로 설치할 CCTV 대수
+    - weight: 'count' (범죄 발생 건수) 또는 'rate' (인구 10만명당 범죄 발생률)
+    - coverage_m2: 카메라 1대가 커버하는 면적 (제곱미터). 작을수록 구가 포화되기까지 많은 대수가 필요합니다.
+    - max_per_district: 한 구에 추가할 수 있는 최대 대수 (없으면 제한 없음)
+    """
+    try:
+        return await run_in_threadpool(get_service().allocate_cctv, budget, weight, coverage_m2, max_per_district)
+    except Exception as e:
+        return _error_response(e, "CCTV 배치 최적화")
+
+@router.get(
+    "/cctv/sweep",
+    summary="CCTV 예산별 배치 효과 곡선",
+    description="여러 예산으로 배치를 최적화해 예산 대비 범죄 가중 커버리지 개선율을 비교합니다."
+)
+async def get_cctv_sweep(budgets: str = "0,100,250,500,1000,2000,5000", weight: str = 'count',
+                         coverage_m2: float = 20000, max_per_district: int = None):
+    """
+    CCTV 예산별 효과 곡선
+    
+    - budgets: 쉼표로 구분한 예산 목록 (최대 200개)
+    - 나머지 파라미터는 /cctv/allocation 과 같습니다.
+    """
+    try:
+        try:
+            values = [int(budget) for budget in (_csv_list(budgets) or [])]
+        except ValueError:
+            raise InvalidRequestError(f"budgets 는 쉼표로 구분한 정수여야 합니다. 현재 값: {budgets}")
+        if not values or len(values) > 200:
+            raise InvalidRequestError(f"budgets 는 1~200개여야 합니다. 현재 개수: {len(values)}")
+        return await run_in_threadpool(get_service().sweep_cctv, values, weight, coverage_m2, max_per_district)
+    except Exception as e:
+        return _error_response(e, "CCTV 예산 비교")
+
+@router.get(
+    "/geocode/metrics",
+    summary="카카오맵 호출 지표",
+    description="카카오맵 지오코딩 클라이언트의 호출별 지연 시간 통계와 차단기(circuit breaker) 상태를 조회합니다."
+)
+async def get_geocode_metrics(recent: int = 10):
+    """
+    카카오맵 API 호출 지표
+    
+    - calls / success / not_found / error / rejected / retries: 누적 호출 수
+    - latency_seconds: 최근 호출의 p50 / p95 / p99 / max / mean
+    - circuit: 차단기 상태 (closed / open / half_open)
+    - recent: 최근 호출 기록
+    """
+    return {"status": "success", "metrics": geocode_metrics(recent)}
@@ -2,14 +2,35 @@ import pandas as pd
 import logging
 import numpy as np
 import os
+import json
+import time
+import gzip
+import uuid
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import matplotlib
 matplotlib.use('Agg')  # GUI 백엔드 없이 사용
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from sklearn.preprocessing import MinMaxScaler
+import pyarrow as pa
+try:
+    import brotli  # 선택 패키지: 없으면 gzip 으로만 압축
+except ImportError:
+    brotli = None
 from app.seoul_crime.seoul_method import SeoulMethod
 from app.seoul_crime.seoul_data import SeoulData
-from app.seoul_crime.kakao_map_singletone import KakaoMapSingleton
+from app.seoul_crime.kakao_geocoder import geocode_all
+from app.seoul_crime.heatmap_cache import HeatmapCache, render_key
+from app.seoul_crime.crime_rate_store import CrimeRateStore, file_version as _file_version
+from app.seoul_crime.district_index import DistrictIndex
+from app.seoul_crime.incident_grid import IncidentGrid, aggregate_incidents, incident_columns
+from app.seoul_crime.cctv_allocator import CctvAllocator
+from app.common.pipeline import Pipeline, Step
+from app.common.errors import InvalidRequestError
 
 # 한글 폰트 설정
 def setup_korean_font():
@@ -59,6 +80,116 @@ logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
 
+# 범죄율 표 저장소 ((CSV 경로, 인구 파일 경로) -> CrimeRateStore), 프로세스 전체에서 공유
+_CRIME_RATE_STORES = {}
+_STORE_LOCK = threading.Lock()
+_HEATMAP_CACHE = HeatmapCache()
+
+# 범죄율 API 직렬화 결과 (ETag -> 바이트, ETag -> (crime_type, kind, fmt))
+CRIME_RATE_KINDS = ('norm', 'rate', 'counts')
+CRIME_RATE_MEDIA_TYPES = {'json': 'application/json', 'arrow': 'application/vnd.apache.arrow.stream'}
+_PAYLOAD_CACHE = {}
+_PAYLOAD_LOCK = threading.Lock()
+_PAYLOAD_KEYS = {}
+
+
+# 자치구 경계 GeoJSON (파일 버전, 단순화된 GeoJSON) 과 crime_type -> 미리 만든 지도 {"etag", "bodies", ...}
+_GEOJSON = None
+_MAP_CACHE = {}
+_MAP_LOCK = threading.Lock()
+
+# 자치구 경계 공간 인덱스 (파일 버전, DistrictIndex) - 원본 경계(단순화 전)로 만든다
+_DISTRICT_INDEX = None
+_DISTRICT_LOCK = threading.Lock()
+
+# 사건 파일 집계 (파일 경로, 파일 버전, 경계 버전, 격자, 칸 크기) -> {"aggregator", "cells_geo", "map", ...}
+_INCIDENT_CACHE = {}
+_INCIDENT_LOCK = threading.Lock()
+_INCIDENT_MAX_ITEMS = 8
+INCIDENT_SUFFIXES = ('.parquet', '.csv')
+
+# CCTV 배치 최적화기 (입력 파일 버전, weight, coverage_m2) -> CctvAllocator
+_CCTV_ALLOCATORS = {}
+_CCTV_LOCK = threading.Lock()
+
+
+def _compress(content: bytes) -> dict:
+    """응답 본문을 인코딩별로 한 번만 압축해 둠 (identity / gzip / br)"""
+    bodies = {"identity": content, "gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(content, quality=11)
+    return bodies
+
+
+def _serialize_table(table: pd.DataFrame, crime_type: str, kind: str, fmt: str) -> bytes:
+    """자치구 인덱스 표 -> JSON (index/columns/data) 또는 Arrow IPC 스트림 바이트"""
+    if fmt == 'arrow':
+        arrow_table = pa.Table.from_pandas(table.reset_index(), preserve_index=False)
+        arrow_table = arrow_table.replace_schema_metadata(
+            {**(arrow_table.schema.metadata or {}), b'crime_type': crime_type.encode(), b'kind': kind.encode()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+        return sink.getvalue().to_pybytes()
+    payload = {
+        "status": "success",
+        "crime_type": crime_type,
+        "kind": kind,
+        "index": table.index.tolist(),
+        "columns": table.columns.tolist(),
+        "data": table.to_numpy().tolist(),
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# 히트맵 변형 렌더링 프로세스 풀 (처음 쓸 때 생성해서 계속 재사용)
+_RENDER_POOL = None
+_RENDER_POOL_LOCK = threading.Lock()
+
+
+def _render_variant(df_norm: pd.DataFrame, options: dict) -> bytes:
+    """렌더링 작업 (풀 워커 프로세스에서도 실행되므로 모듈 함수)"""
+    setup_korean_font()
+    return SeoulMethod().render_heatmap(df_norm, **options)
+
+
+def _render_workers() -> int:
+    return max(1, int(os.getenv('HEATMAP_RENDER_WORKERS', min(4, os.cpu_count() or 1))))
+
+
+def _render_pool() -> ProcessPoolExecutor:
+    global _RENDER_POOL
+    with _RENDER_POOL_LOCK:
+        if _RENDER_POOL is None:
+            # 서버 스레드 상태를 물려받지 않도록 spawn 으로 워커 생성
+            _RENDER_POOL = ProcessPoolExecutor(max_workers=_render_workers(),
+                                               mp_context=multiprocessing.get_context('spawn'))
+        return _RENDER_POOL
+
+
+def _render_pooled(df_norm: pd.DataFrame, options: dict) -> bytes:
+    """
+    렌더링 작업 하나를 프로세스 풀에서 실행하고 결과를 기다림
+
+    렌더링은 GIL 을 잡는 CPU 작업이라 스레드 대신 프로세스 풀을 쓴다.
+    워커가 하나면 프로세스 간 전송 비용만 드므로 현재 프로세스에서 바로 그린다.
+    """
+    if _render_workers() == 1:
+        return _render_variant(df_norm, options)
+    global _RENDER_POOL
+    pool = _render_pool()
+    try:
+        return pool.submit(_render_variant, df_norm, options).result()
+    except BrokenProcessPool as e:
+        # 워커가 죽은 풀은 버리고 (다음 요청에서 새로 생성) 이번 작업은 현재 프로세스에서 그림
+        logger.warning(f"⚠️ 히트맵 렌더링 프로세스 풀 오류, 현재 프로세스에서 렌더링: {e}")
+        with _RENDER_POOL_LOCK:
+            if _RENDER_POOL is pool:
+                _RENDER_POOL = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        return _render_variant(df_norm, options)
+
+
 class SeoulService:
     """서울 범죄에 따른 구별 cctv 할당 처리 및 머신러닝 서비스"""
 
@@ -66,165 +197,53 @@ class SeoulService:
         self.method = SeoulMethod()
         self.dataset = SeoulData()
         self.data_path = self.dataset.dname
-        self.df_pop_cleaned = None  # 정리된 인구 데이터 저장
 
-    def preprocess(self):
-        """CCTV와 인구 데이터 전처리 및 머지"""
-        # 1. 데이터 로드
-        cctv_path = os.path.join(self.data_path, 'cctv.csv')
-        pop_path = os.path.join(self.data_path, 'pop.xls')
-        crime_path = os.path.join(self.data_path, 'crime.csv')
-        
-        df_cctv = self.method.csv_to_df(cctv_path)
-        df_pop = self.method.xlsx_to_df(pop_path)
-        df_crime = self.method.csv_to_df(crime_path)
-
-        # CCTV 데이터 컬럼 정리: 좌로부터 1, 2번째 컬럼만 유지
-        logger.info("\n🧹 CCTV 데이터 컬럼 정리")
-        logger.info(f"  원본 컬럼: {df_cctv.columns.tolist()}")
-        if len(df_cctv.columns) >= 2:
-            cols_to_keep = [df_cctv.columns[0], df_cctv.columns[1]]
-            df_cctv = df_cctv[cols_to_keep]
-            logger.info(f"  유지된 컬럼: {cols_to_keep}")
-        else:
-            logger.warning("  컬럼이 2개 미만입니다.")
-
-        # '자치구' 컬럼 확인 및 매핑
-        logger.info(f"\n📋 인구 데이터 컬럼: {', '.join(df_pop.columns.tolist())}")
-        if '자치구' not in df_pop.columns:
-            # '자치구_자치구' 컬럼이 있으면 '자치구'로 rename
-            if '자치구_자치구' in df_pop.columns:
-                df_pop = df_pop.rename(columns={'자치구_자치구': '자치구'})
-                logger.info(f"  '자치구_자치구' → '자치구'로 변경")
-            else:
-                # 첫 번째 컬럼을 '자치구'로 rename
-                if len(df_pop.columns) > 0:
-                    first_col = df_pop.columns[0]
-                    if '기간' not in str(first_col) and '합계' not in str(first_col):
-                        df_pop = df_pop.rename(columns={first_col: '자치구'})
-                        logger.info(f"  '{first_col}' → '자치구'로 변경")
-        
-        if '자치구' not in df_pop.columns:
-            raise ValueError(f"'자치구' 컬럼을 찾을 수 없습니다. 사용 가능한 컬럼: {df_pop.columns.tolist()}")
-        
-        # 인구 데이터 정리 (메서드로 분리)
-        df_pop = self._clean_population_data(df_pop)
-        
-        # 정리된 인구 데이터를 인스턴스 변수로 저장 (generate_heatmap에서 재사용)
-        self.df_pop_cleaned = df_pop.copy()
-        
+    def warm(self):
+        """
+        서버 시작 시 자치구 GeoJSON, 자치구 공간 인덱스, 범죄율 표를 미리 준비 (서비스 컨테이너가 호출)
 
+        crime_with_gu.csv 가 아직 없으면 범죄율 표는 /seoul/preprocess 이후 첫 요청에서 계산한다.
+        """
+        self.seoul_geojson()
+        self.district_index()
+        if os.path.exists(self.crime_rate_store().crime_csv_path):
+            for crime_type in self.method.HEATMAP_SPECS:
+                self.crime_rate_tables(crime_type)
 
+    def close(self):
+        """히트맵 렌더링 프로세스 풀 종료 (서비스 컨테이너가 서버 종료 시 호출)"""
+        global _RENDER_POOL
+        with _RENDER_POOL_LOCK:
+            pool, _RENDER_POOL = _RENDER_POOL, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        # 2. 데이터 확인 (상위 5개)
-        logger.info("📊 CCTV 데이터 (상위 5개)")
-        logger.info(f"\n{df_cctv.head(5).to_string()}")
-        
-        logger.info("\n📊 인구 데이터 (상위 5개)")
-        logger.info(f"\n{df_pop.head(5).to_string()}")
-        
-        logger.info("\n📊 범죄 데이터 (상위 5개)")
-        logger.info(f"\n{df_crime.head(5).to_string()}")
-        
-        # 3. CCTV와 인구 데이터 머지
-        df_merged = self.method.df_merge(
-            df_cctv, 
-            df_pop, 
-            left_on='기관명', 
-            right_on='자치구', 
-            how='inner'
-        )
-        
-        # 4. 머지 결과 확인
-        logger.info("\n✅ 머지 결과 (상위 5개)")
-        logger.info(f"\n{df_merged.head(5).to_string()}")
-        
-        # 5. 관서명에 따른 경찰서 주소 찾기
-        station_names = []  # 경찰서 관서명 리스트
-        
-        for name in df_crime['관서명']:
-            station_names.append('서울' + str(name[:-1]) + '경찰서')
-        
-        logger.info(f"🔥💧경찰서 관서명 리스트: {station_names}")
-        
-        station_addrs = []
-        station_lats = []
-        station_lngs = []
-        
-        kakao_map1 = KakaoMapSingleton()
-        kakao_map2 = KakaoMapSingleton()
-        
-        if kakao_map1 is kakao_map2:
-            logger.info("동일한 객체 입니다.")
-        else:
-            logger.info("다른 객체 입니다.")
-        
-        kakao_map = KakaoMapSingleton()  # 카카오맵 객체 생성
-        
-        for name in station_names:
-            tmp = kakao_map.geocode(name, language='ko')
-            if tmp and len(tmp) > 0:
-                logger.info(f"{name}의 검색 결과: {tmp[0].get('formatted_address')}")
-                station_addrs.append(tmp[0].get("formatted_address"))
-                tmp_loc = tmp[0].get("geometry")
-                station_lats.append(tmp_loc['location']['lat'])
-                station_lngs.append(tmp_loc['location']['lng'])
-            else:
-                logger.warning(f"⚠️ {name}의 주소를 찾을 수 없습니다.")
-                station_addrs.append("")  # 빈 문자열 추가
-                station_lats.append(0.0)
-                station_lngs.append(0.0)
-        
-        logger.info(f"🔥💧자치구 리스트: {station_addrs}")
-        
-        # 위도/경도 정보 출력
-        logger.info(f"🔥💧위도(Latitude) 리스트: {station_lats}")
-        logger.info(f"🔥💧경도(Longitude) 리스트: {station_lngs}")
-        
-        # 경찰서별 상세 정보 테이블 형태로 출력
-        logger.info("\n" + "="*100)
-        logger.info("📍 경찰서 위치 정보 상세")
-        logger.info("="*100)
-        location_df = pd.DataFrame({
-            '경찰서명': station_names,
-            '주소': station_addrs,
-            '위도(Lat)': station_lats,
-            '경도(Lng)': station_lngs
-        })
-        logger.info(f"\n{location_df.to_string(index=False)}")
-        logger.info("="*100 + "\n")
-        
-        gu_names = []
-        for addr in station_addrs:
-            if addr:  # 빈 문자열이 아닌 경우만 처리
-                tmp = addr.split()
-                tmp_gu = [gu for gu in tmp if gu[-1] == '구']
-                if tmp_gu:
-                    gu_names.append(tmp_gu[0])
-                else:
-                    logger.warning(f"⚠️ 주소에서 자치구를 찾을 수 없습니다: {addr}")
-                    gu_names.append("")  # 빈 문자열 추가
-            else:
-                gu_names.append("")  # 빈 문자열 추가
-        
-        logger.info(f"🔥💧자치구 리스트 2: {gu_names}")
-        
-        # crime 데이터프레임에 '자치구' 컬럼을 제일 앞에 추가
-        df_crime.insert(0, '자치구', gu_names)
-        
-        # 관서명을 '서울ㅇㅇ경찰서' 형식으로 변경
-        df_crime['관서명'] = station_names
-        logger.info(f"\n✅ 관서명이 '서울ㅇㅇ경찰서' 형식으로 변경되었습니다.")
-        
-        # save 폴더에 저장
+    def preprocess(self):
+        """
+        CCTV와 인구 데이터 전처리 및 머지, 경찰서 자치구 추가
+
+        load (인구는 변환된 parquet) → merge → geocode → enrich (좌표 → 자치구 공간 배정) 단계를 Pipeline 으로 실행한다.
+        단계 결과는 입력 해시로 save/pipeline_cache 에 캐시되어, 원본 파일이 그대로면
+        다시 읽거나 계산하지 않는다. 지오코딩 단계는 자체 SQLite 캐시를 쓰므로 매번 실행하고,
+        결과가 같으면 뒤 단계(enrich)는 캐시에서 꺼낸다.
+        """
+        result = self.pipeline().run()
+        df_cctv, df_pop, df_crime, df_merged = result["cctv"], result["pop"], result["crime"], result["cctv_pop"]
+
+        # enrich 단계가 다시 계산됐거나 파일이 없을 때만 save 폴더에 저장
         save_path = os.path.join(self.dataset.sname, 'crime_with_gu.csv')
-        df_crime.to_csv(save_path, index=False, encoding='utf-8-sig')
-        logger.info(f"\n💾 자치구가 추가된 Crime 데이터 저장 완료: {save_path}")
-        logger.info(f"   저장된 데이터 shape: {df_crime.shape}")
-        logger.info(f"   컬럼: {df_crime.columns.tolist()}")
-        logger.info("\n📊 저장된 Crime 데이터 (상위 5개)")
-        logger.info(f"\n{df_crime.head(5).to_string()}")
-        
+        enriched = next(record for record in result.report if record["step"] == "enrich_crime")
+        if not enriched["cache"].startswith("hit") or not os.path.exists(save_path):
+            os.makedirs(self.dataset.sname, exist_ok=True)
+            tmp_path = f"{save_path}.{uuid.uuid4().hex}.tmp"
+            df_crime.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+            os.replace(tmp_path, save_path)
+            logger.info(f"\n💾 자치구가 추가된 Crime 데이터 저장 완료: {save_path} {df_crime.shape}")
+
+        # 히트맵 / 범죄율 API 가 쓰는 범죄율 표를 미리 계산 (CSV 가 그대로면 메모를 그대로 씀)
+        for crime_type in self.method.HEATMAP_SPECS:
+            self.crime_rate_tables(crime_type)
+
         # 포스트맨 응답용 데이터 구성
         return {
             "status": "success",
@@ -241,113 +260,469 @@ class SeoulService:
             "pop_preview": df_pop.head(3).to_dict(orient='records'),
             "cctv_pop_preview": df_merged.head(3).to_dict(orient='records'),
             "saved_crime_file": save_path,
+            "geocode": result["geocode_stats"],
+            "pipeline": result.report,
             "message": "데이터 전처리 및 머지가 완료되었습니다"
-
-            
         }
+
+    def pipeline(self) -> Pipeline:
+        """서울 범죄 전처리 단계 선언 (원본 파일 세 개는 동시에 읽음)"""
+        cctv_path = os.path.join(self.data_path, 'cctv.csv')
+        pop_path = os.path.join(self.data_path, 'pop.xls')
+        crime_path = os.path.join(self.data_path, 'crime.csv')
+        return Pipeline("seoul", [
+            Step("load_cctv", self.method.load_cctv, outputs=("cctv",), params={"path": cctv_path},
+                 fingerprint=partial(_file_version, cctv_path)),
+            Step("load_pop", self.method.load_population, outputs=("pop",), params={"pop_path": pop_path},
+                 fingerprint=partial(_file_version, pop_path)),
+            Step("load_crime", self.method.csv_to_df, outputs=("crime",), params={"fname": crime_path},
+                 fingerprint=partial(_file_version, crime_path)),
+            Step("merge_cctv_pop", self.method.merge_cctv_pop, ("cctv", "pop"), ("cctv_pop",)),
+            Step("station_names", self.method.station_names, ("crime",), ("station_names",)),
+            Step("geocode", self._geocode_stations, ("station_names",), ("geocoded", "geocode_stats"), cache=False),
+            Step("district_index", self.district_index, outputs=("districts",), cache=False),
+            Step("enrich_crime", self.method.enrich_crime, ("crime", "station_names", "geocoded", "districts"),
+                 ("crime",)),
+        ], cache_dir=os.path.join(self.dataset.sname, 'pipeline_cache'))
+
+    def _geocode_stations(self, station_names: list) -> tuple:
+        """
+        관서명 -> 카카오맵 검색 결과, 이번 실행의 캐시 적중/조회 통계
+
+        경찰서 위치는 바뀌지 않으므로 save/geocode_cache.sqlite 캐시를 먼저 보고,
+        캐시에 없는 관서만 카카오맵 API 로 동시에 조회
+        """
+        geocoded, stats = geocode_all(station_names)
+        # 검색어 순서로 정렬해서 같은 결과면 같은 해시가 되도록 함
+        return {name: geocoded.get(name, []) for name in station_names}, stats
     
-    def _clean_population_data(self, df_pop):
-        """인구 데이터 정리 메서드 (preprocess와 generate_heatmap에서 공통 사용)"""
-        logger.info("\n🧹 인구 데이터 컬럼 및 행 정리")
-        
-        # 1. axis=1: 자치구 컬럼과 좌로부터 4번째 컬럼만 남기고 나머지 삭제
-        if '자치구' in df_pop.columns:
-            # 자치구 컬럼의 인덱스 찾기
-            자치구_idx = df_pop.columns.get_loc('자치구')
-            # 좌로부터 4번째 컬럼 (인덱스 3)
-            if len(df_pop.columns) > 3:
-                cols_to_keep = [df_pop.columns[자치구_idx], df_pop.columns[3]]
-                df_pop = df_pop[cols_to_keep]
-                logger.info(f"  유지된 컬럼: {cols_to_keep}")
-            else:
-                logger.warning("  컬럼이 4개 미만입니다.")
-        
-        # 2. axis=0: 위로부터 2, 3, 4 번째 행 제거 (인덱스 1, 2, 3)
-        if len(df_pop) > 3:
-            df_pop = df_pop.drop(df_pop.index[1:4])  # 인덱스 1, 2, 3 제거
-            logger.info(f"  인덱스 1, 2, 3 행 제거 완료")
-        else:
-            logger.warning("  행이 4개 미만입니다.")
-        
-        # 3. 인구수 컬럼명을 '인구'로 변경 및 데이터 타입 변환
-        if len(df_pop.columns) >= 2:
-            # 두 번째 컬럼이 인구수 컬럼
-            pop_col = df_pop.columns[1]
-            df_pop = df_pop.rename(columns={pop_col: '인구'})
-            
-            # 숫자가 아닌 행 제거 (예: '계', '합계' 등)
-            df_pop = df_pop[df_pop['인구'].astype(str).str.replace(',', '').str.isdigit()]
-            
-            # 인구수 데이터 타입 변환 (쉼표 제거)
-            df_pop['인구'] = df_pop['인구'].astype(str).str.replace(',', '').astype(float)
-            logger.info(f"  인구 데이터 정리 완료")
-        
-        return df_pop
-        
+    # -----------------------------
+    # 히트맵
+    # -----------------------------
+    def crime_rate_store(self) -> CrimeRateStore:
+        """이 서비스의 데이터 경로에 해당하는 공용 범죄율 표 저장소"""
+        crime_csv_path = os.path.join(self.dataset.sname, 'crime_with_gu.csv')
+        pop_path = os.path.join(self.data_path, 'pop.xls')
+        with _STORE_LOCK:
+            key = (crime_csv_path, pop_path)
+            if key not in _CRIME_RATE_STORES:
+                _CRIME_RATE_STORES[key] = CrimeRateStore(self.method, crime_csv_path, pop_path)
+            return _CRIME_RATE_STORES[key]
+
+    def crime_rate_tables(self, crime_type: str = '발생') -> dict:
+        """
+        자치구별 범죄율 표 {"counts", "rate", "norm"}
+
+        히트맵 / 지도 / 범죄율 API 가 모두 이 표를 쓴다.
+        crime_with_gu.csv 나 pop.xls 가 바뀌면 저장소가 알아서 다시 계산한다.
+        """
+        return self.crime_rate_store().tables(crime_type)
+
+    def heatmap_matrix(self, crime_type: str = '발생') -> tuple:
+        """히트맵 정규화 행렬 (df_norm, df_grouped)"""
+        tables = self.crime_rate_tables(crime_type)
+        return tables["norm"], tables["counts"]
+
+    def crime_rates(self, crime_type: str = '발생', kind: str = 'norm', fmt: str = 'json') -> dict:
+        """
+        범죄율 표를 클라이언트 차트용 JSON / Arrow 바이트로 직렬화 (직렬화 결과도 캐시)
+
+        Args:
+            kind: 'norm' (MinMax 정규화), 'rate' (인구 10만명당), 'counts' (합산 건수)
+            fmt: 'json' (index/columns/data 분리형) 또는 'arrow' (Arrow IPC 스트림)
+
+        Returns:
+            {"etag", "content", "media_type"}
+        """
+        if kind not in CRIME_RATE_KINDS:
+            raise InvalidRequestError(f"kind는 {CRIME_RATE_KINDS} 중 하나여야 합니다. 현재 값: {kind}")
+        if fmt not in CRIME_RATE_MEDIA_TYPES:
+            raise InvalidRequestError(f"format은 {list(CRIME_RATE_MEDIA_TYPES)} 중 하나여야 합니다. 현재 값: {fmt}")
+        table = self.crime_rate_tables(crime_type)[kind]
+        etag = render_key(table, crime_type=crime_type, kind=kind, fmt=fmt)
+        with _PAYLOAD_LOCK:
+            content = _PAYLOAD_CACHE.get(etag)
+        if content is None:
+            content = _serialize_table(table, crime_type, kind, fmt)
+            with _PAYLOAD_LOCK:
+                # 표가 바뀌면 ETag 도 바뀌므로 이전 직렬화 결과는 같은 (crime_type, kind, fmt) 끼리 교체
+                for stale in [k for k, v in _PAYLOAD_KEYS.items() if v == (crime_type, kind, fmt)]:
+                    _PAYLOAD_CACHE.pop(stale, None)
+                    del _PAYLOAD_KEYS[stale]
+                _PAYLOAD_CACHE[etag] = content
+                _PAYLOAD_KEYS[etag] = (crime_type, kind, fmt)
+        return {"etag": etag, "content": content, "media_type": CRIME_RATE_MEDIA_TYPES[fmt]}
+
+    def seoul_geojson(self) -> tuple:
+        """
+        단순화된 서울 자치구 GeoJSON (파일 버전, GeoJSON)
+
+        kr-state.json 을 프로세스에서 한 번만 읽고 단순화한다 (파일이 바뀌면 다시 읽음).
+        """
+        global _GEOJSON
+        geo_path = os.path.join(self.data_path, 'kr-state.json')
+        version = _file_version(geo_path)
+        with _MAP_LOCK:
+            if _GEOJSON is None or _GEOJSON[0] != version:
+                with open(geo_path, 'r', encoding='utf-8') as f:
+                    seoul_geo = json.load(f)
+                simplified = self.method.simplify_geojson(seoul_geo)
+                before = len(json.dumps(seoul_geo, ensure_ascii=False))
+                after = len(json.dumps(simplified, ensure_ascii=False))
+                logger.info(f"🗺️ GeoJSON 로드 및 단순화: {len(simplified['features'])}개 구, {before:,} → {after:,} bytes")
+                _GEOJSON = (version, simplified)
+            return _GEOJSON
+
+    def district_index(self) -> DistrictIndex:
+        """
+        kr-state.json 자치구 경계의 STR 트리 공간 인덱스
+
+        프로세스에서 한 번만 만들고 파일이 바뀌면 다시 만든다. 지도용 단순화 GeoJSON 이 아니라
+        원본 경계를 써서 경계 근처 점도 원래 구에 배정한다.
+        """
+        global _DISTRICT_INDEX
+        geo_path = os.path.join(self.data_path, 'kr-state.json')
+        version = _file_version(geo_path)
+        with _DISTRICT_LOCK:
+            if _DISTRICT_INDEX is None or _DISTRICT_INDEX[0] != version:
+                with open(geo_path, 'r', encoding='utf-8') as f:
+                    index = DistrictIndex.from_geojson(json.load(f))
+                logger.info(f"🧭 자치구 공간 인덱스 생성: {len(index)}개 구")
+                _DISTRICT_INDEX = (version, index)
+            return _DISTRICT_INDEX[1]
+
+    def assign_districts(self, lat, lng) -> np.ndarray:
+        """위도 / 경도 배열 -> 자치구 이름 배열 (서울 밖이거나 좌표가 없으면 빈 문자열)"""
+        return self.district_index().assign(lat, lng)
+
+    def seoul_map(self, crime_type: str = '발생') -> dict:
+        """
+        자치구 범죄율 Folium 지도 HTML (crime_type 별로 미리 만들어 두고 재사용)
+
+        지도 키는 정규화 범죄율 표 내용 + GeoJSON 버전의 해시라서 범죄 데이터가 바뀔 때만 다시 만든다.
+        HTML 은 만들 때 gzip(과 brotli 가 설치돼 있으면 br)로 한 번 압축해 둔다.
+
+        Returns:
+            {"etag", "bodies": {인코딩: 바이트}, "built", "data_summary"}
+        """
+        df_norm = self.crime_rate_tables(crime_type)["norm"]
+        geo_version, seoul_geo = self.seoul_geojson()
+        etag = render_key(df_norm, crime_type=crime_type, geojson=geo_version, kind='folium')
+        with _MAP_LOCK:
+            cached = _MAP_CACHE.get(crime_type)
+        if cached is not None and cached["etag"] == etag:
+            return {**cached, "built": False}
+
+        m, crime_rate_data = self.method.build_folium_map(df_norm, seoul_geo, crime_type)
+        bodies = _compress(m.get_root().render().encode('utf-8'))
+        entry = {
+            "etag": etag,
+            "bodies": bodies,
+            "data_summary": {
+                "total_districts": len(crime_rate_data),
+                "crime_type": crime_type,
+                "html_bytes": {encoding: len(body) for encoding, body in bodies.items()},
+                "crime_rate_preview": crime_rate_data.head(10).to_dict(orient='records')
+            },
+        }
+        with _MAP_LOCK:
+            _MAP_CACHE[crime_type] = entry
+        logger.info(f"🗺️ {crime_type} 지도 생성: {entry['data_summary']['html_bytes']}")
+        return {**entry, "built": True}
+
+    # -----------------------------
+    # 사건 단위 데이터
+    # -----------------------------
+    def incidents_path(self) -> str:
+        """
+        사건 좌표 파일 경로
+
+        SEOUL_INCIDENTS_PATH 환경 변수가 있으면 그 파일, 없으면 save/incidents.parquet → save/incidents.csv 순서
+        """
+        path = os.getenv('SEOUL_INCIDENTS_PATH')
+        if path:
+            return path
+        for suffix in INCIDENT_SUFFIXES:
+            candidate = os.path.join(self.dataset.sname, f'incidents{suffix}')
+            if os.path.exists(candidate):
+                return candidate
+        raise FileNotFoundError("사건 파일이 없습니다. POST /seoul/incidents 로 업로드하거나 SEOUL_INCIDENTS_PATH 를 지정하세요.")
+
+    def save_incidents(self, tmp_path: str, suffix: str) -> dict:
+        """
+        업로드된 사건 파일(CSV / Parquet)을 save/incidents.{확장자} 로 옮기고 기본 격자로 집계
+
+        위도/경도 컬럼을 먼저 확인해서 읽을 수 없는 파일은 기존 파일을 덮어쓰지 않는다.
+        """
+        if suffix not in INCIDENT_SUFFIXES:
+            raise InvalidRequestError(f"사건 파일은 {INCIDENT_SUFFIXES} 형식이어야 합니다. 현재 값: {suffix}")
+        incident_columns(tmp_path)
+        os.makedirs(self.dataset.sname, exist_ok=True)
+        save_path = os.path.join(self.dataset.sname, f'incidents{suffix}')
+        os.replace(tmp_path, save_path)
+        # 다른 형식의 예전 파일이 먼저 선택되지 않도록 정리
+        for other in INCIDENT_SUFFIXES:
+            other_path = os.path.join(self.dataset.sname, f'incidents{other}')
+            if other != suffix and os.path.exists(other_path):
+                os.remove(other_path)
+        logger.info(f"💾 사건 파일 저장: {save_path} ({os.path.getsize(save_path):,} bytes)")
+        return self.incident_aggregate()
+
+    def _incident_entry(self, grid: str, cell_m: float, chunksize: int) -> dict:
+        """사건 파일 집계 메모 (파일이나 자치구 경계가 바뀌면 다시 집계)"""
+        path = self.incidents_path()
+        districts = self.district_index()
+        key = (path, _file_version(path), _DISTRICT_INDEX[0], grid, float(cell_m))
+        with _INCIDENT_LOCK:
+            entry = _INCIDENT_CACHE.get(key)
+        if entry is not None:
+            return entry
+
+        aggregator = aggregate_incidents(path, districts, IncidentGrid(districts.extent, grid, cell_m), chunksize)
+        cells_geo = aggregator.cells_geojson()
+        entry = {
+            "key": key,
+            "etag": render_key(aggregator.cell_counts, key=str(key), kind='incidents'),
+            "aggregator": aggregator,
+            "cells_geo": cells_geo,
+            "cells_body": _compress(json.dumps(cells_geo, ensure_ascii=False, separators=(',', ':')).encode('utf-8')),
+            "map": None,
+        }
+        with _INCIDENT_LOCK:
+            while len(_INCIDENT_CACHE) >= _INCIDENT_MAX_ITEMS:
+                _INCIDENT_CACHE.pop(next(iter(_INCIDENT_CACHE)))
+            _INCIDENT_CACHE[key] = entry
+        return entry
+
+    def incident_aggregate(self, grid: str = 'hex', cell_m: float = 500, chunksize: int = 500_000) -> dict:
+        """
+        사건 파일을 chunksize 행씩 읽어 자치구 / 격자 칸별 사건 수 집계
+
+        Returns:
+            {"status", "file", "summary", "districts": [{자치구, 사건수}], "etag"}
+        """
+        entry = self._incident_entry(grid, cell_m, chunksize)
+        aggregator = entry["aggregator"]
+        return {
+            "status": "success",
+            "file": os.path.basename(entry["key"][0]),
+            "summary": aggregator.summary(),
+            "districts": aggregator.district_table().to_dict(orient='records'),
+            "etag": entry["etag"],
+        }
+
+    def incident_cells(self, grid: str = 'hex', cell_m: float = 500) -> dict:
+        """
+        사건이 있는 격자 칸 GeoJSON (지도 타일 / 클라이언트 레이어용)
+
+        Returns:
+            {"etag", "bodies": {인코딩: 바이트}}
+        """
+        entry = self._incident_entry(grid, cell_m, 500_000)
+        return {"etag": entry["etag"], "bodies": entry["cells_body"]}
+
+    def incident_map(self, grid: str = 'hex', cell_m: float = 500) -> dict:
+        """
+        자치구 사건 수 단계구분도 + 격자 칸 레이어 Folium 지도 HTML (집계가 같으면 한 번만 만듦)
+
+        Returns:
+            {"etag", "bodies": {인코딩: 바이트}, "built"}
+        """
+        entry = self._incident_entry(grid, cell_m, 500_000)
+        with _INCIDENT_LOCK:
+            bodies = entry["map"]
+        if bodies is not None:
+            return {"etag": entry["etag"], "bodies": bodies, "built": False}
+
+        aggregator = entry["aggregator"]
+        _, seoul_geo = self.seoul_geojson()
+        # 지도 레이어가 칸 색을 properties 에 써 넣으므로 캐시된 GeoJSON 대신 새로 만든 것을 넘김
+        m = self.method.build_incident_map(aggregator.cells_geojson(), aggregator.district_table(), seoul_geo,
+                                           grid_label=f"{grid} {cell_m:g}m")
+        bodies = _compress(m.get_root().render().encode('utf-8'))
+        with _INCIDENT_LOCK:
+            entry["map"] = bodies
+        logger.info(f"🗺️ 사건 지도 생성 ({grid} {cell_m:g}m): {({k: len(v) for k, v in bodies.items()})}")
+        return {"etag": entry["etag"], "bodies": bodies, "built": True}
+
+    # -----------------------------
+    # CCTV 배치
+    # -----------------------------
+    def cctv_allocator(self, weight: str = 'count', coverage_m2: float = 20_000) -> CctvAllocator:
+        """
+        구별 CCTV 배치 최적화기 (CCTV + 인구 머지, 발생 범죄 표, 자치구 면적으로 만든 입력)
+
+        입력 파일(cctv.csv, pop.xls, crime_with_gu.csv, kr-state.json)이 그대로면 만들어 둔 것을 재사용한다.
+        """
+        cctv_path = os.path.join(self.data_path, 'cctv.csv')
+        store = self.crime_rate_store()
+        districts = self.district_index()
+        key = (_file_version(cctv_path), store.version(), _DISTRICT_INDEX[0], weight, float(coverage_m2))
+        with _CCTV_LOCK:
+            allocator = _CCTV_ALLOCATORS.get(key)
+        if allocator is not None:
+            return allocator
+
+        df_cctv_pop = self.method.merge_cctv_pop(self.method.load_cctv(cctv_path),
+                                                 self.method.load_population(store.pop_path))
+        areas = dict(zip(districts.names, districts.areas_m2()))
+        inputs = self.method.cctv_allocation_inputs(df_cctv_pop, self.crime_rate_tables('발생'), areas, weight)
+        allocator = CctvAllocator(inputs, coverage_m2)
+        with _CCTV_LOCK:
+            # 데이터 버전이 바뀌면 예전 최적화기는 버림
+            for old_key in [k for k in _CCTV_ALLOCATORS if k[:3] != key[:3]]:
+                del _CCTV_ALLOCATORS[old_key]
+            _CCTV_ALLOCATORS[key] = allocator
+        logger.info(f"📹 CCTV 배치 입력 준비: {len(inputs)}개 구 (weight={weight}, coverage_m2={coverage_m2:g})")
+        return allocator
+
+    def allocate_cctv(self, budget: int, weight: str = 'count', coverage_m2: float = 20_000,
+                      max_per_district: int = None) -> dict:
+        """
+        CCTV 추가 예산 budget 대를 범죄 가중 커버리지가 최대가 되도록 자치구에 배치
+
+        Returns:
+            {"status", "weight", "coverage_m2", "budget", "allocated", "objective_before", "objective_after",
+             "improvement_pct", "elapsed_ms", "districts"}
+        """
+        result = self.cctv_allocator(weight, coverage_m2).allocate(budget, max_per_district)
+        return {"status": "success", "weight": weight, "coverage_m2": coverage_m2, **result}
+
+    def sweep_cctv(self, budgets: list, weight: str = 'count', coverage_m2: float = 20_000,
+                   max_per_district: int = None) -> dict:
+        """여러 예산의 배치 효과 곡선 (예산을 바꿔 가며 비교할 때)"""
+        allocator = self.cctv_allocator(weight, coverage_m2)
+        started = time.perf_counter()
+        curve = allocator.sweep(budgets, max_per_district)
+        return {
+            "status": "success",
+            "weight": weight,
+            "coverage_m2": coverage_m2,
+            "objective_before": round(allocator.objective(allocator.existing), 4),
+            "curve": curve,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _variant(self, df_norm: pd.DataFrame, crime_type: str, style: str, size: str) -> tuple:
+        """(캐시 키, 렌더링 옵션) - 키는 정규화 행렬 내용 + 모든 렌더링 옵션의 해시"""
+        options = self.method.heatmap_variant(crime_type, style, size)
+        return render_key(df_norm, **options), options
+
+    def heatmap(self, crime_type: str = '발생', style: str = None, size: str = 'print') -> dict:
+        """
+        히트맵 이미지 한 장 (렌더링 캐시 사용)
+
+        캐시 키는 정규화 행렬 내용 + crime_type + 컬러맵 + dpi + 크기 + 형식의 해시이고, 그대로 ETag 로 쓴다.
+        캐시에 있으면 메모리/디스크에서 바로 돌려주고, 없을 때만 렌더링한다.
+
+        Args:
+            style: 컬러맵 이름 (기본값: 발생은 Reds, 검거는 Blues)
+            size: 크기 프리셋 (thumbnail / web / print / svg)
+
+        Returns:
+            {"etag", "content", "format", "path", "cache", "data_summary"}
+        """
+        df_norm, df_grouped = self.heatmap_matrix(crime_type)
+        key, options = self._variant(df_norm, crime_type, style, size)
+        content, status = _HEATMAP_CACHE.get_or_render(
+            key, partial(_render_variant, df_norm, options), options["fmt"])
+        logger.info(f"🗺️ {crime_type} 히트맵 ({options['cmap']}, {size}): {status}")
+        return {
+            "etag": key,
+            "content": content,
+            "format": options["fmt"],
+            "path": _HEATMAP_CACHE.path(key, options["fmt"]),
+            "cache": status,
+            "data_summary": self.method.heatmap_summary(df_norm, df_grouped),
+        }
+
+    def heatmap_variants(self, crime_type: str = '발생', styles: list = None, sizes: list = None) -> list:
+        """
+        여러 스타일 × 크기 히트맵을 한 번에 렌더링 (미리 만들어 두기용)
+
+        정규화 행렬은 한 번만 계산하고, 캐시에 없는 변형만 프로세스 풀에서 동시에 렌더링한다.
+        변형마다 키가 따로라서 각각 독립적으로 캐시되고, heatmap 과 같은 키별 잠금(get_or_render)을 거치므로
+        다른 요청이 같은 변형을 렌더링하는 중이면 다시 그리지 않고 그 결과를 기다린다.
+
+        Returns:
+            변형별 {"style", "size", "etag", "format", "path", "cache"} 목록 (이미지 바이트 제외)
+        """
+        df_norm, _ = self.heatmap_matrix(crime_type)
+        styles = styles or [None]
+        sizes = sizes or list(self.method.HEATMAP_SIZES)
+
+        variants, missing = [], {}
+        for style in dict.fromkeys(styles):
+            for size in dict.fromkeys(sizes):
+                key, options = self._variant(df_norm, crime_type, style, size)
+                _, status = _HEATMAP_CACHE.get(key, options["fmt"])
+                variants.append({"style": options["cmap"], "size": size, "etag": key, "format": options["fmt"],
+                                 "path": _HEATMAP_CACHE.path(key, options["fmt"]), "cache": status})
+                if status == "miss":
+                    missing[key] = options
+
+        if missing:
+            # 변형이 하나뿐이면 프로세스 간 전송 없이 현재 프로세스에서 그림
+            render = _render_variant if len(missing) == 1 else _render_pooled
+            with ThreadPoolExecutor(max_workers=len(missing)) as threads:
+                futures = {
+                    key: threads.submit(_HEATMAP_CACHE.get_or_render, key, partial(render, df_norm, options),
+                                        options["fmt"])
+                    for key, options in missing.items()
+                }
+                statuses = {key: future.result()[1] for key, future in futures.items()}
+            for variant in variants:
+                variant["cache"] = statuses.get(variant["etag"], variant["cache"])
+            logger.info(f"🎨 {crime_type} 히트맵 변형 {len(missing)}개 렌더링 (전체 {len(variants)}개)")
+        return variants
+
+    def heatmap_info(self, crime_type: str = '발생') -> dict:
+        """렌더링 없이 행렬 요약과 기본 히트맵(print)의 ETag / 캐시 여부만 조회"""
+        df_norm, df_grouped = self.heatmap_matrix(crime_type)
+        key, options = self._variant(df_norm, crime_type, None, 'print')
+        path = _HEATMAP_CACHE.path(key, options["fmt"])
+        return {
+            "etag": key,
+            "heatmap_files": [path] if os.path.exists(path) else [],
+            "data_summary": self.method.heatmap_summary(df_norm, df_grouped),
+        }
+
     def generate_heatmap(self):
         """
-        서울 범죄 발생 데이터 히트맵 생성
+        서울 범죄 발생 데이터 히트맵 생성 (save/heatmap.png)
         
-        SeoulMethod의 generate_heatmap 메서드를 호출하여 전체 프로세스를 수행합니다.
+        공용 범죄율 표와 렌더링 캐시를 거친 기본(print) 히트맵을 save 폴더에 저장합니다.
         """
-        try:
-            # 한글 폰트 재설정 (히트맵 생성 전)
-            setup_korean_font()
-            
-            # 파일 경로 설정
-            crime_csv_path = os.path.join(self.dataset.sname, 'crime_with_gu.csv')
-            pop_path = os.path.join(self.data_path, 'pop.xls')
-            save_dir = self.dataset.sname
-            
-            # SeoulMethod의 generate_heatmap 메서드 호출 (전체 프로세스 포함)
-            result = self.method.generate_heatmap(
-                crime_csv_path=crime_csv_path,
-                pop_path=pop_path,
-                save_dir=save_dir,
-                df_pop_cleaned=self.df_pop_cleaned,
-                crime_type='발생'
-            )
-            
-            return result
-            
-        except Exception as e:
-            import traceback
-            error_detail = traceback.format_exc()
-            logger.error(f"❌ 히트맵 생성 오류: {str(e)}")
-            logger.error(error_detail)
-            raise
+        return self._save_heatmap('발생')
     
     def generate_heatmap_arrest(self):
         """
-        서울 범죄 검거 데이터 히트맵 생성
+        서울 범죄 검거 데이터 히트맵 생성 (save/heatmap_arrest.png)
         
-        SeoulMethod의 generate_heatmap 메서드를 호출하여 검거 히트맵을 생성합니다.
+        공용 범죄율 표와 렌더링 캐시를 거친 기본(print) 검거 히트맵을 save 폴더에 저장합니다.
         """
+        return self._save_heatmap('검거')
+
+    def _save_heatmap(self, crime_type: str) -> dict:
         try:
-            # 한글 폰트 재설정 (히트맵 생성 전)
-            setup_korean_font()
-            
-            # 파일 경로 설정
-            crime_csv_path = os.path.join(self.dataset.sname, 'crime_with_gu.csv')
-            pop_path = os.path.join(self.data_path, 'pop.xls')
-            save_dir = self.dataset.sname
-            
-            # SeoulMethod의 generate_heatmap 메서드 호출 (검거 데이터)
-            result = self.method.generate_heatmap(
-                crime_csv_path=crime_csv_path,
-                pop_path=pop_path,
-                save_dir=save_dir,
-                df_pop_cleaned=self.df_pop_cleaned,
-                crime_type='검거'
-            )
-            
-            return result
+            result = self.heatmap(crime_type)
+            os.makedirs(self.dataset.sname, exist_ok=True)
+            heatmap_path = os.path.join(self.dataset.sname, self.method.HEATMAP_SPECS[crime_type][4])
+            tmp_path = f"{heatmap_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(result["content"])
+            os.replace(tmp_path, heatmap_path)
+            logger.info(f"  ✅ 히트맵 저장: {heatmap_path}")
+            return {
+                "status": "success",
+                "message": "히트맵 생성이 완료되었습니다",
+                "heatmap_files": [heatmap_path],
+                "data_summary": result["data_summary"]
+            }
             
         except Exception as e:
             import traceback
             error_detail = traceback.format_exc()
-            logger.error(f"❌ 검거 히트맵 생성 오류: {str(e)}")
+            logger.error(f"❌ {crime_type} 히트맵 생성 오류: {str(e)}")
             logger.error(error_detail)
             raise
-
-        
@@ -0,0 +1,123 @@
+"""
+타이타닉 전처리 메모리/시간 프로파일
+
+기존 방식(train/test 각각 inplace 수정 + age_ratio 에서 concat + 행 단위 apply)과
+현재 방식(합친 프레임 한 번 처리, category/int8 dtype)의 최대 메모리와 소요 시간을 비교한다.
+
+실행 (mlservice 디렉토리에서):
+    python -m app.titanic.titanic_benchmark --scale 1 20 100
+"""
+import os
+import time
+import argparse
+import warnings
+import tracemalloc
+import numpy as np
+import pandas as pd
+from app.titanic.titanic_method import TitanicMethod, RAW_DTYPES
+
+
+def _scaled_frames(scale: int):
+    """train/test 원본을 scale 배로 복제 (PassengerId 는 겹치지 않게 재부여)"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    train = pd.read_csv(os.path.join(current_dir, 'train.csv'))
+    test = pd.read_csv(os.path.join(current_dir, 'test.csv'))
+    train = pd.concat([train] * scale, ignore_index=True)
+    test = pd.concat([test] * scale, ignore_index=True)
+    train["PassengerId"] = np.arange(1, len(train) + 1)
+    test["PassengerId"] = np.arange(len(train) + 1, len(train) + len(test) + 1)
+    return train, test
+
+
+def legacy_preprocess(df_train: pd.DataFrame, df_test: pd.DataFrame):
+    """이전 버전 TitanicService.preprocess 의 전처리 흐름 (비교용으로만 보관)"""
+    for df in (df_train, df_test):
+        df["FamilySize"] = df["SibSp"] + df["Parch"] + 1
+        df["IsAlone"] = (df["FamilySize"] == 1).astype(int)
+    train = df_train.drop(columns=["Survived"], errors="ignore")
+    label = df_train[["Survived"]]
+    test = df_test.drop(columns=["Survived"], errors="ignore")
+    for df in (train, test):
+        df.drop(columns=['SibSp', 'Parch', 'Ticket', 'Cabin'], errors="ignore", inplace=True)
+        df["Pclass"] = df["Pclass"].astype(int)
+
+    median_val = train["Fare"].median()
+    train["Fare"].fillna(median_val, inplace=True)
+    test["Fare"].fillna(median_val, inplace=True)
+    bins = pd.qcut(train["Fare"], q=4, retbins=True, duplicates="drop")[1]
+    train["Fare"] = pd.cut(train["Fare"], bins=bins, labels=False, include_lowest=True).astype(int)
+    test["Fare"] = pd.cut(test["Fare"], bins=bins, labels=False, include_lowest=True).astype(int)
+
+    mode_val = train["Embarked"].mode()[0]
+    train["Embarked"].fillna(mode_val, inplace=True)
+    test["Embarked"].fillna(mode_val, inplace=True)
+    for df in (train, test):
+        df["Embarked"] = df["Embarked"].map({"S": 0, "C": 1, "Q": 2}).astype(int)
+        df["Sex"] = df["Sex"].map({"male": 0, "female": 1}).astype(int)
+        df["Title"] = df["Name"].str.extract(r',\s*([^\.]+)\.', expand=False)
+        df["Title"] = df["Title"].replace([
+            "Lady", "Countess", "Capt", "Col", "Don", "Dr", "Major", "Rev",
+            "Sir", "Jonkheer", "Dona"
+        ], "Rare")
+        df["Title"] = df["Title"].map({"Master": 0, "Miss": 1, "Mr": 2, "Mrs": 3, "Rare": 4}).fillna(4).astype(int)
+
+    combined = pd.concat([train, test], ignore_index=True)
+    title_medians = combined.groupby("Title")["Age"].median()
+    global_median = combined["Age"].median()
+    for df in (train, test):
+        df["Age"] = df.apply(
+            lambda row: title_medians[row["Title"]] if pd.isna(row["Age"]) else row["Age"],
+            axis=1
+        )
+        df["Age"].fillna(global_median, inplace=True)
+        df.drop(columns=['Name'], errors="ignore", inplace=True)
+    return train, test, label
+
+
+def current_preprocess(df_train: pd.DataFrame, df_test: pd.DataFrame):
+    """현재 TitanicMethod 흐름"""
+    train, test, label, _ = TitanicMethod().build_features(df_train, df_test)
+    return train, test, label
+
+
+def profile(fn, df_train: pd.DataFrame, df_test: pd.DataFrame) -> dict:
+    """입력 프레임 이후에 새로 할당된 메모리의 최대값, 소요 시간, 경고 수 측정"""
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        tracemalloc.start()
+        started = time.perf_counter()
+        train, test, _ = fn(df_train, df_test)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "peak_mb": peak / 1024 ** 2,
+        "seconds": elapsed,
+        "warnings": len(caught),
+        "result_mb": (train.memory_usage(deep=True).sum() + test.memory_usage(deep=True).sum()) / 1024 ** 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타이타닉 전처리 메모리 프로파일")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 20, 100],
+                        help="원본 데이터 복제 배수 목록")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'rows':>9} | {'방식':<8} {'peak MB':>9} {'result MB':>10} {'seconds':>8} {'warnings':>8}")
+    print("-" * 72)
+    for scale in args.scale:
+        train, test = _scaled_frames(scale)
+        rows = len(train) + len(test)
+        legacy = profile(legacy_preprocess, train.copy(), test.copy())
+        # 현재 방식은 category/int8 dtype 으로 읽는 것까지 흐름에 포함
+        train_typed = train.astype({k: v for k, v in RAW_DTYPES.items() if k in train.columns})
+        test_typed = test.astype({k: v for k, v in RAW_DTYPES.items() if k in test.columns})
+        current = profile(current_preprocess, train_typed, test_typed)
+        for name, result in (("legacy", legacy), ("current", current)):
+            print(f"{scale:>6} {rows:>9} | {name:<8} {result['peak_mb']:>9.2f} {result['result_mb']:>10.2f} "
+                  f"{result['seconds']:>8.3f} {result['warnings']:>8}")
+
+
+if __name__ == "__main__":
+    main()
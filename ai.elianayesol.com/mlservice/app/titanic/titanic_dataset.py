@@ -1,74 +1,7 @@
 from dataclasses import dataclass
-import pandas as pd
-
-
-@dataclass  # 데이터웨어하우스에서 일부분 발췌하는 데코레이터
-class DataSet(object):
-    _fname: str = ''  # file name
-    _dname: str = ''  # data path
-    _sname: str = ''  # save path
-    _train: pd.DataFrame = None
-    _test: pd.DataFrame = None
-    _id: str = ''
-    _label: str = ''
-
-    @property  # 필요한 부분만 읽게 하는 것
-    def fname(self) -> str:
-        return self._fname
-
-    @fname.setter
-    def fname(self, fname):
-        self._fname = fname
-
-    @property
-    def dname(self) -> str:
-        return self._dname
-
-    @dname.setter
-    def dname(self, dname):
-        self._dname = dname
-
-    @property
-    def sname(self) -> str:
-        return self._sname
-
-    @sname.setter
-    def sname(self, sname):
-        self._sname = sname
-
-    @property
-    def train(self) -> object:
-        return self._train
-
-    @train.setter
-    def train(self, train):
-        self._train = train
-
-    @property
-    def test(self) -> object:
-        return self._test
-
-    @test.setter
-    def test(self, test):
-        self._test = test
-
-    @property
-    def id(self) -> str:
-        return self._id
-
-    @id.setter
-    def id(self, id):
-        self._id = id
-
-    @property
-    def label(self) -> str:
-        return self._label
-
-    @label.setter
-    def label(self, label):
-        self._label = label
+from app.common.dataset import DataSet  # noqa: F401 (기존 import 경로 유지)
 
 
+@dataclass
 class TitanicDataset(DataSet):
-    """타이타닉 데이터셋 클래스"""
-    pass
\ No newline at end of file
+    """타이타닉 데이터셋 클래스 (train/test 는 전처리 파이프라인 결과, state 는 단계별 학습 통계)"""
@@ -1,9 +1,53 @@
+import os
+import numpy as np
 import pandas as pd
+from functools import partial
 from pandas import DataFrame
-from app.titanic.titanic_dataset import TitanicDataset
+from app.common.method import TabularMethod
+from app.common.pipeline import Pipeline, Step
 
+# 전처리 로직이 바뀌면 올려서 저장된 모델 아티팩트와 단계 캐시를 무효화
+FEATURE_VERSION = 3
 
-class TitanicMethod(object):
+# 원본 CSV 읽기 dtype (문자열 범주는 category, 작은 정수는 int8)
+RAW_DTYPES = {
+    "PassengerId": "int32",
+    "Pclass": "int8",
+    "Sex": "category",
+    "SibSp": "int8",
+    "Parch": "int8",
+    "Embarked": "category",
+}
+
+RARE_TITLES = [
+    "Lady", "Countess", "Capt", "Col", "Don", "Dr", "Major", "Rev",
+    "Sir", "Jonkheer", "Dona"
+]
+# 코드 순서 = 리스트 순서 (Master=0, Miss=1, Mr=2, Mrs=3, Rare=4)
+TITLE_CATEGORIES = ["Master", "Miss", "Mr", "Mrs", "Rare"]
+SEX_CATEGORIES = ["male", "female"]
+EMBARKED_CATEGORIES = ["S", "C", "Q"]
+
+SPLIT_COLUMN = "Split"
+
+
+def _file_version(path: str) -> tuple:
+    """원본 파일 버전 (수정 시각, 크기) - 파일이 바뀌면 읽기 단계 캐시 무효화"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TitanicMethod(TabularMethod):
+    """
+    타이타닉 전처리 단계 모음
+
+    train/test 를 split 표시 컬럼이 있는 하나의 프레임으로 합친 뒤
+    모든 단계가 그 프레임의 컬럼을 통째로 교체하는 방식으로 동작한다.
+    (열 뷰에 대한 inplace 수정/연쇄 할당이 없어 pandas 복사 경고가 발생하지 않음)
+
+    단계 순서는 pipeline() 의 Step 선언이 정하고, 통계값(최빈값, 중앙값, 구간 경계)은
+    단계별 state 가 비어 있을 때만 train 행으로 계산한다. 같은 단계로 외부 데이터도 변환할 수 있다.
+    """
 
     def __init__(self):
         pass
@@ -11,132 +55,176 @@ class TitanicMethod(object):
     # -----------------------------
     # 기본 처리
     # -----------------------------
-    def read_csv(self, train_path: str, test_path: str):
-        return pd.read_csv(train_path), pd.read_csv(test_path)
+    def read_csv(self, path: str, dtype: dict = None) -> DataFrame:
+        return pd.read_csv(path, dtype=RAW_DTYPES if dtype is None else dtype)
 
-    def create_df(self, df: DataFrame, label: str) -> DataFrame:
-        return df.drop(columns=[label], errors="ignore")
+    def create_frame(self, train_df: DataFrame, test_df: DataFrame, label: str):
+        """train/test 를 하나의 프레임으로 합치고 라벨을 분리 (전체 과정에서 유일한 데이터 복사)"""
+        parts = [df for df in (train_df, test_df) if df is not None]
+        n_train = 0 if train_df is None else len(train_df)
+        frame = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
 
-    def create_label(self, df: DataFrame, label: str) -> DataFrame:
-        return df[[label]]
+        labels = frame.pop(label) if label in frame.columns else None
+        labels = None if labels is None else labels.iloc[:n_train].astype("int8").to_frame()
 
-    # -----------------------------
-    # 공통: TitanicDataset 구조 기반 처리
-    # -----------------------------
-    def drop_features(self, this: TitanicDataset, *features: str):
-        this.train.drop(columns=list(features), errors="ignore", inplace=True)
-        this.test.drop(columns=list(features), errors="ignore", inplace=True)
-        return this
+        split_codes = np.zeros(len(frame), dtype=np.int8)
+        split_codes[n_train:] = 1
+        frame[SPLIT_COLUMN] = pd.Categorical.from_codes(split_codes, categories=["train", "test"])
+        return frame, labels
+
+    def split_frame(self, frame: DataFrame):
+        """split 표시 컬럼을 제거하고 train/test 를 행 구간 슬라이스로 나눔"""
+        n_train = int((frame[SPLIT_COLUMN].cat.codes == 0).sum())
+        del frame[SPLIT_COLUMN]
+        train = frame.iloc[:n_train]
+        test = frame.iloc[n_train:]
+        test.index = pd.RangeIndex(len(test))
+        return train, test
+
+    def _train_rows(self, frame: DataFrame) -> np.ndarray:
+        return (frame[SPLIT_COLUMN].cat.codes == 0).to_numpy()
+
+    @staticmethod
+    def _codes(values: pd.Series, categories: list) -> np.ndarray:
+        """고정된 범주 순서로 int8 코드 생성 (범주에 없는 값/결측은 -1)"""
+        return pd.Categorical(values, categories=categories).codes.astype(np.int8)
 
     # -----------------------------
-    # 결측치 체크
+    # FamilySize / IsAlone 생성
     # -----------------------------
-    def check_null(self, this: TitanicDataset):
-        return this.train.isnull().sum(), this.test.isnull().sum()
+    def family_features(self, frame: DataFrame):
+        frame["FamilySize"] = (frame["SibSp"] + frame["Parch"] + 1).astype("int8")
+        frame["IsAlone"] = (frame["FamilySize"] == 1).astype("int8")
+        return frame
 
     # -----------------------------
     # Pclass (Ordinal)
     # -----------------------------
-    def pclass_ordinal(self, this: TitanicDataset):
-        this.train["Pclass"] = this.train["Pclass"].astype(int)
-        this.test["Pclass"] = this.test["Pclass"].astype(int)
-        return this
+    def pclass_ordinal(self, frame: DataFrame):
+        frame["Pclass"] = frame["Pclass"].astype("int8")
+        return frame
 
     # -----------------------------
     # Title 생성 + Rare 통합
     # -----------------------------
-    def title_nominal(self, this: TitanicDataset):
-
-        def extract(df):
-            return df["Name"].str.extract(r',\s*([^\.]+)\.', expand=False)
-
-        this.train["Title"] = extract(this.train)
-        this.test["Title"] = extract(this.test)
-
-        rare_titles = [
-            "Lady", "Countess", "Capt", "Col", "Don", "Dr", "Major", "Rev",
-            "Sir", "Jonkheer", "Dona"
-        ]
-
-        this.train["Title"] = this.train["Title"].replace(rare_titles, "Rare")
-        this.test["Title"] = this.test["Title"].replace(rare_titles, "Rare")
-
-        mapping = {
-            "Master": 0,
-            "Miss": 1,
-            "Mr": 2,
-            "Mrs": 3,
-            "Rare": 4
-        }
-
+    def title_nominal(self, frame: DataFrame):
+        title = frame["Name"].str.extract(r',\s*([^\.]+)\.', expand=False)
+        title = title.where(~title.isin(RARE_TITLES), "Rare")
+        codes = self._codes(title, TITLE_CATEGORIES)
         # 매핑되지 않은 값(NaN 포함)은 "Rare"(4)로 처리
-        this.train["Title"] = this.train["Title"].map(mapping).fillna(4).astype(int)
-        this.test["Title"] = this.test["Title"].map(mapping).fillna(4).astype(int)
-
-        return this
+        codes[codes < 0] = TITLE_CATEGORIES.index("Rare")
+        frame["Title"] = codes
+        return frame
 
     # -----------------------------
     # Sex encoding
     # -----------------------------
-    def gender_nominal(self, this: TitanicDataset):
-        mapping = {"male": 0, "female": 1}
-        this.train["Sex"] = this.train["Sex"].map(mapping).astype(int)
-        this.test["Sex"] = this.test["Sex"].map(mapping).astype(int)
-        return this
+    def gender_nominal(self, frame: DataFrame):
+        codes = self._codes(frame["Sex"], SEX_CATEGORIES)
+        codes[codes < 0] = 0
+        frame["Sex"] = codes
+        return frame
 
     # -----------------------------
     # Embarked encoding
     # -----------------------------
-    def embarked_nominal(self, this: TitanicDataset):
-
-        mode_val = this.train["Embarked"].mode()[0]
+    def embarked_nominal(self, frame: DataFrame, state: dict):
+        if "embarked_mode" not in state:
+            state["embarked_mode"] = str(frame.loc[self._train_rows(frame), "Embarked"].mode()[0])
+        mode_code = EMBARKED_CATEGORIES.index(state["embarked_mode"])
 
-        this.train["Embarked"].fillna(mode_val, inplace=True)
-        this.test["Embarked"].fillna(mode_val, inplace=True)
-
-        mapping = {"S": 0, "C": 1, "Q": 2}
-
-        this.train["Embarked"] = this.train["Embarked"].map(mapping).astype(int)
-        this.test["Embarked"] = this.test["Embarked"].map(mapping).astype(int)
-
-        return this
+        codes = self._codes(frame["Embarked"], EMBARKED_CATEGORIES)
+        codes[codes < 0] = mode_code
+        frame["Embarked"] = codes
+        return frame
 
     # -----------------------------
     # Fare (qcut)
     # -----------------------------
-    def fare_ordinal(self, this: TitanicDataset):
-
-        median_val = this.train["Fare"].median()
+    def fare_ordinal(self, frame: DataFrame, state: dict):
+        if "fare_bins" not in state:
+            train_fare = frame.loc[self._train_rows(frame), "Fare"]
+            median_val = train_fare.median()
+            train_bins = pd.qcut(train_fare.fillna(median_val), q=4, retbins=True, duplicates="drop")[1]
+            state["fare_median"] = float(median_val)
+            state["fare_bins"] = train_bins.tolist()
 
-        this.train["Fare"].fillna(median_val, inplace=True)
-        this.test["Fare"].fillna(median_val, inplace=True)
-
-        train_bins = pd.qcut(this.train["Fare"], q=4, retbins=True, duplicates="drop")[1]
-
-        this.train["Fare"] = pd.cut(this.train["Fare"], bins=train_bins, labels=False, include_lowest=True).astype(int)
-        this.test["Fare"] = pd.cut(this.test["Fare"], bins=train_bins, labels=False, include_lowest=True).astype(int)
-
-        return this
+        bins = state["fare_bins"]
+        fare = frame["Fare"].fillna(state["fare_median"]).clip(bins[0], bins[-1])
+        frame["Fare"] = pd.cut(fare, bins=bins, labels=False, include_lowest=True).astype("int8")
+        return frame
 
     # -----------------------------
     # Age imputing (Title 기반)
     # -----------------------------
-    def age_ratio(self, this: TitanicDataset):
-
-        combined = pd.concat([this.train, this.test], ignore_index=True)
-
-        title_medians = combined.groupby("Title")["Age"].median()
-        global_median = combined["Age"].median()
-
-        def fill(df):
-            df["Age"] = df.apply(
-                lambda row: title_medians[row["Title"]] if pd.isna(row["Age"]) else row["Age"],
-                axis=1
-            )
-            df["Age"].fillna(global_median, inplace=True)
-            return df
-
-        this.train = fill(this.train)
-        this.test = fill(this.test)
-
-        return this
+    def age_ratio(self, frame: DataFrame, state: dict):
+        if "title_age_medians" not in state:
+            # train + test 전체에서 호칭별 중앙값 계산 (합친 프레임이므로 concat 불필요)
+            title_medians = frame.groupby("Title")["Age"].median()
+            state["title_age_medians"] = {int(k): float(v) for k, v in title_medians.items()}
+            state["age_median"] = float(frame["Age"].median())
+
+        title_age = frame["Title"].map(state["title_age_medians"])
+        frame["Age"] = frame["Age"].fillna(title_age).fillna(state["age_median"]).astype("float32")
+        return frame
+
+    # -----------------------------
+    # 파이프라인 선언
+    # -----------------------------
+    def pipeline(self, train_path: str = None, test_path: str = None, cache_dir: str = None) -> Pipeline:
+        """
+        타이타닉 전처리 파이프라인
+
+        read_train/read_test 는 동시에 실행되고, 나머지는 합친 프레임에 순서대로 적용된다.
+        fare_ordinal / embarked_nominal / age_ratio 는 state 를 학습하는 단계.
+        """
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        train_path = train_path or os.path.join(current_dir, 'train.csv')
+        test_path = test_path or os.path.join(current_dir, 'test.csv')
+        return Pipeline("titanic", [
+            Step("read_train", self.read_csv, outputs=("train_raw",), params={"path": train_path},
+                 fingerprint=partial(_file_version, train_path)),
+            Step("read_test", self.read_csv, outputs=("test_raw",), params={"path": test_path},
+                 fingerprint=partial(_file_version, test_path)),
+            Step("create_frame", self.create_frame, ("train_raw", "test_raw"), ("frame", "label"),
+                 params={"label": "Survived"}),
+            Step("family_features", self.family_features, ("frame",), ("frame",)),
+            # 불필요한 컬럼 제거
+            Step("drop_features", self.drop_columns, ("frame",), ("frame",),
+                 params={"features": ['SibSp', 'Parch', 'Ticket', 'Cabin']}),
+            # 기본 전처리
+            Step("pclass_ordinal", self.pclass_ordinal, ("frame",), ("frame",)),
+            Step("fare_ordinal", self.fare_ordinal, ("frame",), ("frame",), stateful=True),
+            Step("embarked_nominal", self.embarked_nominal, ("frame",), ("frame",), stateful=True),
+            Step("gender_nominal", self.gender_nominal, ("frame",), ("frame",)),
+            Step("title_nominal", self.title_nominal, ("frame",), ("frame",)),
+            Step("age_ratio", self.age_ratio, ("frame",), ("frame",), stateful=True),
+            # 원본 이름 컬럼 제거 후 train/test 분리
+            Step("drop_name", self.drop_columns, ("frame",), ("frame",), params={"features": ['Name']}),
+            Step("split_frame", self.split_frame, ("frame",), ("train", "test")),
+        ], cache_dir=cache_dir, version=FEATURE_VERSION)
+
+    # -----------------------------
+    # 전체 단계 실행
+    # -----------------------------
+    def build_features(self, train_df: DataFrame, test_df: DataFrame, state: dict = None, cache: bool = False):
+        """이미 읽은 train/test 에 전처리 단계를 적용 (train, test, label, state 반환)"""
+        result = self.pipeline().run(
+            inputs={"train_raw": train_df, "test_raw": test_df},
+            state=state, cache=cache, targets=["train", "test", "label"]
+        )
+        return result["train"], result["test"], result["label"], result.state
+
+    # -----------------------------
+    # 새 데이터 변환 (학습 시 저장한 state 재사용)
+    # -----------------------------
+    def transform_frame(self, df: DataFrame, state: dict, feature_columns: list) -> DataFrame:
+        """
+        원본 형식(test.csv 와 같은 컬럼)의 새 데이터를 학습된 모델 입력으로 변환
+
+        preprocess 와 같은 단계를 그대로 적용하되, 통계값은 학습 시 저장한
+        state 를 사용한다. 청크 단위 채점에 사용된다 (청크마다 데이터가 달라 캐시하지 않음).
+        """
+        # 모든 행이 test 로 표시되고, state 가 채워져 있어 통계를 다시 계산하지 않음
+        _, test, _, _ = self.build_features(None, df, state=state)
+        return test[feature_columns]
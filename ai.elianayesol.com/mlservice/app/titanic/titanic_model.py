@@ -1,21 +1,82 @@
+import os
+import uuid
+import joblib
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from lightgbm import LGBMClassifier
 from sklearn.metrics import accuracy_score
 
+
+# -----------------------------
+# 모델 저장소 (이름 -> (클래스, 기본 하이퍼파라미터))
+# TitanicService.modeling 과 TitanicTuner 가 같은 기본값을 공유한다
+# -----------------------------
+MODEL_ZOO = {
+    "logistic_regression": (LogisticRegression, {"max_iter": 1000, "random_state": 42}),
+    "naive_bayes": (GaussianNB, {}),
+    "random_forest": (RandomForestClassifier, {
+        "n_estimators": 100,
+        "max_depth": None,
+        "min_samples_split": 2,
+        "random_state": 42
+    }),
+    "decision_tree": (DecisionTreeClassifier, {"random_state": 42}),
+    "lightgbm": (LGBMClassifier, {
+        "n_estimators": 100,
+        "learning_rate": 0.1,
+        "num_leaves": 31,
+        "random_state": 42,
+        "verbose": -1
+    }),
+    "knn": (KNeighborsClassifier, {"n_neighbors": 13}),
+}
+
+
+def create_model(name: str, params: dict = None):
+    """MODEL_ZOO 의 기본값에 params 를 덮어써서 새 모델 객체 생성"""
+    if name not in MODEL_ZOO:
+        raise ValueError(f"지원하지 않는 모델입니다: {name} (가능: {list(MODEL_ZOO)})")
+    model_cls, defaults = MODEL_ZOO[name]
+    return model_cls(**{**defaults, **(params or {})})
+
+
 class TitanicModel:
-    def __init__(self):
-        self.model = RandomForestClassifier(
-            n_estimators=300,
-            max_depth=7,
-            random_state=42
-        )
+    """
+    학습된 모델 아티팩트
+
+    추정기와 함께 학습 피처 컬럼 순서, 전처리 state, 데이터 버전을 보관해서
+    디스크에서 다시 읽은 뒤에도 새 데이터를 같은 방식으로 변환/예측할 수 있다.
+    """
+
+    def __init__(self, name: str = "random_forest", params: dict = None):
+        self.name = name
+        self.params = params or {}
+        self.model = create_model(name, self.params)
+        self.feature_columns = None
+        self.state = None
+        self.version = None
 
     def fit(self, X, y):
+        self.feature_columns = list(X.columns)
         self.model.fit(X, y)
 
     def predict(self, X):
-        return self.model.predict(X)
+        return self.model.predict(X[self.feature_columns])
 
     def evaluate(self, X, y):
-        pred = self.model.predict(X)
+        pred = self.predict(X)
         return accuracy_score(y, pred)
+
+    def save(self, path: str):
+        """임시 파일에 쓴 뒤 교체 (동시에 읽는 요청이 깨진 파일을 보지 않도록)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> "TitanicModel":
+        return joblib.load(path)
@@ -1,11 +1,19 @@
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Query, UploadFile, File
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-import csv
+import math
 import os
+import shutil
+import tempfile
+import itertools
 import logging
+import pandas as pd
 from .titanic_service import TitanicService
+from .titanic_store import PassengerStore
+from app.common.container import services
+from app.common.errors import InvalidRequestError
 
 # Logger 설정
 logger = logging.getLogger(__name__)
@@ -41,6 +49,22 @@ class Top10Response(BaseModel):
     total: int
     message: str
 
+class PassengerPageResponse(BaseModel):
+    """승객 페이지 조회 응답 모델"""
+    success: bool
+    data: List[PassengerResponse]
+    total: int
+    page: int
+    size: int
+    pages: int
+    message: str
+
+class PassengerDetailResponse(BaseModel):
+    """승객 단건 조회 응답 모델"""
+    success: bool
+    data: PassengerResponse
+    message: str
+
 class ServiceStatusResponse(BaseModel):
     """서비스 상태 응답 모델"""
     message: str
@@ -49,45 +73,12 @@ class ServiceStatusResponse(BaseModel):
 # 서비스 인스턴스 생성
 # 컨테이너 내부 경로에 맞게 조정
 def get_service() -> TitanicService:
-    """TitanicService 인스턴스 반환"""
-    return TitanicService()
+    """프로세스에서 공유하는 TitanicService 인스턴스 반환 (서비스 컨테이너)"""
+    return services.get(TitanicService)
 
 def get_top_10_passengers() -> List[Dict]:
-    """train.csv에서 리스트 순서대로 상위 10명을 반환"""
-    # 현재 파일의 디렉토리 경로
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(current_dir, 'train.csv')
-    
-    # CSV 파일 읽기
-    passengers = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # 요금을 float로 변환 (빈 값은 0으로 처리)
-            try:
-                fare = float(row['Fare']) if row['Fare'] else 0.0
-            except ValueError:
-                fare = 0.0
-            passengers.append({
-                'passengerId': row['PassengerId'],
-                'name': row['Name'],
-                'survived': row['Survived'],
-                'pclass': row['Pclass'],
-                'sex': row['Sex'],
-                'age': row['Age'] if row['Age'] else None,
-                'fare': fare,
-                'embarked': row['Embarked'] if row['Embarked'] else None
-            })
-    
-    # 정렬 없이 리스트에서 순서대로 처음 10명만 반환
-    top_10 = passengers[:10]
-    
-    # 순위 추가
-    for rank, passenger in enumerate(top_10, 1):
-        passenger['rank'] = rank
-        passenger['survivedText'] = '생존' if passenger['survived'] == '1' else '사망'
-        passenger['pclassText'] = f"{passenger['pclass']}등급"
-    
+    """train.csv에서 리스트 순서대로 상위 10명을 반환 (메모리 저장소 사용)"""
+    top_10, _ = PassengerStore().query(page=1, size=10)
     return top_10
 
 @router.get(
@@ -118,11 +109,12 @@ async def preprocess_data():
     
     - Train 데이터와 Test 데이터를 로드하고 전처리합니다.
     - 각 데이터의 타입, 컬럼, 상위 행, null 개수 등을 확인합니다.
+    - **pipeline**: 단계별 실행 기록 (cache: hit-memory / hit-disk / miss, seconds)
     """
     try:
         service = get_service()
-        service.preprocess()
-        return {"message": "데이터 전처리가 완료되었습니다."}
+        dataset = service.preprocess()
+        return {"message": "데이터 전처리가 완료되었습니다.", "pipeline": dataset.report}
     except Exception as e:
         import traceback
         error_detail = traceback.format_exc()
@@ -185,7 +177,7 @@ async def get_top_10():
     ```
     """
     top_10 = get_top_10_passengers()
-    total_count = 891  # 타이타닉 데이터셋의 총 승객 수
+    total_count = PassengerStore().total  # 실제 승객 수
     return {
         "success": True,
         "data": top_10,
@@ -193,16 +185,104 @@ async def get_top_10():
         "message": f"총 {total_count}명 중 상위 10명을 반환했습니다."
     }
 
+@router.get(
+    "/passengers",
+    response_model=PassengerPageResponse,
+    summary="승객 목록 조회 (필터/정렬/페이지)",
+    description="메모리에 적재된 승객 데이터에서 조건에 맞는 승객을 페이지 단위로 반환합니다.",
+    response_description="조건에 맞는 승객 목록과 페이지 정보"
+)
+async def get_passengers(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    pclass: Optional[int] = Query(None, ge=1, le=3),
+    sex: Optional[str] = None,
+    survived: Optional[int] = Query(None, ge=0, le=1),
+    sort_by: Optional[str] = None,
+    order: str = "asc"
+):
+    """
+    승객 목록을 필터/정렬/페이지 조건으로 조회합니다.
+    
+    Parameters:
+    - page: 페이지 번호 (1부터 시작)
+    - size: 페이지 크기 (최대 100)
+    - pclass: 객실 등급 (1, 2, 3)
+    - sex: 성별 (male, female)
+    - survived: 생존 여부 (0: 사망, 1: 생존)
+    - sort_by: 정렬 기준 (passengerId, name, pclass, age, fare / 생략 시 원본 순서)
+    - order: 정렬 방향 (asc, desc)
+    
+    rank는 현재 정렬 기준의 전체 순위입니다.
+    """
+    try:
+        data, total = PassengerStore().query(
+            pclass=pclass, sex=sex, survived=survived,
+            sort_by=sort_by, order=order, page=page, size=size
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": str(e)}
+        )
+    return {
+        "success": True,
+        "data": data,
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": math.ceil(total / size) if total else 0,
+        "message": f"총 {total}명 중 {len(data)}명을 반환했습니다."
+    }
+
+@router.get(
+    "/passengers/{passenger_id}",
+    response_model=PassengerDetailResponse,
+    summary="승객 단건 조회",
+    description="PassengerId로 승객 한 명을 조회합니다.",
+    response_description="승객 정보"
+)
+async def get_passenger(passenger_id: int):
+    """PassengerId 인덱스로 승객 정보를 조회합니다."""
+    passenger = PassengerStore().get(passenger_id)
+    if passenger is None:
+        return JSONResponse(
+            status_code=404,
+            content={"success": False, "message": f"승객을 찾을 수 없습니다: {passenger_id}"}
+        )
+    return {
+        "success": True,
+        "data": passenger,
+        "message": "승객 정보를 반환했습니다."
+    }
+
+def _evaluate(service: TitanicService, tuned: bool) -> dict:
+    # 1. 전처리
+    logger.info("전처리 시작...")
+    dataset = service.preprocess()
+    
+    # 2. 모델링 (튜닝 파라미터는 이번 요청에만 적용)
+    logger.info("모델링 시작...")
+    params = service.load_best_params(dataset) if tuned else None
+    models = service.modeling(params)
+    
+    # 3. 평가 (10-Fold CV)
+    logger.info("평가 시작...")
+    return service.evaluate(models, dataset)
+
 @router.get(
     "/evaluate",
     summary="모델 평가",
     description="타이타닉 데이터로 7가지 알고리즘을 10-Fold 교차검증으로 평가합니다.",
     response_description="각 모델의 평가 결과"
 )
-async def evaluate_model():
+async def evaluate_model(tuned: bool = False):
     """
     모델 평가를 수행합니다.
     
+    Parameters:
+    - tuned: True 이면 /titanic/tune 으로 저장된 최적 하이퍼파라미터를 적용 (기본값: False)
+    
     ### 처리 순서
     1. 데이터 전처리 + Feature Engineering (preprocess)
     2. 모델 초기화 (modeling) - 6개 개별 모델 + 앙상블
@@ -247,17 +327,8 @@ async def evaluate_model():
     try:
         service = get_service()
         
-        # 1. 전처리
-        logger.info("전처리 시작...")
-        service.preprocess()
-        
-        # 2. 모델링
-        logger.info("모델링 시작...")
-        service.modeling()
-        
-        # 3. 평가 (10-Fold CV)
-        logger.info("평가 시작...")
-        results = service.evaluate()
+        # 전처리 → 모델링 → 10-Fold CV 는 블로킹 작업이라 스레드 풀에서 실행
+        results = await run_in_threadpool(_evaluate, service, tuned)
         
         return {
             "success": True,
@@ -276,22 +347,118 @@ async def evaluate_model():
             "detail": error_detail
         }
 
+@router.get(
+    "/explain",
+    summary="모델 설명 (피처 중요도)",
+    description="학습된 모델의 Permutation Importance 와 Tree SHAP 값을 계산합니다. 모델 버전별로 캐시됩니다.",
+    response_description="피처별 중요도"
+)
+async def explain_model(model: str = "random_forest", n_repeats: int = Query(10, ge=1, le=50)):
+    """
+    모델 설명을 반환합니다.
+    
+    - 같은 모델 버전(데이터 + 하이퍼파라미터)에 대해서는 한 번만 계산하고,
+      결과를 모델 아티팩트 옆에 저장하여 재요청 시 바로 반환합니다 (cached: true).
+    - permutation_importance: 피처를 섞었을 때의 정확도 감소량 (피처별 병렬 계산)
+    - shap: 트리 모델(random_forest, decision_tree, lightgbm)의 피처별 평균 |SHAP| 값
+    
+    Parameters:
+    - model: 모델 이름 (random_forest, lightgbm, decision_tree, logistic_regression, naive_bayes, knn)
+    - n_repeats: 피처별 셔플 반복 횟수 (기본값: 10)
+    """
+    try:
+        service = get_service()
+        # 캐시가 없으면 fold 별 학습 + Permutation Importance + SHAP 계산이라 스레드 풀에서 실행
+        result = await run_in_threadpool(service.explain, name=model, n_repeats=n_repeats)
+        return {
+            "success": True,
+            "results": result,
+            "message": "모델 설명이 완료되었습니다."
+        }
+        
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        logger.error(f"모델 설명 중 오류 발생: {str(e)}")
+        return {
+            "success": False,
+            "message": "모델 설명 중 오류가 발생했습니다.",
+            "error": str(e),
+            "detail": error_detail
+        }
+
+def _tune(service: TitanicService, model_names: Optional[List[str]], n_jobs: int) -> dict:
+    # 1. 전처리
+    logger.info("전처리 시작...")
+    dataset = service.preprocess()
+    
+    # 2. 탐색
+    logger.info("하이퍼파라미터 탐색 시작...")
+    return service.tune(dataset, models=model_names, n_jobs=n_jobs)
+
+@router.get(
+    "/tune",
+    summary="하이퍼파라미터 탐색",
+    description="Successive Halving(Hyperband) 방식으로 모델 저장소 전체의 하이퍼파라미터를 병렬 탐색합니다.",
+    response_description="모델별 최적 파라미터와 탐색 통계"
+)
+async def tune_model(models: Optional[str] = None, n_jobs: int = -1):
+    """
+    하이퍼파라미터 탐색을 수행합니다.
+    
+    ### 처리 순서
+    1. 데이터 전처리 (preprocess)
+    2. 모델별 탐색 공간에서 후보 샘플링 (이전 실행의 상위 후보로 웜 스타트)
+    3. 적은 행 수(예산)로 평가 → 상위 1/3 만 더 큰 예산으로 승격, 나머지 조기 중단
+    4. 전체 데이터로 평가된 후보 중 모델별 최적 파라미터 저장 (save/tune_best.json)
+    
+    Parameters:
+    - models: 쉼표로 구분한 모델 이름 (예: "random_forest,lightgbm", 기본값: 전체)
+    - n_jobs: 병렬 프로세스 수 (기본값: -1, 모든 코어)
+    
+    저장된 파라미터는 `/titanic/evaluate?tuned=true` 에서 사용됩니다.
+    """
+    try:
+        service = get_service()
+        
+        model_names = [m.strip() for m in models.split(",") if m.strip()] if models else None
+        # 전처리와 탐색(여러 후보 병렬 평가)은 블로킹 작업이라 스레드 풀에서 실행
+        result = await run_in_threadpool(_tune, service, model_names, n_jobs)
+        
+        return {
+            "success": True,
+            "results": result,
+            "message": "하이퍼파라미터 탐색이 완료되었습니다."
+        }
+        
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        logger.error(f"하이퍼파라미터 탐색 중 오류 발생: {str(e)}")
+        return {
+            "success": False,
+            "message": "하이퍼파라미터 탐색 중 오류가 발생했습니다.",
+            "error": str(e),
+            "detail": error_detail
+        }
+
 @router.get(
     "/submit",
     summary="Kaggle 제출 파일 생성",
-    description="정확도가 가장 높은 RandomForest 모델로 test 데이터를 예측하여 Kaggle 제출용 CSV 파일을 생성합니다.",
+    description="캐시된 RandomForest 모델로 test 데이터를 예측하여 Kaggle 제출용 CSV를 스트리밍합니다.",
     response_description="제출용 CSV 파일 다운로드"
 )
-async def submit_model():
+async def submit_model(save: bool = False):
     """
     모델 제출을 수행합니다.
     
     ### 처리 순서
-    1. 데이터 전처리 (preprocess)
-    2. 모델 초기화 (modeling)
-    3. RandomForest 모델로 전체 train 데이터 학습
-    4. Test 데이터 예측
-    5. Kaggle 제출용 CSV 파일 생성 (download/titanic_submission.csv)
+    1. 학습된 RandomForest 모델 조회 (메모리 → save/ 아티팩트 → 없을 때만 전처리 + 학습)
+    2. Test 데이터 예측
+    3. Kaggle 제출용 CSV를 파일로 쓰지 않고 바로 스트리밍
+    
+    Parameters:
+    - save: True 이면 download/ 폴더에도 요청별 고유 이름으로 저장 (기본값: False)
     
     ### 반환 정보
     - **PassengerId**: 승객 ID
@@ -309,25 +476,24 @@ async def submit_model():
     try:
         service = get_service()
         
-        # 1. 전처리
-        logger.info("전처리 시작...")
-        service.preprocess()
-        
-        # 2. 모델링
-        logger.info("모델링 시작...")
-        service.modeling()
+        if save:
+            logger.info("제출 파일 생성 시작...")
+            submission_path = await run_in_threadpool(service.submit)
+            file_name = os.path.basename(submission_path)
+            return FileResponse(
+                path=submission_path,
+                filename=file_name,
+                media_type='text/csv',
+                headers={"Content-Disposition": f"attachment; filename={file_name}"}
+            )
         
-        # 3. 제출 파일 생성
-        logger.info("제출 파일 생성 시작...")
-        submission_path = service.submit()
-        
-        # 파일 경로를 상대 경로로 변환
-        # download/titanic_submission.csv
-        file_name = os.path.basename(submission_path)
-        
-        return FileResponse(
-            path=submission_path,
-            filename=file_name,
+        # 예측(필요하면 모델 학습)은 첫 청크를 만들 때 수행되므로 오류를 먼저 확인하기 위해
+        # 스레드 풀에서 미리 한 번 실행 (나머지 청크는 StreamingResponse 가 스레드 풀에서 읽음)
+        stream = service.stream_submission()
+        first = await run_in_threadpool(next, stream)
+        file_name = service.submission_filename()
+        return StreamingResponse(
+            itertools.chain([first], stream),
             media_type='text/csv',
             headers={"Content-Disposition": f"attachment; filename={file_name}"}
         )
@@ -341,4 +507,68 @@ async def submit_model():
             "message": "제출 파일 생성 중 오류가 발생했습니다.",
             "error": str(e),
             "detail": error_detail
-        }
\ No newline at end of file
+        }
+
+def _open_batch(service: TitanicService, file: UploadFile, chunk_size: int) -> tuple:
+    """업로드 파일을 임시 파일로 옮기고 채점 스트림과 첫 청크 반환 (임시 파일은 스트림이 끝나면 삭제)"""
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as tmp:
+            tmp_path = tmp.name
+            shutil.copyfileobj(file.file, tmp, length=1024 * 1024)
+        stream = service.stream_external_submission(tmp_path, chunk_size=chunk_size, remove_after=True)
+        return stream, next(stream)
+    except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+@router.post(
+    "/submit/batch",
+    summary="외부 test 파일 일괄 채점",
+    description="test.csv 와 같은 형식의 CSV 파일을 업로드하면 캐시된 모델로 청크 단위 예측 결과를 스트리밍합니다.",
+    response_description="제출용 CSV 파일 다운로드"
+)
+async def submit_batch(file: UploadFile = File(...), chunk_size: int = 50000):
+    """
+    외부 test 파일을 청크 단위로 채점합니다.
+    
+    - 업로드 파일은 임시 파일로 옮긴 뒤 chunk_size 행씩 읽어 변환/예측합니다.
+    - 전처리 통계(요금 구간, 최빈값, 호칭별 나이 중앙값)는 학습 시 저장한 값을 사용합니다.
+    - 파일 크기와 무관하게 메모리 사용량이 일정합니다.
+    
+    Parameters:
+    - file: PassengerId, Pclass, Name, Sex, Age, SibSp, Parch, Fare, Embarked 컬럼을 가진 CSV
+    - chunk_size: 한 번에 처리할 행 수 (기본값: 50000)
+    """
+    try:
+        service = get_service()
+        # 업로드 복사와 첫 청크 예측(필요하면 모델 학습)은 블로킹 작업이라 스레드 풀에서 실행
+        stream, first = await run_in_threadpool(_open_batch, service, file, chunk_size)
+        file_name = service.submission_filename()
+        return StreamingResponse(
+            itertools.chain([first], stream),
+            media_type='text/csv',
+            headers={"Content-Disposition": f"attachment; filename={file_name}"}
+        )
+        
+    except (InvalidRequestError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        # 필수 컬럼 누락, 읽을 수 없는 CSV 등 잘못된 업로드
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": f"업로드 파일이 올바르지 않습니다: {str(e)}"}
+        )
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        logger.error(f"외부 파일 채점 중 오류 발생: {str(e)}")
+        logger.error(error_detail)
+        return JSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "message": "외부 파일 채점 중 오류가 발생했습니다.",
+                "error": str(e),
+                "detail": error_detail
+            }
+        )
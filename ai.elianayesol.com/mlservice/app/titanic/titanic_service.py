@@ -1,115 +1,90 @@
 import pandas as pd
 import os
+import json
+import time
+import uuid
+import hashlib
 import logging
+import threading
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.naive_bayes import GaussianNB
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier
-from sklearn.tree import DecisionTreeClassifier
-from lightgbm import LGBMClassifier
-from sklearn.svm import SVC
-from sklearn.neighbors import KNeighborsClassifier
+from sklearn.ensemble import VotingClassifier
 from sklearn.model_selection import StratifiedKFold, cross_val_score
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score
-from app.titanic.titanic_method import TitanicMethod
+from sklearn.inspection import permutation_importance
+from app.titanic.titanic_method import TitanicMethod, FEATURE_VERSION
 from app.titanic.titanic_dataset import TitanicDataset
+from app.titanic.titanic_model import create_model, TitanicModel
+from app.titanic.titanic_tuner import TitanicTuner
+from app.titanic.titanic_store import PassengerStore
+from app.common.errors import InvalidRequestError
 
 
 # Logger 설정
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
-class TitanicService:
-    """타이타닉 TITANIC 승객 데이터 처리 및 머신러닝 서비스"""
-
-    def __init__(self):
-        self.dataset = None  # TitanicDataset 객체
-        # 모델들
-        self.lr_model = None
-        self.nb_model = None
-        self.rf_model = None
-        self.dt_model = None
-        self.lgbm_model = None
-        self.knn_model = None
-        self.ensemble_model = None
-        # Scaler
-        self.scaler = None
-        # 평가 결과
-        self.evaluation_results = None
-
-    def preprocess(self):
-        the_method = TitanicMethod()
-        current_dir = os.path.dirname(os.path.abspath(__file__))
+# 학습된 모델 캐시 (버전 -> TitanicModel), 프로세스 전체에서 공유
+_MODEL_CACHE = {}
+_MODEL_LOCK = threading.Lock()
 
-        # -----------------------------
-        # 데이터 읽기
-        # -----------------------------
-        train_path = os.path.join(current_dir, 'train.csv')
-        test_path = os.path.join(current_dir, 'test.csv')
-        df_train, df_test = the_method.read_csv(train_path, test_path)
-        logger.info("❤️❤️ 데이터 읽기 완료")
+# 모델 설명 결과 캐시 (설명 파일 경로 -> 결과)
+_EXPLAIN_CACHE = {}
+# 설명 파일 경로 -> 잠금 (같은 모델 버전의 계산만 직렬화, 다른 모델은 동시에 계산)
+_EXPLAIN_LOCKS = {}
+_EXPLAIN_LOCK = threading.Lock()  # _EXPLAIN_LOCKS 보호
 
-        # -----------------------------
-        # Feature Engineering (원본 데이터 사용)
-        # -----------------------------
-        logger.info("Feature Engineering 시작...")
-        
-        # FamilySize 생성 (원본 데이터에서)
-        df_train["FamilySize"] = df_train["SibSp"] + df_train["Parch"] + 1
-        df_test["FamilySize"] = df_test["SibSp"] + df_test["Parch"] + 1
-        
-        # IsAlone 생성
-        df_train["IsAlone"] = (df_train["FamilySize"] == 1).astype(int)
-        df_test["IsAlone"] = (df_test["FamilySize"] == 1).astype(int)
+# Permutation Importance 를 계산하는 검증 fold 수
+EXPLAIN_FOLDS = 5
 
-        # -----------------------------
-        # Train 전처리
-        # -----------------------------
-        this_train = the_method.create_df(df_train, 'Survived')       # features만
-        this_label = the_method.create_label(df_train, 'Survived')    # label 생성
+# 외부 채점 파일에 있어야 하는 컬럼 (test.csv 형식)
+EXTERNAL_COLUMNS = ['PassengerId', 'Pclass', 'Name', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked']
 
-        # -----------------------------
-        # Test 전처리
-        # -----------------------------
-        this_test = the_method.create_df(df_test, 'Survived')
 
-        # -----------------------------
-        # TitanicDataset으로 통합
-        # -----------------------------
-        this = TitanicDataset()
-        this.train = this_train
-        this.test = this_test
-        this.label = this_label
+def _explain_lock(explain_path: str) -> threading.Lock:
+    with _EXPLAIN_LOCK:
+        return _EXPLAIN_LOCKS.setdefault(explain_path, threading.Lock())
+
 
-        self.dataset = this
+class TitanicService:
+    """
+    타이타닉 TITANIC 승객 데이터 처리 및 머신러닝 서비스
+
+    인스턴스는 서비스 컨테이너가 프로세스에서 하나만 만들어 모든 요청이 공유하므로
+    데이터셋 / 모델 / 하이퍼파라미터를 인스턴스에 두지 않고 메서드 인자와 반환값으로 주고받는다.
+    """
+
+    def warm(self):
+        """서버 시작 시 승객 조회 저장소와 전처리 데이터를 미리 준비 (서비스 컨테이너가 호출)"""
+        PassengerStore()
+        self.preprocess()
+
+    def preprocess(self) -> TitanicDataset:
+        """전처리된 데이터셋 반환 (결측치 보정까지 끝난 상태, report 에 단계별 실행 기록)"""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
 
         # -----------------------------
-        # 전처리 적용
+        # 전처리 파이프라인 실행
+        # (읽기 → train/test 통합 → FamilySize/IsAlone 생성 → 컬럼 제거 → 인코딩 → 나이 보정 → 분리)
+        # 입력 파일과 단계 코드가 그대로면 단계 결과를 save/pipeline_cache 에서 재사용
         # -----------------------------
         logger.info("❤️❤️ 전처리 시작")
-        
-        # 불필요한 컬럼 제거
-        drop_features = ['SibSp', 'Parch', 'Ticket', 'Cabin']
-        self.dataset = the_method.drop_features(self.dataset, *drop_features)
-        
-        # 기본 전처리
-        self.dataset = the_method.pclass_ordinal(self.dataset)
-        self.dataset = the_method.fare_ordinal(self.dataset)
-        self.dataset = the_method.embarked_nominal(self.dataset)
-        self.dataset = the_method.gender_nominal(self.dataset)
-        self.dataset = the_method.title_nominal(self.dataset)
-        self.dataset = the_method.age_ratio(self.dataset)
-        
-        # 불필요한 컬럼 제거
-        drop_original = ['Name']
-        self.dataset = the_method.drop_features(self.dataset, *drop_original)
-        
-        # 결측치 최종 확인 및 처리
-        if self.dataset.train.isnull().sum().sum() > 0:
+        pipeline = TitanicMethod().pipeline(cache_dir=os.path.join(current_dir, 'save', 'pipeline_cache'))
+        result = pipeline.run(targets=["train", "test", "label"])
+        train, test = result["train"], result["test"]
+
+        # 결측치 최종 확인 및 처리 (데이터셋을 만들기 전에 끝내서 반쯤 처리된 프레임이 보이지 않도록 함)
+        if train.isnull().sum().sum() > 0:
             logger.warning("결측치 발견, 중앙값으로 대체합니다.")
-            self.dataset.train = self.dataset.train.fillna(self.dataset.train.median())
-            self.dataset.test = self.dataset.test.fillna(self.dataset.test.median())
+            train = train.fillna(train.median())
+            test = test.fillna(test.median())
+
+        dataset = TitanicDataset()
+        dataset.train = train
+        dataset.test = test
+        dataset.label = result["label"]
+        dataset.state = result.state
+        dataset.report = result.report
 
         logger.info("❤️❤️ 전처리 완료!")
         
@@ -117,99 +92,123 @@ class TitanicService:
         logger.info("\n" + "="*80)
         logger.info("전처리된 Train 데이터 (상위 10개 샘플)")
         logger.info("="*80)
-        logger.info(f"\n{self.dataset.train.head(10).to_string()}")
+        logger.info(f"\n{dataset.train.head(10).to_string()}")
         
         logger.info("\n" + "="*80)
         logger.info("데이터 타입 정보")
         logger.info("="*80)
-        logger.info(f"\n{self.dataset.train.dtypes.to_string()}")
+        logger.info(f"\n{dataset.train.dtypes.to_string()}")
         
         logger.info("\n" + "="*80)
         logger.info("데이터 통계 정보")
         logger.info("="*80)
-        logger.info(f"\n{self.dataset.train.describe().to_string()}")
+        logger.info(f"\n{dataset.train.describe().to_string()}")
         
         logger.info("\n" + "="*80)
-        logger.info(f"Train 데이터 shape: {self.dataset.train.shape}")
-        logger.info(f"Test 데이터 shape: {self.dataset.test.shape}")
-        logger.info(f"Label shape: {self.dataset.label.shape}")
+        logger.info(f"Train 데이터 shape: {dataset.train.shape}")
+        logger.info(f"Test 데이터 shape: {dataset.test.shape}")
+        logger.info(f"Label shape: {dataset.label.shape}")
         logger.info("="*80 + "\n")
+        return dataset
 
     # -----------------------------
     # 모델링, 학습, 평가
     # -----------------------------
-    def modeling(self):
-        """6가지 알고리즘 모델 초기화 + 앙상블"""
+    def modeling(self, params: dict = None) -> dict:
+        """
+        6가지 알고리즘 모델 초기화 + 앙상블 (params 가 있으면 튜닝된 파라미터 적용)
+
+        Args:
+            params: 모델 이름 -> 하이퍼파라미터 (load_best_params 결과)
+
+        Returns:
+            평가 순서대로 {모델 이름: 학습 전 estimator}
+        """
         logger.info("❤️❤️ 모델링 시작")
+        params = params or {}
+        if params:
+            logger.info(f"튜닝된 하이퍼파라미터 적용: {list(params)}")
         
         # 1. 로지스틱 회귀
-        self.lr_model = LogisticRegression(max_iter=1000, random_state=42)
+        lr_model = create_model("logistic_regression", params.get("logistic_regression"))
         
         # 2. 나이브베이즈
-        self.nb_model = GaussianNB()
+        nb_model = create_model("naive_bayes", params.get("naive_bayes"))
         
-        # 3. 랜덤포레스트 (하이퍼파라미터 최적화)
-        self.rf_model = RandomForestClassifier(
-            n_estimators=100, 
-            max_depth=None,  # 제한 없음 (이전 버전으로 복원)
-            min_samples_split=2,
-            random_state=42
-        )
+        # 3. 랜덤포레스트
+        rf_model = create_model("random_forest", params.get("random_forest"))
         
         # 4. 결정트리
-        self.dt_model = DecisionTreeClassifier(random_state=42)
+        dt_model = create_model("decision_tree", params.get("decision_tree"))
         
-        # 5. LightGBM (하이퍼파라미터 최적화)
-        self.lgbm_model = LGBMClassifier(
-            n_estimators=100, 
-            learning_rate=0.1, 
-            num_leaves=31, 
-            random_state=42,
-            verbose=-1
-        )
+        # 5. LightGBM
+        lgbm_model = create_model("lightgbm", params.get("lightgbm"))
         
         # 6. KNN
-        self.knn_model = KNeighborsClassifier(n_neighbors=13)
+        knn_model = create_model("knn", params.get("knn"))
         
         # 7. 앙상블 모델 (성능 좋은 모델만 선택)
-        self.ensemble_model = VotingClassifier(
+        ensemble_model = VotingClassifier(
             estimators=[
-                ('rf', self.rf_model), 
-                ('lgbm', self.lgbm_model), 
-                ('lr', self.lr_model),
-                ('nb', self.nb_model)
+                ('rf', rf_model), 
+                ('lgbm', lgbm_model), 
+                ('lr', lr_model),
+                ('nb', nb_model)
             ],
             voting='soft'
         )
         
         logger.info("❤️❤️ 모델링 완료")
+        return {
+            "logistic_regression": lr_model,
+            "naive_bayes": nb_model,
+            "random_forest": rf_model,
+            "decision_tree": dt_model,
+            "lightgbm": lgbm_model,
+            "knn": knn_model,
+            "ensemble": ensemble_model,
+        }
+
+    def load_best_params(self, dataset: TitanicDataset = None) -> dict:
+        """
+        이전 /titanic/tune 실행에서 저장된 최적 하이퍼파라미터 로드
+
+        지금 데이터(dataset, 없으면 새로 전처리)와 전처리 버전으로 탐색한 파라미터만 돌려주고,
+        다르거나 없으면 빈 딕셔너리.
+        """
+        dataset = dataset if dataset is not None else self.preprocess()
+        tuner = TitanicTuner()
+        return tuner.load_best(tuner.data_version(dataset.train, dataset.label.values.ravel()))
+
+    def tune(self, dataset: TitanicDataset, models: list = None, n_jobs: int = -1):
+        """
+        Successive Halving(Hyperband) 방식 하이퍼파라미터 탐색
+
+        결과는 save/tune_best.json 에만 저장하고, 이후 요청은 load_best_params() 로 명시적으로 불러 쓴다.
+        """
+        logger.info("❤️❤️ 하이퍼파라미터 탐색 시작")
+        X = dataset.train
+        y = dataset.label.values.ravel()
+        result = TitanicTuner(n_jobs=n_jobs).tune(X, y, models=models)
+        logger.info("❤️❤️ 하이퍼파라미터 탐색 완료")
+        return result
 
     def create_k_fold(self):
         """StratifiedKFold 10-Fold 생성"""
         return StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
 
-    def evaluate(self):
-        """StratifiedKFold 10-Fold 교차검증으로 평가"""
+    def evaluate(self, models: dict, dataset: TitanicDataset) -> dict:
+        """StratifiedKFold 10-Fold 교차검증으로 평가 (models 는 modeling() 결과)"""
         logger.info("❤️❤️ 평가 시작 (10-Fold Cross Validation)")
         
-        X = self.dataset.train
-        y = self.dataset.label.values.ravel()
+        X = dataset.train
+        y = dataset.label.values.ravel()
         
         k_fold = self.create_k_fold()
         results = {}
         
         # 모든 모델 평가
-        models = [
-            ("logistic_regression", self.lr_model),
-            ("naive_bayes", self.nb_model),
-            ("random_forest", self.rf_model),
-            ("decision_tree", self.dt_model),
-            ("lightgbm", self.lgbm_model),
-            ("knn", self.knn_model),
-            ("ensemble", self.ensemble_model)
-        ]
-        
-        for name, model in models:
+        for name, model in models.items():
             logger.info(f"{name} 평가 중...")
             scores = cross_val_score(
                 model, X, y, 
@@ -221,48 +220,238 @@ class TitanicService:
             results[name] = float(accuracy)
             logger.info(f'{name} 10-Fold CV 평균 정확도: {accuracy}%')
         
-        self.evaluation_results = results
         logger.info("❤️❤️ 평가 완료")
         
         return results
     
+    # -----------------------------
+    # 학습된 모델 캐시 및 제출
+    # -----------------------------
+    def model_version(self, name: str = "random_forest", params: dict = None) -> str:
+        """원본 데이터 + 모델 이름/파라미터 + 전처리 버전으로 만든 아티팩트 버전 (params: 모델 이름 -> 하이퍼파라미터)"""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha1()
+        for fname in ('train.csv', 'test.csv'):
+            with open(os.path.join(current_dir, fname), 'rb') as f:
+                digest.update(f.read())
+        model_params = (params or {}).get(name) or {}
+        digest.update(f"{name}|{json.dumps(model_params, sort_keys=True, default=str)}|{FEATURE_VERSION}".encode())
+        return digest.hexdigest()[:16]
+
+    def get_fitted_model(self, name: str = "random_forest", params: dict = None,
+                         dataset: TitanicDataset = None) -> TitanicModel:
+        """
+        전체 train 데이터로 학습된 모델 반환 (params 가 없으면 기본 하이퍼파라미터)
+
+        프로세스 메모리 → save/ 디스크 아티팩트 → 새로 학습 순서로 찾으며,
+        새로 학습한 경우 아티팩트를 저장한다. dataset 은 이미 전처리한 데이터셋이 있을 때
+        넘기면 다시 전처리하지 않는다.
+        """
+        version = self.model_version(name, params)
+        with _MODEL_LOCK:
+            cached = _MODEL_CACHE.get(version)
+            if cached is not None:
+                return cached
+
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            model_path = os.path.join(current_dir, 'save', f'model_{name}_{version}.joblib')
+            if os.path.exists(model_path):
+                logger.info(f"저장된 모델 로드: {model_path}")
+                model = TitanicModel.load(model_path)
+            else:
+                if dataset is None:
+                    dataset = self.preprocess()
+                logger.info(f"{name} 모델 학습 중 (버전 {version})...")
+                model = TitanicModel(name, (params or {}).get(name))
+                model.fit(dataset.train, dataset.label.values.ravel())
+                model.state = dict(dataset.state)
+                model.version = version
+                model.save(model_path)
+                logger.info(f"모델 저장 완료: {model_path}")
+
+            _MODEL_CACHE[version] = model
+            return model
+
+    # -----------------------------
+    # 모델 설명 (Permutation Importance / Tree SHAP)
+    # -----------------------------
+    def explain(self, name: str = "random_forest", n_repeats: int = 10, n_jobs: int = -1) -> dict:
+        """
+        학습된 모델의 피처 중요도 계산 (모델 버전당 한 번)
+
+        - permutation_importance: 학습에 쓴 행으로 재면 모델이 외운 피처의 중요도가 부풀려지므로
+          EXPLAIN_FOLDS 개 fold 로 나눠, fold 마다 나머지 행으로 새로 학습한 모델을 검증 fold 에서 셔플/재평가
+        - shap: 전체 train 으로 학습한 모델 자체의 기여도
+
+        결과는 모델 아티팩트 옆(save/model_{name}_{version}.explain_cv{k}_r{n}.json)과
+        프로세스 메모리에 저장되어, 같은 모델 버전에 대한 재요청은 바로 반환된다.
+        """
+        model = self.get_fitted_model(name)
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        explain_path = os.path.join(
+            current_dir, 'save', f'model_{name}_{model.version}.explain_cv{EXPLAIN_FOLDS}_r{n_repeats}.json'
+        )
+
+        with _explain_lock(explain_path):
+            cached = _EXPLAIN_CACHE.get(explain_path)
+            if cached is None and os.path.exists(explain_path):
+                with open(explain_path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                _EXPLAIN_CACHE[explain_path] = cached
+            if cached is not None:
+                return {**cached, "cached": True}
+
+            logger.info(f"❤️❤️ {name} 모델 설명 계산 시작 (버전 {model.version})")
+            started = time.perf_counter()
+            dataset = self.preprocess()
+            X = dataset.train[model.feature_columns]
+            y = dataset.label.values.ravel()
+
+            # fold 마다 검증 행에서 피처별 셔플/재평가 (n_jobs 프로세스로 병렬 수행)
+            k_fold = StratifiedKFold(n_splits=EXPLAIN_FOLDS, shuffle=True, random_state=42)
+            importances = []
+            for train_idx, val_idx in k_fold.split(X, y):
+                fold_model = create_model(name, model.params)
+                fold_model.fit(X.iloc[train_idx], y[train_idx])
+                perm = permutation_importance(
+                    fold_model, X.iloc[val_idx], y[val_idx],
+                    scoring='accuracy',
+                    n_repeats=n_repeats,
+                    random_state=42,
+                    n_jobs=n_jobs
+                )
+                importances.append(perm.importances)
+            # (피처, fold x 반복) 전체의 평균 / 표준편차
+            importances = np.concatenate(importances, axis=1)
+            permutation = {
+                col: {"mean": round(float(m), 6), "std": round(float(sd), 6)}
+                for col, m, sd in zip(model.feature_columns, importances.mean(axis=1), importances.std(axis=1))
+            }
+
+            result = {
+                "model": name,
+                "version": model.version,
+                "n_samples": int(len(X)),
+                "cv_folds": EXPLAIN_FOLDS,
+                "permutation_importance": dict(
+                    sorted(permutation.items(), key=lambda item: item[1]["mean"], reverse=True)
+                ),
+                "shap": self._tree_shap(model, X),
+                "elapsed_seconds": round(time.perf_counter() - started, 3),
+            }
+
+            os.makedirs(os.path.dirname(explain_path), exist_ok=True)
+            tmp_path = f"{explain_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, explain_path)
+            _EXPLAIN_CACHE[explain_path] = result
+            logger.info(f"❤️❤️ 모델 설명 계산 완료 ({result['elapsed_seconds']}초)")
+            return {**result, "cached": False}
+
+    @staticmethod
+    def _tree_shap(model: TitanicModel, X: pd.DataFrame):
+        """트리 모델의 SHAP 값 (피처별 평균 절대값), 트리 모델이 아니면 None"""
+        if model.name == "lightgbm":
+            # LightGBM 내장 TreeSHAP (마지막 열은 기대값), 단위: log-odds
+            contrib = model.model.predict(X, pred_contrib=True)
+            values, base_value, output = contrib[:, :-1], float(contrib[:, -1].mean()), "log_odds"
+        elif model.name in ("random_forest", "decision_tree"):
+            # shap 은 import 시간이 길어 필요할 때만 로드
+            import shap
+            explainer = shap.TreeExplainer(model.model)
+            shap_values = explainer.shap_values(X)
+            # 이진 분류: 생존(1) 클래스 기준, 단위: 확률
+            if isinstance(shap_values, list):
+                values = shap_values[1]
+            elif shap_values.ndim == 3:
+                values = shap_values[..., 1]
+            else:
+                values = shap_values
+            base_value, output = float(np.atleast_1d(explainer.expected_value)[-1]), "probability"
+        else:
+            return None
+
+        mean_abs = np.abs(values).mean(axis=0)
+        return {
+            "output": output,
+            "base_value": round(base_value, 6),
+            "mean_abs": dict(sorted(
+                ((col, round(float(v), 6)) for col, v in zip(model.feature_columns, mean_abs)),
+                key=lambda item: item[1], reverse=True
+            )),
+        }
+
+    def submission_filename(self) -> str:
+        """요청마다 겹치지 않는 제출 파일 이름"""
+        return f"titanic_submission_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.csv"
+
+    @staticmethod
+    def _submission_lines(passenger_ids, predictions, header: bool = True) -> str:
+        lines = ["PassengerId,Survived"] if header else []
+        lines.extend(f"{int(pid)},{int(pred)}" for pid, pred in zip(passenger_ids, predictions))
+        return "\n".join(lines) + "\n"
+
+    def stream_submission(self, name: str = "random_forest"):
+        """캐시된 모델로 test.csv 를 예측하여 CSV 텍스트를 순차적으로 생성 (제너레이터)"""
+        logger.info("❤️❤️ 제출 데이터 생성 시작")
+        model = self.get_fitted_model(name)
+
+        # 전처리 없이 모델에 저장된 state 로 test.csv 만 변환
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        df_test = pd.read_csv(os.path.join(current_dir, 'test.csv'))
+        X_test = TitanicMethod().transform_frame(df_test, model.state, model.feature_columns)
+
+        predictions = model.predict(X_test)
+        logger.info(f"예측 결과 요약: 생존 {int(predictions.sum())}명, 사망 {len(predictions) - int(predictions.sum())}명")
+        yield self._submission_lines(X_test["PassengerId"], predictions)
+
+    def stream_external_submission(self, csv_path: str, name: str = "random_forest",
+                                   chunk_size: int = 50000, remove_after: bool = False):
+        """
+        외부 test 형식 CSV 를 청크 단위로 변환/예측하여 CSV 텍스트를 생성 (제너레이터)
+
+        파일 크기와 무관하게 한 번에 chunk_size 행만 메모리에 올린다.
+        chunk_size 나 컬럼이 잘못됐으면 모델을 불러오기 전에 InvalidRequestError 를 던진다.
+        """
+        try:
+            if chunk_size < 1:
+                raise InvalidRequestError(f"chunk_size 는 1 이상이어야 합니다. 현재 값: {chunk_size}")
+            columns = pd.read_csv(csv_path, nrows=0).columns
+            missing = [col for col in EXTERNAL_COLUMNS if col not in columns]
+            if missing:
+                raise InvalidRequestError(f"필수 컬럼이 없습니다: {missing} (현재 컬럼: {columns.tolist()})")
+
+            model = self.get_fitted_model(name)
+            the_method = TitanicMethod()
+            total = 0
+            for idx, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size)):
+                X_chunk = the_method.transform_frame(chunk, model.state, model.feature_columns)
+                predictions = model.predict(X_chunk)
+                total += len(predictions)
+                yield self._submission_lines(X_chunk["PassengerId"], predictions, header=(idx == 0))
+            if total == 0:
+                yield "PassengerId,Survived\n"
+            logger.info(f"외부 파일 채점 완료: {total}행")
+        finally:
+            if remove_after and os.path.exists(csv_path):
+                os.remove(csv_path)
+
     def submit(self):
-        """RandomForest 모델로 test 데이터 예측 및 Kaggle 제출용 CSV 생성"""
+        """test 예측 결과를 app/download 에 요청별 고유 이름으로 저장하고 경로 반환"""
         logger.info("❤️❤️ 제출 파일 생성 시작")
-        
-        # RandomForest 모델로 전체 train 데이터 학습
-        X_train = self.dataset.train
-        y_train = self.dataset.label.values.ravel()
-        
-        logger.info("RandomForest 모델 학습 중...")
-        self.rf_model.fit(X_train, y_train)
-        
-        # Test 데이터 예측
-        X_test = self.dataset.test
-        logger.info("Test 데이터 예측 중...")
-        predictions = self.rf_model.predict(X_test)
-        
-        # 원본 test.csv에서 PassengerId 읽기
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        test_path = os.path.join(current_dir, 'test.csv')
-        df_test_original = pd.read_csv(test_path)
-        
-        # 제출용 DataFrame 생성
-        submission = pd.DataFrame({
-            'PassengerId': df_test_original['PassengerId'],
-            'Survived': predictions.astype(int)
-        })
-        
+
         # download 폴더에 저장 (app/download)
-        # current_dir = app/titanic
-        # os.path.dirname(current_dir) = app
+        current_dir = os.path.dirname(os.path.abspath(__file__))
         download_dir = os.path.join(os.path.dirname(current_dir), 'download')
         os.makedirs(download_dir, exist_ok=True)
-        
-        submission_path = os.path.join(download_dir, 'titanic_submission.csv')
-        submission.to_csv(submission_path, index=False)
-        
+
+        submission_path = os.path.join(download_dir, self.submission_filename())
+        tmp_path = f"{submission_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for text in self.stream_submission():
+                f.write(text)
+        os.replace(tmp_path, submission_path)
+
         logger.info(f"제출 파일 생성 완료: {submission_path}")
-        logger.info(f"예측 결과 요약: 생존 {predictions.sum()}명, 사망 {len(predictions) - predictions.sum()}명")
-        
         return submission_path
@@ -0,0 +1,172 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+
+class PassengerStore:
+    """
+    train.csv 승객 데이터를 한 번만 읽어 메모리에 보관하는 컬럼 기반 저장소 (싱글턴)
+
+    - 컬럼별 numpy 배열 (int8/int32/float32) 로 보관
+    - 인덱스: PassengerId -> 행 번호, 객실 등급/성별/생존 여부 -> 행 번호 배열
+    - 정렬 가능한 컬럼은 로드 시 정렬 순서를 미리 계산해 두고 조회 시 재사용
+    """
+    _instance = None  # 싱글턴 인스턴스를 저장할 클래스 변수
+
+    SEX_CODES = {"male": 0, "female": 1}
+    SORTABLE = {
+        "passengerId": "passenger_id",
+        "name": "name",
+        "pclass": "pclass",
+        "age": "age",
+        "fare": "fare",
+    }
+
+    def __new__(cls):
+        if cls._instance is None:  # 인스턴스가 없으면 생성 후 데이터 로드
+            instance = super(PassengerStore, cls).__new__(cls)
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            instance._load(os.path.join(current_dir, 'train.csv'))
+            cls._instance = instance
+        return cls._instance  # 기존 인스턴스 반환
+
+    # -----------------------------
+    # 로드 및 인덱스 생성
+    # -----------------------------
+    def _load(self, csv_path: str):
+        df = pd.read_csv(
+            csv_path,
+            usecols=['PassengerId', 'Survived', 'Pclass', 'Name', 'Sex', 'Age', 'Fare', 'Embarked'],
+            dtype={'PassengerId': 'int32', 'Survived': 'int8', 'Pclass': 'int8',
+                   'Age': 'float32', 'Fare': 'float32', 'Embarked': 'category'}
+        )
+        self.passenger_id = df['PassengerId'].to_numpy()
+        self.survived = df['Survived'].to_numpy()
+        self.pclass = df['Pclass'].to_numpy()
+        self.sex = df['Sex'].map(self.SEX_CODES).fillna(-1).to_numpy(dtype=np.int8)
+        self.age = df['Age'].to_numpy()
+        self.fare = df['Fare'].fillna(0.0).to_numpy()
+        self.embarked = df['Embarked'].cat.codes.to_numpy(dtype=np.int8)
+        self.embarked_labels = list(df['Embarked'].cat.categories)
+        self.name = df['Name'].to_numpy(dtype=object)
+        self.total = len(df)
+
+        # 해시 인덱스
+        self.id_index = {int(pid): row for row, pid in enumerate(self.passenger_id)}
+        self.pclass_index = self._group_index(self.pclass)
+        self.sex_index = self._group_index(self.sex)
+        self.survived_index = self._group_index(self.survived)
+
+        # 정렬 순서 (NaN 은 오름/내림차순 모두 마지막)
+        self.sort_orders = {}
+        for key, attr in self.SORTABLE.items():
+            values = getattr(self, attr)
+            asc = np.argsort(values, kind="stable")
+            if values.dtype.kind == 'f':
+                nan_mask = np.isnan(values[asc])
+                valid, missing = asc[~nan_mask], asc[nan_mask]
+                self.sort_orders[key] = (asc, np.concatenate([valid[::-1], missing]))
+            else:
+                self.sort_orders[key] = (asc, asc[::-1])
+
+        logger.info(f"🚢 승객 저장소 로드 완료: {self.total}명")
+
+    @staticmethod
+    def _group_index(values: np.ndarray) -> dict:
+        """값 -> 해당 값을 가진 행 번호 배열 (오름차순)"""
+        order = np.argsort(values, kind="stable")
+        keys, starts = np.unique(values[order], return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+        return {int(k): np.sort(order[s:e]) for k, s, e in zip(keys, starts, bounds)}
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def _row(self, row: int, rank: int) -> dict:
+        age = self.age[row]
+        embarked_code = self.embarked[row]
+        survived = str(int(self.survived[row]))
+        pclass = str(int(self.pclass[row]))
+        return {
+            'passengerId': str(int(self.passenger_id[row])),
+            'name': self.name[row],
+            'survived': survived,
+            'pclass': pclass,
+            'sex': 'female' if self.sex[row] == 1 else 'male',
+            'age': None if np.isnan(age) else f"{float(age):g}",
+            'fare': round(float(self.fare[row]), 4),
+            'embarked': None if embarked_code < 0 else self.embarked_labels[embarked_code],
+            'rank': rank,
+            'survivedText': '생존' if survived == '1' else '사망',
+            'pclassText': f"{pclass}등급",
+        }
+
+    def get(self, passenger_id: int):
+        """PassengerId 로 승객 한 명 조회 (없으면 None)"""
+        row = self.id_index.get(int(passenger_id))
+        return None if row is None else self._row(row, 1)
+
+    def query(self, pclass: int = None, sex: str = None, survived: int = None,
+              sort_by: str = None, order: str = "asc",
+              page: int = 1, size: int = 10) -> tuple:
+        """
+        필터/정렬/페이지 조회
+
+        Args:
+            pclass: 객실 등급 (1, 2, 3)
+            sex: 성별 ('male', 'female')
+            survived: 생존 여부 (0, 1)
+            sort_by: 정렬 기준 (passengerId, name, pclass, age, fare / 없으면 원본 순서)
+            order: 'asc' 또는 'desc'
+            page: 1부터 시작하는 페이지 번호
+            size: 페이지 크기
+
+        Returns:
+            (승객 딕셔너리 리스트, 조건에 맞는 전체 승객 수)
+        """
+        if sort_by is not None and sort_by not in self.SORTABLE:
+            raise ValueError(f"정렬할 수 없는 컬럼입니다: {sort_by} (가능: {list(self.SORTABLE)})")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"order는 'asc' 또는 'desc'여야 합니다. 현재 값: {order}")
+        if sex is not None and sex not in self.SEX_CODES:
+            raise ValueError(f"sex는 'male' 또는 'female'이어야 합니다. 현재 값: {sex}")
+
+        # 인덱스로 후보 행 집합 계산 (작은 집합부터 교집합)
+        empty = np.empty(0, dtype=np.int64)
+        candidates = []
+        if pclass is not None:
+            candidates.append(self.pclass_index.get(int(pclass), empty))
+        if sex is not None:
+            candidates.append(self.sex_index.get(self.SEX_CODES[sex], empty))
+        if survived is not None:
+            candidates.append(self.survived_index.get(int(survived), empty))
+
+        if candidates:
+            candidates.sort(key=len)
+            rows = candidates[0]
+            for other in candidates[1:]:
+                rows = np.intersect1d(rows, other, assume_unique=True)
+        else:
+            rows = None
+        total = self.total if rows is None else len(rows)
+
+        # 정렬: 미리 계산한 전체 정렬 순서에서 후보 행만 남김
+        if sort_by is not None:
+            asc, desc = self.sort_orders[sort_by]
+            ordered = asc if order == "asc" else desc
+            if rows is not None:
+                member = np.zeros(self.total, dtype=bool)
+                member[rows] = True
+                ordered = ordered[member[ordered]]
+        else:
+            ordered = np.arange(self.total) if rows is None else rows
+            if order == "desc":
+                ordered = ordered[::-1]
+
+        offset = (max(page, 1) - 1) * size
+        page_rows = ordered[offset:offset + size]
+        return [self._row(int(row), offset + idx + 1) for idx, row in enumerate(page_rows)], total
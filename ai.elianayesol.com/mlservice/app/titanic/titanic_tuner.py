@@ -0,0 +1,340 @@
+import json
+import math
+import os
+import time
+import uuid
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from app.titanic.titanic_method import FEATURE_VERSION
+from app.titanic.titanic_model import create_model
+
+# Logger 설정
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# 모델별 탐색 공간
+# -----------------------------
+SEARCH_SPACE = {
+    "logistic_regression": {
+        "C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0],
+        "solver": ["lbfgs", "liblinear"],
+    },
+    "naive_bayes": {
+        "var_smoothing": [1e-11, 1e-10, 1e-9, 1e-8, 1e-7, 1e-6, 1e-5],
+    },
+    "random_forest": {
+        "n_estimators": [100, 200, 300, 500],
+        "max_depth": [None, 4, 6, 8, 10, 12],
+        "min_samples_split": [2, 4, 8, 16],
+        "min_samples_leaf": [1, 2, 4],
+        "max_features": ["sqrt", "log2", None],
+    },
+    "decision_tree": {
+        "max_depth": [None, 3, 4, 5, 6, 8, 10],
+        "min_samples_split": [2, 4, 8, 16],
+        "min_samples_leaf": [1, 2, 4, 8],
+        "criterion": ["gini", "entropy"],
+    },
+    "lightgbm": {
+        "n_estimators": [100, 200, 400],
+        "learning_rate": [0.01, 0.03, 0.05, 0.1],
+        "num_leaves": [7, 15, 31, 63],
+        "min_child_samples": [5, 10, 20, 40],
+        "subsample": [0.7, 0.85, 1.0],
+        "subsample_freq": [1],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+    },
+    "knn": {
+        "n_neighbors": [3, 5, 7, 9, 11, 13, 17, 21, 25],
+        "weights": ["uniform", "distance"],
+        "p": [1, 2],
+    },
+}
+
+
+def _params_key(params: dict) -> str:
+    """파라미터 딕셔너리를 비교 가능한 문자열 키로 변환"""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _evaluate_trial(name: str, params: dict, X: np.ndarray, y: np.ndarray,
+                    budget: int, cv: int, random_state: int) -> float:
+    """
+    한 번의 trial 평가 (워커 프로세스에서 실행)
+
+    budget 은 사용할 학습 행 수이며, 층화 순열의 앞쪽 budget 개 행으로
+    StratifiedKFold 교차검증 평균 정확도를 계산한다.
+    """
+    X_sub, y_sub = X[:budget], y[:budget]
+    model = create_model(name, params)
+    k_fold = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    # 바깥에서 이미 프로세스 병렬화하므로 내부는 단일 작업으로 실행
+    scores = cross_val_score(model, X_sub, y_sub, cv=k_fold, scoring="accuracy", n_jobs=1)
+    return float(np.mean(scores))
+
+
+class TitanicTuner:
+    """
+    타이타닉 모델 저장소 전체에 대한 예산 기반 하이퍼파라미터 탐색
+
+    - Hyperband 방식: 여러 bracket 에서 Successive Halving 을 수행
+    - 예산(budget) = 학습에 사용하는 행 수, 낮은 예산에서 성능이 낮은 trial 은 조기 중단(pruned)
+    - 같은 rung 의 trial 들은 모델 구분 없이 joblib 프로세스 풀에서 병렬 평가
+    - trial 이력은 JSON Lines 로 저장되고, 다음 실행 시 웜 스타트에 사용
+      (동일 데이터 버전에서 이미 평가한 (모델, 파라미터, 예산) 은 재평가하지 않음)
+    """
+
+    def __init__(self, save_dir: str = None, eta: int = 3, min_budget: int = 80,
+                 cv: int = 5, n_jobs: int = -1, random_state: int = 42):
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.save_dir = save_dir or os.path.join(current_dir, 'save')
+        self.history_path = os.path.join(self.save_dir, 'tune_history.jsonl')
+        self.best_path = os.path.join(self.save_dir, 'tune_best.json')
+        self.eta = eta
+        self.min_budget = min_budget
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    # -----------------------------
+    # 데이터 준비
+    # -----------------------------
+    def data_version(self, X: pd.DataFrame, y: np.ndarray) -> str:
+        """전처리된 데이터의 해시 (이력 재사용 범위를 결정)"""
+        digest = hashlib.sha1()
+        digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        digest.update(_params_key(list(X.columns)).encode())
+        return digest.hexdigest()[:16]
+
+    def _stratified_order(self, y: np.ndarray) -> np.ndarray:
+        """앞쪽 어느 구간을 잘라도 클래스 비율이 유지되도록 행 순서를 섞음"""
+        rng = np.random.default_rng(self.random_state)
+        groups = [rng.permutation(np.flatnonzero(y == label)) for label in np.unique(y)]
+        # 각 클래스 내부 위치를 0~1 로 정규화한 뒤 합쳐 정렬 -> 비율이 고르게 섞임
+        positions = np.concatenate([(np.arange(len(g)) + 0.5) / len(g) for g in groups])
+        order = np.concatenate(groups)
+        return order[np.argsort(positions, kind="stable")]
+
+    # -----------------------------
+    # 이력 (웜 스타트)
+    # -----------------------------
+    def load_history(self, version: str = None) -> list:
+        if not os.path.exists(self.history_path):
+            return []
+        records = []
+        with open(self.history_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if version is None or record.get("data_version") == version:
+                    records.append(record)
+        return records
+
+    def _append_history(self, records: list):
+        os.makedirs(self.save_dir, exist_ok=True)
+        with open(self.history_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def load_best(self, version: str = None) -> dict:
+        """
+        저장된 모델별 최적 파라미터 반환 (없으면 빈 딕셔너리)
+
+        tune_best.json 은 탐색한 데이터 버전과 FEATURE_VERSION 을 함께 저장한다.
+        전처리 버전이 다르거나, version(data_version 결과)을 주었는데 데이터 버전이 다르면
+        다른 피처로 찾은 파라미터이므로 쓰지 않는다 (버전 정보가 없는 이전 형식 파일도 무시).
+        """
+        if not os.path.exists(self.best_path):
+            return {}
+        with open(self.best_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get("feature_version") != FEATURE_VERSION or "params" not in saved:
+            logger.warning(f"⚠️ 저장된 최적 파라미터의 전처리 버전이 다릅니다 "
+                           f"({saved.get('feature_version')} != {FEATURE_VERSION}), 무시합니다.")
+            return {}
+        if version is not None and saved.get("data_version") != version:
+            logger.warning(f"⚠️ 저장된 최적 파라미터의 데이터 버전이 다릅니다 "
+                           f"({saved.get('data_version')} != {version}), 무시합니다.")
+            return {}
+        return saved["params"]
+
+    # -----------------------------
+    # 후보 생성
+    # -----------------------------
+    def _sample_configs(self, name: str, n: int, rng: np.random.Generator,
+                        seeds: list, seen: set) -> list:
+        """웜 스타트 후보(seeds)를 먼저 채우고 나머지는 탐색 공간에서 무작위 샘플링"""
+        space = SEARCH_SPACE[name]
+        n_total = math.prod(len(v) for v in space.values())
+        configs = []
+        for params in seeds:
+            key = _params_key(params)
+            if key not in seen and len(configs) < n:
+                seen.add(key)
+                configs.append(params)
+        attempts = 0
+        while len(configs) < n and len(seen) < n_total and attempts < n * 50:
+            attempts += 1
+            params = {k: v[rng.integers(len(v))] for k, v in space.items()}
+            params = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in params.items()}
+            key = _params_key(params)
+            if key in seen:
+                continue
+            seen.add(key)
+            configs.append(params)
+        return configs
+
+    def _brackets(self, max_budget: int) -> list:
+        """Hyperband bracket 목록 [(초기 후보 수, rung 수 s), ...]"""
+        s_max = max(0, int(math.floor(math.log(max_budget / self.min_budget, self.eta) + 1e-9)))
+        return [(int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s)), s) for s in range(s_max, -1, -1)]
+
+    def _rung_budget(self, max_budget: int, s: int, rung: int) -> int:
+        """bracket s 의 rung 번째 예산 (마지막 rung 은 항상 전체 데이터)"""
+        if rung >= s:
+            return max_budget
+        return max(int(max_budget * self.eta ** (rung - s)), self.cv * 2)
+
+    # -----------------------------
+    # 탐색 실행
+    # -----------------------------
+    def tune(self, X: pd.DataFrame, y: np.ndarray, models: list = None) -> dict:
+        """
+        모델 저장소 전체 하이퍼파라미터 탐색
+
+        Args:
+            X: 전처리된 학습 피처
+            y: 라벨 (1차원)
+            models: 탐색할 모델 이름 목록 (기본값: SEARCH_SPACE 전체)
+
+        Returns:
+            모델별 최적 파라미터/점수, 전체 최적 모델, trial 통계를 담은 딕셔너리
+        """
+        started = time.perf_counter()
+        models = models or list(SEARCH_SPACE)
+        unknown = [m for m in models if m not in SEARCH_SPACE]
+        if unknown:
+            raise ValueError(f"탐색 공간이 없는 모델입니다: {unknown}")
+
+        y = np.asarray(y).ravel()
+        version = self.data_version(X, y)
+        order = self._stratified_order(y)
+        X_arr = X.to_numpy(dtype=np.float64)[order]
+        y_arr = y[order]
+        max_budget = len(y_arr)
+
+        # 이전 실행 이력: (모델, 파라미터, 예산) -> 점수 캐시 + 모델별 상위 파라미터
+        history = self.load_history(version)
+        score_cache = {(r["model"], _params_key(r["params"]), r["budget"]): r["score"] for r in history}
+        warm_seeds = {}
+        for name in models:
+            done = [r for r in history if r["model"] == name and r["budget"] == max_budget]
+            done.sort(key=lambda r: r["score"], reverse=True)
+            warm_seeds[name] = [r["params"] for r in done[:self.eta]]
+        logger.info(f"🔎 하이퍼파라미터 탐색 시작 (데이터 버전 {version}, 이전 trial {len(history)}개)")
+
+        run_id = uuid.uuid4().hex[:8]
+        rng = np.random.default_rng(self.random_state + len(history))
+        seen = {name: set() for name in models}
+        records = []
+        n_evaluated = 0
+        n_reused = 0
+
+        for bracket_idx, (n_configs, s) in enumerate(self._brackets(max_budget)):
+            # bracket 마다 모델별 후보 생성 (웜 스타트 후보는 가장 공격적인 bracket 에만 투입)
+            alive = {}
+            for name in models:
+                seeds = warm_seeds[name] if bracket_idx == 0 else []
+                alive[name] = self._sample_configs(name, n_configs, rng, seeds, seen[name])
+
+            for rung in range(s + 1):
+                budget = self._rung_budget(max_budget, s, rung)
+                jobs = [(name, params) for name in models for params in alive[name]]
+                if not jobs:
+                    break
+                pending = [(name, params) for name, params in jobs
+                           if (name, _params_key(params), budget) not in score_cache]
+                scores = Parallel(n_jobs=self.n_jobs)(
+                    delayed(_evaluate_trial)(name, params, X_arr, y_arr, budget, self.cv, self.random_state)
+                    for name, params in pending
+                )
+                evaluated = set()
+                for (name, params), score in zip(pending, scores):
+                    score_cache[(name, _params_key(params), budget)] = score
+                    evaluated.add((name, _params_key(params)))
+                n_evaluated += len(pending)
+                n_reused += len(jobs) - len(pending)
+
+                # 모델별로 상위 1/eta 만 다음 rung 으로 승격, 나머지는 조기 중단
+                is_last = rung == s
+                next_alive = {}
+                for name in models:
+                    ranked = sorted(alive[name],
+                                    key=lambda p: score_cache[(name, _params_key(p), budget)],
+                                    reverse=True)
+                    keep = 0 if is_last else max(1, len(ranked) // self.eta)
+                    for idx, params in enumerate(ranked):
+                        records.append({
+                            "run_id": run_id,
+                            "data_version": version,
+                            "model": name,
+                            "params": params,
+                            "budget": budget,
+                            "bracket": bracket_idx,
+                            "rung": rung,
+                            "score": score_cache[(name, _params_key(params), budget)],
+                            "status": "completed" if is_last else ("promoted" if idx < keep else "pruned"),
+                            "reused": (name, _params_key(params)) not in evaluated,
+                        })
+                    next_alive[name] = ranked[:keep]
+                alive = next_alive
+
+        self._append_history(records)
+
+        # 전체 예산으로 평가된 trial 중 모델별 최고 파라미터 선택 (이전 실행 포함)
+        full = [r for r in history + records if r["budget"] == max_budget]
+        best = {}
+        for name in models:
+            candidates = [r for r in full if r["model"] == name]
+            if not candidates:
+                continue
+            top = max(candidates, key=lambda r: r["score"])
+            best[name] = {"params": top["params"], "accuracy": round(top["score"] * 100, 2)}
+        best_model = max(best, key=lambda m: best[m]["accuracy"]) if best else None
+
+        # 같은 데이터 버전에서 이번에 탐색하지 않은 모델의 파라미터는 유지
+        saved = self.load_best(version)
+        saved.update({name: info["params"] for name, info in best.items()})
+        os.makedirs(self.save_dir, exist_ok=True)
+        tmp_path = f"{self.best_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"data_version": version, "feature_version": FEATURE_VERSION, "params": saved},
+                      f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.best_path)
+
+        elapsed = round(time.perf_counter() - started, 2)
+        logger.info(f"🔎 탐색 완료: 평가 {n_evaluated}회, 이력 재사용 {n_reused}회, {elapsed}초")
+        if best_model:
+            logger.info(f"🏆 최적 모델: {best_model} ({best[best_model]['accuracy']}%)")
+
+        return {
+            "run_id": run_id,
+            "data_version": version,
+            "best_model": best_model,
+            "best": best,
+            "trials": {
+                "evaluated": n_evaluated,
+                "reused": n_reused,
+                "pruned": sum(1 for r in records if r["status"] == "pruned"),
+                "completed": sum(1 for r in records if r["status"] == "completed"),
+            },
+            "elapsed_seconds": elapsed,
+        }
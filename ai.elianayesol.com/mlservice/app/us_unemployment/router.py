@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from app.us_unemployment.service import USUnemploymentService
+from app.common.container import services
 import logging
 import os
 
@@ -16,8 +18,8 @@ router = APIRouter(
 )
 
 def get_service() -> USUnemploymentService:
-    """USUnemploymentService 인스턴스 반환"""
-    return USUnemploymentService()
+    """프로세스에서 공유하는 USUnemploymentService 인스턴스 반환 (서비스 컨테이너)"""
+    return services.get(USUnemploymentService)
 
 @router.get(
     "/",
@@ -31,6 +33,25 @@ async def usa_root():
         "status": "running"
     }
 
+def _render_map(service: USUnemploymentService, location: list, zoom_start: int) -> str:
+    """
+    지도를 생성/저장하고 HTML 문자열 반환
+
+    지도는 서비스 인스턴스(service.map)에 만들어지므로 생성 → 저장 → 변환을 서비스 잠금 안에서 처리
+    (동시에 다른 위치로 요청해도 서로의 지도를 덮어쓰지 않음)
+    """
+    with services.lock(USUnemploymentService):
+        # 지도 생성
+        service.generate_map(location=location, zoom_start=zoom_start)
+        
+        # 지도 저장
+        saved_path = service.save_map("us_unemployment_map.html")
+        logger.info(f"💾 지도 저장 경로: {saved_path}")
+        
+        # HTML로 변환 (Folium 지도를 HTML 문자열로 변환)
+        map_obj = service.get_map()
+        return map_obj.get_root().render()
+
 @router.get(
     "/map",
     summary="미국 실업률 지도 생성",
@@ -55,16 +76,8 @@ async def generate_map(
         lat, lng = map(float, location.split(','))
         location_list = [lat, lng]
         
-        # 지도 생성
-        service.generate_map(location=location_list, zoom_start=zoom_start)
-        
-        # 지도 저장
-        saved_path = service.save_map("us_unemployment_map.html")
-        logger.info(f"💾 지도 저장 경로: {saved_path}")
-        
-        # HTML로 변환 (Folium 지도를 HTML 문자열로 변환)
-        map_obj = service.get_map()
-        map_html = map_obj.get_root().render()
+        # 데이터 다운로드와 지도 렌더링은 스레드풀에서 (서비스 잠금을 이벤트 루프에서 잡지 않도록)
+        map_html = await run_in_threadpool(_render_map, service, location_list, zoom_start)
         
         return HTMLResponse(content=map_html)
         
@@ -83,6 +96,12 @@ async def generate_map(
             }
         )
 
+def _load_map_data(service: USUnemploymentService) -> tuple:
+    """서비스 잠금 안에서 지도 데이터를 (필요하면 내려받아) 읽고 (state_geo, state_data) 반환"""
+    with services.lock(USUnemploymentService):
+        service.load_data()
+        return service.state_geo, service.state_data
+
 @router.get(
     "/map/info",
     summary="지도 생성 정보 조회",
@@ -97,14 +116,14 @@ async def get_map_info():
     """
     try:
         service = get_service()
-        service.load_data()
+        state_geo, state_data = await run_in_threadpool(_load_map_data, service)
         
         return {
             "status": "success",
             "data_summary": {
-                "states_count": len(service.state_geo.get('features', [])) if service.state_geo else 0,
-                "unemployment_data_rows": len(service.state_data) if service.state_data is not None else 0,
-                "unemployment_data_columns": service.state_data.columns.tolist() if service.state_data is not None else [],
+                "states_count": len(state_geo.get('features', [])) if state_geo else 0,
+                "unemployment_data_rows": len(state_data) if state_data is not None else 0,
+                "unemployment_data_columns": state_data.columns.tolist() if state_data is not None else [],
                 "geo_url": service.geo_url,
                 "data_url": service.data_url
             }
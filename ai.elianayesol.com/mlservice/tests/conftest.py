@@ -0,0 +1,38 @@
+import os
+import shutil
+from functools import partial
+
+import pandas as pd
+import pytest
+
+from app.grade import grade_service
+from app.grade.grade_partition import GradePartitionStore
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+
+
+@pytest.fixture
+def clean_save_dirs():
+    """테스트가 새로 만든 app/*/save 폴더를 테스트가 끝나면 지움 (원래 있던 폴더는 그대로 둠)"""
+    def track(*relative_paths):
+        paths = [os.path.join(APP_DIR, path) for path in relative_paths]
+        created.extend(path for path in paths if not os.path.exists(path))
+
+    created = []
+    yield track
+    for path in created:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def grade_store(tmp_path, monkeypatch, clean_save_dirs):
+    """원본 2025년 데이터 + 절반만 복사한 2024년 파티션을 임시 폴더에 적재한 저장소"""
+    clean_save_dirs('grade/save')
+    store_cls = partial(GradePartitionStore, root=str(tmp_path / 'partitions'))
+    monkeypatch.setattr(grade_service, 'GradePartitionStore', store_cls)
+    store = store_cls()
+    store.bootstrap()
+    for split in ('train', 'test'):
+        df = pd.read_csv(f'{store.current_dir}/{split}.csv')
+        store.ingest(df.iloc[::2].assign(year=2024), split=split)
+    return store
@@ -0,0 +1,77 @@
+# 자치구 공간 인덱스: 점-폴리곤 판정 (구멍, MultiPolygon, 범위 밖)
+import numpy as np
+import pytest
+
+from app.seoul_crime.district_index import DistrictIndex
+
+
+def square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+@pytest.fixture
+def index():
+    geo = {"type": "FeatureCollection", "features": [
+        # 가운데 구멍이 있는 구
+        {"properties": {"name": "가"},
+         "geometry": {"type": "Polygon", "coordinates": [square(0, 0, 4, 4), square(1, 1, 3, 3)]}},
+        # 떨어진 두 조각으로 된 구
+        {"properties": {"name": "나"},
+         "geometry": {"type": "MultiPolygon",
+                      "coordinates": [[square(5, 0, 6, 1)], [square(5, 3, 6, 4)]]}},
+        # 가의 구멍 안에 있는 구
+        {"properties": {"name": "다"},
+         "geometry": {"type": "Polygon", "coordinates": [square(1.5, 1.5, 2.5, 2.5)]}},
+        # 지원하지 않는 geometry 는 건너뜀
+        {"properties": {"name": "점"}, "geometry": {"type": "Point", "coordinates": [0, 0]}},
+    ]}
+    return DistrictIndex.from_geojson(geo, node_capacity=2)
+
+
+def test_locate_shell_hole_and_multipolygon(index):
+    # (경도, 위도)
+    points = np.array([
+        [0.5, 0.5],   # 가 외곽 안
+        [1.2, 1.2],   # 가 구멍 안, 다 밖 -> 어디에도 없음
+        [2.0, 2.0],   # 구멍 안의 다
+        [5.5, 0.5],   # 나 첫 조각
+        [5.5, 3.5],   # 나 둘째 조각
+        [5.5, 2.0],   # 나 조각 사이
+        [10, 10],     # 전체 범위 밖
+        [np.nan, 1],  # 좌표 없음
+    ])
+    located = index.locate(points[:, 1], points[:, 0])
+    assert located.tolist() == [0, -1, 2, 1, 1, -1, -1, -1]
+    assert index.assign(points[:, 1], points[:, 0], missing="?").tolist() == ["가", "?", "다", "나", "나", "?", "?", "?"]
+    assert len(index) == 3
+
+
+def test_locate_matches_brute_force(index):
+    rng = np.random.default_rng(0)
+    lng, lat = rng.uniform(-1, 7, 5000), rng.uniform(-1, 5, 5000)
+    located = index.locate(lat, lng)
+
+    def brute(x, y):
+        if 0 < x < 4 and 0 < y < 4 and not (1 < x < 3 and 1 < y < 3):
+            return 0
+        if 5 < x < 6 and (0 < y < 1 or 3 < y < 4):
+            return 1
+        if 1.5 < x < 2.5 and 1.5 < y < 2.5:
+            return 2
+        return -1
+
+    assert located.tolist() == [brute(x, y) for x, y in zip(lng, lat)]
+
+
+def test_small_chunks_give_same_result(index):
+    rng = np.random.default_rng(1)
+    lng, lat = rng.uniform(-1, 7, 1000), rng.uniform(-1, 5, 1000)
+    chunked = DistrictIndex(index.names, index.polygons, max_cells=7)
+    assert np.array_equal(chunked.locate(lat, lng), index.locate(lat, lng))
+
+
+def test_areas_exclude_holes(index):
+    areas = index.areas_m2()
+    # 가 = 16 - 4, 나 = 1 + 1, 다 = 1 (제곱도 단위 비율)
+    assert areas[0] / areas[2] == pytest.approx(12, rel=1e-3)
+    assert areas[1] / areas[2] == pytest.approx(2, rel=1e-3)
@@ -0,0 +1,99 @@
+# ESG 등급 엔드포인트 오류 응답: 잘못된 요청 값만 400
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.grade.grade_service import GradeService
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('ML_WARM_SERVICES', '0')
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def fit_calls(monkeypatch):
+    calls = []
+
+    def broken_fit(self, name='random_forest', years=None, dataset=None):
+        calls.append(name)
+        raise ValueError("모델 학습 실패")
+
+    monkeypatch.setattr(GradeService, 'get_fitted_model', broken_fit)
+    return calls
+
+
+COMPANY = {"envRating": "C", "socRating": "A", "govRating": "A", "year": 2025}
+
+
+@pytest.mark.parametrize("company, params", [
+    (COMPANY, {"model": "svm"}),
+    ({**COMPANY, "envRating": "Z"}, {}),
+])
+def test_invalid_predict_request_is_400_without_fitting(client, fit_calls, company, params):
+    response = client.post('/grade/predict', params=params, json={"companies": [company]})
+    assert response.status_code == 400
+    assert "detail" not in response.json()
+    assert fit_calls == []
+
+
+def test_predict_internal_error_is_500(client, fit_calls):
+    response = client.post('/grade/predict', json={"companies": [COMPANY]})
+    assert response.status_code == 500
+    assert "detail" in response.json()
+    assert fit_calls == ['random_forest']
+
+
+def test_unknown_company_transition_is_404(client):
+    response = client.get('/grade/companies/999999999/transition')
+    assert response.status_code == 404
+    assert "detail" not in response.json()
+
+
+def test_transition_internal_key_error_is_500(client, monkeypatch):
+    def broken_history(self):
+        raise KeyError('company_code')
+
+    monkeypatch.setattr(GradeService, 'history_frame', broken_history)
+    response = client.get('/grade/companies/1/transition')
+    assert response.status_code == 500
+    assert "detail" in response.json()
+
+
+def test_transition_evaluate_invalid_n_splits_is_400(client):
+    response = client.get('/grade/transition/evaluate', params={"n_splits": 1})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("body, params", [
+    (b"a,b\n1,2\n", {}),
+    (b"", {}),
+    (b"NO,company_name\n1,\"x\n2", {}),
+    (b"NO,company_name,company_code,esg_rating,env_rating,soc_rating,gov_rating,year\n", {"split": "valid"}),
+])
+def test_malformed_ingest_is_400(client, body, params):
+    response = client.post('/grade/ingest', params=params,
+                           files={'file': ('new.csv', io.BytesIO(body), 'text/csv')})
+    assert response.status_code == 400
+    assert "detail" not in response.json()
+
+
+def test_ingest_internal_error_is_500(client, monkeypatch):
+    def broken_ingest(self, df, split="train", replace=False):
+        raise ValueError("파티션 쓰기 실패")
+
+    monkeypatch.setattr(GradeService, 'ingest', broken_ingest)
+    body = b"NO,company_name,company_code,esg_rating,env_rating,soc_rating,gov_rating,year\n1,a,1,A,A,A,A,2030\n"
+    response = client.post('/grade/ingest', files={'file': ('new.csv', io.BytesIO(body), 'text/csv')})
+    assert response.status_code == 500
+
+
+@pytest.mark.parametrize("years", ["abc", "1999"])
+def test_invalid_profile_years_is_400(client, years):
+    response = client.get('/grade/profile', params={"years": years})
+    assert response.status_code == 400
+    assert "detail" not in response.json()
@@ -0,0 +1,26 @@
+# 회사별 등급 이력 프레임 캐시
+from app.grade import grade_service
+from app.grade.grade_service import GradeService
+
+
+def test_history_frame_is_cached_until_partitions_change(grade_store, monkeypatch):
+    builds = []
+    original = GradeService._build_history
+    monkeypatch.setattr(GradeService, '_build_history',
+                        lambda self, store: builds.append(1) or original(self, store))
+    service = GradeService()
+
+    first = service.history_frame()
+    first['scratch'] = 1  # 호출한 쪽의 수정이 캐시에 남지 않아야 함
+    second = service.history_frame()
+    assert len(builds) == 1
+    assert 'scratch' not in second.columns
+    assert sorted(second['year'].unique()) == [2024, 2025]
+
+    # 새 연도를 적재하면 파티션 해시가 바뀌어 다시 계산
+    train = grade_store.read('train', [2025])
+    grade_store.ingest(train.assign(year=2026), split='train')
+    third = service.history_frame()
+    assert len(builds) == 2
+    assert 2026 in set(third['year'])
+    assert len(grade_service._HISTORY_CACHE) == 1
@@ -0,0 +1,36 @@
+# 컬럼별 인코딩 래퍼 (*_Nominal / *_Ordinal)
+import numpy as np
+import pandas as pd
+
+from app.grade.grade_method import GradeMethod
+
+
+def frames():
+    train = pd.DataFrame({'company_code': [10, 20], 'env_rating': ['S', 'B+'], 'year': ['2024', '2025']})
+    test = pd.DataFrame({'company_code': [20, 30], 'env_rating': ['A', 'Z'], 'year': ['2025', '2025']})
+    return train, test
+
+
+def test_ordinal_wrapper_returns_copies_and_keeps_nan_for_unknown():
+    train, test = frames()
+    original_train, original_test = train.copy(), test.copy()
+    encoded_train, encoded_test = GradeMethod().env_rating_Ordinal(train, test)
+
+    pd.testing.assert_frame_equal(train, original_train)
+    pd.testing.assert_frame_equal(test, original_test)
+    assert encoded_train['env_rating'].tolist() == [0, 3]
+    assert encoded_test['env_rating'].iloc[0] == 2
+    assert np.isnan(encoded_test['env_rating'].iloc[1])
+
+
+def test_nominal_and_year_wrappers_leave_inputs_untouched():
+    train, test = frames()
+    method = GradeMethod()
+    encoded_train, encoded_test = method.company_code_Nominal(train, test)
+    assert encoded_train['company_code'].tolist() == [0, 1]
+    assert encoded_test['company_code'].tolist() == [1, -1]
+
+    encoded_train, _ = method.year_Ordinal(train, test)
+    assert encoded_train['year'].tolist() == [2024, 2025]
+    assert train['company_code'].tolist() == [10, 20]
+    assert train['year'].tolist() == ['2024', '2025']
@@ -0,0 +1,64 @@
+# 연도 파티션 저장소: 동시 bootstrap, split 에 없는 연도 읽기, 적재 검증
+import threading
+
+import pandas as pd
+import pytest
+
+from app.common.errors import InvalidRequestError
+from app.grade.grade_partition import GradePartitionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return GradePartitionStore(root=str(tmp_path / 'partitions'))
+
+
+def test_concurrent_bootstrap_ingests_once(store):
+    errors = []
+
+    def bootstrap():
+        try:
+            GradePartitionStore(root=store.root).bootstrap()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=bootstrap) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert store.years('train') == store.years('test') == [2025]
+    assert store.bootstrap() == []
+
+
+def test_read_year_missing_from_split(store):
+    store.bootstrap()
+    train = pd.read_csv(f'{store.current_dir}/train.csv').assign(year=2024)
+    store.ingest(train, split='train')
+
+    # 일부 연도만 있으면 있는 연도만 읽음
+    assert set(store.read('test', [2024, 2025])['year']) == {2025}
+    # 하나도 없으면 missing_ok 일 때 같은 dtype 의 빈 프레임
+    empty = store.read('test', [2024], missing_ok=True)
+    assert empty.empty
+    assert empty.dtypes.equals(store.read('test', [2025]).dtypes)
+    with pytest.raises(ValueError, match='test 파티션이 없습니다'):
+        store.read('test', [2024])
+
+
+def test_ingest_validation_errors_are_request_errors(store):
+    store.bootstrap()
+    train = pd.read_csv(f'{store.current_dir}/train.csv')
+    with pytest.raises(InvalidRequestError):
+        store.ingest(train, split='valid')
+    with pytest.raises(InvalidRequestError):
+        store.ingest(train.drop(columns='year'))
+    with pytest.raises(InvalidRequestError):
+        store.ingest(pd.concat([train.head(2), train.head(2)]).assign(year=2024))
+    with pytest.raises(InvalidRequestError):
+        store.ingest(train.head(2).assign(year=2024, company_code='abc'))
+    with pytest.raises(InvalidRequestError, match='이미 적재된 연도입니다'):
+        store.ingest(train)
+    assert store.years('train') == [2025]
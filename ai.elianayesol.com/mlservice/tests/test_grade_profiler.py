@@ -0,0 +1,43 @@
+# 전처리 계측기: 동시 계측이 서로의 tracemalloc 추적을 멈추지 않는지
+import threading
+import time
+import tracemalloc
+
+from app.grade.grade_profiler import PipelineProfiler
+
+
+def allocate():
+    data = [bytes(1024) for _ in range(2000)]
+    time.sleep(0.05)
+    return len(data)
+
+
+def test_concurrent_profilers_keep_their_peaks():
+    profilers = [PipelineProfiler(enabled=True) for _ in range(4)]
+
+    def run(profiler):
+        for i in range(3):
+            profiler.run(f"step{i}", allocate)
+
+    threads = [threading.Thread(target=run, args=(profiler,)) for profiler in profilers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for profiler in profilers:
+        peaks = [record["peak_alloc_mb"] for record in profiler.report()["steps"]]
+        assert len(peaks) == 3 and min(peaks) >= 1.5
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_stops_when_step_fails():
+    def broken():
+        raise RuntimeError("단계 실패")
+
+    profiler = PipelineProfiler(enabled=True)
+    try:
+        profiler.run("broken", broken)
+    except RuntimeError:
+        pass
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,45 @@
+# 히트맵 렌더링 캐시: 디스크 용량 상한, 같은 키 동시 렌더링
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.seoul_crime.heatmap_cache import HeatmapCache
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = HeatmapCache(cache_dir=str(tmp_path), max_items=1, max_disk_bytes=250)
+    for key in ('a', 'b'):
+        cache.put(key, b'x' * 100)
+        os.utime(cache.path(key), (time.time() - 100, time.time() - 100))
+    # b 를 메모리에서 밀어낸 뒤 디스크에서 읽어 최근 사용으로 갱신
+    cache.put('c', b'x' * 10)
+    assert cache.get('a') == (b'x' * 100, 'hit-disk')
+    os.utime(cache.path('b'), (time.time() - 200, time.time() - 200))
+
+    cache.put('d', b'x' * 100)
+
+    assert sorted(os.listdir(tmp_path)) == ['a.png', 'c.png', 'd.png']
+    assert cache.get('b', 'png')[1] == 'miss'
+
+
+def test_concurrent_requests_render_once(tmp_path):
+    cache = HeatmapCache(cache_dir=str(tmp_path))
+    calls = []
+    started = threading.Event()
+
+    def render():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return b'png'
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(cache.get_or_render, 'k', render)
+        started.wait()
+        others = [pool.submit(cache.get_or_render, 'k', render) for _ in range(3)]
+        results = [first.result()] + [future.result() for future in others]
+
+    assert len(calls) == 1
+    assert results[0] == (b'png', 'miss')
+    assert all(content == b'png' and status.startswith('hit') for content, status in results[1:])
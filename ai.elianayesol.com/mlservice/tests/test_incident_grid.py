@@ -0,0 +1,114 @@
+# 사건 좌표 격자 / 청크 집계
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.common.errors import InvalidRequestError
+from app.seoul_crime.district_index import DistrictIndex
+from app.seoul_crime.incident_grid import IncidentAggregator, IncidentGrid, aggregate_incidents
+
+# (최소 경도, 최소 위도, 최대 경도, 최대 위도) - 약 9km x 6.6km
+BOUNDS = (127.0, 37.5, 127.1, 37.56)
+
+
+def random_points(n, seed=0, margin=0.0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(BOUNDS[1] - margin, BOUNDS[3] + margin, n)
+    lng = rng.uniform(BOUNDS[0] - margin, BOUNDS[2] + margin, n)
+    return lat, lng
+
+
+@pytest.fixture
+def districts():
+    # 범위를 동서로 나눈 두 구 (동쪽 끝 0.01도는 어느 구에도 없음)
+    west = [[127.0, 37.5], [127.05, 37.5], [127.05, 37.56], [127.0, 37.56], [127.0, 37.5]]
+    east = [[127.05, 37.5], [127.09, 37.5], [127.09, 37.56], [127.05, 37.56], [127.05, 37.5]]
+    return DistrictIndex(["서", "동"], [[(west, [])], [(east, [])]])
+
+
+def test_square_cells_match_floor_of_projected_meters():
+    grid = IncidentGrid(BOUNDS, kind='square', cell_m=250)
+    lat, lng = random_points(2000)
+    x, y = grid.project(lat, lng)
+    expected = np.floor(y / 250).astype(int) * grid.n_q + np.floor(x / 250).astype(int)
+    assert np.array_equal(grid.cell_index(lat, lng), expected)
+    # 범위 밖과 좌표 없음은 -1
+    assert grid.cell_index([37.0, np.nan], [127.05, 127.05]).tolist() == [-1, -1]
+
+
+def test_hex_cell_is_nearest_center():
+    grid = IncidentGrid(BOUNDS, kind='hex', cell_m=400)
+    lat, lng = random_points(3000, seed=1)
+    index = grid.cell_index(lat, lng)
+    assert (index >= 0).all()
+
+    # 모든 칸 중심 (미터) 과 비교: 육각형 격자에서 점이 속한 칸 = 중심이 가장 가까운 칸
+    cells = np.arange(grid.n_cells)
+    r, q = np.divmod(cells, grid.n_q)
+    q, r = q + grid.q_min, r + grid.r_min
+    cx, cy = 400 * math.sqrt(3) * (q + r / 2), 400 * 1.5 * r
+    x, y = grid.project(lat, lng)
+    distances = (x[:, None] - cx) ** 2 + (y[:, None] - cy) ** 2
+    nearest = distances.min(axis=1)
+    assert np.allclose(distances[np.arange(len(x)), index], nearest)
+
+
+def test_cell_polygon_contains_its_points():
+    grid = IncidentGrid(BOUNDS, kind='hex', cell_m=500)
+    lat, lng = random_points(50, seed=2)
+    for la, ln, cell in zip(lat, lng, grid.cell_index(lat, lng)):
+        ring = np.array(grid.cell_polygon(cell))
+        assert ring[0].tolist() == ring[-1].tolist() and len(ring) == 7
+        index = DistrictIndex(["칸"], [[(ring, [])]])
+        assert index.locate([la], [ln])[0] == 0
+
+
+@pytest.mark.parametrize("kwargs", [{"kind": "tri"}, {"cell_m": 10}, {"cell_m": 50, "bounds": (120, 30, 130, 40)}])
+def test_invalid_grid_is_request_error(kwargs):
+    bounds = kwargs.pop("bounds", BOUNDS)
+    with pytest.raises(InvalidRequestError):
+        IncidentGrid(bounds, **kwargs)
+
+
+def test_chunked_aggregation_equals_single_pass(districts):
+    grid = IncidentGrid(BOUNDS, kind='hex', cell_m=300)
+    lat, lng = random_points(10_000, seed=3, margin=0.01)
+    lat[:7] = np.nan
+
+    whole = IncidentAggregator(districts, grid)
+    whole.add(lat, lng)
+    chunked = IncidentAggregator(districts, grid)
+    for start in range(0, len(lat), 999):
+        chunked.add(lat[start:start + 999], lng[start:start + 999])
+
+    assert np.array_equal(whole.district_counts, chunked.district_counts)
+    assert np.array_equal(whole.cell_counts, chunked.cell_counts)
+    assert whole.summary() == chunked.summary()
+
+    summary = whole.summary()
+    assert summary["rows"] == 10_000 and summary["invalid"] == 7
+    assert whole.district_counts.sum() + summary["outside_districts"] == 10_000 - 7
+    assert whole.cell_counts.sum() + summary["outside_grid"] == 10_000 - 7
+    expected = districts.locate(lat, lng)
+    assert whole.district_counts.tolist() == [int((expected == 0).sum()), int((expected == 1).sum())]
+
+
+def test_aggregate_incidents_reads_file_in_chunks(tmp_path, districts):
+    grid = IncidentGrid(BOUNDS, kind='square', cell_m=500)
+    lat, lng = random_points(1000, seed=4)
+    frame = pd.DataFrame({"사건": range(1000), "위도": lat.round(6).astype(object), "경도": lng.round(6)})
+    frame.loc[3, "위도"] = "없음"
+    path = tmp_path / "incidents.csv"
+    frame.to_csv(path, index=False, encoding="utf-8-sig")
+
+    aggregator = aggregate_incidents(str(path), districts, grid, chunksize=128)
+
+    assert aggregator.rows == 1000 and aggregator.invalid == 1
+    table = aggregator.district_table()
+    assert table["사건수"].sum() == 999 - aggregator.outside_districts
+    geo = aggregator.cells_geojson(min_count=2)
+    counts = [feature["properties"]["count"] for feature in geo["features"]]
+    assert min(counts) >= 2
+    assert sum(counts) == aggregator.cell_counts[aggregator.cell_counts >= 2].sum()
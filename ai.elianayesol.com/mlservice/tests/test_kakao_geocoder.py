@@ -0,0 +1,45 @@
+# 카카오 지오코딩 클라이언트의 차단기 / 호출 지표
+import asyncio
+
+import httpx
+
+from app.seoul_crime.kakao_geocoder import AsyncKakaoGeocoder, CircuitBreaker, LatencyMetrics
+
+
+def geocoder(handler, breaker, metrics):
+    return AsyncKakaoGeocoder(
+        api_key="test", base_url="http://fake/v2/local", concurrency=1, rate_per_sec=0, max_retries=1, backoff=0,
+        timeout=1, transport=httpx.MockTransport(handler), breaker=breaker, metrics=metrics,
+    )
+
+
+def test_failures_open_breaker_and_are_recorded():
+    breaker, metrics = CircuitBreaker(failure_threshold=2, reset_timeout=60), LatencyMetrics()
+    client = geocoder(lambda request: httpx.Response(503), breaker, metrics)
+
+    results = asyncio.run(client.geocode_many(["a", "b", "c"]))
+
+    assert results == {"a": None, "b": None, "c": None}
+    assert breaker.state == "open"
+    summary = metrics.summary()
+    # 두 건이 재시도까지 실패해 차단기가 열리고, 세 번째는 호출하지 않음
+    assert (summary["error"], summary["rejected"], summary["retries"]) == (2, 1, 2)
+
+
+def test_half_open_probe_with_client_error_does_not_block_next_probe():
+    breaker, metrics = CircuitBreaker(failure_threshold=1, reset_timeout=0), LatencyMetrics()
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+
+    forbidden = geocoder(lambda request: httpx.Response(403), breaker, metrics)
+    assert asyncio.run(forbidden.geocode_many(["a"])) == {"a": None}
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    breaker.release()
+
+    documents = {"documents": [{"address_name": "서울 중구", "x": "126.97", "y": "37.56"}]}
+    ok = geocoder(lambda request: httpx.Response(200, json=documents), breaker, metrics)
+    result = asyncio.run(ok.geocode_many(["b"]))["b"]
+    assert result[0]["geometry"]["location"] == {"lat": 37.56, "lng": 126.97}
+    assert breaker.state == "closed"
+    assert metrics.summary()["success"] == 1
@@ -0,0 +1,33 @@
+# 서울 범죄 엔드포인트 오류 응답: 잘못된 요청 값만 400
+import json
+
+import pandas as pd
+import pytest
+
+from app.common.errors import InvalidRequestError
+from app.seoul_crime.cctv_allocator import CctvAllocator
+from app.seoul_crime.seoul_router import _error_response
+
+
+@pytest.mark.parametrize("error, status", [
+    (InvalidRequestError("잘못된 값"), 400),
+    (FileNotFoundError("파일 없음"), 404),
+    (ValueError("내부 계산 오류"), 500),
+    (KeyError("컬럼"), 500),
+])
+def test_error_response_status(error, status):
+    response = _error_response(error, "테스트")
+    assert response.status_code == status
+    body = json.loads(response.body)
+    assert body["status"] == "error"
+    assert ("detail" in body) == (status == 500)
+
+
+def test_validation_errors_are_invalid_request_errors():
+    districts = pd.DataFrame({'자치구': ['a'], '기존CCTV': [1], '가중치': [1.0], '면적_m2': [1e6]})
+    with pytest.raises(InvalidRequestError):
+        CctvAllocator(districts).solve(-1)
+    # 입력 데이터 문제는 요청 값 오류가 아님 (500)
+    with pytest.raises(ValueError) as info:
+        CctvAllocator(districts.drop(columns='면적_m2'))
+    assert not isinstance(info.value, InvalidRequestError)
@@ -0,0 +1,69 @@
+# 서비스 컨테이너가 공유하는 서비스 인스턴스에 요청별 상태가 남지 않는지 확인
+import pytest
+
+from app.grade import grade_service
+from app.grade.grade_service import GradeService
+from app.titanic import titanic_service
+from app.titanic.titanic_service import TitanicService
+
+
+@pytest.fixture
+def fitted(monkeypatch):
+    """_load_or_fit 을 디스크에 저장하지 않는 버전으로 바꾸고 (prefix, version) 을 기록"""
+    calls = []
+
+    def load_or_fit(self, prefix, version, fit):
+        model = fit()
+        model.version = version
+        calls.append((prefix, version))
+        return model
+
+    monkeypatch.setattr(GradeService, '_load_or_fit', load_or_fit)
+    return calls
+
+
+def test_grade_evaluate_with_years_does_not_leak_into_later_requests(grade_store, fitted, monkeypatch):
+    service = GradeService()
+    full_version = service.model_version('naive_bayes')
+
+    # 2024년만 평가한 뒤에도 연도를 지정하지 않은 요청은 전체 연도 기준이어야 함
+    service.evaluate(models=['naive_bayes'], n_splits=2, n_jobs=1, years=[2024])
+    assert fitted[-1][1] == service.model_version('naive_bayes', [2024]) != full_version
+
+    rows = []
+    original = grade_service.GradeModel.fit
+    monkeypatch.setattr(grade_service.GradeModel, 'fit',
+                        lambda model, X, y: rows.append(len(X)) or original(model, X, y))
+    service.get_fitted_model('naive_bayes')
+    assert fitted[-1][1] == service.model_version('naive_bayes') == full_version
+    assert rows[-1] == len(GradeService().preprocess().train)
+    assert vars(service) == {}
+
+
+def test_grade_ingest_does_not_touch_datasets_in_use(grade_store):
+    service = GradeService()
+    dataset = service.preprocess([2024])
+    train = grade_store.read('train', [2025])
+    service.ingest(train.assign(year=2023), split='train')
+    # 다른 요청이 쓰고 있던 데이터셋은 그대로
+    assert dataset.train is not None and len(dataset.train) > 0
+    assert dataset.report
+
+
+def test_titanic_tuned_params_apply_only_to_the_request(monkeypatch, clean_save_dirs):
+    clean_save_dirs('titanic/save')
+    tuned = {'random_forest': {'n_estimators': 7, 'max_depth': 3}}
+    monkeypatch.setattr(titanic_service.TitanicTuner, 'load_best', lambda self, version=None: tuned)
+    service = TitanicService()
+    default_version = service.model_version('random_forest')
+
+    # /titanic/evaluate?tuned=true 와 같은 순서
+    dataset = service.preprocess()
+    params = service.load_best_params(dataset)
+    models = service.modeling(params)
+    assert models['random_forest'].get_params()['n_estimators'] == 7
+
+    assert service.model_version('random_forest') == default_version
+    assert service.model_version('random_forest', params) != default_version
+    assert service.modeling()['random_forest'].get_params()['n_estimators'] != 7
+    assert vars(service) == {}
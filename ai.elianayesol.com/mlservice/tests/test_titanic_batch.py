@@ -0,0 +1,52 @@
+# 외부 test 파일 채점: 잘못된 업로드만 400, 서버 오류는 500
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.titanic.titanic_service import TitanicService
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('ML_WARM_SERVICES', '0')
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def fit_calls(monkeypatch):
+    calls = []
+
+    def broken_fit(self, name='random_forest', params=None, dataset=None):
+        calls.append(name)
+        raise ValueError("모델 학습 실패")
+
+    monkeypatch.setattr(TitanicService, 'get_fitted_model', broken_fit)
+    return calls
+
+
+def upload(client, body: bytes, **params):
+    return client.post('/titanic/submit/batch', params=params,
+                       files={'file': ('test.csv', io.BytesIO(body), 'text/csv')})
+
+
+@pytest.mark.parametrize("body, params", [
+    (b"a,b\n1,2\n", {}),
+    (b"", {}),
+    (b"PassengerId,Pclass\n1,\"2\n3", {}),
+    (b"PassengerId,Pclass,Name,Sex,Age,SibSp,Parch,Fare,Embarked\n", {"chunk_size": 0}),
+])
+def test_malformed_upload_is_400_without_fitting(client, fit_calls, body, params):
+    response = upload(client, body, **params)
+    assert response.status_code == 400
+    assert "detail" not in response.json()
+    assert fit_calls == []
+
+
+def test_internal_error_is_500(client, fit_calls):
+    body = b"PassengerId,Pclass,Name,Sex,Age,SibSp,Parch,Fare,Embarked\n892,3,\"Kelly, Mr. James\",male,34.5,0,0,7.8292,Q\n"
+    response = upload(client, body)
+    assert response.status_code == 500
+    assert fit_calls == ['random_forest']
@@ -0,0 +1,37 @@
+# 타이타닉 모델 설명: 검증 fold 에서 Permutation Importance 계산, 모델 버전별 잠금
+import os
+import glob
+
+from app.titanic import titanic_service
+from app.titanic.titanic_service import TitanicService, EXPLAIN_FOLDS, _explain_lock
+from tests.conftest import APP_DIR
+
+
+def test_explain_lock_is_per_model_version():
+    assert _explain_lock('a.json') is _explain_lock('a.json')
+    assert _explain_lock('a.json') is not _explain_lock('b.json')
+
+
+def test_permutation_importance_uses_held_out_rows(monkeypatch, clean_save_dirs):
+    clean_save_dirs('titanic/save')
+    scored = []
+    original = titanic_service.permutation_importance
+
+    def record(estimator, X, y, **kwargs):
+        scored.append(X.index)
+        return original(estimator, X, y, **kwargs)
+
+    monkeypatch.setattr(titanic_service, 'permutation_importance', record)
+    monkeypatch.setattr(titanic_service, '_EXPLAIN_CACHE', {})
+    # 이전 실행이 남긴 설명 파일은 지우고 새로 계산
+    for path in glob.glob(os.path.join(APP_DIR, 'titanic', 'save', 'model_naive_bayes_*.explain_*_r2.json')):
+        os.remove(path)
+
+    result = TitanicService().explain('naive_bayes', n_repeats=2, n_jobs=1)
+
+    # fold 마다 다른 검증 행을 쓰고, 합치면 train 전체를 한 번씩 덮음
+    assert len(scored) == EXPLAIN_FOLDS
+    rows = [i for index in scored for i in index]
+    assert len(rows) == len(set(rows)) == result['n_samples']
+    assert result['cv_folds'] == EXPLAIN_FOLDS
+    assert result['cached'] is False
@@ -0,0 +1,39 @@
+# 저장된 최적 파라미터는 같은 데이터 / 전처리 버전에서만 사용
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.titanic import titanic_tuner
+from app.titanic.titanic_tuner import TitanicTuner
+
+
+@pytest.fixture
+def tuned(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=200), 'b': rng.normal(size=200)})
+    y = (X['a'] + rng.normal(scale=0.5, size=200) > 0).astype(int).to_numpy()
+    tuner = TitanicTuner(save_dir=str(tmp_path), min_budget=60, cv=3, n_jobs=1)
+    result = tuner.tune(X, y, models=['naive_bayes'])
+    return tuner, result
+
+
+def test_load_best_matches_data_version(tuned):
+    tuner, result = tuned
+    best = tuner.load_best(result['data_version'])
+    assert best == {'naive_bayes': result['best']['naive_bayes']['params']}
+    assert tuner.load_best() == best
+    assert tuner.load_best('another-version') == {}
+
+
+def test_load_best_ignores_other_feature_version_and_legacy_file(tuned, monkeypatch):
+    tuner, result = tuned
+    monkeypatch.setattr(titanic_tuner, 'FEATURE_VERSION', titanic_tuner.FEATURE_VERSION + 1)
+    assert tuner.load_best(result['data_version']) == {}
+    monkeypatch.undo()
+
+    # 버전 정보 없이 파라미터만 저장하던 이전 형식
+    with open(tuner.best_path, 'w', encoding='utf-8') as f:
+        json.dump({'naive_bayes': {'var_smoothing': 1e-9}}, f)
+    assert tuner.load_best(result['data_version']) == {}